@@ -28,7 +28,7 @@ from cl.search.constants import ALERTS_HL_TAG, SEARCH_ALERTS_OPINION_HL_FIELDS
 from cl.search.documents import OpinionDocument
 from cl.search.forms import SearchForm
 from cl.search.models import SEARCH_TYPES
-from cl.stats.utils import tally_stat
+from cl.stats.utils import flush_stats, tally_stat
 
 # Only do this number of RT items at a time. If there are more, they will be
 # handled in the next run of this script.
@@ -151,6 +151,7 @@ class Command(VerboseCommand):
         self.send_emails_and_webhooks(options["rate"])
         if options["rate"] == Alert.REAL_TIME:
             self.clean_rt_queue()
+        flush_stats()
 
     def run_query(self, alert, rate):
         results = []
@@ -13,7 +13,7 @@ from cl.alerts.models import (
 from cl.alerts.tasks import send_search_alert_emails
 from cl.alerts.utils import InvalidDateError, override_alert_query
 from cl.lib.command_utils import VerboseCommand, logger
-from cl.stats.utils import tally_stat
+from cl.stats.utils import flush_stats, tally_stat
 
 DAYS_TO_DELETE = 90
 
@@ -180,3 +180,4 @@ class Command(VerboseCommand):
             logger.info("ES OA Alerts are disabled.")
             return None
         send_scheduled_alerts(options["rate"])
+        flush_stats()
@@ -53,6 +53,7 @@ from cl.audio.factories import AudioWithParentsFactory
 from cl.audio.models import Audio
 from cl.donate.models import NeonMembership
 from cl.favorites.factories import NoteFactory, UserTagFactory
+from cl.lib.redis_utils import get_redis_interface
 from cl.lib.test_helpers import SimpleUserDataMixin, opinion_v3_search_api_keys
 from cl.people_db.factories import PersonFactory
 from cl.search.documents import AudioDocument, AudioPercolator
@@ -75,6 +76,7 @@ from cl.search.models import (
 )
 from cl.search.tasks import add_items_to_solr
 from cl.stats.models import Stat
+from cl.stats.utils import STATS_PENDING_KEY, flush_stats
 from cl.tests.base import SELENIUM_TIMEOUT, BaseSeleniumTest
 from cl.tests.cases import APITestCase, ESIndexTestCase, TestCase
 from cl.tests.utils import MockResponse, make_client
@@ -258,7 +260,7 @@ class DocketAlertTest(TestCase):
         self.assertEqual(len(mail.outbox), 0)
 
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     def test_triggering_docket_webhook(self, mock_post) -> None:
@@ -661,7 +663,7 @@ class SearchAlertsWebhooksTest(ESIndexTestCase, TestCase):
         )
         cls.mock_date = now().replace(day=15, hour=0)
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -758,7 +760,7 @@ class SearchAlertsWebhooksTest(ESIndexTestCase, TestCase):
         self.assertEqual(len(search_alerts), 8, msg="Alerts doesn't match.")
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -986,7 +988,7 @@ class SearchAlertsWebhooksTest(ESIndexTestCase, TestCase):
         ]
         for rate, events, results in rates:
             with mock.patch(
-                "cl.api.webhooks.requests.post",
+                "cl.api.webhooks.requests.Session.post",
                 side_effect=lambda *args, **kwargs: MockResponse(
                     200, mock_raw=True
                 ),
@@ -1583,7 +1585,7 @@ class OldDocketAlertsWebhooksTest(TestCase):
 
         # Run handle_old_docket_alerts command, mocking webhook request.
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -1650,7 +1652,7 @@ class OldDocketAlertsWebhooksTest(TestCase):
 
         # Run command again
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -1681,7 +1683,7 @@ class OldDocketAlertsWebhooksTest(TestCase):
         # Run handle_old_docket_alerts command with delete_old_alerts=False,
         # mocking webhook request.
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -1947,7 +1949,7 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
         """Can we send RT OA search alerts?"""
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -2066,7 +2068,7 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
 
         # Confirm no HL fields are properly displayed.
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -2121,7 +2123,7 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
     def test_send_alert_on_document_creation(self, mock_abort_audio):
         """Avoid sending Search Alerts on document updates."""
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -2149,7 +2151,7 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
         self.assertEqual(len(webhook_events), 4)
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -2220,8 +2222,10 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
         alert_count,
         previous_date=None,
     ):
+        # Drop stat increments left over by other tests.
+        get_redis_interface("STATS").delete(STATS_PENDING_KEY)
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -2366,7 +2370,7 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
             )
         # Send mly alerts on a day after 28th, it must fail.
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -2400,7 +2404,7 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
     def test_group_alerts_and_hits(self, mock_logger, mock_abort_audio):
         """"""
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -2460,7 +2464,7 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
                 self.assertTrue(False, "Search Alert webhooks failed.")
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -2522,6 +2526,8 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
         contains more than ELASTICSEARCH_PAGINATION_BATCH_SIZE results. So additional
         requests are performed in order to retrieve all the available results.
         """
+        # Drop stat increments left over by other tests.
+        get_redis_interface("STATS").delete(STATS_PENDING_KEY)
         memberships = NeonMembership.objects.all()
         self.assertEqual(memberships.count(), 2)
         self.assertEqual(len(mail.outbox), 0)
@@ -2566,7 +2572,7 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
 
         # Trigger RT alerts adding a document that matches the alerts.
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -2594,6 +2600,7 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
         self.assertEqual(len(content["results"]), 1)
 
         # Confirm Stat object is properly created and updated.
+        flush_stats()
         stats_objects = Stat.objects.all()
         self.assertEqual(stats_objects.count(), 1)
         self.assertEqual(stats_objects[0].name, "alerts.sent.rt")
@@ -2631,7 +2638,7 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
             # Create a new document that triggers each existing alert created
             # at this stage.
             with mock.patch(
-                "cl.api.webhooks.requests.post",
+                "cl.api.webhooks.requests.Session.post",
                 side_effect=lambda *args, **kwargs: MockResponse(
                     200, mock_raw=True
                 ),
@@ -2671,7 +2678,7 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
         self.assertEqual(len(webhook_events_rate[Alert.MONTHLY]), 10)
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -2707,7 +2714,7 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
 
         # Save a document to percolate it later.
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -2762,7 +2769,7 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
             query="q=Disabled+Alert&type=oa",
         )
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -2800,7 +2807,7 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
             query="q=Scheduled+Alert&type=oa",
         )
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -2895,7 +2902,7 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase):
             query="q=Monthly+Hit&type=oa",
         )
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
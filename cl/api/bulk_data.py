@@ -0,0 +1,802 @@
+import bz2
+import hashlib
+import json
+import os
+import subprocess
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Any, Iterable, Iterator
+
+import boto3
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Model
+
+from cl.audio.models import Audio
+from cl.disclosures.models import (
+    Agreement,
+    Debt,
+    FinancialDisclosure,
+    Gift,
+    Investment,
+    NonInvestmentIncome,
+)
+from cl.disclosures.models import Position as DisclosurePosition
+from cl.disclosures.models import Reimbursement, SpouseIncome
+from cl.lib.command_utils import logger
+from cl.people_db.models import (
+    Education,
+    Person,
+    PoliticalAffiliation,
+    Position,
+    Race,
+    RetentionEvent,
+    School,
+)
+from cl.recap.models import FjcIntegratedDatabase
+from cl.search.models import (
+    Citation,
+    Court,
+    Courthouse,
+    Docket,
+    Opinion,
+    OpinionCluster,
+    OpinionsCited,
+    OriginatingCourtInformation,
+    Parenthetical,
+)
+
+BULK_DATA_PREFIX = "bulk-data"
+# The rows of a table are compressed in blocks of this size, each one in its
+# own process. The compressed blocks are concatenated, which bzip2 and the bz2
+# libraries read as a single file.
+COMPRESSION_BLOCK_SIZE = 16 * 1024 * 1024
+# S3 parts must be at least 5MB, and an upload can have at most 10,000 parts,
+# so this allows files of up to 640GB.
+UPLOAD_PART_SIZE = 64 * 1024 * 1024
+COPY_OPTIONS = "FORMAT csv, ENCODING utf8, HEADER, QUOTE '`'"
+# FORCE_QUOTE is only allowed in COPY TO, so the load script uses the options
+# above.
+EXPORT_COPY_OPTIONS = f"{COPY_OPTIONS}, FORCE_QUOTE *"
+MANIFEST_PREFIX = "manifest-"
+# How far each delta export reaches back before the watermark of the export
+# it follows. See get_delta_since.
+DELTA_OVERLAP = timedelta(hours=1)
+INTEGER_PK_TYPES = {"AutoField", "BigAutoField", "IntegerField"}
+
+
+@dataclass(frozen=True)
+class BulkTable:
+    """A table in the bulk data, and the name of its files."""
+
+    model: type[Model]
+    name: str
+
+    @property
+    def db_table(self) -> str:
+        return self.model._meta.db_table
+
+    @property
+    def columns(self) -> list[str]:
+        return [f.column for f in self.model._meta.concrete_fields]
+
+    def get_filename(self, stamp: str, extension: str = "csv.bz2") -> str:
+        return f"{self.name}-{stamp}.{extension}"
+
+
+def get_delta_stamp(started: datetime) -> str:
+    """Make the stamp that names the files of a delta export. It has the
+    time as well as the date, so that deltas exported on the same day don't
+    overwrite each other.
+
+    :param started: When the export started.
+    :return: The stamp, like "2024-01-02T153000Z".
+    """
+    return started.astimezone(dt_timezone.utc).strftime("%Y-%m-%dT%H%M%SZ")
+
+
+def get_bulk_tables() -> list[BulkTable]:
+    """Get the tables in the bulk data.
+
+    Tables are listed so that the tables they have foreign keys to come
+    before them, which is the order they have to be loaded in.
+
+    :return: The tables to export.
+    """
+    return [
+        BulkTable(Person, "people-db-people"),
+        BulkTable(Race, "people_db_race"),
+        BulkTable(School, "people-db-schools"),
+        BulkTable(Court, "courts"),
+        BulkTable(Position, "people-db-positions"),
+        BulkTable(FjcIntegratedDatabase, "fjc-integrated-database"),
+        BulkTable(
+            OriginatingCourtInformation, "originating-court-information"
+        ),
+        BulkTable(Docket, "dockets"),
+        BulkTable(OpinionCluster, "opinion-clusters"),
+        BulkTable(OpinionCluster.panel.through, "search_opinioncluster_panel"),
+        BulkTable(
+            OpinionCluster.non_participating_judges.through,
+            "search_opinioncluster_non_participating_judges",
+        ),
+        BulkTable(Opinion, "opinions"),
+        BulkTable(Opinion.joined_by.through, "search_opinion_joined_by"),
+        BulkTable(Courthouse, "courthouses"),
+        BulkTable(Court.appeals_to.through, "court-appeals-to"),
+        BulkTable(OpinionsCited, "citation-map"),
+        BulkTable(Citation, "citations"),
+        BulkTable(Parenthetical, "parentheticals"),
+        BulkTable(Audio, "oral-arguments"),
+        BulkTable(RetentionEvent, "people-db-retention-events"),
+        BulkTable(Education, "people-db-educations"),
+        BulkTable(PoliticalAffiliation, "people-db-political-affiliations"),
+        BulkTable(Person.race.through, "people-db-races"),
+        BulkTable(FinancialDisclosure, "financial-disclosures"),
+        BulkTable(Investment, "financial-disclosure-investments"),
+        BulkTable(DisclosurePosition, "financial-disclosures-positions"),
+        BulkTable(Agreement, "financial-disclosures-agreements"),
+        BulkTable(
+            NonInvestmentIncome, "financial-disclosures-non-investment-income"
+        ),
+        BulkTable(SpouseIncome, "financial-disclosures-spousal-income"),
+        BulkTable(Reimbursement, "financial-disclosures-reimbursements"),
+        BulkTable(Gift, "financial-disclosures-gifts"),
+        BulkTable(Debt, "financial-disclosures-debts"),
+    ]
+
+
+class S3MultipartUpload:
+    """Upload a file to the bulk data bucket in parts, as it's written.
+
+    Use it as a context manager. The upload is completed when the block
+    exits, or aborted if it raises, so no partial files are published.
+    """
+
+    def __init__(self, key: str, part_size: int = UPLOAD_PART_SIZE) -> None:
+        self.key = key
+        self.part_size = part_size
+        self.client = boto3.client("s3")
+        self.bucket = settings.AWS_STORAGE_BUCKET_NAME
+        self.buffer = bytearray()
+        self.parts: list[dict[str, Any]] = []
+        self.upload_id = ""
+
+    def __enter__(self) -> "S3MultipartUpload":
+        upload = self.client.create_multipart_upload(
+            Bucket=self.bucket, Key=self.key, ACL="public-read"
+        )
+        self.upload_id = upload["UploadId"]
+        return self
+
+    def write(self, data: bytes) -> None:
+        self.buffer += data
+        while len(self.buffer) >= self.part_size:
+            self._upload_part(bytes(self.buffer[: self.part_size]))
+            del self.buffer[: self.part_size]
+
+    def _upload_part(self, data: bytes) -> None:
+        part_number = len(self.parts) + 1
+        part = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        self.parts.append({"ETag": part["ETag"], "PartNumber": part_number})
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self.upload_id
+            )
+            return
+        if self.buffer or not self.parts:
+            # The last part can be smaller than the part size.
+            self._upload_part(bytes(self.buffer))
+            self.buffer.clear()
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": self.parts},
+        )
+
+
+def compress_block(block: bytes) -> bytes:
+    """Compress a block of rows. This runs in the compression processes.
+
+    :param block: The uncompressed block.
+    :return: The block as a complete bz2 stream.
+    """
+    return bz2.compress(block)
+
+
+def iter_blocks(chunks: Iterable[bytes], block_size: int) -> Iterator[bytes]:
+    """Group a stream of chunks into blocks of at least the given size.
+
+    :param chunks: The chunks, like the ones COPY TO STDOUT streams.
+    :param block_size: The minimum size of each block but the last one.
+    :return: An iterator of blocks.
+    """
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= block_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def compress_in_order(
+    blocks: Iterable[bytes], executor: Executor, max_pending: int
+) -> Iterator[bytes]:
+    """Compress blocks in parallel, yielding them in their original order.
+
+    At most max_pending blocks are held in memory at a time, so the producer
+    slows down if compression falls behind.
+
+    :param blocks: The blocks to compress.
+    :param executor: The executor to compress the blocks in.
+    :param max_pending: The max number of blocks compressing at a time.
+    :return: An iterator of compressed blocks.
+    """
+    pending: deque = deque()
+    for block in blocks:
+        pending.append(executor.submit(compress_block, block))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def begin_snapshot_transaction(using: str, snapshot_id: str | None) -> str:
+    """Start a read only, repeatable read transaction, and share its
+    snapshot, so that every table is exported from the same point in time.
+
+    Must be called inside a transaction on the connection.
+
+    :param using: The database alias.
+    :param snapshot_id: The snapshot to use, or None to export a new one.
+    :return: The ID of the transaction's snapshot.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY"
+        )
+        if snapshot_id is None:
+            cursor.execute("SELECT pg_export_snapshot()")
+            return cursor.fetchone()[0]
+        cursor.execute("SET TRANSACTION SNAPSHOT %s", [snapshot_id])
+        return snapshot_id
+
+
+@contextmanager
+def snapshot_cursor(using: str, snapshot_id: str) -> Iterator[Any]:
+    """Open a cursor in a transaction reading from an exported snapshot.
+
+    This is used by the threads exporting tables, each with a connection of
+    its own, which is closed when the block exits.
+
+    :param using: The database alias.
+    :param snapshot_id: The snapshot to read from.
+    :return: A cursor, without a statement timeout.
+    """
+    connection = connections[using]
+    try:
+        with transaction.atomic(using=using):
+            begin_snapshot_transaction(using, snapshot_id)
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL statement_timeout TO 0")
+                yield cursor
+    finally:
+        connection.close()
+
+
+def get_watermark(using: str) -> datetime:
+    """Get the moment the data in the current transaction is up to date as
+    of. On a replica, that's the commit time of the last transaction it
+    replayed, not the current time.
+
+    :param using: The database alias.
+    :return: The watermark of the next delta export.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT COALESCE(pg_last_xact_replay_timestamp(), now())"
+        )
+        return cursor.fetchone()[0]
+
+
+def get_event_tables() -> dict[str, str]:
+    """Map the tables tracked by pghistory to their event tables.
+
+    :return: A dict mapping tracked tables to their event tables.
+    """
+    return {
+        model.pgh_tracked_model._meta.db_table: model._meta.db_table
+        for model in apps.get_models()
+        if getattr(model, "pgh_tracked_model", None)
+    }
+
+
+def copy_to_s3(
+    cursor,
+    query: str,
+    params: list[Any],
+    filename: str,
+    executor: Executor,
+    max_pending: int,
+) -> dict[str, Any]:
+    """Stream the results of a query to the bulk data bucket.
+
+    The rows are streamed with COPY TO STDOUT, compressed in blocks in the
+    executor's processes and uploaded in parts as they're compressed, so the
+    file is never staged on disk or held in memory whole.
+
+    :param cursor: The cursor to run the query with.
+    :param query: A table, or a SELECT in parentheses, to copy.
+    :param params: The parameters of the query.
+    :param filename: The name of the file to upload.
+    :param executor: The executor to compress the blocks in.
+    :param max_pending: The max number of blocks compressing at a time.
+    :return: The file's name, row count, size and checksum.
+    """
+    logger.info("Streaming %s", filename)
+    sha256 = hashlib.sha256()
+    size = 0
+    with (
+        S3MultipartUpload(f"{BULK_DATA_PREFIX}/{filename}") as upload,
+        cursor.copy(
+            f"COPY {query} TO STDOUT WITH ({EXPORT_COPY_OPTIONS})", params
+        ) as copy,
+    ):
+        blocks = iter_blocks(copy, COMPRESSION_BLOCK_SIZE)
+        for data in compress_in_order(blocks, executor, max_pending):
+            sha256.update(data)
+            size += len(data)
+            upload.write(data)
+    # After a COPY, rowcount is the number of rows copied.
+    rows = cursor.rowcount
+    logger.info("Exported %s rows to %s", rows, filename)
+    return {
+        "file": filename,
+        "rows": rows,
+        "bytes": size,
+        "sha256": sha256.hexdigest(),
+    }
+
+
+def get_max_id(cursor, table: BulkTable) -> int | None:
+    """Get the highest ID of a table with integer IDs.
+
+    :param cursor: The cursor to query with.
+    :param table: The table.
+    :return: The highest ID, or None if the table doesn't have integer IDs
+    or is empty.
+    """
+    if table.model._meta.pk.get_internal_type() not in INTEGER_PK_TYPES:
+        return None
+    quote_name = cursor.db.ops.quote_name
+    cursor.execute(
+        f"SELECT max({quote_name(table.model._meta.pk.column)}) "
+        f"FROM {quote_name(table.db_table)}"
+    )
+    return cursor.fetchone()[0]
+
+
+def export_table(
+    table: BulkTable,
+    stamp: str,
+    using: str,
+    snapshot_id: str,
+    executor: Executor,
+    max_pending: int,
+) -> dict[str, Any]:
+    """Stream a whole table to the bulk data bucket.
+
+    This runs in a thread of its own, with its own DB connection.
+
+    :param table: The table to export.
+    :param stamp: The stamp of the export, used in the file name: the date
+    of a full export, or the stamp of a delta export from get_delta_stamp.
+    :param using: The database alias to export from.
+    :param snapshot_id: The snapshot to export the table from.
+    :param executor: The executor to compress the blocks in.
+    :param max_pending: The max number of blocks compressing at a time.
+    :return: The manifest entry of the table.
+    """
+    quote_name = connections[using].ops.quote_name
+    columns = ", ".join(quote_name(column) for column in table.columns)
+    with snapshot_cursor(using, snapshot_id) as cursor:
+        upserts = copy_to_s3(
+            cursor,
+            f"{quote_name(table.db_table)} ({columns})",
+            [],
+            table.get_filename(stamp),
+            executor,
+            max_pending,
+        )
+        max_id = get_max_id(cursor, table)
+    return {
+        "table": table.db_table,
+        "mode": "full",
+        "columns": table.columns,
+        "max_id": max_id,
+        "upserts": upserts,
+        "deletes": None,
+    }
+
+
+def export_table_delta(
+    table: BulkTable,
+    stamp: str,
+    using: str,
+    snapshot_id: str,
+    since: datetime,
+    previous: dict[str, Any] | None,
+    event_table: str | None,
+    executor: Executor,
+    max_pending: int,
+) -> dict[str, Any]:
+    """Stream the rows of a table that changed since the last export to the
+    bulk data bucket, along with the IDs of the rows deleted since then.
+
+    Deleted rows are found in the pghistory event table, which keeps a
+    snapshot of each row that's updated or deleted. Upserts are the rows
+    modified since the last export, or, in tables without a date_modified
+    field, the rows that are new or have events since then. Tables that
+    aren't tracked by pghistory, or weren't in the last export, are exported
+    in full.
+
+    This runs in a thread of its own, with its own DB connection.
+
+    :param table: The table to export.
+    :param stamp: The stamp of the export, used in the file names.
+    :param using: The database alias to export from.
+    :param snapshot_id: The snapshot to export the table from.
+    :param since: When to export the changes from.
+    :param previous: The entry of the table in the last export's manifest,
+    if it had one.
+    :param event_table: The pghistory event table of the table, if any.
+    :param executor: The executor to compress the blocks in.
+    :param max_pending: The max number of blocks compressing at a time.
+    :return: The manifest entry of the table.
+    """
+    fields = {f.name for f in table.model._meta.concrete_fields}
+    previous_max_id = previous["max_id"] if previous else None
+    if (
+        event_table is None
+        or previous is None
+        or ("date_modified" not in fields and previous_max_id is None)
+    ):
+        return export_table(
+            table, stamp, using, snapshot_id, executor, max_pending
+        )
+
+    quote_name = connections[using].ops.quote_name
+    db_table = quote_name(table.db_table)
+    pk = quote_name(table.model._meta.pk.column)
+    # The event tables have BRIN indexes on pgh_created_at for these queries.
+    events = quote_name(event_table)
+    columns = ", ".join(quote_name(column) for column in table.columns)
+    if "date_modified" in fields:
+        where = "date_modified >= %s"
+        params = [since]
+    else:
+        where = (
+            f"{pk} > %s OR {pk} IN "
+            f"(SELECT id FROM {events} WHERE pgh_created_at >= %s)"
+        )
+        params = [previous_max_id, since]
+    with snapshot_cursor(using, snapshot_id) as cursor:
+        upserts = copy_to_s3(
+            cursor,
+            f"(SELECT {columns} FROM {db_table} WHERE {where})",
+            params,
+            table.get_filename(stamp, "delta.csv.bz2"),
+            executor,
+            max_pending,
+        )
+        deletes = copy_to_s3(
+            cursor,
+            f"(SELECT DISTINCT e.id FROM {events} e "
+            f"WHERE e.pgh_created_at >= %s AND NOT EXISTS "
+            f"(SELECT 1 FROM {db_table} t WHERE t.{pk} = e.id))",
+            [since],
+            table.get_filename(stamp, "deletes.csv.bz2"),
+            executor,
+            max_pending,
+        )
+        max_id = get_max_id(cursor, table)
+    return {
+        "table": table.db_table,
+        "mode": "delta",
+        "columns": table.columns,
+        "max_id": max_id,
+        "upserts": upserts,
+        "deletes": deletes,
+    }
+
+
+def export_schema(day: date, using: str) -> str:
+    """Stream the schema of the exported tables to the bulk data bucket.
+
+    :param day: The date of the export, used in the file name.
+    :param using: The database alias to export from.
+    :return: The name of the schema file.
+    """
+    filename = f"schema-{day.isoformat()}.sql"
+    db = settings.DATABASES[using]
+    command = [
+        "pg_dump",
+        "--host",
+        db["HOST"],
+        "--username",
+        db["USER"],
+        "--create",
+        "--schema-only",
+        "--no-privileges",
+        "--no-publications",
+        "--no-subscriptions",
+    ]
+    for pattern in ["search_*", "people_db_*", "audio_*", "recap_*"]:
+        command.extend(["--table", pattern])
+    command.extend(["--table", "disclosures_*", db["NAME"]])
+    env = {**os.environ, "PGPASSWORD": db["PASSWORD"]}
+    with (
+        subprocess.Popen(command, stdout=subprocess.PIPE, env=env) as proc,
+        S3MultipartUpload(f"{BULK_DATA_PREFIX}/{filename}") as upload,
+    ):
+        while data := proc.stdout.read(UPLOAD_PART_SIZE):
+            upload.write(data)
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, command)
+    return filename
+
+
+def make_load_script(
+    tables: list[BulkTable], day: date, schema_filename: str
+) -> str:
+    """Make the shell script that loads the bulk data into a database.
+
+    :param tables: The exported tables, in the order to load them.
+    :param day: The date of the export.
+    :param schema_filename: The name of the schema file.
+    :return: The script.
+    """
+    lines = [
+        "#!/bin/bash",
+        "set -e",
+        "# You must place all uncompressed bulk files in the same directory "
+        "and set",
+        "# environment variable BULK_DIR, BULK_DB_HOST, BULK_DB_USER, "
+        "BULK_DB_PASSWORD",
+        "# NOTES:",
+        "# 1. If you have your postgresql instance on a docker service, you "
+        "need to mount",
+        "# the directory where the bulk files are, otherwise you will get "
+        "this error:",
+        "# ERROR:  could not open file No such file or directory",
+        "# 2. You may need to grant execute permissions to this file",
+        "",
+    ]
+    for variable, description in [
+        ("BULK_DIR", " BULK_DIR is where all the unzipped files are."),
+        ("BULK_DB_HOST", ""),
+        ("BULK_DB_USER", ""),
+        ("BULK_DB_PASSWORD", ""),
+    ]:
+        lines.extend(
+            [
+                f"if [[ -z ${{{variable}}} ]];",
+                "then",
+                f"echo \"Variable having name '{variable}' is not "
+                f'set.{description}"',
+                "exit",
+                "fi",
+                "",
+            ]
+        )
+    lines.extend(
+        [
+            "# Default from schema is 'courtlistener'",
+            "export BULK_DB_NAME=courtlistener",
+            "export PGPASSWORD=$BULK_DB_PASSWORD",
+            "",
+            f'echo "Loading schema to database: {schema_filename}"',
+            f'psql -f "$BULK_DIR"/{schema_filename} --host "$BULK_DB_HOST" '
+            '--username "$BULK_DB_USER"',
+            "",
+        ]
+    )
+    for table in tables:
+        csv_filename = table.get_filename(day.isoformat(), "csv")
+        columns = ", ".join(table.columns)
+        lines.extend(
+            [
+                f'echo "Loading {csv_filename} to database"',
+                "psql --command \\",
+                f'"COPY public.{table.db_table} ({columns}) FROM '
+                f"'$BULK_DIR/{csv_filename}' WITH ({COPY_OPTIONS})\" \\",
+                '--host "$BULK_DB_HOST" \\',
+                '--username "$BULK_DB_USER" \\',
+                '--dbname "$BULK_DB_NAME"',
+                "",
+            ]
+        )
+    return "\n".join(lines)
+
+
+def upload_bulk_file(filename: str, content: str) -> None:
+    """Upload a small text file to the bulk data bucket.
+
+    :param filename: The name of the file.
+    :param content: The content of the file.
+    :return: None
+    """
+    with S3MultipartUpload(f"{BULK_DATA_PREFIX}/{filename}") as upload:
+        upload.write(content.encode())
+
+
+def make_manifest(
+    day: date,
+    snapshot_id: str,
+    watermark: datetime,
+    tables: list[dict[str, Any]],
+    previous: dict[str, Any] | None = None,
+    stamp: str | None = None,
+) -> dict[str, Any]:
+    """Make the manifest of an export, listing its files with their row
+    counts and checksums.
+
+    Delta exports are chained: each one names the manifest it follows and
+    the full export the chain started from. Loading the base export and then
+    each delta in order gives the data as of the last one's watermark.
+
+    :param day: The date of the export.
+    :param snapshot_id: The snapshot the tables were exported from.
+    :param watermark: The moment the data is up to date as of.
+    :param tables: The manifest entries of the exported tables.
+    :param previous: The manifest of the last export, for delta exports.
+    :param stamp: The stamp of the files of a delta export.
+    :return: The manifest.
+    """
+    if previous is None:
+        name = get_manifest_filename(day.isoformat(), delta=False)
+        base = name
+    else:
+        name = get_manifest_filename(stamp, delta=True)
+        base = previous["base"]
+    return {
+        "manifest": name,
+        "type": "full" if previous is None else "delta",
+        "date": day.isoformat(),
+        "snapshot": snapshot_id,
+        "watermark": watermark.isoformat(),
+        "base": base,
+        "previous": previous["manifest"] if previous else None,
+        "since": previous["watermark"] if previous else None,
+        "tables": tables,
+    }
+
+
+def get_manifest_filename(stamp: str, delta: bool) -> str:
+    kind = "delta-" if delta else ""
+    return f"{MANIFEST_PREFIX}{kind}{stamp}.json"
+
+
+def get_latest_manifest() -> dict[str, Any] | None:
+    """Get the manifest of the most recent export, full or delta.
+
+    :return: The manifest, or None if there hasn't been an export yet.
+    """
+    client = boto3.client("s3")
+    bucket = settings.AWS_STORAGE_BUCKET_NAME
+    paginator = client.get_paginator("list_objects_v2")
+    latest = None
+    for page in paginator.paginate(
+        Bucket=bucket, Prefix=f"{BULK_DATA_PREFIX}/{MANIFEST_PREFIX}"
+    ):
+        for item in page.get("Contents", []):
+            if latest is None or item["LastModified"] > latest["LastModified"]:
+                latest = item
+    if latest is None:
+        return None
+    return get_manifest(latest["Key"].removeprefix(f"{BULK_DATA_PREFIX}/"))
+
+
+def get_manifest(filename: str) -> dict[str, Any]:
+    """Get the manifest of an export from the bulk data bucket.
+
+    :param filename: The name of the manifest.
+    :return: The manifest.
+    """
+    obj = boto3.client("s3").get_object(
+        Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+        Key=f"{BULK_DATA_PREFIX}/{filename}",
+    )
+    return json.loads(obj["Body"].read())
+
+
+def get_delta_since(previous: dict[str, Any]) -> datetime:
+    """Get the moment a delta export following another export starts from.
+
+    Rows are stamped with the time their transaction started, so a row
+    committed after the last export's snapshot can have a date_modified
+    before its watermark. The deltas overlap by DELTA_OVERLAP so such rows
+    aren't missed. Loading a row twice is harmless, since they're upserts.
+
+    :param previous: The manifest of the last export.
+    :return: When to export the changes from.
+    """
+    return datetime.fromisoformat(previous["watermark"]) - DELTA_OVERLAP
+
+
+def make_delta_load_script(manifest: dict[str, Any]) -> str:
+    """Make the SQL script that applies a delta export to a database loaded
+    from the previous exports in its chain.
+
+    Run it with psql from the directory the uncompressed files are in.
+
+    :param manifest: The manifest of the delta export.
+    :return: The script.
+    """
+    lines = [
+        f"-- Applies {manifest['manifest']} on top of {manifest['previous']}",
+        "BEGIN;",
+        "SET CONSTRAINTS ALL DEFERRED;",
+    ]
+    for entry in manifest["tables"]:
+        table = entry["table"]
+        columns = ", ".join(entry["columns"])
+        updates = ", ".join(
+            f"{column} = EXCLUDED.{column}"
+            for column in entry["columns"]
+            if column != "id"
+        )
+        upserts = entry["upserts"]["file"].removesuffix(".bz2")
+        lines.extend(
+            [
+                "CREATE TEMP TABLE delta_upserts "
+                f"(LIKE {table} INCLUDING DEFAULTS);",
+                f"\\copy delta_upserts ({columns}) FROM '{upserts}' "
+                f"WITH ({COPY_OPTIONS})",
+            ]
+        )
+        if entry["mode"] == "full":
+            # The table was exported whole, so any row not in it is gone.
+            lines.append(
+                f"DELETE FROM {table} t WHERE NOT EXISTS "
+                "(SELECT 1 FROM delta_upserts u WHERE u.id = t.id);"
+            )
+        else:
+            deletes = entry["deletes"]["file"].removesuffix(".bz2")
+            lines.extend(
+                [
+                    "CREATE TEMP TABLE delta_deletes AS "
+                    f"SELECT id FROM {table} WITH NO DATA;",
+                    f"\\copy delta_deletes (id) FROM '{deletes}' "
+                    f"WITH ({COPY_OPTIONS})",
+                    f"DELETE FROM {table} WHERE id IN "
+                    "(SELECT id FROM delta_deletes);",
+                    "DROP TABLE delta_deletes;",
+                ]
+            )
+        lines.extend(
+            [
+                f"INSERT INTO {table} ({columns}) "
+                f"SELECT {columns} FROM delta_upserts "
+                f"ON CONFLICT (id) DO UPDATE SET {updates};",
+                "DROP TABLE delta_upserts;",
+            ]
+        )
+    lines.append("COMMIT;")
+    return "\n".join(lines) + "\n"
@@ -1,12 +1,12 @@
 import sys
 import time
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 from django.db import transaction
 from django.utils.timezone import now
 
 from cl.api.models import WEBHOOK_EVENT_STATUS, Webhook, WebhookEvent
-from cl.api.webhooks import send_webhook_event
+from cl.api.webhooks import send_webhook_events
 from cl.lib.command_utils import VerboseCommand
 from cl.lib.redis_utils import get_redis_interface
 from cl.users.tasks import send_webhook_still_disabled_email
@@ -17,6 +17,50 @@ DAYS_TO_DELETE = 90
 # Currently, that's about 54 hours (3 min delay with 3× backoff).
 HOURS_WEBHOOKS_CUT_OFF = 60
 
+# The number of webhook events sent concurrently on each retry batch.
+RETRY_BATCH_SIZE = 100
+
+# How long the events claimed by a retry batch are left alone by other
+# retries. If the process dies while sending them, they're retried after it.
+RETRY_CLAIM_DURATION = timedelta(minutes=30)
+
+
+def claim_webhook_events(created_date_cut_off: datetime) -> list[WebhookEvent]:
+    """Claim a batch of webhook events to retry.
+
+    The events are locked only while their next retry date is pushed past
+    RETRY_CLAIM_DURATION, and the claim is committed before they're sent, so
+    no row locks are held during the requests. Sending an event sets its next
+    retry date again.
+
+    :param created_date_cut_off: Events created before this aren't retried.
+    :return: The claimed webhook events.
+    """
+    with transaction.atomic():
+        webhook_events = list(
+            WebhookEvent.objects.select_for_update(
+                of=("self",), skip_locked=True
+            )
+            .filter(
+                next_retry_date__lte=now(),
+                debug=False,
+                webhook__enabled=True,
+                event_status__in=[
+                    WEBHOOK_EVENT_STATUS.ENQUEUED_RETRY,
+                    WEBHOOK_EVENT_STATUS.ENDPOINT_DISABLED,
+                ],
+                date_created__gte=created_date_cut_off,
+            )
+            .select_related("webhook__user")
+            .order_by("date_created")[:RETRY_BATCH_SIZE]
+        )
+        WebhookEvent.objects.filter(
+            pk__in=[webhook_event.pk for webhook_event in webhook_events]
+        ).update(
+            next_retry_date=now() + RETRY_CLAIM_DURATION, date_modified=now()
+        )
+    return webhook_events
+
 
 def retry_webhook_events() -> int:
     """Retry Webhook events that need to be retried.
@@ -24,8 +68,8 @@ def retry_webhook_events() -> int:
     :return: Number of retried webhooks .
     """
 
+    created_date_cut_off = now() - timedelta(hours=HOURS_WEBHOOKS_CUT_OFF)
     with transaction.atomic():
-        created_date_cut_off = now() - timedelta(hours=HOURS_WEBHOOKS_CUT_OFF)
         base_events = WebhookEvent.objects.select_for_update().filter(
             next_retry_date__lte=now(),
             debug=False,
@@ -48,16 +92,11 @@ def retry_webhook_events() -> int:
             date_created__gte=created_date_cut_off,
         ).update(retry_counter=0, date_modified=now())
 
-        webhook_events_to_retry = base_events.filter(
-            event_status__in=[
-                WEBHOOK_EVENT_STATUS.ENQUEUED_RETRY,
-                WEBHOOK_EVENT_STATUS.ENDPOINT_DISABLED,
-            ],
-            date_created__gte=created_date_cut_off,
-        ).order_by("date_created")
-        for webhook_event in webhook_events_to_retry:
-            send_webhook_event(webhook_event)
-    return len(webhook_events_to_retry)
+    retried = 0
+    while webhook_events := claim_webhook_events(created_date_cut_off):
+        send_webhook_events(webhook_events)
+        retried += len(webhook_events)
+    return retried
 
 
 def delete_old_webhook_events() -> int:
@@ -0,0 +1,173 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date
+
+from django.conf import settings
+from django.core.management import CommandError
+from django.db import connections, transaction
+from django.utils.timezone import now
+
+from cl.api.bulk_data import (
+    begin_snapshot_transaction,
+    export_schema,
+    export_table,
+    export_table_delta,
+    get_bulk_tables,
+    get_delta_since,
+    get_delta_stamp,
+    get_event_tables,
+    get_latest_manifest,
+    get_manifest,
+    get_watermark,
+    make_delta_load_script,
+    make_load_script,
+    make_manifest,
+    upload_bulk_file,
+)
+from cl.lib.command_utils import VerboseCommand, logger
+
+
+class Command(VerboseCommand):
+    help = (
+        "Export the bulk data files to S3. Tables are streamed from a single "
+        "snapshot of the DB with COPY TO STDOUT, compressed in parallel and "
+        "uploaded as they're compressed, so nothing is staged on disk."
+    )
+
+    def add_arguments(self, parser):
+        has_replica = "replica" in settings.DATABASES
+        parser.add_argument(
+            "--database",
+            type=str,
+            default="replica" if has_replica else "default",
+            help="The DB to export from. Defaults to the replica, if there "
+            "is one.",
+        )
+        parser.add_argument(
+            "--table-workers",
+            type=int,
+            default=4,
+            help="The number of tables to export at a time.",
+        )
+        parser.add_argument(
+            "--compression-workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="The number of processes compressing the files.",
+        )
+        parser.add_argument(
+            "--tables",
+            type=str,
+            nargs="*",
+            default=[],
+            help="Only export these tables, e.g. search_docket. Defaults to "
+            "all of them. The schema and load script are only exported "
+            "along with all of the tables.",
+        )
+        parser.add_argument(
+            "--delta",
+            action="store_true",
+            default=False,
+            help="Only export the changes since the last export, full or "
+            "delta, along with the IDs of the deleted rows.",
+        )
+        parser.add_argument(
+            "--since",
+            type=str,
+            default="",
+            help="With --delta, the manifest of the export to export the "
+            "changes since, e.g. manifest-2024-01-31.json. Defaults to the "
+            "latest one.",
+        )
+
+    def handle(self, *args, **options):
+        super().handle(*args, **options)
+
+        using = options["database"]
+        tables = get_bulk_tables()
+        if options["tables"]:
+            tables = [t for t in tables if t.db_table in options["tables"]]
+        day = date.today()
+        stamp = day.isoformat()
+        compression_workers = options["compression_workers"]
+        # Keep every compression process busy, with a block queued behind
+        # it, without letting one table hog all of them.
+        max_pending = max(
+            2, 2 * compression_workers // options["table_workers"]
+        )
+
+        previous = None
+        if options["delta"]:
+            if options["since"]:
+                previous = get_manifest(options["since"])
+            else:
+                previous = get_latest_manifest()
+            if previous is None:
+                raise CommandError("There's no export to make a delta of.")
+            since = get_delta_since(previous)
+            stamp = get_delta_stamp(now())
+            previous_tables = {t["table"]: t for t in previous["tables"]}
+            event_tables = get_event_tables()
+            logger.info(
+                "Exporting the changes since %s, after %s",
+                since,
+                previous["manifest"],
+            )
+
+        # The transaction exporting the snapshot must stay open until every
+        # table has started reading from it.
+        with transaction.atomic(using=using):
+            snapshot_id = begin_snapshot_transaction(using, None)
+            watermark = get_watermark(using)
+            logger.info(
+                "Exporting %s tables from snapshot %s",
+                len(tables),
+                snapshot_id,
+            )
+            with (
+                ProcessPoolExecutor(compression_workers) as compressors,
+                ThreadPoolExecutor(options["table_workers"]) as exporters,
+            ):
+                futures = []
+                for table in tables:
+                    args = [table, stamp, using, snapshot_id]
+                    if previous is None:
+                        future = exporters.submit(
+                            export_table, *args, compressors, max_pending
+                        )
+                    else:
+                        future = exporters.submit(
+                            export_table_delta,
+                            *args,
+                            since,
+                            previous_tables.get(table.db_table),
+                            event_tables.get(table.db_table),
+                            compressors,
+                            max_pending,
+                        )
+                    futures.append(future)
+                # Keep the manifest in load order, whichever tables finish
+                # first.
+                entries = [future.result() for future in futures]
+        connections[using].close()
+
+        manifest = make_manifest(
+            day, snapshot_id, watermark, entries, previous, stamp
+        )
+        if previous is not None:
+            upload_bulk_file(
+                f"load-bulk-data-delta-{stamp}.sql",
+                make_delta_load_script(manifest),
+            )
+        elif not options["tables"]:
+            logger.info("Exporting the schema")
+            schema_filename = export_schema(day, using)
+            upload_bulk_file(
+                f"load-bulk-data-{day.isoformat()}.sh",
+                make_load_script(tables, day, schema_filename),
+            )
+        # The manifest goes last, so that the next delta only follows
+        # exports that finished.
+        upload_bulk_file(manifest["manifest"], json.dumps(manifest, indent=2))
+        logger.info("Done exporting the bulk data")
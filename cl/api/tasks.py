@@ -1,13 +1,11 @@
 import json
 from typing import Any
 
-from rest_framework.renderers import JSONRenderer
-
 from cl.alerts.api_serializers import SearchAlertSerializerModel
 from cl.alerts.models import Alert
 from cl.api.models import Webhook, WebhookEvent, WebhookEventType
 from cl.api.utils import generate_webhook_key_content
-from cl.api.webhooks import send_webhook_event
+from cl.api.webhooks import render_webhook_content, send_webhook_event
 from cl.celery_init import app
 from cl.corpus_importer.api_serializers import DocketEntrySerializer
 from cl.search.api_serializers import V3OAESResultSerializer
@@ -64,11 +62,7 @@ def send_docket_alert_webhook_events(
                 "results": serialized_docket_entries,
             },
         }
-        renderer = JSONRenderer()
-        json_bytes = renderer.render(
-            post_content,
-            accepted_media_type="application/json;",
-        )
+        json_bytes = render_webhook_content(post_content)
 
         webhook_event = WebhookEvent.objects.create(
             webhook=webhook,
@@ -106,11 +100,7 @@ def send_es_search_alert_webhook(
             "alert": serialized_alert,
         },
     }
-    renderer = JSONRenderer()
-    json_bytes = renderer.render(
-        post_content,
-        accepted_media_type="application/json;",
-    )
+    json_bytes = render_webhook_content(post_content)
     webhook_event = WebhookEvent.objects.create(
         webhook=webhook,
         content=post_content,
@@ -1,4 +1,6 @@
+import bz2
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 from http import HTTPStatus
 from typing import Any, Dict
@@ -10,10 +12,11 @@ from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import Permission
 from django.contrib.humanize.templatetags.humanize import intcomma, ordinal
 from django.db import connection
-from django.http import HttpRequest, JsonResponse
+from django.http import HttpRequest, JsonResponse, QueryDict
 from django.test.client import AsyncClient, AsyncRequestFactory
 from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import http_date
 from django.utils.timezone import now
 from rest_framework.exceptions import NotFound
 from rest_framework.pagination import Cursor, CursorPagination
@@ -21,9 +24,24 @@ from rest_framework.request import Request
 from rest_framework.test import APIRequestFactory
 
 from cl.alerts.api_views import DocketAlertViewSet, SearchAlertViewSet
+from cl.api.bulk_data import (
+    compress_in_order,
+    get_bulk_tables,
+    get_delta_since,
+    get_event_tables,
+    iter_blocks,
+    make_delta_load_script,
+    make_load_script,
+    make_manifest,
+)
 from cl.api.factories import WebhookEventFactory, WebhookFactory
 from cl.api.models import WEBHOOK_EVENT_STATUS, WebhookEvent, WebhookEventType
 from cl.api.pagination import VersionBasedPagination
+from cl.api.utils import (
+    FastJSONRenderer,
+    FastListMixin,
+    invalidate_list_cache,
+)
 from cl.api.views import coverage_data
 from cl.api.webhooks import send_webhook_event
 from cl.audio.api_views import AudioViewSet
@@ -59,7 +77,11 @@ from cl.people_db.api_views import (
     SchoolViewSet,
     SourceViewSet,
 )
-from cl.people_db.factories import PartyFactory, PartyTypeFactory
+from cl.people_db.factories import (
+    PartyFactory,
+    PartyTypeFactory,
+    SchoolFactory,
+)
 from cl.people_db.models import Attorney
 from cl.recap.factories import ProcessingQueueFactory
 from cl.recap.views import (
@@ -80,8 +102,13 @@ from cl.search.api_views import (
     RECAPDocumentViewSet,
     TagViewSet,
 )
-from cl.search.factories import CourtFactory, DocketFactory
-from cl.search.models import SOURCES, Docket, Opinion
+from cl.search.factories import (
+    CourtFactory,
+    DocketEntryWithParentsFactory,
+    DocketFactory,
+    RECAPDocumentFactory,
+)
+from cl.search.models import SOURCES, Docket, Opinion, RECAPDocument, Tag
 from cl.stats.models import Event
 from cl.tests.cases import SimpleTestCase, TestCase, TransactionTestCase
 from cl.tests.utils import MockResponse, make_client
@@ -387,6 +414,188 @@ class ApiEventCreationTestCase(TestCase):
         )
 
 
+@mock.patch(
+    "cl.api.utils.get_logging_prefix",
+    return_value="api:test_conditional",
+)
+class ConditionalGetTest(TestCase):
+    """Are conditional requests answered with 304 Not Modified?"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.court = CourtFactory(id="canb", jurisdiction="FB")
+        cls.other_court = CourtFactory(id="cand", jurisdiction="FD")
+        cls.docket = DocketFactory(court=cls.court, source=Docket.HARVARD)
+        DocketFactory(court=cls.other_court, source=Docket.HARVARD)
+        cls.school = SchoolFactory(name="Test School")
+
+    def setUp(self) -> None:
+        self.r = get_redis_interface("STATS")
+        keys = self.r.keys("api:test_conditional*")
+        if keys:
+            self.r.delete(*keys)
+
+    async def test_detail_etag(self, mock_logging_prefix) -> None:
+        """Do detail responses change their ETag when the object or its
+        related objects change?
+        """
+        path = reverse(
+            "docket-detail", kwargs={"version": "v4", "pk": self.docket.pk}
+        )
+        r = await self.async_client.get(path)
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        etag = r.headers["ETag"]
+        # Dockets have related objects, so a date can't version them.
+        self.assertNotIn("Last-Modified", r.headers)
+
+        r = await self.async_client.get(path, headers={"If-None-Match": etag})
+        self.assertEqual(r.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertEqual(r.content, b"")
+        self.assertEqual(r.headers["ETag"], etag)
+
+        # Asking for other fields changes the body, so it's another ETag.
+        r = await self.async_client.get(
+            path, {"fields": "id"}, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+
+        await Docket.objects.filter(pk=self.docket.pk).aupdate(
+            date_modified=now() + timedelta(minutes=1)
+        )
+        r = await self.async_client.get(path, headers={"If-None-Match": etag})
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertNotEqual(r.headers["ETag"], etag)
+        etag = r.headers["ETag"]
+
+        # Tagging the docket doesn't change its date_modified, but it
+        # changes the body.
+        tag = await Tag.objects.acreate(name="test-conditional")
+        await self.docket.tags.aadd(tag)
+        r = await self.async_client.get(path, headers={"If-None-Match": etag})
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertNotEqual(r.headers["ETag"], etag)
+        etag = r.headers["ETag"]
+
+        await self.docket.tags.aremove(tag)
+        r = await self.async_client.get(path, headers={"If-None-Match": etag})
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertNotEqual(r.headers["ETag"], etag)
+
+        self.assertEqual(int(self.r.get("api:test_conditional.count")), 7)
+        self.assertEqual(
+            int(self.r.get("api:test_conditional.conditional.count")), 6
+        )
+        self.assertEqual(
+            int(self.r.get("api:test_conditional.conditional.hits")), 1
+        )
+
+    async def test_detail_last_modified(self, mock_logging_prefix) -> None:
+        """Do detail responses without related objects use Last-Modified?"""
+        path = reverse(
+            "school-detail", kwargs={"version": "v4", "pk": self.school.pk}
+        )
+        r = await self.async_client.get(path)
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertIn("ETag", r.headers)
+
+        r = await self.async_client.get(
+            path, headers={"If-Modified-Since": r.headers["Last-Modified"]}
+        )
+        self.assertEqual(r.status_code, HTTPStatus.NOT_MODIFIED)
+
+    async def test_list_etag(self, mock_logging_prefix) -> None:
+        """Do list responses change their ETag with their filters and with
+        the objects they match?
+        """
+        path = reverse("docket-list", kwargs={"version": "v4"})
+        params = {"court": self.court.pk}
+        r = await self.async_client.get(path, params)
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        # Plain list requests aren't versioned, to skip the extra query.
+        self.assertNotIn("ETag", r.headers)
+
+        # If-Modified-Since gets an ETag, but never a 304, since a date
+        # can't tell that objects were removed.
+        r = await self.async_client.get(
+            path,
+            params,
+            headers={"If-Modified-Since": http_date(now().timestamp())},
+        )
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertNotIn("Last-Modified", r.headers)
+        etag = r.headers["ETag"]
+
+        r = await self.async_client.get(
+            path, params, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(r.status_code, HTTPStatus.NOT_MODIFIED)
+
+        r = await self.async_client.get(
+            path,
+            {"court": self.other_court.pk},
+            headers={"If-None-Match": etag},
+        )
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertNotEqual(r.headers["ETag"], etag)
+
+        new_docket = await sync_to_async(DocketFactory)(
+            court=self.court, source=Docket.HARVARD
+        )
+        r = await self.async_client.get(
+            path, params, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertNotEqual(r.headers["ETag"], etag)
+        etag = r.headers["ETag"]
+
+        # Deleting an object doesn't change the latest date_modified, but it
+        # changes the list.
+        await Docket.objects.filter(pk=self.docket.pk).aupdate(
+            date_modified=now() + timedelta(minutes=1)
+        )
+        r = await self.async_client.get(
+            path, params, headers={"If-None-Match": etag}
+        )
+        etag = r.headers["ETag"]
+        await new_docket.adelete()
+        r = await self.async_client.get(
+            path, params, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertNotEqual(r.headers["ETag"], etag)
+
+    async def test_list_etag_of_the_page(self, mock_logging_prefix) -> None:
+        """Are list responses versioned by the objects of the requested page
+        only?
+        """
+        dockets = await sync_to_async(DocketFactory.create_batch)(
+            20, court=self.court, source=Docket.HARVARD
+        )
+        path = reverse("docket-list", kwargs={"version": "v4"})
+        params = {"court": self.court.pk}
+        r = await self.async_client.get(
+            path, params, headers={"If-Modified-Since": http_date(0)}
+        )
+        self.assertEqual(len(r.data["results"]), 20)
+        self.assertNotIn(self.docket.pk, [d["id"] for d in r.data["results"]])
+        etag = r.headers["ETag"]
+
+        # Tagging a docket on another page doesn't change this one.
+        tag = await Tag.objects.acreate(name="test-conditional-page")
+        await self.docket.tags.aadd(tag)
+        r = await self.async_client.get(
+            path, params, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(r.status_code, HTTPStatus.NOT_MODIFIED)
+
+        await dockets[-1].tags.aadd(tag)
+        r = await self.async_client.get(
+            path, params, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertNotEqual(r.headers["ETag"], etag)
+
+
 class DRFOrderingTests(TestCase):
     """Does ordering work generally and specifically?"""
 
@@ -994,6 +1203,59 @@ class DRFFieldSelectionTest(SimpleUserDataMixin, TestCase):
             len(r.data["results"][0].keys()), len(fields_to_return)
         )
 
+    async def test_fast_list_matches_serializer(self) -> None:
+        """Are lists of fields read from columns rendered by the fast path,
+        with the same content the serializers make?
+        """
+        self.assertTrue(
+            await self.async_client.alogin(
+                username="pandora", password="password"
+            )
+        )
+        cases = [
+            (
+                "docket-list",
+                "resource_uri,id,court,court_id,date_created,date_filed,"
+                "case_name,source,pacer_case_id",
+            ),
+            (
+                "opinioncluster-list",
+                "resource_uri,id,docket,date_filed,per_curiam,slug,"
+                "precedential_status",
+            ),
+        ]
+        for endpoint, fields in cases:
+            with self.subTest(endpoint=endpoint):
+                path = reverse(endpoint, kwargs={"version": "v4"})
+                r = await self.async_client.get(path, {"fields": fields})
+                self.assertIsInstance(r.accepted_renderer, FastJSONRenderer)
+                self.assertEqual(
+                    set(r.json()["results"][0].keys()), set(fields.split(","))
+                )
+
+                with mock.patch.object(
+                    FastListMixin, "get_fast_columns", return_value=None
+                ):
+                    slow_r = await self.async_client.get(
+                        path, {"fields": fields}
+                    )
+                self.assertNotIsInstance(
+                    slow_r.accepted_renderer, FastJSONRenderer
+                )
+                self.assertEqual(r.content, slow_r.content)
+
+    async def test_fast_list_falls_back_for_related_fields(self) -> None:
+        """Do fields built from related objects use the serializer?"""
+        self.assertTrue(
+            await self.async_client.alogin(
+                username="pandora", password="password"
+            )
+        )
+        path = reverse("docket-list", kwargs={"version": "v4"})
+        r = await self.async_client.get(path, {"fields": "id,panel"})
+        self.assertNotIsInstance(r.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(set(r.json()["results"][0].keys()), {"id", "panel"})
+
 
 class ExamplePagination(VersionBasedPagination):
     page_size = 5
@@ -2071,6 +2333,135 @@ class DRFRecapPermissionTest(TestCase):
             print("✓")
 
 
+@mock.patch(
+    "cl.api.utils.get_logging_prefix",
+    return_value="api:test_list_cache",
+)
+class ListCacheTest(TestCase):
+    """Are RECAPDocument lists of a docket cached for all users, and
+    invalidated by writes to the docket?
+    """
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        ps = Permission.objects.filter(codename="has_recap_api_access")
+        for username in ["recap-user", "recap-user-2"]:
+            up = UserProfileWithParentsFactory.create(
+                user__username=username,
+                user__password=make_password("password"),
+            )
+            up.user.user_permissions.add(*ps)
+        UserProfileWithParentsFactory.create(
+            user__username="pandora",
+            user__password=make_password("password"),
+        )
+        cls.court = CourtFactory(id="canb", jurisdiction="FB")
+        cls.rds = [
+            RECAPDocumentFactory(
+                docket_entry=DocketEntryWithParentsFactory(
+                    docket=DocketFactory(court=cls.court)
+                ),
+            )
+            for _ in range(2)
+        ]
+        cls.path = reverse("recapdocument-list", kwargs={"version": "v4"})
+
+    def setUp(self) -> None:
+        for rd in self.rds:
+            invalidate_list_cache(
+                RECAPDocument, scope=rd.docket_entry.docket_id
+            )
+        self.r = get_redis_interface("STATS")
+        keys = self.r.keys("api:test_list_cache*")
+        if keys:
+            self.r.delete(*keys)
+
+    def assert_cache_stats(self, hits: int, misses: int) -> None:
+        stats_key = "api:test_list_cache.list_cache"
+        self.assertEqual(int(self.r.get(f"{stats_key}.hits") or 0), hits)
+        self.assertEqual(int(self.r.get(f"{stats_key}.misses") or 0), misses)
+
+    def test_cache_is_shared_by_users(self, mock_logging_prefix) -> None:
+        """Do users share cached lists, while permissions still apply?"""
+        params = {"docket_entry__docket": self.rds[0].docket_entry.docket_id}
+        self.client.login(username="recap-user", password="password")
+        r = self.client.get(self.path, params)
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assert_cache_stats(hits=0, misses=1)
+
+        self.client.login(username="recap-user-2", password="password")
+        cached_r = self.client.get(self.path, params)
+        self.assertEqual(cached_r.status_code, HTTPStatus.OK)
+        self.assertEqual(cached_r.json(), r.json())
+        self.assert_cache_stats(hits=1, misses=1)
+
+        self.client.login(username="pandora", password="password")
+        r = self.client.get(self.path, params)
+        self.assertEqual(r.status_code, HTTPStatus.FORBIDDEN)
+        self.assert_cache_stats(hits=1, misses=1)
+
+    def test_unfiltered_lists_are_not_cached(
+        self, mock_logging_prefix
+    ) -> None:
+        """Are lists of all the documents left out of the cache?"""
+        self.client.login(username="recap-user", password="password")
+        for _ in range(2):
+            r = self.client.get(self.path)
+            self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assert_cache_stats(hits=0, misses=0)
+
+    def test_writes_invalidate_lists(self, mock_logging_prefix) -> None:
+        """Do writes invalidate the lists of their docket only?"""
+        self.client.login(username="recap-user", password="password")
+        rd_1, rd_2 = self.rds
+        docket_params = {
+            "docket_entry__docket": rd_1.docket_entry.docket_id,
+        }
+        self.client.get(self.path, docket_params)
+        self.assert_cache_stats(hits=0, misses=1)
+
+        # A write to another docket leaves the list alone.
+        # Without its entry loaded, the docket of the document is looked up.
+        rd_2 = RECAPDocument.objects.get(pk=rd_2.pk)
+        rd_2.description = "Changed"
+        with self.captureOnCommitCallbacks(execute=True):
+            rd_2.save()
+        self.client.get(self.path, docket_params)
+        self.assert_cache_stats(hits=1, misses=1)
+
+        # A write to the docket invalidates its lists, once it's committed.
+        rd_1.description = "Changed too"
+        with self.captureOnCommitCallbacks(execute=True):
+            rd_1.save()
+            self.client.get(self.path, docket_params)
+            self.assert_cache_stats(hits=2, misses=1)
+        r = self.client.get(self.path, docket_params)
+        self.assert_cache_stats(hits=2, misses=2)
+        self.assertEqual(r.json()["results"][0]["description"], "Changed too")
+
+    def test_scope_spellings_share_lists(self, mock_logging_prefix) -> None:
+        """Do different spellings of the same scope share a cached list?"""
+        self.client.login(username="recap-user", password="password")
+        docket_id = self.rds[0].docket_entry.docket_id
+        for value in [str(docket_id), f"0{docket_id}", f"00{docket_id}"]:
+            r = self.client.get(self.path, {"docket_entry__docket": value})
+            self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assert_cache_stats(hits=2, misses=1)
+
+    def test_scope_values_are_sorted(self, mock_logging_prefix) -> None:
+        """Are comma separated scope values sorted and deduplicated?"""
+        request = mock.Mock()
+        view = RECAPDocumentViewSet()
+        for value in ["ca2,ca1", "ca1,ca2,ca1", "ca1, ca2"]:
+            request.query_params = QueryDict(f"docket_entry__docket={value}")
+            self.assertEqual(
+                view.get_list_cache_scope(request),
+                ("docket_entry__docket", ["ca1", "ca2"]),
+            )
+        request.query_params = QueryDict("docket_entry__docket=1,,2")
+        self.assertIsNone(view.get_list_cache_scope(request))
+
+
 class WebhooksProxySecurityTest(TestCase):
     """Test Webhook proxy security"""
 
@@ -2202,7 +2593,7 @@ class WebhooksMilestoneEventsTest(TestCase):
         )
         # Send one webhook event for user_1.
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -2242,7 +2633,7 @@ class WebhooksMilestoneEventsTest(TestCase):
                 event_status=WEBHOOK_EVENT_STATUS.IN_PROGRESS,
             )
             with mock.patch(
-                "cl.api.webhooks.requests.post",
+                "cl.api.webhooks.requests.Session.post",
                 side_effect=lambda *args, **kwargs: MockResponse(
                     200, mock_raw=True
                 ),
@@ -2273,7 +2664,7 @@ class WebhooksMilestoneEventsTest(TestCase):
                 event_status=WEBHOOK_EVENT_STATUS.IN_PROGRESS,
             )
             with mock.patch(
-                "cl.api.webhooks.requests.post",
+                "cl.api.webhooks.requests.Session.post",
                 side_effect=lambda *args, **kwargs: MockResponse(
                     200, mock_raw=True
                 ),
@@ -2313,7 +2704,7 @@ class WebhooksMilestoneEventsTest(TestCase):
         )
         # Send a webhook event that fails to be delivered.
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 500, mock_raw=True
             ),
@@ -2338,7 +2729,7 @@ class WebhooksMilestoneEventsTest(TestCase):
         )
         # Send a debug webhook event.
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -2352,3 +2743,90 @@ class WebhooksMilestoneEventsTest(TestCase):
         self.assertEqual(await webhook_events.acount(), 2)
         # Confirm no milestone event should be created.
         self.assertEqual(await milestone_events.acount(), 0)
+
+
+class BulkDataTest(SimpleTestCase):
+    def test_blocks_are_compressed_in_order(self) -> None:
+        """Are the blocks compressed into one bz2 file, in their order?"""
+        chunks = [f"{i},row\n".encode() for i in range(1000)]
+        blocks = list(iter_blocks(chunks, 100))
+        self.assertGreater(len(blocks), 1)
+        self.assertEqual(b"".join(blocks), b"".join(chunks))
+
+        with ThreadPoolExecutor(4) as executor:
+            compressed = b"".join(compress_in_order(blocks, executor, 3))
+        self.assertEqual(bz2.decompress(compressed), b"".join(chunks))
+
+    def test_columns_come_from_the_models(self) -> None:
+        """Are the columns of each table derived from its model, including
+        the columns of the M2M tables?
+        """
+        tables = {t.db_table: t for t in get_bulk_tables()}
+        self.assertEqual(len(tables), 32)
+        columns = tables["search_opinionscited"].columns
+        self.assertIn("cited_opinion_id", columns)
+        self.assertEqual(
+            tables["search_opinion_joined_by"].columns,
+            ["id", "opinion_id", "person_id"],
+        )
+
+        script = make_load_script(
+            [tables["search_opinionscited"]], date(2024, 1, 2), "schema.sql"
+        )
+        self.assertIn("citation-map-2024-01-02.csv", script)
+        self.assertNotIn("FORCE_QUOTE", script)
+
+    def test_delta_manifests_chain_to_their_base(self) -> None:
+        """Do delta manifests name the export they follow and the full
+        export the chain started from?
+        """
+        watermark = now()
+        entry = {
+            "table": "search_docket",
+            "mode": "delta",
+            "columns": ["id", "case_name"],
+            "max_id": 10,
+            "upserts": {"file": "dockets-2024-01-02.delta.csv.bz2"},
+            "deletes": {"file": "dockets-2024-01-02.deletes.csv.bz2"},
+        }
+        full = make_manifest(date(2024, 1, 1), "snap-1", watermark, [])
+        delta = make_manifest(
+            date(2024, 1, 2),
+            "snap-2",
+            watermark + timedelta(days=1),
+            [entry],
+            json.loads(json.dumps(full)),
+            "2024-01-02T100000Z",
+        )
+        second_delta = make_manifest(
+            date(2024, 1, 2),
+            "snap-3",
+            watermark,
+            [],
+            delta,
+            "2024-01-02T160000Z",
+        )
+        self.assertEqual(full["base"], full["manifest"])
+        self.assertEqual(delta["type"], "delta")
+        self.assertEqual(delta["previous"], full["manifest"])
+        self.assertEqual(second_delta["base"], full["manifest"])
+        self.assertEqual(second_delta["previous"], delta["manifest"])
+        # Deltas exported on the same day don't overwrite each other.
+        self.assertNotEqual(second_delta["manifest"], delta["manifest"])
+        self.assertLess(get_delta_since(delta), watermark + timedelta(days=1))
+
+        script = make_delta_load_script(delta)
+        self.assertIn("'dockets-2024-01-02.deletes.csv'", script)
+        self.assertIn(
+            "CREATE TEMP TABLE delta_deletes AS "
+            "SELECT id FROM search_docket WITH NO DATA;",
+            script,
+        )
+        self.assertIn("ON CONFLICT (id) DO UPDATE SET case_name", script)
+        self.assertTrue(script.strip().endswith("COMMIT;"))
+
+    def test_event_tables(self) -> None:
+        """Are the tables tracked by pghistory mapped to their events?"""
+        event_tables = get_event_tables()
+        self.assertEqual(event_tables["search_docket"], "search_docketevent")
+        self.assertNotIn("search_opinionscited", event_tables)
@@ -1,41 +1,56 @@
+import hashlib
 import logging
+import time
 from collections import OrderedDict, defaultdict
 from datetime import date, datetime, timedelta, timezone
-from typing import Dict, List, Set, TypedDict, Union
+from http import HTTPStatus
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Set,
+    TypedDict,
+    Union,
+)
 
 import eyecite
+import orjson
 from dateutil import parser
 from dateutil.rrule import DAILY, rrule
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.humanize.templatetags.humanize import intcomma, ordinal
-from django.db.models import F
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Count, F, Max, Model, Sum
 from django.urls import resolve
-from django.utils.decorators import method_decorator
+from django.utils.cache import get_conditional_response
 from django.utils.encoding import force_str
+from django.utils.http import http_date
 from django.utils.timezone import now
-from django.views.decorators.cache import cache_page
-from django.views.decorators.vary import vary_on_headers
 from django_ratelimit.core import get_header
-from eyecite.tokenizers import HyperscanTokenizer
 from requests import Response
-from rest_framework import serializers
+from rest_framework import response, serializers
 from rest_framework.exceptions import Throttled
 from rest_framework.metadata import SimpleMetadata
 from rest_framework.permissions import DjangoModelPermissions
+from rest_framework.relations import PKOnlyObject
+from rest_framework.renderers import JSONRenderer
 from rest_framework.request import clone_request
 from rest_framework.throttling import UserRateThrottle
 from rest_framework_filters import FilterSet, RelatedFilter
 from rest_framework_filters.backends import RestFrameworkFilterBackend
 
 from cl.api.models import WEBHOOK_EVENT_STATUS, Webhook, WebhookEvent
+from cl.citations.tokenizers import get_hyperscan_tokenizer
 from cl.citations.utils import filter_out_non_case_law_and_non_valid_citations
 from cl.lib.redis_utils import get_redis_interface
 from cl.stats.models import Event
 from cl.stats.utils import MILESTONES_FLAT, get_milestone_range
 from cl.users.tasks import notify_failing_webhook
 
-HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
 BOOLEAN_LOOKUPS = ["exact"]
 DATETIME_LOOKUPS = [
     "exact",
@@ -226,7 +241,7 @@ class LoggingMixin:
             # Don't log things like 401, 403, etc.,
             # noinspection PyBroadException
             try:
-                results = self._log_request(request)
+                results = self._log_request(request, response)
                 self._handle_events(results, request.user)
             except Exception as e:
                 logger.exception(
@@ -244,7 +259,7 @@ class LoggingMixin:
 
         return max(response_ms, 0)
 
-    def _log_request(self, request):
+    def _log_request(self, request, response):
         d = date.today().isoformat()
         user = request.user
         client_ip = get_header(request, "CloudFront-Viewer-Address").split(
@@ -288,6 +303,17 @@ class LoggingMixin:
         timing_key = f"{api_prefix}.endpoint.d:{d}.timings"
         pipe.zincrby(timing_key, response_ms, endpoint)
 
+        # Count conditional requests, and how many we answered with 304 Not
+        # Modified, to know the hit rate of ETags and Last-Modified dates.
+        if request.headers.get("If-None-Match") or request.headers.get(
+            "If-Modified-Since"
+        ):
+            pipe.incr(f"{api_prefix}.conditional.count")
+            pipe.incr(f"{api_prefix}.d:{d}.conditional.count")
+            if response.status_code == HTTPStatus.NOT_MODIFIED:
+                pipe.incr(f"{api_prefix}.conditional.hits")
+                pipe.incr(f"{api_prefix}.d:{d}.conditional.hits")
+
         results = pipe.execute()
         return results
 
@@ -308,14 +334,560 @@ class LoggingMixin:
                 )
 
 
+def is_conditional_request(request) -> bool:
+    """Does a request have any precondition to check?
+
+    :param request: The DRF request.
+    :return: True if it has an If-None-Match or If-Modified-Since header.
+    """
+    return bool(
+        request.headers.get("If-None-Match")
+        or request.headers.get("If-Modified-Since")
+    )
+
+
+def get_related_model(model: type[Model], lookup: str) -> type[Model]:
+    """Follow a lookup like "recap_documents__tags" to its model.
+
+    :param model: The model the lookup starts from.
+    :param lookup: The relation lookup.
+    :return: The model at the end of the lookup.
+    """
+    for name in lookup.split("__"):
+        model = model._meta.get_field(name).related_model
+    return model
+
+
+def has_date_modified(model: type[Model]) -> bool:
+    """Does a model have a date_modified field?
+
+    :param model: The model.
+    :return: True if it does.
+    """
+    try:
+        model._meta.get_field("date_modified")
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+class ConditionalGetMixin:
+    """Answer conditional GET requests without serializing anything.
+
+    A response is versioned by the latest date_modified of its objects and of
+    the related objects its serializer nests or links to, which views list in
+    conditional_related. Since adding or removing an object or a relation
+    does not change any date_modified, the number of objects and of related
+    rows, and a sum of the related IDs, are part of the version too. The ETag
+    hashes that version with the query string, API version and media type,
+    since those change the body. Requests whose If-None-Match matches get a
+    304 response before the objects are fetched.
+
+    Detail responses always get an ETag, since finding it only looks up one
+    object. List responses are versioned by the objects of the requested page
+    and by the count and links of the pagination, so the related objects are
+    only looked up for the rows of one page. They get an ETag only for
+    conditional requests, so that plain list requests don't pay for fetching
+    the page twice. Clients without an ETag for a list get one by sending
+    If-Modified-Since.
+
+    Only detail views without related objects get a Last-Modified date,
+    because a date can't tell that a relation was removed. If-Modified-Since
+    is checked only there.
+
+    Views that nest objects without a date_modified field can't be versioned
+    this way and shouldn't use this mixin. Views of models without one are
+    left alone.
+    """
+
+    conditional_related: tuple[str, ...] = ()
+
+    def list(self, request, *args, **kwargs):
+        if not is_conditional_request(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Only the IDs of the page are needed, not its related objects.
+        page = self.paginate_queryset(queryset.prefetch_related(None))
+        page_counts = []
+        if page is not None:
+            pagination = self.get_paginated_response([]).data
+            page_counts = [
+                pagination.get("count") or 0,
+                int(bool(pagination.get("next"))),
+                int(bool(pagination.get("previous"))),
+            ]
+            queryset = queryset.filter(pk__in=[obj.pk for obj in page])
+        return self.conditional_response(
+            queryset,
+            super().list,
+            request,
+            *args,
+            page_counts=page_counts,
+            **kwargs,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        return self.conditional_response(
+            queryset,
+            super().retrieve,
+            request,
+            *args,
+            use_last_modified=not self.conditional_related,
+            **kwargs,
+        )
+
+    def get_version(self, queryset) -> tuple[datetime, list[int]] | None:
+        """Get the latest date_modified of a queryset and of its related
+        objects, and the counts and ID sums that show that objects or
+        relations were added or removed.
+
+        :param queryset: The objects in the response.
+        :return: The latest date_modified and the list of counts and sums,
+        or None if the queryset has no objects.
+        """
+        queryset = queryset.order_by()
+        values = queryset.aggregate(
+            last_modified=Max("date_modified"), count=Count("pk")
+        )
+        last_modified = values["last_modified"]
+        if last_modified is None:
+            return None
+
+        counts = [values["count"]]
+        for lookup in self.conditional_related:
+            aggregates = {
+                "count": Count(lookup),
+                "checksum": Sum(f"{lookup}__pk"),
+            }
+            model = get_related_model(queryset.model, lookup)
+            if has_date_modified(model):
+                aggregates["last_modified"] = Max(f"{lookup}__date_modified")
+            values = queryset.aggregate(**aggregates)
+            counts.extend([values["count"], values["checksum"] or 0])
+            related_modified = values.get("last_modified")
+            if related_modified is not None:
+                last_modified = max(last_modified, related_modified)
+        return last_modified, counts
+
+    def conditional_response(
+        self,
+        queryset,
+        view,
+        request,
+        *args,
+        use_last_modified: bool = False,
+        page_counts: list[int] | None = None,
+        **kwargs,
+    ):
+        """Check the request's preconditions against the version of a
+        queryset, and call the view if they pass.
+
+        :param queryset: The objects in the response.
+        :param view: The view method that makes the full response.
+        :param request: The DRF request.
+        :param use_last_modified: Whether to send Last-Modified and check
+        If-Modified-Since. Only safe if removing a relation can't change the
+        body.
+        :param page_counts: For list responses, the total count and whether
+        there are next and previous pages, which are part of the body too.
+        :return: The response, with an ETag header when the queryset has any
+        objects.
+        """
+        if not has_date_modified(queryset.model):
+            return view(request, *args, **kwargs)
+
+        try:
+            version = self.get_version(queryset)
+        except (TypeError, ValueError, ValidationError):
+            # A malformed lookup value. The view will return a 404.
+            return view(request, *args, **kwargs)
+        if version is None:
+            # No objects. Let the view return its 404 or empty list.
+            return view(request, *args, **kwargs)
+
+        last_modified, counts = version
+        etag = make_api_etag(
+            request, last_modified, [*(page_counts or []), *counts]
+        )
+        timestamp = int(last_modified.timestamp())
+        precondition_response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=timestamp if use_last_modified else None,
+        )
+        if precondition_response is not None:
+            resp = response.Response(status=precondition_response.status_code)
+        else:
+            resp = view(request, *args, **kwargs)
+        if resp.status_code in (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED):
+            resp.headers["ETag"] = etag
+            if use_last_modified:
+                resp.headers["Last-Modified"] = http_date(timestamp)
+        return resp
+
+
+def make_api_etag(request, last_modified: datetime, counts: list[int]) -> str:
+    """Make the ETag of an API response.
+
+    :param request: The DRF request.
+    :param last_modified: The latest date_modified of the objects in the
+    response and of their related objects.
+    :param counts: The counts and ID sums of the objects and their related
+    objects.
+    :return: A weak ETag, quoted for the ETag header.
+    """
+    key = "|".join(
+        [
+            request.version or "",
+            request.accepted_media_type or "",
+            request.get_full_path(),
+            last_modified.isoformat(),
+            ",".join(str(c) for c in counts),
+        ]
+    )
+    return f'W/"{hashlib.md5(key.encode()).hexdigest()}"'
+
+
+LIST_CACHE_VERSION_PREFIX = "api-list-version"
+
+
+def make_list_cache_version_key(
+    model: type[Model], scope: str | None = None
+) -> str:
+    """Make the key of the version of the cached lists of a model.
+
+    :param model: The model of the lists.
+    :param scope: Optional, the value of the view's scope parameter, to get
+    the version of the lists filtered by it.
+    :return: The cache key.
+    """
+    key = f"{LIST_CACHE_VERSION_PREFIX}:{model._meta.label_lower}"
+    if scope is not None:
+        key = f"{key}:{scope}"
+    return key
+
+
+def get_list_cache_version(
+    model: type[Model], scope: str | None = None
+) -> int:
+    """Get the version of the cached lists of a model.
+
+    New versions start from the current time, so a version key that's
+    evicted from the cache doesn't bring back lists cached under its old
+    values.
+
+    :param model: The model of the lists.
+    :param scope: Optional, the value of the view's scope parameter.
+    :return: The version.
+    """
+    return cache.get_or_set(
+        make_list_cache_version_key(model, scope),
+        time.time_ns(),
+        timeout=None,
+    )
+
+
+def invalidate_list_cache(model: type[Model], scope: Any = None) -> None:
+    """Invalidate the cached lists of a model after one of its objects is
+    saved or deleted.
+
+    :param model: The model of the object.
+    :param scope: Optional, the value of the view's scope parameter for the
+    object, e.g. its docket ID. If given, only the lists filtered by it are
+    invalidated. Otherwise, all the lists of the model are.
+    :return: None
+    """
+    key = make_list_cache_version_key(
+        model, None if scope is None else str(scope)
+    )
+    try:
+        cache.incr(key)
+    except ValueError:
+        # No version yet, so nothing is cached under this key.
+        pass
+
+
 class CacheListMixin:
-    """Cache listed results"""
+    """Cache listed results, shared by every user.
+
+    Permissions are checked before list is called, so cached results are
+    only served to users allowed to see them. The cache key is made from the
+    normalized query, the URL and the view's permission classes, plus the
+    version of the view's model, which is bumped whenever one of its objects
+    is saved or deleted (see invalidate_list_cache).
+
+    Views can set list_cache_scope_params to parameters that filter the list
+    down to a part of the data that's versioned on its own, like a docket.
+    Only lists filtered by one of them are cached then, and they are only
+    invalidated by writes to those parts. Lists of the whole model change
+    with every write, so caching them isn't worth it.
+    """
+
+    # Writes to related objects, like tags, don't invalidate the lists, so
+    # keep them for a short while only.
+    list_cache_timeout = 60
+    list_cache_scope_params: tuple[str, ...] = ()
 
-    @method_decorator(cache_page(60))
-    # Ensure that permissions are maintained and not cached!
-    @method_decorator(vary_on_headers("Cookie", "Authorization"))
-    def list(self, *args, **kwargs):
-        return super().list(*args, **kwargs)
+    def get_list_cache_scope(self, request) -> tuple[str, list[str]] | None:
+        """Get the normalized values of the scope parameter a list is
+        filtered by.
+
+        The same filter can be written in many ways, like "0123" or "123",
+        and "ca1,ca2" or "ca2,ca1", so integers are parsed and comma separated
+        values are sorted and deduplicated. Otherwise, each spelling would
+        get its own cache entry.
+
+        :param request: The DRF request.
+        :return: The parameter and its values, or None if the list isn't
+        filtered by exactly one scope parameter, or by an empty value.
+        """
+        for param in self.list_cache_scope_params:
+            values = request.query_params.getlist(param)
+            if len(values) != 1:
+                continue
+            scope = set()
+            for value in values[0].split(","):
+                value = value.strip()
+                if not value:
+                    return None
+                try:
+                    value = str(int(value))
+                except ValueError:
+                    pass
+                scope.add(value)
+            return param, sorted(scope)
+        return None
+
+    def list(self, request, *args, **kwargs):
+        scope = self.get_list_cache_scope(request)
+        if self.list_cache_scope_params and scope is None:
+            return super().list(request, *args, **kwargs)
+
+        key = self.make_list_cache_key(request, scope)
+        r = get_redis_interface("STATS")
+        stats_key = f"{get_logging_prefix()}.list_cache"
+        cached = cache.get(key)
+        if cached is not None:
+            r.incr(f"{stats_key}.hits")
+            return response.Response(orjson.loads(cached))
+
+        r.incr(f"{stats_key}.misses")
+        resp = super().list(request, *args, **kwargs)
+        if resp.status_code == HTTPStatus.OK:
+            cache.set(
+                key,
+                FastJSONRenderer().render(resp.data),
+                self.list_cache_timeout,
+            )
+        return resp
+
+    def make_list_cache_key(
+        self, request, scope: tuple[str, list[str]] | None
+    ) -> str:
+        """Make the cache key of a list request.
+
+        :param request: The DRF request.
+        :param scope: The scope parameter the list is filtered by and its
+        normalized values, if any.
+        :return: The cache key.
+        """
+        model = self.get_queryset().model
+        params = {
+            param: sorted(values)
+            for param, values in request.query_params.lists()
+        }
+        if scope is None:
+            versions = [get_list_cache_version(model)]
+        else:
+            scope_param, scope_values = scope
+            params[scope_param] = scope_values
+            # The list changes with a write to any of the parts it's made of.
+            versions = [
+                get_list_cache_version(model, value) for value in scope_values
+            ]
+        permissions = sorted(
+            f"{type(p).__module__}.{type(p).__qualname__}"
+            for p in self.get_permissions()
+        )
+        key = orjson.dumps(
+            [
+                request.build_absolute_uri(request.path),
+                sorted(params.items()),
+                permissions,
+                versions,
+            ]
+        )
+        return f"api-list:{hashlib.md5(key).hexdigest()}"
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Render JSON with orjson, byte for byte like the DRF JSONRenderer.
+
+    Dates and decimals are handed to the DRF encoder, which formats them
+    differently than orjson does.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        ret = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+        # Escape the line and paragraph separators like JSONRenderer does.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+# Field classes whose to_representation returns DB values unchanged.
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+)
+# Field classes whose to_representation works on the values from the DB.
+CONVERTED_FIELDS = (
+    serializers.ChoiceField,
+    serializers.DateField,
+    serializers.DateTimeField,
+    serializers.DecimalField,
+    serializers.FloatField,
+    serializers.JSONField,
+    serializers.UUIDField,
+)
+URL_PK_PLACEHOLDER = "__pk__"
+
+
+class FastColumn(NamedTuple):
+    name: str
+    column: str
+    convert: Callable[[Any], Any] | None
+
+
+def make_url_converter(
+    field: serializers.HyperlinkedRelatedField,
+) -> Callable[[Any], str]:
+    """Make a function that builds the URL of a hyperlinked field from a PK.
+
+    The field reverses its URL once, with a placeholder PK, and the PK of
+    each object is put in place of the placeholder.
+
+    :param field: The bound hyperlinked field.
+    :return: A function that takes a PK and returns its URL.
+    """
+    url = field.to_representation(PKOnlyObject(URL_PK_PLACEHOLDER))
+    prefix, _, suffix = str(url).partition(URL_PK_PLACEHOLDER)
+    return lambda pk: f"{prefix}{pk}{suffix}"
+
+
+def get_fast_columns(
+    serializer: serializers.ModelSerializer,
+) -> list[FastColumn] | None:
+    """Map the fields of a serializer to the DB columns they're built from.
+
+    Only fields that are read straight from a column of the model can be
+    mapped: plain model fields, IDs and hyperlinks to single objects. Fields
+    built from related or nested objects, or from model methods, can't.
+
+    :param serializer: The serializer, bound to the request, so fields the
+    request didn't ask for are already removed.
+    :return: The columns in the order of the serializer fields, or None if
+    any field can't be read from a column.
+    """
+    opts = serializer.Meta.model._meta
+    attnames = {f.attname: f for f in opts.concrete_fields}
+    names = {f.name: f for f in opts.concrete_fields}
+    columns = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.HyperlinkedIdentityField):
+            columns.append(
+                FastColumn(name, opts.pk.attname, make_url_converter(field))
+            )
+            continue
+        model_field = names.get(field.source)
+        if isinstance(field, serializers.HyperlinkedRelatedField):
+            if model_field is None or not model_field.many_to_one:
+                return None
+            converter = make_url_converter(field)
+        else:
+            if model_field is None or model_field.is_relation:
+                # The columns of foreign keys, like court_id, hold plain IDs.
+                model_field = attnames.get(field.source)
+                if model_field is None or not model_field.is_relation:
+                    return None
+            if isinstance(field, PASSTHROUGH_FIELDS):
+                converter = None
+            elif isinstance(field, CONVERTED_FIELDS):
+                converter = field.to_representation
+            else:
+                return None
+        columns.append(FastColumn(name, model_field.attname, converter))
+    return columns
+
+
+class FastListMixin:
+    """Serialize v4 JSON list responses straight from `.values()` rows.
+
+    Hyperlinked model serializers build every object and reverse every URL,
+    which is slow for clients paging through whole tables. When all the
+    fields the client asked for, e.g. with the fields parameter, are read
+    from columns of the model, the rows are fetched with `.values()`, the
+    URLs are built from templates and the page is rendered with orjson. The
+    response is the same as the one the serializer would make.
+    """
+
+    def list(self, request, *args, **kwargs):
+        columns = self.get_fast_columns()
+        if columns is None:
+            return super().list(request, *args, **kwargs)
+
+        # The cursor paginator reads the position from the ordering column.
+        values = {column.column for column in columns}
+        values.update(getattr(self, "cursor_ordering_fields", []))
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .select_related(None)
+            .prefetch_related(None)
+            .values(*values)
+        )
+        rows = self.paginate_queryset(queryset)
+        data = [
+            {
+                name: (
+                    row[column]
+                    if convert is None or row[column] is None
+                    else convert(row[column])
+                )
+                for name, column, convert in columns
+            }
+            for row in rows
+        ]
+        request.accepted_renderer = FastJSONRenderer()
+        return self.get_paginated_response(data)
+
+    def get_fast_columns(self) -> list[FastColumn] | None:
+        """Get the columns for the fast path, if it can serve this request.
+
+        :return: The columns to serialize, or None to use the serializer.
+        """
+        request = self.request
+        if request.version != "v4" or self.paginator is None:
+            return None
+        renderer = request.accepted_renderer
+        if type(renderer) is not JSONRenderer or renderer.get_indent(
+            request.accepted_media_type, {"request": request}
+        ):
+            return None
+        return get_fast_columns(self.get_serializer())
 
 
 class ExceptionalUserRateThrottle(UserRateThrottle):
@@ -379,7 +951,7 @@ class CitationCountRateThrottle(ExceptionalUserRateThrottle):
             return 1
 
         citation_objs = filter_out_non_case_law_and_non_valid_citations(
-            eyecite.get_citations(text, tokenizer=HYPERSCAN_TOKENIZER)
+            eyecite.get_citations(text, tokenizer=get_hyperscan_tokenizer())
         )
         view.citation_list = citation_objs
         return len(citation_objs)
@@ -745,7 +1317,8 @@ def check_webhook_failure_count_and_notify(
     """Check if a Webhook needs to be disabled and/or send a notification about
      a failing webhook event. Only email failing webhook notifications based on
      the oldest active ENQUEUED_RETRY WebhookEvent, avoiding sending
-     notifications for every failing webhook event.
+     notifications for every failing webhook event. The request metrics of the
+     endpoint are logged along with each notification.
 
     :param webhook_event: The related WebhookEvent to check.
     :return: None
@@ -772,6 +1345,15 @@ def check_webhook_failure_count_and_notify(
     current_try_counter = webhook_event.retry_counter
     notify = notify_on[current_try_counter]
     if notify:
+        stats = get_webhook_endpoint_stats(webhook.pk)
+        logger.warning(
+            "Webhook %s is failing: %s of its %s requests failed, with an "
+            "average latency of %sms.",
+            webhook.pk,
+            stats["failures"],
+            stats["count"],
+            stats["latency_ms"] // max(stats["count"], 1),
+        )
         oldest_enqueued_for_retry = WebhookEvent.objects.filter(
             webhook=webhook_event.webhook,
             event_status=WEBHOOK_EVENT_STATUS.ENQUEUED_RETRY,
@@ -805,6 +1387,7 @@ def update_webhook_event_after_request(
     webhook_event: WebhookEvent,
     response: Response | None = None,
     error: str | None = "",
+    elapsed: float | None = None,
 ) -> None:
     """Update the webhook event after sending the POST request. If the webhook
     event fails, increase the retry counter, next retry date and increase its
@@ -816,6 +1399,8 @@ def update_webhook_event_after_request(
     update the WebhookEvent accordingly.
     :param error: Optional, if we don't receive a request Response we'll
     receive an error to log it.
+    :param elapsed: Optional, the seconds the request took, to log it in the
+    endpoint metrics.
     :return: None
     """
 
@@ -837,6 +1422,10 @@ def update_webhook_event_after_request(
             failed_request = True
     webhook_event.status_code = status_code
     webhook_event.response = data
+    if elapsed is not None:
+        log_webhook_endpoint_request(
+            webhook_event.webhook_id, elapsed, bool(failed_request or error)
+        )
 
     if failed_request or error:
         if error is None:
@@ -913,6 +1502,42 @@ def log_webhook_event(webhook_user_id: int) -> list[int | float]:
     return results
 
 
+def log_webhook_endpoint_request(
+    webhook_id: int, elapsed: float, failed: bool
+) -> None:
+    """Log the latency and outcome of a webhook request to redis, so slow or
+    failing endpoints can be spotted.
+
+    :param webhook_id: The id of the webhook the request was sent to.
+    :param elapsed: The seconds the request took.
+    :param failed: Whether the request failed.
+    :return: None
+    """
+    r = get_redis_interface("STATS")
+    key = f"{get_webhook_logging_prefix()}.endpoint.{webhook_id}"
+    pipe = r.pipeline()
+    pipe.hincrby(key, "count", 1)
+    pipe.hincrby(key, "failures", int(failed))
+    pipe.hincrby(key, "latency_ms", round(elapsed * 1000))
+    pipe.execute()
+
+
+def get_webhook_endpoint_stats(webhook_id: int) -> dict[str, int]:
+    """Get the request metrics logged for a webhook endpoint.
+
+    :param webhook_id: The id of the webhook.
+    :return: A dict with the number of requests, the number of failed ones
+    and the total latency in milliseconds.
+    """
+    r = get_redis_interface("STATS")
+    key = f"{get_webhook_logging_prefix()}.endpoint.{webhook_id}"
+    stats = r.hgetall(key)
+    return {
+        field: int(stats.get(field, 0))
+        for field in ("count", "failures", "latency_ms")
+    }
+
+
 def handle_webhook_events(results: list[int | float], user: User) -> None:
     """Create global and user tracking events if a webhook milestone is
     reached.
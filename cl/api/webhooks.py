@@ -1,9 +1,15 @@
-import json
+import logging
 import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 
 import requests
 from django.conf import settings
 from elasticsearch_dsl.response import Response
+from requests.adapters import HTTPAdapter
 from rest_framework.renderers import JSONRenderer
 from scorched.response import SolrResponse
 
@@ -18,6 +24,11 @@ from cl.api.utils import (
     generate_webhook_key_content,
     update_webhook_event_after_request,
 )
+from cl.lib.redis_utils import (
+    acquire_redis_slot,
+    get_redis_interface,
+    release_redis_slot,
+)
 from cl.lib.scorched_utils import ExtraSolrInterface
 from cl.lib.string_utils import trunc
 from cl.recap.api_serializers import PacerFetchQueueSerializer
@@ -28,54 +39,205 @@ from cl.search.api_serializers import (
 )
 from cl.search.api_utils import ResultObject
 
+logger = logging.getLogger(__name__)
 
-def send_webhook_event(
-    webhook_event: WebhookEvent, content_bytes: bytes | None = None
-) -> None:
-    """Send the webhook POST request.
 
-    :param webhook_event: An WebhookEvent to send.
-    :param content_bytes: Optional, the bytes JSON content to send the first time
-    the webhook is sent.
+# Pooled HTTP sessions, one per egress proxy, so the connections to the proxy
+# are reused across webhook events instead of opened for each one.
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+# How long a request can hold one of its endpoint's slots, in milliseconds.
+# Requests time out well before this, so only the slots of crashed processes
+# are left to expire.
+WEBHOOK_ENDPOINT_SLOT_TTL = 60 * 1000
+# How long a request waits for one of its endpoint's slots, in milliseconds,
+# before it's given up and enqueued for retry.
+WEBHOOK_ENDPOINT_SLOT_TIMEOUT = 30 * 1000
+
+
+def get_webhook_session(proxy: str) -> requests.Session:
+    """Get the pooled session used to send webhooks through an egress proxy.
+
+    :param proxy: The URL of the egress proxy.
+    :return: The session for the proxy.
     """
-    proxy_server = {
-        "http": random.choice(settings.EGRESS_PROXY_HOSTS),  # type: ignore
-    }
+    with _sessions_lock:
+        session = _sessions.get(proxy)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=settings.WEBHOOK_POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.proxies = {"http": proxy}
+            _sessions[proxy] = session
+    return session
+
+
+def get_webhook_endpoint_slots_key(url: str) -> str:
+    return f"webhook.endpoint_slots:{url}"
+
+
+def render_webhook_content(content: dict) -> bytes:
+    """Serialize the content of a webhook event. This is done once per event,
+    and the bytes are sent as is.
+
+    :param content: The content of the webhook event.
+    :return: The JSON bytes to send.
+    """
+    return JSONRenderer().render(
+        content, accepted_media_type="application/json;"
+    )
+
+
+@dataclass
+class WebhookDelivery:
+    """The outcome of sending a webhook event."""
+
+    response: requests.Response | None = None
+    error: str = ""
+    elapsed: float = 0.0
+
+
+def post_webhook_event(
+    webhook_event: WebhookEvent, json_bytes: bytes
+) -> WebhookDelivery:
+    """Send the webhook POST request, without touching the DB.
+
+    Every request to an endpoint, whether it's a first attempt or a retry and
+    whichever process sends it, takes one of the endpoint's
+    WEBHOOK_ENDPOINT_CONCURRENCY slots, waiting for one to be free. If none is
+    free before WEBHOOK_ENDPOINT_SLOT_TIMEOUT, the request isn't sent and the
+    delivery fails, so the event is retried later.
+
+    :param webhook_event: The WebhookEvent to send.
+    :param json_bytes: The serialized content of the event.
+    :return: A WebhookDelivery with the response or the error.
+    """
+    session = get_webhook_session(
+        random.choice(settings.EGRESS_PROXY_HOSTS)  # type: ignore
+    )
     headers = {
         "Content-type": "application/json",
         "Idempotency-Key": str(webhook_event.event_id),
         "X-WhSentry-TLS": "true",
     }
-    if content_bytes:
-        json_bytes = content_bytes
-    else:
-        renderer = JSONRenderer()
-        json_bytes = renderer.render(
-            webhook_event.content,
-            accepted_media_type="application/json;",
+    # To send a POST to an HTTPS target and using webhook-sentry as proxy,
+    # you needed to change the protocol to HTTP and set the X-WhSentry-TLS
+    # header to true. See https://github.com/juggernaut/webhook-sentry#https-target
+    url = webhook_event.webhook.url.replace("https://", "http://")
+    r = get_redis_interface("CACHE")
+    slots_key = get_webhook_endpoint_slots_key(webhook_event.webhook.url)
+    try:
+        slot = acquire_redis_slot(
+            r,
+            slots_key,
+            settings.WEBHOOK_ENDPOINT_CONCURRENCY,
+            WEBHOOK_ENDPOINT_SLOT_TTL,
+            WEBHOOK_ENDPOINT_SLOT_TIMEOUT,
         )
-
-    json_data = json.loads(json_bytes)
-    if json_data == {}:
-        raise ValueError("Webhook payload is empty.")
+    except TimeoutError as exc:
+        return WebhookDelivery(error=f"{type(exc).__name__}: {exc}")
+    start = time.monotonic()
     try:
-        # To send a POST to an HTTPS target and using webhook-sentry as proxy,
-        # you needed to change the protocol to HTTP and set the X-WhSentry-TLS
-        # header to true. See https://github.com/juggernaut/webhook-sentry#https-target
-        url = webhook_event.webhook.url.replace("https://", "http://")
-        response = requests.post(
+        response = session.post(
             url,
-            proxies=proxy_server,
-            json=json_data,
+            data=json_bytes,
             timeout=(3, 3),
             headers=headers,
             allow_redirects=False,
         )
-        update_webhook_event_after_request(webhook_event, response)
     except (requests.ConnectionError, requests.Timeout) as exc:
         error_str = f"{type(exc).__name__}: {exc}"
-        trunc(error_str, 500)
-        update_webhook_event_after_request(webhook_event, error=error_str)
+        return WebhookDelivery(
+            error=trunc(error_str, 500), elapsed=time.monotonic() - start
+        )
+    finally:
+        release_redis_slot(r, slots_key, slot)
+    return WebhookDelivery(response=response, elapsed=time.monotonic() - start)
+
+
+def send_webhook_event(
+    webhook_event: WebhookEvent, content_bytes: bytes | None = None
+) -> None:
+    """Send the webhook POST request.
+
+    :param webhook_event: An WebhookEvent to send.
+    :param content_bytes: Optional, the bytes JSON content to send the first time
+    the webhook is sent.
+    """
+    json_bytes = content_bytes or render_webhook_content(webhook_event.content)
+    if json_bytes == b"{}":
+        raise ValueError("Webhook payload is empty.")
+    delivery = post_webhook_event(webhook_event, json_bytes)
+    update_webhook_event_after_request(
+        webhook_event,
+        delivery.response,
+        error=delivery.error,
+        elapsed=delivery.elapsed,
+    )
+
+
+def send_webhook_events(webhook_events: list[WebhookEvent]) -> None:
+    """Send many webhook events concurrently.
+
+    Events are grouped by endpoint and split into at most
+    WEBHOOK_ENDPOINT_CONCURRENCY lanes per endpoint, so a slow endpoint
+    doesn't hold up the others and threads don't sit waiting for the
+    endpoint's slots. Each lane sends its events one after the other in a
+    thread. Once a lane is done, its events are updated in the calling
+    thread. An unexpected error sending or updating an event is logged and
+    recorded on that event only, so it doesn't stop the rest of the batch.
+
+    :param webhook_events: The WebhookEvents to send. Their webhooks should be
+    loaded already.
+    :return: None
+    """
+    by_endpoint: defaultdict[str, list[tuple[WebhookEvent, bytes]]] = (
+        defaultdict(list)
+    )
+    for webhook_event in webhook_events:
+        json_bytes = render_webhook_content(webhook_event.content)
+        if json_bytes == b"{}":
+            logger.error("Webhook payload is empty for %s", webhook_event)
+            continue
+        by_endpoint[webhook_event.webhook.url].append(
+            (webhook_event, json_bytes)
+        )
+
+    # Each lane sends its events one after the other. An endpoint gets as
+    # many lanes as its concurrency limit allows.
+    lanes = []
+    for events in by_endpoint.values():
+        lane_count = min(settings.WEBHOOK_ENDPOINT_CONCURRENCY, len(events))
+        lanes.extend(events[i::lane_count] for i in range(lane_count))
+
+    def send_lane(
+        lane: list[tuple[WebhookEvent, bytes]],
+    ) -> list[tuple[WebhookEvent, WebhookDelivery]]:
+        deliveries = []
+        for webhook_event, json_bytes in lane:
+            try:
+                delivery = post_webhook_event(webhook_event, json_bytes)
+            except Exception as exc:
+                logger.exception("Unable to send %s", webhook_event)
+                error_str = f"{type(exc).__name__}: {exc}"
+                delivery = WebhookDelivery(error=trunc(error_str, 500))
+            deliveries.append((webhook_event, delivery))
+        return deliveries
+
+    with ThreadPoolExecutor(settings.WEBHOOK_MAX_WORKERS) as executor:
+        futures = [executor.submit(send_lane, lane) for lane in lanes]
+        for future in as_completed(futures):
+            for webhook_event, delivery in future.result():
+                try:
+                    update_webhook_event_after_request(
+                        webhook_event,
+                        delivery.response,
+                        error=delivery.error,
+                        elapsed=delivery.elapsed,
+                    )
+                except Exception:
+                    logger.exception("Unable to update %s", webhook_event)
 
 
 def send_old_alerts_webhook_event(
@@ -108,11 +270,7 @@ def send_old_alerts_webhook_event(
             "disabled_alerts": serialized_disabled_alerts,
         },
     }
-    renderer = JSONRenderer()
-    json_bytes = renderer.render(
-        post_content,
-        accepted_media_type="application/json;",
-    )
+    json_bytes = render_webhook_content(post_content)
     webhook_event = WebhookEvent.objects.create(
         webhook=webhook,
         content=post_content,
@@ -144,11 +302,7 @@ def send_recap_fetch_webhooks(fq: PacerFetchQueue) -> None:
                 "webhook": generate_webhook_key_content(webhook),
                 "payload": payload,
             }
-            renderer = JSONRenderer()
-            json_bytes = renderer.render(
-                post_content,
-                accepted_media_type="application/json;",
-            )
+            json_bytes = render_webhook_content(post_content)
             webhook_event = WebhookEvent.objects.create(
                 webhook=webhook,
                 content=post_content,
@@ -204,11 +358,7 @@ def send_search_alert_webhook(
             "alert": serialized_alert,
         },
     }
-    renderer = JSONRenderer()
-    json_bytes = renderer.render(
-        post_content,
-        accepted_media_type="application/json;",
-    )
+    json_bytes = render_webhook_content(post_content)
     webhook_event = WebhookEvent.objects.create(
         webhook=webhook,
         content=post_content,
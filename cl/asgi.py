@@ -5,3 +5,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cl.settings")
 
 application = get_asgi_application()
+
+# With gunicorn's --preload, this runs once in the master process, and the
+# workers it forks share the tokenizer's database.
+from cl.citations.tokenizers import prewarm_hyperscan_tokenizer  # noqa: E402
+
+prewarm_hyperscan_tokenizer()
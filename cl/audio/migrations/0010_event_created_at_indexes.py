@@ -0,0 +1,24 @@
+# Indexes the event tables the bulk data delta exports look changes up in.
+# They're BRIN indexes, which are tiny and cheap to build, since events are
+# appended in pgh_created_at order. They aren't in the event models, which
+# pghistory generates, so they're only created in the database.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        (
+            "audio",
+            "0009_alter_audio_stt_status_alter_audioevent_stt_status_noop",
+        ),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "audio_audioevent_created_brin" ON "audio_audioevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "audio_audioevent_created_brin";',
+        ),
+    ]
@@ -0,0 +1,4 @@
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "audio_audioevent_created_brin" ON "audio_audioevent" USING brin ("pgh_created_at");
@@ -2,6 +2,7 @@ import os
 import sys
 
 from celery import Celery
+from celery.signals import worker_init
 
 from cl.lib.celery_utils import throttle_task
 
@@ -20,6 +21,16 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 
 
+@worker_init.connect
+def prewarm_worker(**kwargs) -> None:
+    """Load the shared resources of the tasks in the main worker process,
+    before it forks the pool's processes, so they share them.
+    """
+    from cl.citations.tokenizers import prewarm_hyperscan_tokenizer
+
+    prewarm_hyperscan_tokenizer()
+
+
 @app.task(bind=True)
 @throttle_task("2/4s")
 def debug_task(self) -> None:
@@ -0,0 +1,167 @@
+from collections import Counter
+from typing import Iterator
+
+from django.db import connection
+from django.db.models import Max, Min
+
+from cl.search.models import Opinion, OpinionCluster, OpinionsCited
+
+# The citation_count of a cluster is the number of OpinionsCited rows citing
+# any of its opinions. Rather than being recounted, it's kept up to date by
+# applying the difference each change to the rows of a citing opinion makes.
+
+
+def replace_opinions_cited(
+    citing_opinion_id: int, opinions_cited: list[OpinionsCited]
+) -> list[int]:
+    """Replace the OpinionsCited rows of a citing opinion, and update the
+    citation counts of the clusters whose citations changed.
+
+    Run this in a transaction, so the rows and counts change together.
+
+    :param citing_opinion_id: The ID of the citing opinion.
+    :param opinions_cited: Its new OpinionsCited rows.
+    :return: The IDs of the clusters whose citation counts changed.
+    """
+    previous_rows = OpinionsCited.objects.filter(
+        citing_opinion_id=citing_opinion_id
+    )
+    previous_ids = list(
+        previous_rows.values_list("cited_opinion_id", flat=True)
+    )
+    previous_rows.delete()
+    OpinionsCited.objects.bulk_create(opinions_cited)
+
+    deltas = get_citation_count_deltas(
+        previous_ids, [o.cited_opinion_id for o in opinions_cited]
+    )
+    apply_citation_count_deltas(deltas)
+    return sorted(deltas)
+
+
+def get_citation_count_deltas(
+    removed_opinion_ids: list[int], added_opinion_ids: list[int]
+) -> dict[int, int]:
+    """Compute how the citation counts of clusters change when citations to
+    some opinions are removed and citations to others are added.
+
+    :param removed_opinion_ids: The IDs of the opinions no longer cited, one
+    per removed OpinionsCited row.
+    :param added_opinion_ids: The IDs of the opinions newly cited, one per
+    added OpinionsCited row.
+    :return: A dict mapping cluster IDs to the change in their counts.
+    Clusters whose counts don't change are left out.
+    """
+    cluster_ids = dict(
+        Opinion.objects.filter(
+            pk__in={*removed_opinion_ids, *added_opinion_ids}
+        ).values_list("pk", "cluster_id")
+    )
+    deltas: Counter = Counter()
+    for opinion_id in added_opinion_ids:
+        deltas[cluster_ids[opinion_id]] += 1
+    for opinion_id in removed_opinion_ids:
+        # The opinion is gone if the row was removed by its deletion.
+        if opinion_id in cluster_ids:
+            deltas[cluster_ids[opinion_id]] -= 1
+    return {pk: delta for pk, delta in deltas.items() if delta}
+
+
+def apply_citation_count_deltas(deltas: dict[int, int]) -> None:
+    """Add to the citation counts of clusters in a single query.
+
+    This is done in SQL so that the "date_modified" fields aren't updated.
+    The rows are locked in order first, so concurrent updates can't
+    deadlock.
+
+    :param deltas: A dict mapping cluster IDs to the change in their counts.
+    :return: None
+    """
+    if not deltas:
+        return
+    list(
+        OpinionCluster.objects.filter(pk__in=deltas)
+        .order_by("pk")
+        .select_for_update()
+        .values_list("pk", flat=True)
+    )
+    values = ", ".join(["(%s, %s)"] * len(deltas))
+    params = [value for item in deltas.items() for value in item]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE search_opinioncluster AS t "
+            f"SET citation_count = t.citation_count + v.delta "
+            f"FROM (VALUES {values}) AS v(id, delta) "
+            f"WHERE t.id = v.id",
+            params,
+        )
+
+
+def fix_citation_counts(wrong_counts: list[tuple[int, int, int]]) -> list[int]:
+    """Set wrong citation counts to the actual counts in a single query.
+
+    Counts that changed since they were found to be wrong are left alone,
+    since they were changed by citations being found in the meantime.
+
+    :param wrong_counts: A list of (cluster_id, citation_count,
+    actual_count) tuples, as found by find_wrong_citation_counts.
+    :return: The IDs of the clusters whose counts were fixed.
+    """
+    if not wrong_counts:
+        return []
+    values = ", ".join(["(%s, %s, %s)"] * len(wrong_counts))
+    params = [value for row in wrong_counts for value in row]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE search_opinioncluster AS t "
+            f"SET citation_count = v.count "
+            f"FROM (VALUES {values}) AS v(id, wrong_count, count) "
+            f"WHERE t.id = v.id AND t.citation_count = v.wrong_count "
+            f"RETURNING t.id",
+            params,
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def find_wrong_citation_counts(
+    chunk_size: int = 100_000, cluster_ids: list[int] | None = None
+) -> Iterator[list[tuple[int, int, int]]]:
+    """Recount the citations of clusters set-wise, a range of cluster IDs at
+    a time, and find the counts that are wrong.
+
+    :param chunk_size: The size of the ranges of cluster IDs to recount.
+    :param cluster_ids: Only recount these clusters. Defaults to all of them.
+    :return: An iterator of lists of (cluster_id, citation_count,
+    actual_count) tuples, one list per range.
+    """
+    clusters = OpinionCluster.objects.all()
+    if cluster_ids:
+        clusters = clusters.filter(pk__in=cluster_ids)
+    bounds = clusters.aggregate(start=Min("pk"), end=Max("pk"))
+    if bounds["start"] is None:
+        return
+
+    for start in range(bounds["start"], bounds["end"] + 1, chunk_size):
+        end = start + chunk_size
+        params: list = [start, end, start, end]
+        only_clusters = ""
+        if cluster_ids:
+            only_clusters = "AND c.id = ANY(%s)"
+            params.append(cluster_ids)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT c.id, c.citation_count, COALESCE(n.count, 0) "
+                f"FROM search_opinioncluster AS c "
+                f"LEFT JOIN ("
+                f"  SELECT o.cluster_id, COUNT(*) AS count "
+                f"  FROM search_opinionscited AS oc "
+                f"  JOIN search_opinion AS o ON o.id = oc.cited_opinion_id "
+                f"  WHERE o.cluster_id >= %s AND o.cluster_id < %s "
+                f"  GROUP BY o.cluster_id"
+                f") AS n ON n.cluster_id = c.id "
+                f"WHERE c.id >= %s AND c.id < %s {only_clusters} "
+                f"AND c.citation_count <> COALESCE(n.count, 0) "
+                f"ORDER BY c.id",
+                params,
+            )
+            yield cursor.fetchall()
@@ -0,0 +1,292 @@
+import uuid
+from collections import Counter
+from itertools import batched, groupby
+from typing import Iterable, NamedTuple
+
+from eyecite.models import CitationBase, FullCaseCitation
+
+from cl.citations.utils import get_years_from_reporter
+from cl.lib.redis_utils import get_redis_interface
+from cl.search.models import PRECEDENTIAL_STATUS, Citation, Opinion
+
+# The index maps (reporter, volume, page) citations to the opinions they
+# could refer to. It's a Redis hash per reporter volume, mapping pages to
+# the candidate opinions, and it's rebuilt from scratch under a new version
+# prefix, then swapped in by pointing CITATION_INDEX_VERSION_KEY at it.
+CITATION_INDEX_PREFIX = "citation_index"
+CITATION_INDEX_VERSION_KEY = f"{CITATION_INDEX_PREFIX}:version"
+CITATION_INDEX_STATS_KEY = f"{CITATION_INDEX_PREFIX}:stats"
+
+CitationKey = tuple[str, int, str]
+
+
+class CitationCandidate(NamedTuple):
+    """An opinion that a (reporter, volume, page) citation could refer to."""
+
+    opinion_id: int
+    year: int | None
+    court_id: str
+    precedential: bool
+
+
+def make_citation_key(citation: FullCaseCitation) -> CitationKey | None:
+    """Make the (reporter, volume, page) key of a full case citation, as
+    it'd be stored in the Citation table.
+
+    :param citation: The citation.
+    :return: The key, or None if the citation can't be looked up by one.
+    """
+    volume = citation.groups.get("volume")
+    page = citation.groups.get("page")
+    if not volume or not volume.isdigit() or not page:
+        return None
+    return citation.corrected_reporter(), int(volume), page
+
+
+def filter_citation_candidates(
+    full_citation: FullCaseCitation,
+    candidates: Iterable[CitationCandidate],
+) -> list[CitationCandidate]:
+    """Filter the opinions a citation could refer to the way the search
+    based resolvers do: by precedential status, year and court, leaving out
+    the citing opinion itself.
+
+    :param full_citation: The citation.
+    :param candidates: The opinions with the citation's reporter, volume and
+    page.
+    :return: The opinions the citation can refer to.
+    """
+    citing_opinion = getattr(full_citation, "citing_opinion", None)
+    if full_citation.year:
+        start_year = end_year = full_citation.year
+    else:
+        start_year, end_year = get_years_from_reporter(full_citation)
+        if citing_opinion is not None and citing_opinion.cluster.date_filed:
+            end_year = min(end_year, citing_opinion.cluster.date_filed.year)
+    court = full_citation.metadata.court
+    return [
+        c
+        for c in candidates
+        if c.precedential
+        and c.year is not None
+        and start_year <= c.year <= end_year
+        and (not court or c.court_id == court)
+        and (citing_opinion is None or c.opinion_id != citing_opinion.pk)
+    ]
+
+
+def can_refine_by_case_name(full_citation: FullCaseCitation) -> bool:
+    """Whether the search based resolvers can pick one of several opinions
+    with a citation by the case name of the citation.
+
+    :param full_citation: The citation.
+    :return: True if they can, False otherwise.
+    """
+    citing_opinion = getattr(full_citation, "citing_opinion", None)
+    has_defendant = bool(full_citation.metadata.defendant)
+    return citing_opinion is not None and has_defendant
+
+
+def encode_candidates(candidates: list[CitationCandidate]) -> str:
+    """Encode candidate opinions compactly, for storage in the index.
+
+    :param candidates: The candidate opinions. Only precedential ones are
+    indexed.
+    :return: A string like "123,1999,ca2;124,,scotus".
+    """
+    return ";".join(
+        f"{c.opinion_id},{c.year or ''},{c.court_id}" for c in candidates
+    )
+
+
+def decode_candidates(value: str) -> list[CitationCandidate]:
+    """Decode candidate opinions encoded by encode_candidates.
+
+    :param value: The encoded candidates.
+    :return: The candidate opinions.
+    """
+    candidates = []
+    for candidate in value.split(";"):
+        opinion_id, year, court_id = candidate.split(",")
+        candidates.append(
+            CitationCandidate(
+                int(opinion_id), int(year) if year else None, court_id, True
+            )
+        )
+    return candidates
+
+
+def make_citation_index_key(version: str, reporter: str, volume: int) -> str:
+    """Make the key of the Redis hash indexing a reporter volume.
+
+    :param version: The version of the index.
+    :param reporter: The reporter, e.g. "F.3d".
+    :param volume: The volume.
+    :return: The Redis key.
+    """
+    return f"{CITATION_INDEX_PREFIX}:{version}:{reporter}:{volume}"
+
+
+def build_citation_index(chunk_size: int = 10_000) -> int:
+    """Build a new version of the citation index from the Citation table,
+    swap it in, and delete the previous version.
+
+    Lookups keep using the previous version until the new one is complete.
+
+    :param chunk_size: The number of citations to write to Redis at a time.
+    :return: The number of citations indexed.
+    """
+    r = get_redis_interface("CACHE")
+    previous_version = r.get(CITATION_INDEX_VERSION_KEY)
+    version = uuid.uuid4().hex
+    # Non-precedential opinions are never matched, so they're left out.
+    rows = (
+        Citation.objects.filter(
+            cluster__precedential_status=PRECEDENTIAL_STATUS.PUBLISHED,
+            cluster__sub_opinions__isnull=False,
+        )
+        .order_by("reporter", "volume", "page")
+        .values_list(
+            "reporter",
+            "volume",
+            "page",
+            "cluster__sub_opinions__id",
+            "cluster__date_filed",
+            "cluster__docket__court_id",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    grouped = (
+        (key, list(group)) for key, group in groupby(rows, lambda row: row[:3])
+    )
+    indexed = 0
+    for chunk in batched(grouped, chunk_size):
+        pipe = r.pipeline(transaction=False)
+        for (reporter, volume, page), group in chunk:
+            candidates = [
+                CitationCandidate(
+                    opinion_id,
+                    date_filed.year if date_filed else None,
+                    court_id,
+                    True,
+                )
+                for *_, opinion_id, date_filed, court_id in group
+            ]
+            pipe.hset(
+                make_citation_index_key(version, reporter, volume),
+                page,
+                encode_candidates(candidates),
+            )
+        pipe.execute()
+        indexed += len(chunk)
+
+    r.set(CITATION_INDEX_VERSION_KEY, version)
+    if previous_version:
+        delete_citation_index(previous_version)
+    return indexed
+
+
+def delete_citation_index(version: str) -> None:
+    """Delete a version of the citation index.
+
+    :param version: The version to delete.
+    :return: None
+    """
+    r = get_redis_interface("CACHE")
+    keys = r.scan_iter(
+        match=f"{CITATION_INDEX_PREFIX}:{version}:*", count=10_000
+    )
+    for chunk in batched(keys, 1000):
+        r.unlink(*chunk)
+
+
+def get_citation_candidates(
+    citations: Iterable[CitationBase],
+) -> dict[CitationKey, list[CitationCandidate]] | None:
+    """Look up the opinions the full case citations of a document could
+    refer to in the citation index, with one round trip to Redis.
+
+    :param citations: The citations found in the document.
+    :return: A dict mapping the keys of the citations to their candidate
+    opinions, without the citations that aren't in the index, or None if the
+    index hasn't been built. Citations that aren't in it must be searched
+    for, since they may have been added after it was built.
+    """
+    r = get_redis_interface("CACHE")
+    version = r.get(CITATION_INDEX_VERSION_KEY)
+    if not version:
+        return None
+    keys = list(
+        {
+            key
+            for citation in citations
+            if type(citation) is FullCaseCitation
+            and (key := make_citation_key(citation))
+        }
+    )
+    if not keys:
+        return {}
+    pipe = r.pipeline(transaction=False)
+    for reporter, volume, page in keys:
+        pipe.hget(make_citation_index_key(version, reporter, volume), page)
+    return {
+        key: decode_candidates(value)
+        for key, value in zip(keys, pipe.execute())
+        if value
+    }
+
+
+def forget_citation(reporter: str, volume: int, page: str) -> None:
+    """Drop a citation from the citation index, so that it's resolved by
+    search until the index is rebuilt.
+
+    :param reporter: The reporter of the citation.
+    :param volume: The volume.
+    :param page: The page.
+    :return: None
+    """
+    r = get_redis_interface("CACHE")
+    version = r.get(CITATION_INDEX_VERSION_KEY)
+    if version:
+        r.hdel(make_citation_index_key(version, reporter, volume), page)
+
+
+def record_citation_index_stats(stats: Counter) -> None:
+    """Add the outcomes of some index lookups to the running totals.
+
+    :param stats: A Counter of outcomes: "exact" when the index resolved a
+    citation to an opinion, "unmatched" when it showed there's no opinion to
+    resolve it to, and "search" when it had to be resolved by search.
+    :return: None
+    """
+    if not stats:
+        return
+    r = get_redis_interface("STATS")
+    pipe = r.pipeline(transaction=False)
+    for outcome, count in stats.items():
+        pipe.hincrby(CITATION_INDEX_STATS_KEY, outcome, count)
+    pipe.execute()
+
+
+def get_citation_index_stats() -> dict[str, int]:
+    """Get the running totals of the outcomes of index lookups.
+
+    :return: A dict mapping outcomes to their counts.
+    """
+    r = get_redis_interface("STATS")
+    stats = r.hgetall(CITATION_INDEX_STATS_KEY)
+    return {outcome: int(count) for outcome, count in stats.items()}
+
+
+def get_opinions_by_id(opinion_ids: Iterable[int]) -> dict[int, Opinion]:
+    """Get opinions along with what the short citation resolver needs.
+
+    :param opinion_ids: The IDs of the opinions.
+    :return: A dict mapping IDs to opinions.
+    """
+    return (
+        Opinion.objects.filter(pk__in=set(opinion_ids))
+        .select_related("cluster")
+        .prefetch_related("cluster__citations")
+        .in_bulk()
+    )
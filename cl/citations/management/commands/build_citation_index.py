@@ -0,0 +1,61 @@
+import time
+
+from cl.citations.citation_index import (
+    build_citation_index,
+    get_citation_index_stats,
+)
+from cl.lib.command_utils import VerboseCommand, logger
+
+
+class Command(VerboseCommand):
+    help = (
+        "Build the index that citations are resolved with before falling "
+        "back to search, and keep it fresh. Rebuilds it continuously unless "
+        "--once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=60 * 60,
+            help="The number of seconds to wait between builds.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10_000,
+            help="The number of citations to write to Redis at a time.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            default=False,
+            help="Build the index once and exit, instead of running "
+            "continuously.",
+        )
+
+    def handle(self, *args, **options):
+        super().handle(*args, **options)
+
+        while True:
+            start = time.monotonic()
+            indexed = build_citation_index(options["chunk_size"])
+            logger.info(
+                "Indexed %s citations in %.0fs.",
+                indexed,
+                time.monotonic() - start,
+            )
+            stats = get_citation_index_stats()
+            total = sum(stats.values())
+            if total:
+                resolved = stats.get("exact", 0) + stats.get("unmatched", 0)
+                logger.info(
+                    "Citations resolved without search: %.1f%% of %s %s",
+                    100 * resolved / total,
+                    total,
+                    stats,
+                )
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
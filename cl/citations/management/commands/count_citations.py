@@ -3,12 +3,22 @@ import sys
 from django.conf import settings
 from django.core.management import call_command
 
-from cl.lib.command_utils import VerboseCommand
-from cl.search.models import OpinionCluster
+from cl.citations.citation_graph import (
+    find_wrong_citation_counts,
+    fix_citation_counts,
+)
+from cl.lib.command_utils import VerboseCommand, logger
+from cl.search.models import OpinionsCited
+from cl.search.tasks import add_items_to_solr, index_related_cites_fields
 
 
 class Command(VerboseCommand):
-    help = "Update the citation counts of all items, if they are wrong."
+    help = (
+        "Update the citation counts of all items, if they are wrong. Counts "
+        "are kept up to date as citations are found, so this recounts them "
+        "in SQL, a range of clusters at a time, and only fixes and reindexes "
+        "the ones that drifted."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -38,6 +48,19 @@ class Command(VerboseCommand):
                 "'concurrently'."
             ),
         )
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            default=False,
+            help="Only report the wrong citation counts, without fixing "
+            "them.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=100_000,
+            help="The size of the ranges of cluster IDs to recount at a time.",
+        )
 
     @staticmethod
     def do_solr(options):
@@ -62,24 +85,39 @@ class Command(VerboseCommand):
 
     def handle(self, *args, **options):
         """
-        For any item that has a citation count > 0, update the citation
-        count based on the DB.
+        Recount the citations of every cluster, and fix the counts that are
+        wrong.
         """
         super().handle(*args, **options)
         index_during_processing = False
         if options["index"] == "concurrently":
             index_during_processing = True
 
-        clusters = OpinionCluster.objects.filter(citation_count__gt=0)
-        if options.get("doc_id"):
-            clusters = clusters.filter(pk__in=options["doc_id"])
-
-        for cluster in clusters.iterator():
-            count = 0
-            for sub_opinion in cluster.sub_opinions.all():
-                count += sub_opinion.citing_opinions.all().count()
+        wrong_count = 0
+        for wrong_counts in find_wrong_citation_counts(
+            options["chunk_size"], options.get("doc_id")
+        ):
+            for cluster_id, citation_count, actual_count in wrong_counts:
+                logger.info(
+                    "Cluster %s has a citation count of %s, but is cited %s "
+                    "times.",
+                    cluster_id,
+                    citation_count,
+                    actual_count,
+                )
+            wrong_count += len(wrong_counts)
+            if options["verify"] or not wrong_counts:
+                continue
 
-            cluster.citation_count = count
-            cluster.save(index=index_during_processing)
+            cluster_ids = fix_citation_counts(wrong_counts)
+            if not cluster_ids:
+                continue
+            if index_during_processing:
+                add_items_to_solr.delay(cluster_ids, "search.OpinionCluster")
+            index_related_cites_fields.delay(
+                OpinionsCited.__name__, None, cluster_ids
+            )
 
-        self.do_solr(options)
+        logger.info("Found %s wrong citation counts.", wrong_count)
+        if not options["verify"]:
+            self.do_solr(options)
@@ -1,3 +1,4 @@
+import os
 import sys
 import time
 from typing import Iterable, List, cast
@@ -5,6 +6,7 @@ from typing import Iterable, List, cast
 from django.core.management import CommandError
 from django.core.management.base import CommandParser
 
+from cl.citations.recap_citations import find_recap_citations_in_chunks
 from cl.citations.tasks import (
     find_citations_and_parantheticals_for_recap_documents,
 )
@@ -62,6 +64,34 @@ class Command(VerboseCommand):
             default="batch1",
             help="The celery queue where the tasks should be processed.",
         )
+        parser.add_argument(
+            "--pipeline",
+            action="store_true",
+            default=False,
+            help="Process the documents here, a chunk at a time, instead of "
+            "queueing Celery tasks. Citations are extracted in parallel and "
+            "resolved in bulk. Use this for large backfills.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="With --pipeline, the number of documents per chunk.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="With --pipeline, the number of processes extracting "
+            "citations.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            default=False,
+            help="With --pipeline, skip the documents processed by the last "
+            "run.",
+        )
 
     def log_progress(self, processed_count: int, last_pk: int):
         if processed_count % 1000 == 1:
@@ -158,6 +188,21 @@ class Command(VerboseCommand):
         if options.get("uploaded_before"):
             query = query.filter(date_upload__lte=options["uploaded_before"])
 
+        if options["pipeline"]:
+            query = query.filter(
+                ocr_status__in=[
+                    RECAPDocument.OCR_UNNECESSARY,
+                    RECAPDocument.OCR_COMPLETE,
+                ]
+            )
+            find_recap_citations_in_chunks(
+                query,
+                cast(int, options["chunk_size"]),
+                cast(int, options["workers"]),
+                cast(bool, options["resume"]),
+            )
+            return
+
         self.count = query.count()
         self.average_per_s = 0.0
         self.timings: List[float] = []
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 
+from collections import Counter
 from datetime import datetime
+from functools import partial
 from typing import Dict, Iterable, List, Optional, no_type_check
 
 import waffle
@@ -21,6 +23,16 @@ from eyecite.utils import strip_punct
 from requests import Session
 from scorched.response import SolrResponse
 
+from cl.citations.citation_index import (
+    CitationCandidate,
+    CitationKey,
+    can_refine_by_case_name,
+    filter_citation_candidates,
+    get_citation_candidates,
+    get_opinions_by_id,
+    make_citation_key,
+    record_citation_index_stats,
+)
 from cl.citations.match_citations_queries import es_search_db_for_full_citation
 from cl.citations.types import (
     MatchedResourceType,
@@ -226,6 +238,52 @@ def resolve_fullcase_citation(
     return NO_MATCH_RESOURCE
 
 
+def resolve_fullcase_citation_from_index(
+    full_citation: FullCaseCitation,
+    candidates: dict[CitationKey, list[CitationCandidate]],
+    opinions: dict[int, Opinion],
+    stats: Counter,
+) -> MatchedResourceType:
+    """Resolve a full citation with the citation index, falling back to
+    search when the index can't tell which opinion it refers to.
+
+    The index finds the same opinions as the first, exact citation query of
+    the search based resolvers, so if it finds none, or several that can't
+    be told apart by case name, neither would the search. Citations that
+    aren't in the index at all are searched for, since they may have been
+    added after it was built.
+
+    :param full_citation: The citation to resolve.
+    :param candidates: The candidate opinions of the document's citations,
+    from get_citation_candidates.
+    :param opinions: The candidate opinions, by ID.
+    :param stats: A Counter the outcome of the lookup is added to.
+    :return: The opinion the citation refers to, or NO_MATCH_RESOURCE.
+    """
+    key = None
+    if type(full_citation) is FullCaseCitation:
+        key = make_citation_key(full_citation)
+    if key is None:
+        return resolve_fullcase_citation(full_citation)
+    if key not in candidates:
+        stats["search"] += 1
+        return resolve_fullcase_citation(full_citation)
+
+    matches = filter_citation_candidates(full_citation, candidates[key])
+    if len(matches) == 1 and matches[0].opinion_id in opinions:
+        stats["exact"] += 1
+        return opinions[matches[0].opinion_id]
+    if not matches or (
+        len(matches) > 1 and not can_refine_by_case_name(full_citation)
+    ):
+        stats["unmatched"] += 1
+        return NO_MATCH_RESOURCE
+    # Several opinions match, or the one that does was deleted since the
+    # index was built.
+    stats["search"] += 1
+    return resolve_fullcase_citation(full_citation)
+
+
 def resolve_shortcase_citation(
     short_citation: ShortCaseCitation,
     resolved_full_cites: ResolvedFullCites,
@@ -284,10 +342,29 @@ def do_resolve_citations(
             else:
                 raise "Unknown citing type."
 
+    # Look the full citations up in the citation index, if it's built, so
+    # that only the ambiguous ones need a search query.
+    candidates = get_citation_candidates(citations)
+    if candidates is None:
+        resolve_full_citation = resolve_fullcase_citation
+    else:
+        stats = Counter()
+        resolve_full_citation = partial(
+            resolve_fullcase_citation_from_index,
+            candidates=candidates,
+            opinions=get_opinions_by_id(
+                c.opinion_id for cs in candidates.values() for c in cs
+            ),
+            stats=stats,
+        )
+
     # Call and return eyecite's resolve_citations() function
-    return resolve_citations(
+    citation_resolutions = resolve_citations(
         citations=citations,
-        resolve_full_citation=resolve_fullcase_citation,
+        resolve_full_citation=resolve_full_citation,
         resolve_shortcase_citation=resolve_shortcase_citation,
         resolve_supra_citation=resolve_supra_citation,
     )
+    if candidates is not None:
+        record_citation_index_stats(stats)
+    return citation_resolutions
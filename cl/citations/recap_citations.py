@@ -1,20 +1,52 @@
-from typing import Dict, List
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from itertools import batched
+from typing import Dict, Iterable, Iterator, List
 
-from django.db import transaction
-from eyecite import get_citations
-from eyecite.models import CitationBase
-from eyecite.tokenizers import HyperscanTokenizer
+from django.db import connections, transaction
+from django.db.models import QuerySet
+from eyecite import get_citations, resolve_citations
+from eyecite.models import CitationBase, FullCaseCitation
+from eyecite.utils import clean_text
 
 from cl.citations.annotate_citations import get_and_clean_opinion_text
+from cl.citations.citation_index import (
+    CitationCandidate,
+    CitationKey,
+    filter_citation_candidates,
+    get_opinions_by_id,
+    make_citation_key,
+)
 from cl.citations.match_citations import (
     NO_MATCH_RESOURCE,
     do_resolve_citations,
+    resolve_fullcase_citation,
+    resolve_shortcase_citation,
+    resolve_supra_citation,
+)
+from cl.citations.tokenizers import (
+    get_hyperscan_tokenizer,
+    prewarm_hyperscan_tokenizer,
 )
 from cl.citations.types import MatchedResourceType, SupportedCitationType
-from cl.search.models import OpinionsCitedByRECAPDocument, RECAPDocument
-from cl.search.tasks import index_related_cites_fields
+from cl.lib.command_utils import logger
+from cl.lib.redis_utils import get_redis_interface
+from cl.search.models import (
+    PRECEDENTIAL_STATUS,
+    Citation,
+    Opinion,
+    OpinionsCitedByRECAPDocument,
+    RECAPDocument,
+)
+from cl.search.tasks import (
+    index_recap_documents_cites,
+    index_related_cites_fields,
+)
 
-HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
+RECAP_CITATIONS_LOG_KEY = "recap_citations_backfill:log"
 
 
 def store_recap_citations(document: RECAPDocument) -> None:
@@ -32,7 +64,7 @@ def store_recap_citations(document: RECAPDocument) -> None:
 
     # Extract the citations from the document's text
     citations: List[CitationBase] = get_citations(
-        document.cleaned_text, tokenizer=HYPERSCAN_TOKENIZER
+        document.cleaned_text, tokenizer=get_hyperscan_tokenizer()
     )
 
     # If no citations are found, then there is nothing else to do for now.
@@ -70,3 +102,272 @@ def store_recap_citations(document: RECAPDocument) -> None:
         OpinionsCitedByRECAPDocument.__name__,
         document.pk,
     )
+
+
+def build_citation_lookup(
+    citations: Iterable[CitationBase],
+) -> dict[CitationKey, list[CitationCandidate]]:
+    """Look up the opinions that the full case citations of a chunk of
+    documents could refer to, with two queries for the whole chunk.
+
+    :param citations: The citations found in the chunk's documents.
+    :return: A dict mapping citation keys to the opinions they could refer
+    to.
+    """
+    keys = {
+        key
+        for citation in citations
+        if type(citation) is FullCaseCitation
+        and (key := make_citation_key(citation))
+    }
+    if not keys:
+        return {}
+
+    rows = Citation.objects.filter(
+        reporter__in={key[0] for key in keys},
+        volume__in={key[1] for key in keys},
+        page__in={key[2] for key in keys},
+    ).values_list(
+        "reporter",
+        "volume",
+        "page",
+        "cluster_id",
+        "cluster__date_filed",
+        "cluster__docket__court_id",
+        "cluster__precedential_status",
+    )
+    clusters: dict[int, tuple] = {}
+    keys_by_cluster: dict[int, list[CitationKey]] = defaultdict(list)
+    for reporter, volume, page, cluster_id, *cluster in rows:
+        if (reporter, volume, page) in keys:
+            clusters[cluster_id] = tuple(cluster)
+            keys_by_cluster[cluster_id].append((reporter, volume, page))
+
+    opinions: dict[int, list[int]] = defaultdict(list)
+    for cluster_id, opinion_id in Opinion.objects.filter(
+        cluster_id__in=clusters
+    ).values_list("cluster_id", "pk"):
+        opinions[cluster_id].append(opinion_id)
+
+    lookup: dict[CitationKey, list[CitationCandidate]] = defaultdict(list)
+    for cluster_id, opinion_ids in opinions.items():
+        date_filed, court_id, status = clusters[cluster_id]
+        for opinion_id in opinion_ids:
+            candidate = CitationCandidate(
+                opinion_id,
+                date_filed.year if date_filed else None,
+                court_id,
+                status == PRECEDENTIAL_STATUS.PUBLISHED,
+            )
+            for key in keys_by_cluster[cluster_id]:
+                lookup[key].append(candidate)
+    return lookup
+
+
+def resolve_fullcase_citation_from_lookup(
+    full_citation: FullCaseCitation,
+    lookup: dict[CitationKey, list[CitationCandidate]],
+    opinions: dict[int, Opinion],
+) -> MatchedResourceType:
+    """Resolve a full citation with the lookup of its chunk, applying the
+    same filters as the search based resolver.
+
+    :param full_citation: The citation to resolve.
+    :param lookup: The lookup of the chunk the citation is in.
+    :param opinions: The opinions in the lookup, by ID.
+    :return: The opinion the citation refers to, or NO_MATCH_RESOURCE.
+    """
+    if type(full_citation) is not FullCaseCitation:
+        return resolve_fullcase_citation(full_citation)
+    key = make_citation_key(full_citation)
+    if key is None:
+        return resolve_fullcase_citation(full_citation)
+    candidates = filter_citation_candidates(full_citation, lookup.get(key, []))
+    # Like the search based resolver, which looks for the exact citation
+    # too, only resolve citations that match a single opinion.
+    if len(candidates) == 1:
+        return opinions[candidates[0].opinion_id]
+    return NO_MATCH_RESOURCE
+
+
+def extract_recap_citations(
+    document: tuple[int, str],
+) -> tuple[int, list[CitationBase]]:
+    """Find the citations in the text of a RECAPDocument. This runs in the
+    extraction processes.
+
+    :param document: The ID and plain text of the document.
+    :return: The ID of the document and the citations in it.
+    """
+    pk, plain_text = document
+    cleaned_text = clean_text(plain_text, ["all_whitespace"])
+    return pk, get_citations(cleaned_text, tokenizer=get_hyperscan_tokenizer())
+
+
+def store_recap_citations_in_bulk(
+    extracted: list[tuple[int, list[CitationBase]]],
+) -> int:
+    """Resolve the citations of a chunk of documents and replace the chunk's
+    OpinionsCitedByRECAPDocument rows, then update their cites in ES.
+
+    :param extracted: The IDs of the chunk's documents, and their citations.
+    :return: The number of OpinionsCitedByRECAPDocument rows created.
+    """
+    lookup = build_citation_lookup(
+        citation for _, citations in extracted for citation in citations
+    )
+    opinions = get_opinions_by_id(
+        c.opinion_id for candidates in lookup.values() for c in candidates
+    )
+    resolve_full_citation = partial(
+        resolve_fullcase_citation_from_lookup,
+        lookup=lookup,
+        opinions=opinions,
+    )
+
+    objects_to_create = []
+    for pk, citations in extracted:
+        if not citations:
+            continue
+        citation_resolutions = resolve_citations(
+            citations=citations,
+            resolve_full_citation=resolve_full_citation,
+            resolve_shortcase_citation=resolve_shortcase_citation,
+            resolve_supra_citation=resolve_supra_citation,
+        )
+        citation_resolutions.pop(NO_MATCH_RESOURCE, None)
+        objects_to_create.extend(
+            OpinionsCitedByRECAPDocument(
+                citing_document_id=pk,
+                cited_opinion_id=opinion.pk,
+                depth=len(cits),
+            )
+            for opinion, cits in citation_resolutions.items()
+        )
+
+    doc_ids = [pk for pk, _ in extracted]
+    with transaction.atomic():
+        OpinionsCitedByRECAPDocument.objects.filter(
+            citing_document_id__in=doc_ids
+        ).delete()
+        OpinionsCitedByRECAPDocument.objects.bulk_create(objects_to_create)
+    index_recap_documents_cites.delay(doc_ids)
+    return len(objects_to_create)
+
+
+def iter_recap_texts(
+    queryset: QuerySet, chunk_size: int
+) -> Iterator[list[tuple[int, str]]]:
+    """Stream the texts of RECAPDocuments in chunks, in PK order, with a
+    server-side cursor.
+
+    :param queryset: The documents to stream.
+    :param chunk_size: The number of documents per chunk.
+    :return: An iterator of chunks of (pk, plain_text) tuples.
+    """
+    rows = (
+        queryset.order_by("pk")
+        .values_list("pk", "plain_text")
+        .iterator(chunk_size=chunk_size)
+    )
+    return (list(chunk) for chunk in batched(rows, chunk_size))
+
+
+def log_recap_citations_progress(last_pk: int) -> None:
+    """Record the last document whose citations were stored, to resume
+    from.
+
+    :param last_pk: The ID of the last document of the last chunk stored.
+    :return: None
+    """
+    r = get_redis_interface("CACHE")
+    pipe = r.pipeline()
+    pipe.hset(
+        RECAP_CITATIONS_LOG_KEY,
+        mapping={
+            "last_document_id": last_pk,
+            "date_time": datetime.now().isoformat(),
+        },
+    )
+    pipe.expire(RECAP_CITATIONS_LOG_KEY, 60 * 60 * 24 * 28)  # 4 weeks
+    pipe.execute()
+
+
+def get_last_recap_citations_pk() -> int:
+    """Get the ID of the last document a previous run stored citations for.
+
+    :return: The ID, or 0 if there's no previous run.
+    """
+    r = get_redis_interface("CACHE")
+    return int(r.hget(RECAP_CITATIONS_LOG_KEY, "last_document_id") or 0)
+
+
+def find_recap_citations_in_chunks(
+    queryset: QuerySet, chunk_size: int, workers: int, resume: bool
+) -> None:
+    """Find and store the citations of many RECAPDocuments, a chunk at a
+    time.
+
+    Each chunk goes through four stages:
+
+      1. Its texts are fetched from a server-side cursor.
+      2. Citations are extracted in a pool of processes.
+      3. Full citations are resolved for the whole chunk with a couple of
+         queries, instead of a search query per citation.
+      4. Its rows are replaced in one transaction, and its ES cites are
+         updated in one bulk request.
+
+    The next chunk is extracted while the last one is resolved and stored.
+    The last document stored is checkpointed after every chunk.
+
+    :param queryset: The documents to process.
+    :param chunk_size: The number of documents per chunk.
+    :param workers: The number of extraction processes.
+    :param resume: Whether to skip the documents stored by the last run.
+    :return: None
+    """
+    if resume:
+        last_pk = get_last_recap_citations_pk()
+        logger.info("Resuming after document %s", last_pk)
+        queryset = queryset.filter(pk__gt=last_pk)
+
+    # Load the tokenizer before forking, so the processes share it, and
+    # don't fork open DB connections.
+    prewarm_hyperscan_tokenizer()
+    connections.close_all()
+    start = time.monotonic()
+    documents = citations_found = rows_created = 0
+    with ProcessPoolExecutor(workers) as executor:
+        pending = None
+        for chunk in iter_recap_texts(queryset, chunk_size):
+            # map() submits the whole chunk right away.
+            results = executor.map(
+                extract_recap_citations,
+                chunk,
+                chunksize=max(1, len(chunk) // (workers * 4)),
+            )
+            if pending is not None:
+                rows_created += store_recap_citations_in_bulk(pending)
+                log_recap_citations_progress(pending[-1][0])
+            pending = list(results)
+            documents += len(pending)
+            citations_found += sum(len(cites) for _, cites in pending)
+            elapsed = time.monotonic() - start
+            logger.info(
+                "Extracted %s documents (%.1f/s), %s citations; stored %s "
+                "cited opinions. Last document: %s",
+                documents,
+                documents / elapsed,
+                citations_found,
+                rows_created,
+                pending[-1][0],
+            )
+        if pending is not None:
+            rows_created += store_recap_citations_in_bulk(pending)
+            log_recap_citations_progress(pending[-1][0])
+    logger.info(
+        "Done. Stored %s cited opinions from %s documents in %.0fs.",
+        rows_created,
+        documents,
+        time.monotonic() - start,
+    )
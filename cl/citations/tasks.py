@@ -2,17 +2,16 @@ from http.client import ResponseNotReady
 from typing import Dict, List, Set, Tuple
 
 from django.db import transaction
-from django.db.models import F
 from django.db.models.query import QuerySet
 from eyecite import get_citations
 from eyecite.models import CitationBase
-from eyecite.tokenizers import HyperscanTokenizer
 
 from cl.celery_init import app
 from cl.citations.annotate_citations import (
     create_cited_html,
     get_and_clean_opinion_text,
 )
+from cl.citations.citation_graph import replace_opinions_cited
 from cl.citations.filter_parentheticals import (
     clean_parenthetical_text,
     is_parenthetical_descriptive,
@@ -24,6 +23,7 @@ from cl.citations.match_citations import (
 from cl.citations.parenthetical_utils import create_parenthetical_groups
 from cl.citations.recap_citations import store_recap_citations
 from cl.citations.score_parentheticals import parenthetical_score
+from cl.citations.tokenizers import get_hyperscan_tokenizer
 from cl.citations.types import MatchedResourceType, SupportedCitationType
 from cl.search.models import (
     Opinion,
@@ -38,7 +38,6 @@ from cl.search.tasks import add_items_to_solr, index_related_cites_fields
 # they are considered parallel reporters. For example,
 # "22 U.S. 44, 46 (13 Atl. 33)" would have a distance of 6.
 PARALLEL_DISTANCE = 6
-HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
 
 
 @app.task
@@ -150,7 +149,7 @@ def store_opinion_citations_and_update_parentheticals(
 
     # Extract the citations from the opinion's text
     citations: List[CitationBase] = get_citations(
-        opinion.cleaned_text, tokenizer=HYPERSCAN_TOKENIZER
+        opinion.cleaned_text, tokenizer=get_hyperscan_tokenizer()
     )
 
     # If no citations are found, then there is nothing else to do for now.
@@ -171,21 +170,6 @@ def store_opinion_citations_and_update_parentheticals(
     # Delete the unmatched citations
     citation_resolutions.pop(NO_MATCH_RESOURCE, None)
 
-    # Increase the citation count for the cluster of each matched opinion
-    # if that cluster has not already been cited by this opinion. First,
-    # calculate a list of the IDs of every opinion whose cluster will need
-    # updating.
-
-    currently_cited_opinions = opinion.opinions_cited.all().values_list(
-        "pk", flat=True
-    )
-
-    opinion_ids_to_update = {
-        o.pk
-        for o in citation_resolutions.keys()
-        if o.pk not in currently_cited_opinions
-    }
-
     clusters_to_update_par_groups_for = set()
     parentheticals: List[Parenthetical] = []
 
@@ -217,24 +201,10 @@ def store_opinion_citations_and_update_parentheticals(
     # transcation block. Trigger a single Solr update as well, if
     # required.
     with transaction.atomic():
-        opinion_clusters_to_update = OpinionCluster.objects.filter(
-            sub_opinions__pk__in=opinion_ids_to_update
-        )
-        opinion_clusters_to_update.update(
-            citation_count=F("citation_count") + 1
-        )
-
-        if index:
-            add_items_to_solr.delay(
-                opinion_clusters_to_update.values_list("pk", flat=True),
-                "search.OpinionCluster",
-            )
-        # Nuke existing citations and parentheticals
-        OpinionsCited.objects.filter(citing_opinion_id=opinion.pk).delete()
-        Parenthetical.objects.filter(describing_opinion_id=opinion.pk).delete()
-
-        # Create the new ones.
-        OpinionsCited.objects.bulk_create(
+        # Replace the existing citations, updating the citation counts of
+        # the clusters whose citations changed.
+        cluster_ids_to_update = replace_opinions_cited(
+            opinion.pk,
             [
                 OpinionsCited(
                     citing_opinion_id=opinion.pk,
@@ -242,8 +212,15 @@ def store_opinion_citations_and_update_parentheticals(
                     depth=len(_citations),
                 )
                 for _opinion, _citations in citation_resolutions.items()
-            ]
+            ],
         )
+        if index and cluster_ids_to_update:
+            add_items_to_solr.delay(
+                cluster_ids_to_update, "search.OpinionCluster"
+            )
+
+        # Nuke existing parentheticals and create the new ones.
+        Parenthetical.objects.filter(describing_opinion_id=opinion.pk).delete()
         Parenthetical.objects.bulk_create(parentheticals)
 
         # Update parenthetical groups for clusters that we have added
@@ -257,9 +234,6 @@ def store_opinion_citations_and_update_parentheticals(
         opinion.save(index=False)
 
     # Update changes in ES.
-    cluster_ids_to_update = list(
-        opinion_clusters_to_update.values_list("id", flat=True)
-    )
     index_related_cites_fields.delay(
         OpinionsCited.__name__, opinion.pk, cluster_ids_to_update
     )
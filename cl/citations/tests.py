@@ -11,6 +11,7 @@ from asgiref.sync import async_to_sync, sync_to_async
 from django.contrib.auth.hashers import make_password
 from django.core.cache import cache as default_cache
 from django.core.management import call_command
+from django.db import transaction
 from django.test import override_settings
 from django.urls import reverse
 from eyecite import get_citations
@@ -22,7 +23,6 @@ from eyecite.test_factories import (
     supra_citation,
     unknown_citation,
 )
-from eyecite.tokenizers import HyperscanTokenizer
 from factory import RelatedFactory
 from lxml import etree
 
@@ -30,6 +30,14 @@ from cl.citations.annotate_citations import (
     create_cited_html,
     get_and_clean_opinion_text,
 )
+from cl.citations.citation_graph import replace_opinions_cited
+from cl.citations.citation_index import (
+    CITATION_INDEX_STATS_KEY,
+    CITATION_INDEX_VERSION_KEY,
+    build_citation_index,
+    delete_citation_index,
+    get_citation_index_stats,
+)
 from cl.citations.filter_parentheticals import (
     clean_parenthetical_text,
     is_parenthetical_descriptive,
@@ -49,11 +57,20 @@ from cl.citations.match_citations import (
     do_resolve_citations,
     resolve_fullcase_citation,
 )
+from cl.citations.recap_citations import (
+    extract_recap_citations,
+    store_recap_citations_in_bulk,
+)
 from cl.citations.score_parentheticals import parenthetical_score
 from cl.citations.tasks import (
     find_citations_and_parentheticals_for_opinion_by_pks,
     store_recap_citations,
 )
+from cl.citations.tokenizers import (
+    get_hyperscan_cache_dir,
+    get_hyperscan_tokenizer,
+)
+from cl.lib.redis_utils import get_redis_interface
 from cl.lib.test_helpers import (
     CourtTestCase,
     IndexedSolrTestCase,
@@ -82,8 +99,6 @@ from cl.search.models import (
 from cl.tests.cases import ESIndexTestCase, SimpleTestCase, TestCase
 from cl.users.factories import UserProfileWithParentsFactory
 
-HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
-
 
 class CitationTextTest(SimpleTestCase):
     def test_make_html_from_plain_text(self) -> None:
@@ -203,7 +218,7 @@ class CitationTextTest(SimpleTestCase):
                 opinion = Opinion(plain_text=s)
                 get_and_clean_opinion_text(opinion)
                 citations = get_citations(
-                    opinion.cleaned_text, tokenizer=HYPERSCAN_TOKENIZER
+                    opinion.cleaned_text, tokenizer=get_hyperscan_tokenizer()
                 )
 
                 # Stub out fake output from do_resolve_citations(), since the
@@ -260,7 +275,7 @@ class CitationTextTest(SimpleTestCase):
                 opinion = Opinion(html=s)
                 get_and_clean_opinion_text(opinion)
                 citations = get_citations(
-                    opinion.cleaned_text, tokenizer=HYPERSCAN_TOKENIZER
+                    opinion.cleaned_text, tokenizer=get_hyperscan_tokenizer()
                 )
 
                 # Stub out fake output from do_resolve_citations(), since the
@@ -313,7 +328,7 @@ class CitationTextTest(SimpleTestCase):
                 opinion = Opinion(plain_text=s)
                 get_and_clean_opinion_text(opinion)
                 citations = get_citations(
-                    opinion.cleaned_text, tokenizer=HYPERSCAN_TOKENIZER
+                    opinion.cleaned_text, tokenizer=get_hyperscan_tokenizer()
                 )
 
                 # Stub out fake output from do_resolve_citations(), since the
@@ -408,6 +423,139 @@ class RECAPDocumentObjectTest(ESIndexTestCase, TestCase):
                 )
                 self.assertEqual(citation_obj.depth, depth)
 
+    def test_opinionscited_recap_bulk_creation(self) -> None:
+        """Are the citations of a chunk of documents resolved in bulk, to
+        the same opinions and depths as one document at a time?
+        """
+        other_doc = RECAPDocumentFactory.create(
+            plain_text="Not a citation: 1 Foo. 2",
+            ocr_status=RECAPDocument.OCR_UNNECESSARY,
+            docket_entry=DocketEntryWithParentsFactory(),
+        )
+        extracted = [
+            extract_recap_citations((doc.pk, doc.plain_text))
+            for doc in [self.recap_doc, other_doc]
+        ]
+
+        with patch(
+            "cl.citations.match_citations.search_db_for_fullcitation"
+        ) as search_mock:
+            created = store_recap_citations_in_bulk(extracted)
+        search_mock.assert_not_called()
+
+        self.assertEqual(created, 2)
+        depths = dict(
+            OpinionsCitedByRECAPDocument.objects.filter(
+                citing_document=self.recap_doc
+            ).values_list("cited_opinion__cluster_id", "depth")
+        )
+        self.assertEqual(
+            depths,
+            {self.citation1.cluster_id: 2, self.citation2.cluster_id: 1},
+        )
+        self.assertFalse(
+            OpinionsCitedByRECAPDocument.objects.filter(
+                citing_document=other_doc
+            ).exists()
+        )
+
+
+class CitationIndexTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        court_ca2 = CourtFactory(id="ca2")
+        cls.citation = CitationWithParentsFactory.create(
+            volume="948",
+            reporter="F.3d",
+            page="593",
+            cluster=OpinionClusterFactoryWithChildrenAndParents(
+                docket=DocketFactory(court=court_ca2),
+                case_name="Fisher v. SD Protection Inc.",
+                date_filed=date(2020, 1, 1),
+            ),
+        )
+        # Two opinions with the same citation, which the index can't tell
+        # apart.
+        for case_name in ["Foo v. Bar", "Bar v. Foo"]:
+            CitationWithParentsFactory.create(
+                volume="1",
+                reporter="F.3d",
+                page="1",
+                cluster=OpinionClusterFactoryWithChildrenAndParents(
+                    docket=DocketFactory(court=court_ca2),
+                    case_name=case_name,
+                    date_filed=date(1993, 1, 1),
+                ),
+            )
+
+    def setUp(self) -> None:
+        self.r = get_redis_interface("STATS")
+        self.r.delete(CITATION_INDEX_STATS_KEY)
+        build_citation_index()
+
+    def tearDown(self) -> None:
+        cache = get_redis_interface("CACHE")
+        delete_citation_index(cache.get(CITATION_INDEX_VERSION_KEY))
+        cache.delete(CITATION_INDEX_VERSION_KEY)
+        self.r.delete(CITATION_INDEX_STATS_KEY)
+
+    def test_resolve_citations_from_index(self) -> None:
+        """Are exact citations resolved from the index, without search, and
+        only the ambiguous ones searched for?
+        """
+        citing_opinion = OpinionWithChildrenFactory(
+            cluster=OpinionClusterFactoryWithChildrenAndParents(
+                date_filed=date(2021, 1, 1)
+            ),
+        )
+        citations = get_citations(
+            "Fisher v. SD Protection Inc., 948 F.3d 593 (2d Cir. 2020). "
+            "Foo v. Bar, 1 F.3d 1. Baz, 2 F.3d 2."
+        )
+
+        with patch(
+            "cl.citations.match_citations.search_db_for_fullcitation",
+            return_value=[],
+        ) as search_mock:
+            citation_resolutions = do_resolve_citations(
+                citations, citing_opinion
+            )
+
+        opinion = Opinion.objects.get(cluster_id=self.citation.cluster_id)
+        self.assertEqual(
+            [c.matched_text() for c in citation_resolutions[opinion]],
+            ["948 F.3d 593"],
+        )
+        self.assertEqual(len(citation_resolutions[NO_MATCH_RESOURCE]), 2)
+        # Only the ambiguous citation, which has a case name to refine the
+        # search with, and the one that isn't in the index were searched for.
+        self.assertEqual(search_mock.call_count, 2)
+        self.assertEqual(get_citation_index_stats(), {"exact": 1, "search": 2})
+
+    def test_saved_citations_are_searched(self) -> None:
+        """Are citations saved since the index was built resolved by search,
+        in case the index is out of date?
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.citation.save()
+        citing_opinion = OpinionWithChildrenFactory(
+            cluster=OpinionClusterFactoryWithChildrenAndParents(
+                date_filed=date(2021, 1, 1)
+            ),
+        )
+        citations = get_citations(
+            "Fisher v. SD Protection Inc., 948 F.3d 593 (2d Cir. 2020)."
+        )
+
+        with patch(
+            "cl.citations.match_citations.search_db_for_fullcitation",
+            return_value=[],
+        ) as search_mock:
+            do_resolve_citations(citations, citing_opinion)
+
+        self.assertEqual(search_mock.call_count, 1)
+        self.assertEqual(get_citation_index_stats(), {"search": 1})
+
 
 class CitationObjectTest(ESIndexTestCase, TestCase):
     fixtures: List = []
@@ -807,9 +955,9 @@ class CitationObjectTest(ESIndexTestCase, TestCase):
         """Make sure that a citation like 1 Wheat 9 doesn't match 9 Wheat 1"""
         # citation2a is 9 F. 1, so we expect no results.
         citation_str = "1 F. 9 (1795)"
-        citation = get_citations(citation_str, tokenizer=HYPERSCAN_TOKENIZER)[
-            0
-        ]
+        citation = get_citations(
+            citation_str, tokenizer=get_hyperscan_tokenizer()
+        )[0]
         results = resolve_fullcase_citation(citation)
         self.assertEqual(NO_MATCH_RESOURCE, results)
 
@@ -834,6 +982,38 @@ class CitationObjectTest(ESIndexTestCase, TestCase):
             % (cited.cluster.citation_count, expected_count),
         )
 
+    def test_citation_count_deltas(self) -> None:
+        """Are citation counts updated by the citations a citing opinion
+        gains and loses, and are counts that drifted fixed by
+        count_citations?
+        """
+        opinion1 = Opinion.objects.get(cluster__pk=self.citation1.cluster_id)
+        opinion5 = Opinion.objects.get(cluster__pk=self.citation5.cluster_id)
+        cluster = opinion1.cluster
+
+        # Finding the same citations twice doesn't count them twice.
+        for _ in range(2):
+            find_citations_and_parentheticals_for_opinion_by_pks.delay(
+                [opinion5.pk]
+            )
+            cluster.refresh_from_db()
+            self.assertEqual(cluster.citation_count, 1)
+
+        with transaction.atomic():
+            changed_cluster_ids = replace_opinions_cited(opinion5.pk, [])
+        cluster.refresh_from_db()
+        self.assertEqual(cluster.citation_count, 0)
+        self.assertIn(cluster.pk, changed_cluster_ids)
+
+        OpinionCluster.objects.filter(pk=cluster.pk).update(citation_count=5)
+        args = ["--doc-id", str(cluster.pk), "--index", "False"]
+        call_command("count_citations", *args, "--verify")
+        cluster.refresh_from_db()
+        self.assertEqual(cluster.citation_count, 5)
+        call_command("count_citations", *args)
+        cluster.refresh_from_db()
+        self.assertEqual(cluster.citation_count, 0)
+
     def test_opinionscited_creation(self) -> None:
         """Make sure that found citations are stored in the database as
         OpinionsCited objects with the appropriate references and depth.
@@ -1115,7 +1295,9 @@ class ParallelCitationTest(SimpleTestCase):
                 citation_group_count=citation_group_count,
                 expected_num_parallel_citations=expected_num_parallel_citations,
             ):
-                citations = get_citations(q, tokenizer=HYPERSCAN_TOKENIZER)
+                citations = get_citations(
+                    q, tokenizer=get_hyperscan_tokenizer()
+                )
                 citation_groups = identify_parallel_citations(citations)
                 computed_num_citation_groups = len(citation_groups)
                 self.assertEqual(
@@ -2440,3 +2622,14 @@ class CitationLookUpApiTest(
             # times the allowed number of citations.
             expected_time = test_date + timedelta(minutes=3)
             self.assertEqual(data["wait_until"], expected_time.isoformat())
+
+
+class HyperscanTokenizerTest(SimpleTestCase):
+    def test_tokenizer_is_shared(self) -> None:
+        """Is a single tokenizer shared, with a versioned cache?"""
+        tokenizer = get_hyperscan_tokenizer()
+        self.assertIs(get_hyperscan_tokenizer(), tokenizer)
+        self.assertEqual(tokenizer.cache_dir, get_hyperscan_cache_dir())
+        self.assertIn("hyperscan-", tokenizer.cache_dir)
+        citations = get_citations("1 U.S. 1", tokenizer=tokenizer)
+        self.assertEqual(len(citations), 1)
@@ -0,0 +1,63 @@
+import logging
+import resource
+import time
+from functools import cache
+from importlib.metadata import version
+from pathlib import Path
+
+from eyecite.tokenizers import HyperscanTokenizer
+
+logger = logging.getLogger(__name__)
+
+HYPERSCAN_CACHE_ROOT = ".hyperscan"
+
+
+def get_hyperscan_cache_dir() -> str:
+    """Get the directory the compiled Hyperscan database is cached in.
+
+    Compiled databases can only be loaded by the version of Hyperscan that
+    compiled them, so each version of Hyperscan and eyecite gets a directory
+    of its own. eyecite names the files in it after a hash of the patterns.
+
+    :return: The path of the directory, which is created if needed.
+    """
+    cache_dir = Path(HYPERSCAN_CACHE_ROOT) / (
+        f"hyperscan-{version('hyperscan')}-eyecite-{version('eyecite')}"
+    )
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return str(cache_dir)
+
+
+@cache
+def get_hyperscan_tokenizer() -> HyperscanTokenizer:
+    """Get the tokenizer shared by everything in the process that extracts
+    citations.
+
+    The tokenizer compiles its Hyperscan database, or loads it from the
+    cache, the first time it's used, and keeps it for the life of the
+    process. Sharing one tokenizer means that's only done once per process,
+    and that only one copy of the database is kept in memory.
+
+    :return: The tokenizer.
+    """
+    return HyperscanTokenizer(cache_dir=get_hyperscan_cache_dir())
+
+
+def prewarm_hyperscan_tokenizer() -> None:
+    """Load the Hyperscan database of the shared tokenizer now, instead of
+    on the first citation lookup.
+
+    Call this in parent processes before they fork their workers. The
+    database is never written to after it's loaded, so the workers share the
+    parent's copy of it instead of each loading their own.
+
+    :return: None
+    """
+    start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    get_hyperscan_tokenizer().tokenize("1 U.S. 1")
+    logger.info(
+        "Loaded the Hyperscan tokenizer in %.2fs. Max RSS grew by %s kB.",
+        time.perf_counter() - start,
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start_rss,
+    )
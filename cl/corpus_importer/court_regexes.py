@@ -1,4 +1,8 @@
 import re
+from functools import cache, lru_cache
+from typing import Sequence
+
+import hyperscan
 
 conn_counties = ")|(".join(
     [
@@ -695,6 +699,20 @@ international_pairs = (
 # fmt: on
 
 
+# The tables of (regex, court ID) pairs, by the name they're matched with.
+COURT_PAIRS = {
+    "international": international_pairs,
+    "state": state_pairs,
+    "state_ag": state_ag_pairs,
+    "federal_appeals": ca_pairs,
+    "bankruptcy": fb_pairs,
+    "federal_district": fd_pairs,
+}
+
+# The number of court strings each matcher remembers the matches of.
+MATCH_CACHE_SIZE = 100_000
+
+
 def match_court_string(
     court_str: str,
     federal_appeals: bool = False,
@@ -726,34 +744,170 @@ def match_court_string(
     ), "federal_district and bankruptcy cannot be used in conjunction"
 
     # Generally, we test these from most specific regex to least specific. The
-    # order of the tests below should not be changed.
-    matches = []
-    if international:
-        for regex, value in international_pairs:
-            if re.search(regex, court_str):
-                matches.append(value)
-    if state:
-        for regex, value in state_pairs:
-            if re.search(regex, court_str):
-                matches.append(value)
-    if state_ag:
-        for regex, value in state_ag_pairs:
-            if re.search(regex, court_str):
-                matches.append(value)
-    if federal_appeals:
-        for regex, value in ca_pairs:
-            if re.search(regex, court_str):
-                matches.append(value)
-    if bankruptcy:
-        for regex, value in fb_pairs:
-            if re.search(regex, court_str):
-                matches.append(value)
-    # District go last because they've got some broad ones.
-    if federal_district:
-        for regex, value in fd_pairs:
-            if re.search(regex, court_str):
-                matches.append(value)
+    # order of the tables below should not be changed. District go last
+    # because they've got some broad ones.
+    wanted = {
+        "international": international,
+        "state": state,
+        "state_ag": state_ag,
+        "federal_appeals": federal_appeals,
+        "bankruptcy": bankruptcy,
+        "federal_district": federal_district,
+    }
+    matcher = get_court_matcher(*(name for name, on in wanted.items() if on))
+    court_id = matcher.match(court_str)
 
     # Safety check. If we have more than one match, that's a problem
-    assert len(matches) >= 1, f"Too many matches for {court_str}"
-    return matches[0] if matches else None
+    assert court_id is not None, f"Too many matches for {court_str}"
+    return court_id
+
+
+class CourtMatcher:
+    """Match court strings against a table of (regex, court ID) pairs in a
+    single pass, returning what trying the regexes one at a time in the order
+    of the table would.
+
+    The regexes are compiled once into a Hyperscan database, which finds all
+    the regexes that match a string in one scan. Hyperscan doesn't support
+    everything re does, so they're compiled in prefilter mode, in which a
+    match is only a candidate, and candidates are confirmed with re in the
+    order of the table. Regexes Hyperscan can't compile at all are always
+    candidates.
+
+    The matches of the last MATCH_CACHE_SIZE strings are remembered, since
+    importers see the same court strings over and over.
+    """
+
+    def __init__(self, pairs: Sequence[tuple[re.Pattern, str]]) -> None:
+        self.pairs = pairs
+        self.database: hyperscan.Database | None = None
+        self.unsupported: list[int] = []
+        ids = list(range(len(pairs)))
+        try:
+            self._compile(ids)
+        except hyperscan.error:
+            self.unsupported = [i for i in ids if not self._can_compile(i)]
+            self._compile([i for i in ids if i not in self.unsupported])
+        self._match_all = lru_cache(maxsize=MATCH_CACHE_SIZE)(
+            self._find_matches
+        )
+
+    def _get_flags(self, i: int) -> int:
+        regex = self.pairs[i][0]
+        flags = (
+            hyperscan.HS_FLAG_PREFILTER
+            | hyperscan.HS_FLAG_SINGLEMATCH
+            | hyperscan.HS_FLAG_ALLOWEMPTY
+            | hyperscan.HS_FLAG_UTF8
+            | hyperscan.HS_FLAG_UCP
+        )
+        if regex.flags & re.IGNORECASE:
+            flags |= hyperscan.HS_FLAG_CASELESS
+        if regex.flags & re.MULTILINE:
+            flags |= hyperscan.HS_FLAG_MULTILINE
+        if regex.flags & re.DOTALL:
+            flags |= hyperscan.HS_FLAG_DOTALL
+        return flags
+
+    def _compile(self, ids: list[int]) -> hyperscan.Database | None:
+        if not ids:
+            return None
+        database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        database.compile(
+            expressions=[self.pairs[i][0].pattern.encode() for i in ids],
+            ids=ids,
+            elements=len(ids),
+            flags=[self._get_flags(i) for i in ids],
+        )
+        self.database = database
+        return database
+
+    def _can_compile(self, i: int) -> bool:
+        try:
+            database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            database.compile(
+                expressions=[self.pairs[i][0].pattern.encode()],
+                ids=[i],
+                elements=1,
+                flags=[self._get_flags(i)],
+            )
+        except hyperscan.error:
+            return False
+        return True
+
+    def candidates(self, court_str: str) -> list[int]:
+        """Find the regexes that might match a string.
+
+        :param court_str: The court string.
+        :return: The positions of the regexes in the table, in order.
+        """
+        found = list(self.unsupported)
+
+        def on_match(i, start, end, flags, context):
+            found.append(i)
+
+        if self.database is not None:
+            self.database.scan(
+                court_str.encode(), match_event_handler=on_match
+            )
+        return sorted(found)
+
+    def _find_matches(self, court_str: str) -> tuple[str, ...]:
+        return tuple(
+            self.pairs[i][1]
+            for i in self.candidates(court_str)
+            if self.pairs[i][0].search(court_str)
+        )
+
+    def match_all(self, court_str: str) -> list[str]:
+        """Find the court IDs of all the regexes of the table that match a
+        string.
+
+        :param court_str: The court string.
+        :return: The court IDs, in the order of the table.
+        """
+        return list(self._match_all(court_str))
+
+    def cache_clear(self) -> None:
+        """Forget the matches of the strings matched so far.
+
+        :return: None
+        """
+        self._match_all.cache_clear()
+
+    def match(self, court_str: str) -> str | None:
+        """Find the court ID of the first regex of the table that matches a
+        string.
+
+        :param court_str: The court string.
+        :return: The court ID, or None if no regex matches.
+        """
+        matches = self._match_all(court_str)
+        return matches[0] if matches else None
+
+
+def match_linearly(
+    pairs: Sequence[tuple[re.Pattern, str]], court_str: str
+) -> list[str]:
+    """Find the court IDs of all the regexes of a table that match a string,
+    trying the regexes one at a time. This is what CourtMatcher speeds up,
+    and is kept to check and benchmark it against.
+
+    :param pairs: The table of (regex, court ID) pairs.
+    :param court_str: The court string.
+    :return: The court IDs, in the order of the table.
+    """
+    return [value for regex, value in pairs if re.search(regex, court_str)]
+
+
+@cache
+def get_court_matcher(*tables: str) -> CourtMatcher:
+    """Get the matcher of some tables of COURT_PAIRS, compiling it the first
+    time.
+
+    :param tables: The names of the tables, in the order they're tried.
+    :return: The matcher for the pairs of the tables.
+    """
+    return CourtMatcher(
+        [pair for table in tables for pair in COURT_PAIRS[table]]
+    )
@@ -12,7 +12,7 @@ from juriscraper.lib.string_utils import (
 )
 from lxml import etree
 
-from cl.corpus_importer.court_regexes import state_pairs
+from cl.corpus_importer.court_regexes import get_court_matcher
 from cl.lib.crypto import sha1_of_file
 from cl.people_db.lookup_utils import extract_judge_last_name
 
@@ -378,7 +378,8 @@ def format_case_name(n):
 
 
 def get_state_court_object(raw_court, file_path):
-    """Get the court object from a string. Searches through `state_pairs`.
+    """Get the court object from a string. Searches through `state_pairs`,
+    with the matcher compiled from them.
 
     :param raw_court: A raw court string, parsed from an XML file.
     :param fallback: If fail to find one, will apply the regexes associated to
@@ -392,9 +393,9 @@ def get_state_court_object(raw_court, file_path):
 
     raw_court = raw_court.strip(".")
 
-    for regex, value in state_pairs:
-        if re.search(regex, raw_court):
-            return value
+    matcher = get_court_matcher("state")
+    if court_id := matcher.match(raw_court):
+        return court_id
 
     # this messes up for, e.g. 'St. Louis', and 'U.S. Circuit Court, but works
     # for all others
@@ -402,9 +403,8 @@ def get_state_court_object(raw_court, file_path):
         j = raw_court.find(".")
         r = raw_court[:j]
 
-        for regex, value in state_pairs:
-            if re.search(regex, r):
-                return value
+        if court_id := matcher.match(r):
+            return court_id
 
     # we need the comma to successfully match Superior Courts, the name of which
     # comes after the comma
@@ -412,9 +412,8 @@ def get_state_court_object(raw_court, file_path):
         j = raw_court.find(",")
         r = raw_court[:j]
 
-        for regex, value in state_pairs:
-            if re.search(regex, r):
-                return value
+        if court_id := matcher.match(r):
+            return court_id
     # Reduce to: /data/.../alabama/court_opinions'
     root_folder = file_path.split("/documents")[0]
     # Get the last two dirs off the end, leaving: 'alabama/court_opinions'
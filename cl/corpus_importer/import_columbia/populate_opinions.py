@@ -1,26 +1,39 @@
 import calendar
 import re
 import string
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
 from datetime import date
 
 from asgiref.sync import async_to_sync
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
 from eyecite.find import get_citations
-from eyecite.tokenizers import HyperscanTokenizer
+from eyecite.models import FullCaseCitation
 from eyecite.utils import clean_text
 
+from cl.citations.tokenizers import get_hyperscan_tokenizer
+from cl.corpus_importer.utils import StageTimer, make_citation_params
+from cl.custom_filters.templatetags.text_filters import best_case_name
+from cl.lib.model_helpers import make_docket_number_core
 from cl.lib.scorched_utils import ExtraSolrInterface
 from cl.lib.solr_core_admin import get_term_frequency
-from cl.search.models import SOURCES, Docket, Opinion, OpinionCluster
-
-from ...people_db.lookup_utils import (
-    lookup_judge_by_last_name,
-    lookup_judges_by_last_name_list,
+from cl.lib.string_utils import trunc
+from cl.people_db.models import Person
+from cl.search.models import (
+    SOURCES,
+    Citation,
+    Docket,
+    Opinion,
+    OpinionCluster,
 )
+
+from ...people_db.roster import aget_court_roster, aget_court_rosters
 from .convert_columbia_html import convert_columbia_html
 
-HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
 
 # only make a solr connection once
 SOLR_CONN = ExtraSolrInterface(settings.SOLR_OPINION_URL, mode="r")
@@ -231,13 +244,26 @@ OPINION_TYPE_MAPPING = {
 }
 
 
-def make_and_save(
-    item, skipdupes=False, min_dates=None, start_dates=None, testing=True
-):
-    """Associates case data from `parse_opinions` with objects. Saves these
-    objects.
+@dataclass
+class ColumbiaCase:
+    """The unsaved objects of a case parsed from a Columbia XML file."""
+
+    docket: Docket
+    cluster: OpinionCluster
+    citations: list[Citation]
+    panel: list[Person]
+    opinions: list[tuple[Opinion, list[Person]]]
+
+
+def make_objects(item, min_dates=None, start_dates=None):
+    """Associates case data from `parse_opinions` with unsaved objects.
+
+    Judges are looked up in the roster of the case's court, which is loaded
+    the first time a case of the court is seen.
 
     min_date: if not none, will skip cases after min_date
+
+    :return: A ColumbiaCase, or None if the case is skipped.
     """
     date_filed = date_argued = date_reargued = date_reargument_denied = (
         date_cert_granted
@@ -310,7 +336,7 @@ def make_and_save(
                     min_dates[item["court_id"]],
                     " -- skipping.",
                 )
-                return
+                return None
     if start_dates is not None:
         if start_dates.get(item["court_id"]) is not None:
             if main_date <= start_dates[item["court_id"]]:
@@ -320,7 +346,7 @@ def make_and_save(
                     start_dates[item["court_id"]],
                     " -- skipping.",
                 )
-                return
+                return None
 
     docket = Docket(
         source=Docket.COLUMBIA,
@@ -341,7 +367,7 @@ def make_and_save(
     for c in item["citations"]:
         found = get_citations(
             clean_text(c, ["html", "inline_whitespace"]),
-            tokenizer=HYPERSCAN_TOKENIZER,
+            tokenizer=get_hyperscan_tokenizer(),
         )
         if not found:
             # if the docket number --is-- citation string, we're likely dealing
@@ -365,7 +391,7 @@ def make_and_save(
             for trivial in TRIVIAL_CITE_WORDS:
                 non_trivial = non_trivial.replace(trivial, "")
             num_letters = sum(
-                non_trivial.count(letter) for letter in string.lowercase
+                non_trivial.count(letter) for letter in string.ascii_lowercase
             )
             if num_letters < 3:
                 continue
@@ -381,7 +407,12 @@ def make_and_save(
                 % (c, item["court_id"], item["docket"])
             )
         else:
-            found_citations.extend(found.to_model())
+            found_citations.extend(
+                Citation(**make_citation_params(citation))
+                for citation in found
+                if isinstance(citation, FullCaseCitation)
+                and citation.groups.get("volume", "").isdigit()
+            )
 
     cluster = OpinionCluster(
         judges=item.get("judges", "") or "",
@@ -396,18 +427,18 @@ def make_and_save(
         attorneys=item["attorneys"] or "",
         posture=item["posture"] or "",
     )
-    panel = async_to_sync(lookup_judges_by_last_name_list)(
-        item["panel"], item["court_id"], panel_date
-    )
+    roster = async_to_sync(aget_court_roster)(item["court_id"])
+    panel = roster.lookup_last_names(item["panel"], panel_date)
 
     opinions = []
     for i, opinion_info in enumerate(item["opinions"]):
         if opinion_info["author"] is None:
             author = None
         else:
-            author = async_to_sync(lookup_judge_by_last_name)(
-                opinion_info["author"], item["court_id"], panel_date
+            authors = roster.lookup_last_names(
+                [opinion_info["author"]], panel_date
             )
+            author = authors[0] if authors else None
 
         converted_text = convert_columbia_html(opinion_info["opinion"])
         opinion_type = OPINION_TYPE_MAPPING[opinion_info["type"]]
@@ -425,57 +456,220 @@ def make_and_save(
             # reading this, you'll need to update this code.
             local_path=opinion_info["local_path"],
         )
-        joined_by = async_to_sync(lookup_judges_by_last_name_list)(
-            item["joining"], item["court_id"], panel_date
-        )
+        joined_by = roster.lookup_last_names(item["joining"], panel_date)
         opinions.append((opinion, joined_by))
 
+    return ColumbiaCase(docket, cluster, found_citations, panel, opinions)
+
+
+def make_and_save(
+    item, skipdupes=False, min_dates=None, start_dates=None, testing=True
+):
+    """Associates case data from `parse_opinions` with objects. Saves these
+    objects.
+
+    min_date: if not none, will skip cases after min_date
+    """
+    case = make_objects(item, min_dates, start_dates)
+    if case is None:
+        return
+
     if min_dates is None:
         # check to see if this is a duplicate
-        dups = find_dups(docket, cluster)
+        dups = find_dups(case.docket, case.citations)
         if dups:
             if skipdupes:
                 print("Duplicate. skipping.")
+                return
             else:
                 raise Exception(f"Found {len(dups)} duplicate(s).")
 
     # save all the objects
     if not testing:
+        save_case(case)
+
+
+def save_case(case):
+    """Saves the objects of a case one at a time.
+
+    :param case: A ColumbiaCase.
+    """
+    docket, cluster = case.docket, case.cluster
+    try:
+        docket.save()
+        cluster.docket = docket
+        cluster.save(index=False)
+        for citation in case.citations:
+            citation.cluster = cluster
+            citation.save()
+        for member in case.panel:
+            cluster.panel.add(member)
+        for opinion, joined_by in case.opinions:
+            opinion.cluster = cluster
+            opinion.save(index=False)
+            for joiner in joined_by:
+                opinion.joined_by.add(joiner)
+        if settings.DEBUG:
+            domain = "http://127.0.0.1:8000"
+        else:
+            domain = "https://www.courtlistener.com"
+        print(f"Created item at: {domain}{cluster.get_absolute_url()}")
+    except:
+        # if anything goes wrong, try to delete everything
         try:
-            docket.save()
-            cluster.docket = docket
-            cluster.save(index=False)
-            for citation in found_citations:
-                citation.cluster = cluster
-                citation.save()
-            for member in panel:
-                cluster.panel.add(member)
-            for opinion, joined_by in opinions:
-                opinion.cluster = cluster
-                opinion.save(index=False)
-                for joiner in joined_by:
-                    opinion.joined_by.add(joiner)
-            if settings.DEBUG:
-                domain = "http://127.0.0.1:8000"
-            else:
-                domain = "https://www.courtlistener.com"
-            print(f"Created item at: {domain}{cluster.get_absolute_url()}")
+            docket.delete()
         except:
-            # if anything goes wrong, try to delete everything
+            pass
+        raise
+
+
+def save_cases_in_bulk(cases):
+    """Saves the objects of many cases in one transaction, with one insert
+    per table.
+
+    bulk_create doesn't call save(), so the slugs the models would set are
+    set here, and nothing is indexed.
+
+    :param cases: A list of ColumbiaCase.
+    :return: The IDs of the new clusters, to index along with their
+    opinions.
+    """
+    with transaction.atomic():
+        for case in cases:
+            docket = case.docket
+            docket.slug = slugify(trunc(best_case_name(docket), 75))
+            if docket.docket_number:
+                docket.docket_number_core = make_docket_number_core(
+                    docket.docket_number
+                )
+        Docket.objects.bulk_create([case.docket for case in cases])
+
+        for case in cases:
+            cluster = case.cluster
+            cluster.docket = case.docket
+            cluster.slug = slugify(trunc(best_case_name(cluster), 75))
+        OpinionCluster.objects.bulk_create([case.cluster for case in cases])
+
+        citations, opinions, panel = [], [], []
+        for case in cases:
+            # A citation can be in a file more than once.
+            unique_citations = {
+                (c.volume, c.reporter, c.page): c for c in case.citations
+            }
+            for citation in unique_citations.values():
+                citation.cluster = case.cluster
+                citations.append(citation)
+            panel.extend(
+                OpinionCluster.panel.through(
+                    opinioncluster_id=case.cluster.pk, person_id=member.pk
+                )
+                for member in dict.fromkeys(case.panel)
+            )
+            for opinion, _ in case.opinions:
+                opinion.cluster = case.cluster
+                opinion.clean()
+                opinions.append(opinion)
+        Citation.objects.bulk_create(citations)
+        Opinion.objects.bulk_create(opinions)
+        OpinionCluster.panel.through.objects.bulk_create(panel)
+        Opinion.joined_by.through.objects.bulk_create(
+            [
+                Opinion.joined_by.through(
+                    opinion_id=opinion.pk, person_id=joiner.pk
+                )
+                for case in cases
+                for opinion, joined_by in case.opinions
+                for joiner in dict.fromkeys(joined_by)
+            ]
+        )
+    return [case.cluster.pk for case in cases]
+
+
+def make_and_save_in_bulk(
+    parsed,
+    skipdupes=False,
+    min_dates=None,
+    start_dates=None,
+    testing=True,
+    timer=None,
+):
+    """Like make_and_save, for a batch of parsed files.
+
+    The judge rosters of the batch's courts are loaded together, duplicates
+    are looked up with a single query, and the objects of the whole batch
+    are saved with one insert per table. If that fails, the cases are saved
+    one at a time, so only the ones at fault are lost.
+
+    :param parsed: A list of (path, item) tuples, where items are from
+    `parse_opinions`.
+    :param timer: A StageTimer to time the stages with.
+    :return: The IDs of the new clusters that weren't indexed when they were
+    saved, and a list of (path, exception) tuples for the files that failed.
+    """
+    timer = timer or StageTimer()
+    failures = []
+    with timer.stage("judges"):
+        async_to_sync(aget_court_rosters)(
+            {item["court_id"] for _, item in parsed}
+        )
+
+    cases = []
+    with timer.stage("build"):
+        for path, item in parsed:
             try:
-                docket.delete()
-            except:
-                pass
-            raise
+                case = make_objects(item, min_dates, start_dates)
+            except Exception as e:
+                failures.append((path, e))
+                continue
+            if case is not None:
+                cases.append((path, item, case))
+
+    if min_dates is None:
+        with timer.stage("dedupe"):
+            dups = find_dups_in_bulk([case for _, _, case in cases])
+        unique_cases = []
+        for (path, item, case), case_dups in zip(cases, dups):
+            if not case_dups:
+                unique_cases.append((path, item, case))
+            elif skipdupes:
+                print(f"Duplicate. skipping {path}.")
+            else:
+                failures.append(
+                    (path, Exception(f"Found {len(case_dups)} duplicate(s)."))
+                )
+        cases = unique_cases
 
+    if testing:
+        return [], failures
+
+    with timer.stage("save"):
+        try:
+            return (
+                save_cases_in_bulk([case for _, _, case in cases]),
+                failures,
+            )
+        except (DatabaseError, ValidationError):
+            pass
+        # The objects that were inserted before the failure have IDs, so
+        # they're made again. Saving them one at a time indexes them, through
+        # the signal processor.
+        for path, item, _ in cases:
+            try:
+                case = make_objects(item, min_dates, start_dates)
+                with transaction.atomic():
+                    save_case(case)
+            except Exception as e:
+                failures.append((path, e))
+    return [], failures
 
-def find_dups(docket, cluster):
+
+def find_dups(docket, citations):
     """Finds the duplicate cases associated to a collection of objects.
 
     :param docket: A `Docket` instance.
-    :param cluster: An `OpinionCluster` instance.
+    :param citations: The `Citation` instances of the case.
     """
-    if not cluster.citations.exists():
+    if not citations:
         # if there aren't any citations, assume
         # for now that there's no duplicate
         return []
@@ -483,8 +677,7 @@ def find_dups(docket, cluster):
     params = {
         "fq": [
             f"court_id:{docket.court_id}",
-            "citation:(%s)"
-            % " OR ".join(f'"{c}"~5' for c in cluster.citations.all() if c),
+            "citation:(%s)" % " OR ".join(f'"{c}"~5' for c in citations if c),
         ],
         "rows": 100,
         "caller": "corpus_importer.import_columbia.populate_opinions",
@@ -513,6 +706,60 @@ def find_dups(docket, cluster):
     return []
 
 
+def find_dups_in_bulk(cases):
+    """Finds the duplicates of a batch of cases with a single query, rather
+    than a search per case.
+
+    The duplicates of a case are the clusters of its court with one of its
+    citations. Like in `find_dups`, if there's more than one, they're
+    narrowed down to the ones whose case names have the same important
+    words, if any do.
+
+    :param cases: A list of ColumbiaCase.
+    :return: A list with the IDs of the duplicate clusters of each case.
+    """
+    keys = {
+        (case.docket.court_id, int(c.volume), c.reporter, c.page)
+        for case in cases
+        for c in case.citations
+    }
+    found = defaultdict(dict)
+    if keys:
+        q = Q()
+        for _, volume, reporter, page in keys:
+            q |= Q(volume=volume, reporter=reporter, page=page)
+        rows = Citation.objects.filter(
+            q, cluster__docket__court_id__in={key[0] for key in keys}
+        ).values_list(
+            "cluster__docket__court_id",
+            "volume",
+            "reporter",
+            "page",
+            "cluster_id",
+            "cluster__case_name",
+        )
+        for *key, cluster_id, case_name in rows:
+            found[tuple(key)][cluster_id] = case_name
+
+    dups = []
+    for case in cases:
+        clusters = {}
+        for c in case.citations:
+            key = (case.docket.court_id, int(c.volume), c.reporter, c.page)
+            clusters.update(found.get(key, {}))
+        if len(clusters) > 1:
+            # narrow down the cases that match citations
+            base_words = get_case_name_words(case.docket.case_name)
+            remaining = {
+                pk: case_name
+                for pk, case_name in clusters.items()
+                if case_name and get_case_name_words(case_name) == base_words
+            }
+            clusters = remaining or clusters
+        dups.append(sorted(clusters))
+    return dups
+
+
 def get_case_name_words(case_name):
     """Gets all the important words in a case name. Returns them as a set."""
     case_name = case_name.lower()
@@ -8,18 +8,17 @@ from bs4 import BeautifulSoup as bs4
 from django.db import transaction
 from eyecite.find import get_citations
 from eyecite.models import CitationBase as FoundCitation
-from eyecite.tokenizers import HyperscanTokenizer
 from eyecite.utils import clean_text
 from juriscraper.lib.string_utils import CaseNameTweaker, harmonize
 from reporters_db import REPORTERS
 
+from cl.citations.tokenizers import get_hyperscan_tokenizer
 from cl.citations.utils import map_reporter_db_cite_type
 from cl.lib.command_utils import VerboseCommand, logger
 from cl.lib.string_utils import trunc
 from cl.search.models import SOURCES, Citation, Docket, Opinion, OpinionCluster
 from cl.search.tasks import add_items_to_solr
 
-HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
 
 cnt = CaseNameTweaker()
 
@@ -37,7 +36,7 @@ def find_cites(case_data: Dict[str, str]) -> List[FoundCitation]:
     for cite in cites:
         fc = get_citations(
             clean_text(cite, ["html", "inline_whitespace"]),
-            tokenizer=HYPERSCAN_TOKENIZER,
+            tokenizer=get_hyperscan_tokenizer(),
         )
         if len(fc) > 0:
             found_citations.append(fc[0])
@@ -0,0 +1,114 @@
+import time
+
+from cl.corpus_importer.court_regexes import (
+    COURT_PAIRS,
+    get_court_matcher,
+    match_linearly,
+)
+from cl.lib.command_utils import VerboseCommand, logger
+from cl.search.models import Court
+
+
+def get_court_strings(input_file: str | None) -> list[str]:
+    """Get the court strings to benchmark with.
+
+    :param input_file: A file with a court string per line. If None, the
+    names of the courts in the DB are used.
+    :return: The court strings.
+    """
+    if input_file:
+        with open(input_file) as f:
+            return [line.strip() for line in f if line.strip()]
+    court_strings = []
+    for names in Court.objects.values_list(
+        "full_name", "short_name", "citation_string"
+    ):
+        court_strings.extend(name for name in names if name)
+    return court_strings
+
+
+def benchmark_table(
+    tables: list[str], court_strings: list[str], repeat: int
+) -> None:
+    """Time matching court strings against some tables one regex at a time
+    and with the compiled matcher, and check that they agree.
+
+    :param tables: The names of the tables of COURT_PAIRS.
+    :param court_strings: The court strings.
+    :param repeat: How many times each string is matched, to show the effect
+    of the matcher's cache.
+    :return: None
+    """
+    start = time.perf_counter()
+    matcher = get_court_matcher(*tables)
+    compiled_in = time.perf_counter() - start
+    strings = court_strings * repeat
+
+    start = time.perf_counter()
+    expected = [match_linearly(matcher.pairs, s) for s in strings]
+    linear_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for s in strings:
+        matcher.candidates(s)
+    scan_time = time.perf_counter() - start
+
+    matcher.cache_clear()
+    start = time.perf_counter()
+    got = [matcher.match_all(s) for s in strings]
+    cached_time = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(expected, got) if a != b)
+    logger.info(
+        "%s: %s regexes, %s strings, compiled in %.2fs (%s unsupported). "
+        "One at a time: %.3fs. Compiled scan: %.3fs. Compiled and cached: "
+        "%.3fs (%.0fx). Mismatches: %s",
+        "+".join(tables),
+        len(matcher.pairs),
+        len(strings),
+        compiled_in,
+        len(matcher.unsupported),
+        linear_time,
+        scan_time,
+        cached_time,
+        linear_time / max(cached_time, 1e-9),
+        mismatches,
+    )
+
+
+class Command(VerboseCommand):
+    help = (
+        "Benchmark matching court strings against the court regexes one at "
+        "a time versus with the compiled court matcher, and check that both "
+        "find the same courts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--input-file",
+            type=str,
+            help="A file with a court string per line. Defaults to the names "
+            "of the courts in the DB.",
+        )
+        parser.add_argument(
+            "--tables",
+            type=str,
+            nargs="*",
+            choices=list(COURT_PAIRS),
+            default=list(COURT_PAIRS),
+            help="The tables of regexes to benchmark, each on its own.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="How many times to match each string.",
+        )
+
+    def handle(self, *args, **options):
+        super().handle(*args, **options)
+        court_strings = get_court_strings(options["input_file"])
+        logger.info("Benchmarking with %s court strings", len(court_strings))
+        for table in options["tables"]:
+            benchmark_table([table], court_strings, options["repeat"])
+        benchmark_table(options["tables"], court_strings, options["repeat"])
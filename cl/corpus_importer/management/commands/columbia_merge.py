@@ -20,13 +20,16 @@ manage.py columbia_merge --debug --csv-file /opt/courtlistener/cl/assets/media/t
 
 import os.path
 import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from difflib import SequenceMatcher
-from typing import Any, Optional
+from itertools import batched, islice
+from typing import Any, Iterable, Iterator, Optional
 
 import pandas as pd
 from bs4 import BeautifulSoup
-from django.db import transaction
-from django.db.models import Q
+from django.db import connections, transaction
+from django.db.models import Q, QuerySet
 from juriscraper.lib.string_utils import titlecase
 
 from cl.corpus_importer.import_columbia.columbia_utils import (
@@ -46,9 +49,11 @@ from cl.corpus_importer.utils import (
     JudgeException,
     OpinionMatchingException,
     OpinionTypeException,
+    StageTimer,
     add_citations_to_cluster,
     clean_docket_number,
     match_opinion_lists,
+    match_opinion_lists_in_bulk,
     merge_case_names,
     merge_docket_numbers,
     merge_judges,
@@ -99,11 +104,39 @@ def get_cl_opinion_content(cluster_id: int) -> list[dict[Any, Any]]:
     :param cluster_id: Cluster ID for a set of opinions
     :return: list with opinion content from cl
     """
+    return clean_cl_opinions(Opinion.objects.filter(cluster_id=cluster_id))
+
+
+def get_cl_opinion_contents_in_bulk(
+    cluster_ids: Iterable[int],
+) -> dict[int, list[dict[Any, Any]]]:
+    """Get the opinions content for many clusters in a single query
+
+    :param cluster_ids: The IDs of the clusters
+    :return: A dict mapping cluster IDs to their opinion content from cl, as
+    get_cl_opinion_content returns it
+    """
+    opinions_by_cluster = defaultdict(list)
+    for op in Opinion.objects.filter(cluster_id__in=cluster_ids).order_by(
+        "pk"
+    ):
+        opinions_by_cluster[op.cluster_id].append(op)
+    return {
+        cluster_id: clean_cl_opinions(opinions)
+        for cluster_id, opinions in opinions_by_cluster.items()
+    }
+
+
+def clean_cl_opinions(opinions: Iterable[Opinion]) -> list[dict[Any, Any]]:
+    """Clean the content of the opinions of a cluster
+
+    :param opinions: The opinions of the cluster
+    :return: list with opinion content from cl
+    """
     cl_cleaned_opinions = []
-    opinions_from_cluster = Opinion.objects.filter(cluster_id=cluster_id)
     is_harvard = False
 
-    for i, op in enumerate(opinions_from_cluster):
+    for i, op in enumerate(opinions):
         content = ""
         if len(op.xml_harvard) > 1:
             content = op.xml_harvard
@@ -191,26 +224,27 @@ def update_matching_opinions(
 def map_and_merge_opinions(
     cluster_id: int,
     columbia_opinions: list[dict],
+    cl_cleaned_opinions: list[dict] | None = None,
+    matches: dict[int, int] | None = None,
 ) -> None:
     """Map and merge opinion data
 
     :param cluster_id: Cluster id
     :param columbia_opinions: list of columbia opinions from file
+    :param cl_cleaned_opinions: The opinion content from cl, if it was
+    already fetched
+    :param matches: The matches of the opinions, if they were already found
     :return: None
     """
 
-    cl_cleaned_opinions = get_cl_opinion_content(cluster_id)
+    if cl_cleaned_opinions is None:
+        cl_cleaned_opinions = get_cl_opinion_content(cluster_id)
 
     if len(columbia_opinions) == len(cl_cleaned_opinions):
-        # We need that both list to be cleaned, so we can have a more
-        # accurate match
-        matches = match_opinion_lists(
-            [
-                clean_opinion_content(op["opinion"], is_harvard=False)
-                for op in columbia_opinions
-            ],
-            [op.get("opinion") for op in cl_cleaned_opinions],
-        )
+        if matches is None:
+            matches = match_opinion_lists(
+                *make_opinion_lists(columbia_opinions, cl_cleaned_opinions)
+            )
         if len(matches) == len(columbia_opinions):
             update_matching_opinions(
                 matches, cl_cleaned_opinions, columbia_opinions
@@ -254,6 +288,27 @@ def map_and_merge_opinions(
         )
 
 
+def make_opinion_lists(
+    columbia_opinions: list[dict], cl_cleaned_opinions: list[dict]
+) -> tuple[list[str], list[str]]:
+    """Make the lists of opinion content to match
+
+    :param columbia_opinions: list of columbia opinions from file
+    :param cl_cleaned_opinions: list of cl opinions
+    :return: The cleaned content of the columbia opinions and of the cl
+    opinions
+    """
+    # We need that both list to be cleaned, so we can have a more
+    # accurate match
+    return (
+        [
+            clean_opinion_content(op["opinion"], is_harvard=False)
+            for op in columbia_opinions
+        ],
+        [op.get("opinion") for op in cl_cleaned_opinions],
+    )
+
+
 def merge_date_filed(
     cluster: OpinionCluster, columbia_data: dict
 ) -> dict[str, Any]:
@@ -379,38 +434,13 @@ def merge_docket_data(docket_data: dict, cluster: OpinionCluster) -> None:
         Docket.objects.filter(id=cluster.docket_id).update(**data_to_update)
 
 
-def process_cluster(
-    cluster_id: int,
-    filepath: str,
-    skip_judge_merger: bool = False,
-) -> None:
-    """Merge specified cluster id
+def parse_columbia_file(filepath: str) -> dict[str, Any]:
+    """Parse the data to merge from a columbia xml file
 
-    :param cluster_id: Cluster object id to merge
     :param filepath: specified path to xml file
-    :param skip_judge_merger: skip judge merger
-    :return: None
+    :return: dict with the columbia data
     """
-
-    cluster = (
-        OpinionCluster.objects.filter(
-            id=cluster_id, docket__source__in=Docket.NON_COLUMBIA_SOURCES()
-        )
-        .exclude(source__in=VALID_MERGED_SOURCES)
-        .first()
-    )
-    if not cluster:
-        logger.info(f"Cluster id: {cluster_id} already merged")
-        return
-
-    logger.info(msg=f"Merging {cluster_id} at {filepath}")
-    try:
-        soup = read_xml_to_soup(filepath)
-    except UnicodeDecodeError:
-        logger.warning(
-            f"UnicodeDecodeError: {filepath}, Cluster: {cluster_id}"
-        )
-        return
+    soup = read_xml_to_soup(filepath)
 
     outer_opinion = soup.find("opinion")
     extracted_opinions = extract_columbia_opinions(outer_opinion)
@@ -446,7 +476,84 @@ def process_cluster(
 
     # Add date data into columbia dict
     columbia_data.update(find_dates_in_xml(soup))
+    return columbia_data
+
+
+def read_columbia_file(cluster: tuple[int, str]) -> dict[str, Any] | None:
+    """Parse a columbia xml file in a pool process
+
+    :param cluster: The ID of the cluster and the path to its xml file
+    :return: dict with the columbia data, or None if it couldn't be decoded
+    """
+    cluster_id, filepath = cluster
+    try:
+        return parse_columbia_file(filepath)
+    except UnicodeDecodeError:
+        logger.warning(
+            f"UnicodeDecodeError: {filepath}, Cluster: {cluster_id}"
+        )
+        return None
+
+
+def get_clusters_to_merge(cluster_ids: Iterable[int]) -> QuerySet:
+    """Get the clusters that haven't been merged yet
 
+    :param cluster_ids: The IDs of the clusters
+    :return: A queryset of the clusters
+    """
+    return OpinionCluster.objects.filter(
+        id__in=cluster_ids, docket__source__in=Docket.NON_COLUMBIA_SOURCES()
+    ).exclude(source__in=VALID_MERGED_SOURCES)
+
+
+def process_cluster(
+    cluster_id: int,
+    filepath: str,
+    skip_judge_merger: bool = False,
+) -> None:
+    """Merge specified cluster id
+
+    :param cluster_id: Cluster object id to merge
+    :param filepath: specified path to xml file
+    :param skip_judge_merger: skip judge merger
+    :return: None
+    """
+
+    cluster = get_clusters_to_merge([cluster_id]).first()
+    if not cluster:
+        logger.info(f"Cluster id: {cluster_id} already merged")
+        return
+
+    logger.info(msg=f"Merging {cluster_id} at {filepath}")
+    try:
+        columbia_data = parse_columbia_file(filepath)
+    except UnicodeDecodeError:
+        logger.warning(
+            f"UnicodeDecodeError: {filepath}, Cluster: {cluster_id}"
+        )
+        return
+
+    merge_columbia_data(cluster, columbia_data, skip_judge_merger)
+
+
+def merge_columbia_data(
+    cluster: OpinionCluster,
+    columbia_data: dict[str, Any],
+    skip_judge_merger: bool = False,
+    cl_cleaned_opinions: list[dict] | None = None,
+    matches: dict[int, int] | None = None,
+) -> None:
+    """Merge the data of a columbia file into a cluster
+
+    :param cluster: The cluster to merge into
+    :param columbia_data: dict with the columbia data
+    :param skip_judge_merger: skip judge merger
+    :param cl_cleaned_opinions: The opinion content from cl, if it was
+    already fetched
+    :param matches: The matches of the opinions, if they were already found
+    :return: None
+    """
+    cluster_id = cluster.pk
     # Extract all data related to docket
     docket_data = {
         k: v
@@ -464,7 +571,12 @@ def process_cluster(
 
     try:
         with transaction.atomic():
-            map_and_merge_opinions(cluster_id, columbia_data["opinions"])
+            map_and_merge_opinions(
+                cluster_id,
+                columbia_data["opinions"],
+                cl_cleaned_opinions,
+                matches,
+            )
 
             merged_data = {}
             for field in ["syllabus", "attorneys", "posture", "judges"]:
@@ -525,16 +637,16 @@ def process_cluster(
         logger.warning(msg=f"Judge exception for cluster id: {cluster_id}")
 
 
-def merge_columbia_into_cl(options) -> None:
-    """Merge columbia data into CL
+def columbia_file_generator(
+    csv_filepath: str, xml_dir: str, skip_until: int | None
+) -> Iterator[tuple[int, str]]:
+    """Generate the clusters to merge and the paths to their xml files
 
-    :param options: options passed from management command
-    :return: None
+    :param csv_filepath: Csv file with cluster ids and xml file paths
+    :param xml_dir: The absolute path to the directory with the xml files
+    :param skip_until: If set, skip the clusters before this one
+    :return: An iterator of (cluster_id, xml_path) tuples
     """
-    csv_filepath, xml_dir = options["csv_file"], options["xml_dir"]
-    skip_until, limit = options["skip_until"], options["limit"]
-    skip_judge_merger = options["skip_judge_merger"]
-    total_processed = 0
     start = False if skip_until else True
 
     logger.info(f"Loading csv file at {csv_filepath}")
@@ -557,16 +669,151 @@ def merge_columbia_into_cl(options) -> None:
             logger.warning(f"No file at: {xml_path}, Cluster: {cluster_id}")
             continue
 
+        yield cluster_id, xml_path
+
+
+def merge_columbia_batch(
+    clusters: list[tuple[int, str]],
+    columbia_data: list[dict[str, Any] | None],
+    skip_judge_merger: bool,
+    timer: StageTimer,
+) -> None:
+    """Merge a batch of clusters in one transaction
+
+    The clusters and their opinions are fetched with a query each for the
+    whole batch, and the opinions of the whole batch are matched at once.
+    Each cluster is merged in a savepoint of its own, so a cluster that fails
+    to merge doesn't roll back the rest of the batch.
+
+    :param clusters: The IDs of the clusters and the paths to their xml files
+    :param columbia_data: The columbia data of each cluster, or None if the
+    file couldn't be read
+    :param skip_judge_merger: skip judge merger
+    :param timer: The StageTimer of the merger
+    :return: None
+    """
+    with timer.stage("fetch"):
+        cluster_ids = [cluster_id for cluster_id, _ in clusters]
+        cl_clusters = get_clusters_to_merge(cluster_ids).in_bulk()
+        cl_opinions = get_cl_opinion_contents_in_bulk(cl_clusters)
+
+    with timer.stage("match"):
+        # Only opinions that match one to one need matching
+        to_match = [
+            (cluster_id, data)
+            for cluster_id, data in zip(cluster_ids, columbia_data)
+            if data
+            and cluster_id in cl_clusters
+            and len(data["opinions"]) == len(cl_opinions.get(cluster_id, []))
+        ]
+        matches = dict(
+            zip(
+                [cluster_id for cluster_id, _ in to_match],
+                match_opinion_lists_in_bulk(
+                    [
+                        make_opinion_lists(
+                            data["opinions"], cl_opinions[cluster_id]
+                        )
+                        for cluster_id, data in to_match
+                    ]
+                ),
+            )
+        )
+
+    with timer.stage("merge"), transaction.atomic():
+        for (cluster_id, filepath), data in zip(clusters, columbia_data):
+            if cluster_id not in cl_clusters:
+                logger.info(f"Cluster id: {cluster_id} already merged")
+                continue
+            if not data:
+                continue
+            logger.info(msg=f"Merging {cluster_id} at {filepath}")
+            merge_columbia_data(
+                cl_clusters[cluster_id],
+                data,
+                skip_judge_merger,
+                cl_opinions.get(cluster_id, []),
+                matches.get(cluster_id),
+            )
+
+
+def merge_columbia_in_batches(
+    clusters: Iterable[tuple[int, str]],
+    workers: int,
+    batch_size: int,
+    skip_judge_merger: bool,
+) -> None:
+    """Merge clusters in batches, parsing their xml files in a pool of
+    processes
+
+    The files of a batch are parsed in the pool while this process merges the
+    previous batch, so only one process writes to the DB. After every batch,
+    logs the clusters per second and the time spent in each stage.
+
+    :param clusters: The IDs of the clusters and the paths to their xml files
+    :param workers: The number of processes parsing files
+    :param batch_size: The number of clusters merged per transaction
+    :param skip_judge_merger: skip judge merger
+    :return: None
+    """
+    timer = StageTimer()
+    merged = 0
+    # Don't fork open DB connections.
+    connections.close_all()
+    with ProcessPoolExecutor(workers) as executor:
+        pending = None
+        for batch in batched(clusters, batch_size):
+            # map() submits the whole batch right away.
+            results = executor.map(
+                read_columbia_file,
+                batch,
+                chunksize=max(1, len(batch) // (workers * 4)),
+            )
+            if pending is not None:
+                merge_columbia_batch(*pending, skip_judge_merger, timer)
+                merged += len(pending[0])
+                logger.info(timer.report(merged, unit="clusters"))
+            with timer.stage("parse"):
+                pending = batch, list(results)
+        if pending is not None:
+            merge_columbia_batch(*pending, skip_judge_merger, timer)
+            merged += len(pending[0])
+    logger.info(f"Done. {timer.report(merged, unit='clusters')}")
+
+
+def merge_columbia_into_cl(options) -> None:
+    """Merge columbia data into CL
+
+    :param options: options passed from management command
+    :return: None
+    """
+    limit = options["limit"]
+    clusters = columbia_file_generator(
+        options["csv_file"], options["xml_dir"], options["skip_until"]
+    )
+    if limit:
+        clusters = islice(clusters, limit)
+
+    if options["batch_size"]:
+        merge_columbia_in_batches(
+            clusters,
+            options["workers"],
+            options["batch_size"],
+            options["skip_judge_merger"],
+        )
+        return
+
+    total_processed = 0
+    for cluster_id, xml_path in clusters:
         process_cluster(
             cluster_id=cluster_id,
             filepath=xml_path,
-            skip_judge_merger=skip_judge_merger,
+            skip_judge_merger=options["skip_judge_merger"],
         )
 
         total_processed += 1
-        if limit and total_processed >= limit:
-            logger.info(f"Finished {limit} imports")
-            return
+    if limit and total_processed >= limit:
+        logger.info(f"Finished {limit} imports")
 
 
 class Command(VerboseCommand):
@@ -608,5 +855,20 @@ class Command(VerboseCommand):
             help="Set flag to skip judge merger if the judges do not match",
         )
 
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=0,
+            help="If set, files are parsed in a pool of processes and "
+            "merged in batches of this size, one transaction per batch.",
+        )
+
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="With --batch-size, the number of processes parsing files.",
+        )
+
     def handle(self, *args, **options) -> None:
         merge_columbia_into_cl(options)
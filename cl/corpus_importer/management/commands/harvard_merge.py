@@ -1,11 +1,16 @@
 import itertools
 import json
 import logging
-from typing import Any, Dict, Optional, Tuple
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import batched
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 import requests
 from bs4 import BeautifulSoup
-from django.db import transaction
+from django.db import connections, transaction
 from juriscraper.lib.string_utils import titlecase
 
 from cl.corpus_importer.management.commands.harvard_opinions import (
@@ -20,15 +25,20 @@ from cl.corpus_importer.utils import (
     JudgeException,
     OpinionMatchingException,
     OpinionTypeException,
+    clear_ledger,
+    filter_done_in_ledger,
     match_opinion_lists,
     merge_case_names,
     merge_docket_numbers,
     merge_overlapping_data,
+    record_done_in_ledger,
 )
 from cl.lib.command_utils import VerboseCommand, logger
 from cl.people_db.lookup_utils import find_all_judges, find_just_name
 from cl.search.models import SOURCES, Docket, Opinion, OpinionCluster
 
+HARVARD_MERGE_LEDGER = "harvard_merge"
+
 
 class HarvardConversionUtil:
     types_mapping = {
@@ -336,20 +346,37 @@ def save_headmatter(harvard_data: Dict[str, Any]) -> dict[str, Any]:
     return {"headmatter": "".join(headmatter)}
 
 
+def read_cluster_json(cluster: tuple[int, str]) -> Dict[str, Any] | None:
+    """Read the Harvard json of a cluster without querying the DB, so the
+    parallel merger can run this in a pool of processes.
+
+    :param cluster: The ID of the cluster and the path to its json
+    :return: Harvard data as a json object or None
+    """
+    cluster_id, filepath = cluster
+    return read_json(
+        OpinionCluster(id=cluster_id, filepath_json_harvard=filepath)
+    )
+
+
 def merge_opinion_clusters(
     cluster_id: int,
     only_fastcase: bool = False,
     skip_judge_merger: bool = False,
+    harvard_data: Dict[str, Any] | None = None,
 ) -> None:
     """Merge opinion cluster, docket and opinion data from Harvard
 
     :param cluster_id: The cluster ID to merger
     :param only_fastcase: Only process fastcase data
     :param skip_judge_merger: skip judge merger
+    :param harvard_data: The Harvard json of the cluster, if it was already
+    read
     :return: None
     """
     opinion_cluster = OpinionCluster.objects.get(id=cluster_id)
-    harvard_data = read_json(opinion_cluster)
+    if harvard_data is None:
+        harvard_data = read_json(opinion_cluster)
     if not harvard_data:
         logger.warning(
             msg=f"No Harvard json for cluster: {opinion_cluster.id}"
@@ -666,6 +693,115 @@ def map_and_merge_opinions(
         )
 
 
+def merge_harvard_batch(
+    clusters: list[tuple[int, str]],
+    harvard_data: list[Dict[str, Any] | None],
+    only_fastcase: bool,
+    skip_judge_merger: bool,
+) -> None:
+    """Merge a batch of clusters in one transaction, and record them as done
+    in the ledger.
+
+    Each cluster is merged in a savepoint of its own, so a cluster that
+    fails to merge doesn't roll back the rest of the batch.
+
+    :param clusters: The IDs of the clusters and the paths to their json
+    :param harvard_data: The Harvard json of each cluster, or None if it
+    couldn't be read
+    :param only_fastcase: Only process fastcase data
+    :param skip_judge_merger: skip judge merger
+    :return: None
+    """
+    with transaction.atomic():
+        for (cluster_id, filepath), data in zip(clusters, harvard_data):
+            if not data:
+                logger.warning(
+                    msg=f"No Harvard json for cluster: {cluster_id}"
+                )
+                continue
+            logger.info(msg=f"Merging {cluster_id} at {filepath}")
+            merge_opinion_clusters(
+                cluster_id=cluster_id,
+                only_fastcase=only_fastcase,
+                skip_judge_merger=skip_judge_merger,
+                harvard_data=data,
+            )
+    record_done_in_ledger(
+        HARVARD_MERGE_LEDGER, [str(cluster_id) for cluster_id, _ in clusters]
+    )
+
+
+def merge_harvard_clusters_in_parallel(
+    clusters: Iterable[tuple[int, str]],
+    workers: int,
+    batch_size: int,
+    resume: bool,
+    only_fastcase: bool,
+    skip_judge_merger: bool,
+) -> None:
+    """Merge clusters in batches, reading their Harvard json in a pool of
+    processes.
+
+    The json of a batch is read in the pool while this process merges the
+    previous batch, so only one process writes to the DB. Merged batches are
+    recorded in the ledger, so an interrupted merger can be resumed.
+
+    :param clusters: The IDs of the clusters and the paths to their json
+    :param workers: The number of processes reading json
+    :param batch_size: The number of clusters merged per transaction
+    :param resume: Whether to skip the clusters done by the last merger
+    :param only_fastcase: Only process fastcase data
+    :param skip_judge_merger: skip judge merger
+    :return: None
+    """
+    if resume:
+        logger.info("Skipping the clusters done by the last merger")
+    else:
+        clear_ledger(HARVARD_MERGE_LEDGER)
+    merge_batch = partial(
+        merge_harvard_batch,
+        only_fastcase=only_fastcase,
+        skip_judge_merger=skip_judge_merger,
+    )
+
+    # Don't fork open DB connections.
+    connections.close_all()
+    start = time.monotonic()
+    merged = 0
+    with ProcessPoolExecutor(workers) as executor:
+        pending = None
+        for batch in batched(clusters, batch_size):
+            to_do = set(
+                filter_done_in_ledger(
+                    HARVARD_MERGE_LEDGER, [str(pk) for pk, _ in batch]
+                )
+            )
+            batch = [cluster for cluster in batch if str(cluster[0]) in to_do]
+            # map() submits the whole batch right away.
+            results = executor.map(
+                read_cluster_json,
+                batch,
+                chunksize=max(1, len(batch) // (workers * 4)),
+            )
+            if pending is not None:
+                merge_batch(*pending)
+                merged += len(pending[0])
+            pending = batch, list(results)
+            logger.info(
+                "Merged %s clusters (%.1f/s)",
+                merged,
+                merged / (time.monotonic() - start),
+            )
+        if pending is not None:
+            merge_batch(*pending)
+            merged += len(pending[0])
+    logger.info(
+        "Done. Merged %s clusters in %.0fs.",
+        merged,
+        time.monotonic() - start,
+    )
+
+
 class Command(VerboseCommand):
     help = "Merge harvard opinions into CL opinions"
 
@@ -703,6 +839,31 @@ class Command(VerboseCommand):
             default=10000,
             help="How many mergers to run at one time",
         )
+        parser.add_argument(
+            "--parallel",
+            action="store_true",
+            help="Read the json files in a pool of processes and merge the "
+            "clusters in batches. Use this for large mergers.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="With --parallel, the number of processes reading json.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="With --parallel, the number of clusters merged per "
+            "transaction.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="With --parallel, skip the clusters done by the last "
+            "merger.",
+        )
 
     def handle(self, *args, **options) -> None:
         if options["no_debug"]:
@@ -749,6 +910,17 @@ class Command(VerboseCommand):
                     f"Cluster ID: {options['cluster_id']} doesn't exist"
                 )
 
+        if options["parallel"]:
+            merge_harvard_clusters_in_parallel(
+                cluster_ids,
+                options["workers"],
+                options["batch_size"],
+                options["resume"],
+                options["fastcase"],
+                options["skip_judge_merger"],
+            )
+            return
+
         for cluster_id, filepath in cluster_ids:
             logger.info(msg=f"Merging {cluster_id} at {filepath}")
             merge_opinion_clusters(
@@ -4,26 +4,38 @@ import json
 import logging
 import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta
+from functools import partial
 from glob import glob
+from itertools import batched
 from typing import Any, Optional, TypedDict
 
 import requests
 from bs4 import BeautifulSoup
 from courts_db import find_court
 from django.conf import settings
-from django.db import transaction
+from django.db import connections, transaction
 from django.db.utils import OperationalError
 from eyecite.find import get_citations
 from eyecite.models import FullCaseCitation
-from eyecite.tokenizers import HyperscanTokenizer
 from juriscraper.lib.diff_tools import normalize_phrase
 from juriscraper.lib.string_utils import CaseNameTweaker, harmonize, titlecase
 
+from cl.citations.tokenizers import (
+    get_hyperscan_tokenizer,
+    prewarm_hyperscan_tokenizer,
+)
 from cl.corpus_importer.utils import (
     add_citations_to_cluster,
     clean_body_content,
+    clear_ledger,
+    filter_done_in_ledger,
     match_based_text,
+    pop_new_ids_from_ledger,
+    record_done_in_ledger,
 )
 from cl.lib.argparse_types import _argparse_volumes
 from cl.lib.command_utils import VerboseCommand, logger
@@ -34,10 +46,11 @@ from cl.scrapers.utils import update_or_create_docket
 from cl.search.models import SOURCES, Court, Docket, Opinion, OpinionCluster
 from cl.search.tasks import add_items_to_solr
 
-HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
 
 cnt = CaseNameTweaker()
 
+HARVARD_OPINIONS_LEDGER = "harvard_opinions"
+
 
 def validate_dt(date_str: str) -> tuple[Optional[date], bool]:
     """
@@ -233,6 +246,36 @@ class OptionsType(TypedDict):
     bankruptcy: bool
 
 
+@dataclass
+class HarvardOpinion:
+    """An opinion parsed from a Harvard case body."""
+
+    type: str
+    author_str: str
+    xml_harvard: str
+    per_curiam: bool
+
+
+@dataclass
+class HarvardCase:
+    """A case parsed from a Harvard JSON file, ready to be saved."""
+
+    file_path: str
+    data: dict[str, Any]
+    case_name: str
+    case_name_full: str
+    case_name_short: str
+    citation: FullCaseCitation
+    court_id: str
+    date_filed: date
+    is_approximate: bool
+    harvard_characters: str
+    judges: str
+    short_data: dict[str, str]
+    long_data: dict[str, str]
+    opinions: list[HarvardOpinion]
+
+
 def get_fix_list() -> list[str]:
     """Download the fix list for harvard data.
 
@@ -279,6 +322,152 @@ def read_json(file_path: str, ia_download_url: str) -> Optional[Any]:
     return data
 
 
+def get_ia_download_url(file_path: str) -> str:
+    """Get the URL of a Harvard JSON file on IA, for logging.
+
+    :param file_path: Filepath to JSON
+    :return: The URL of the file
+    """
+    return "/".join(
+        ["https://archive.org/download", file_path.split("/", 9)[-1]]
+    )
+
+
+def get_fix_identifier(file_path: str) -> str:
+    """Get the identifier of a Harvard JSON file in the fix list.
+
+    :param file_path: Filepath to JSON
+    :return: The identifier, e.g. "law.free.cap.a2d.1/12.123.json"
+    """
+    return "/".join(file_path.rsplit("/", 2)[1:])
+
+
+def prepare_harvard_case(
+    file_path: str,
+    needs_fixes: bool,
+    court_id: Optional[str],
+    location: Optional[str],
+    is_bankruptcy: bool,
+) -> Optional[HarvardCase]:
+    """Read a Harvard JSON file and parse the case in it.
+
+    This doesn't touch the DB, so the parallel import runs it in a pool of
+    processes.
+
+    :param file_path: Filepath to JSON
+    :param needs_fixes: Whether the file is in the fix list
+    :param court_id: The CL Court ID, if it was provided
+    :param location: The location of the court, if applicable
+    :param is_bankruptcy: Whether to use bankruptcy courts
+    :return: The parsed case, or None if it can't be imported
+    """
+    data = read_json(file_path, get_ia_download_url(file_path))
+    if not data:
+        return None
+
+    if needs_fixes:
+        logger.info(f"Fetching fixes and merging data at {file_path}")
+        data = merge_fixes(data, get_fix_identifier(file_path))
+
+    # Cleanup whitespace on citations
+    clean_cite = re.sub(r"\s+", " ", data["citations"][0]["cite"])
+    cites = get_citations(clean_cite, tokenizer=get_hyperscan_tokenizer())
+    cites = [cite for cite in cites if isinstance(cite, FullCaseCitation)]
+    if not cites:
+        logger.warning(f"No citation found for {clean_cite}")
+        return None
+
+    case_name = harmonize(data["name_abbreviation"])
+    case_name_short = cnt.make_case_name_short(case_name)
+    case_name_full = harmonize(data["name"])
+
+    # TODO: Generalize this to handle all court types somehow.
+    if not court_id:
+        # Sometimes the court string doesn't match just one court
+        # This is used to alleviate certain circumstances.
+        found_court = find_court(
+            data["court"]["name"],
+            bankruptcy=is_bankruptcy,
+            location=location,
+        )
+        if len(found_court) != 1:
+            logging.warning(
+                f"Court not found for {data['court']['name']} at {file_path}"
+            )
+            return None
+        court_id = found_court[0]
+
+    # Handle partial dates by adding -01 to YYYY-MM dates
+    date_filed, is_approximate = validate_dt(data["decision_date"])
+    if not date_filed:
+        logger.warning(
+            f"No date found for {data['decision_date']} at {file_path}"
+        )
+        return None
+    case_body = data["casebody"]["data"]
+    harvard_characters = clean_body_content(case_body, harvard_file=True)
+
+    if not harvard_characters:
+        # Unfortunately, some harvard cases have no opinions.
+        # See: https://cite.case.law/pdf/1305086/Vinson%20v.%20Cox,%2099%20Fla.%201373%20(1930).pdf
+        logger.warning(f"No opinion in Harvard XML at {file_path}")
+        return None
+
+    soup = BeautifulSoup(case_body, "lxml")
+
+    # Some documents contain images in the HTML
+    # Flag them for a later crawl by using the placeholder '[[Image]]'
+    judge_list = [
+        extract_judge_last_name(x.text)
+        for x in soup.find_all(
+            lambda tag: (tag.name == "judges" and tag.get("data-type") is None)
+            or tag.get("data-type") == "judges"
+        )
+    ]
+    author_list = [
+        extract_judge_last_name(x.text)
+        for x in soup.find_all(
+            lambda tag: (tag.name == "author" and tag.get("data-type") is None)
+            or tag.get("data-type") == "author"
+        )
+    ]
+    # Flatten and dedupe list of judges
+    judges = ", ".join(
+        sorted(set(itertools.chain.from_iterable(judge_list + author_list)))
+    )
+    judges = titlecase(judges)
+
+    short_fields = ["attorneys", "disposition", "otherdate", "seealso"]
+
+    long_fields = [
+        "syllabus",
+        "summary",
+        "history",
+        "headnotes",
+        "correction",
+    ]
+
+    short_data = parse_extra_fields(soup, short_fields, False)
+    long_data = parse_extra_fields(soup, long_fields, True)
+
+    return HarvardCase(
+        file_path=file_path,
+        data=data,
+        case_name=case_name,
+        case_name_full=case_name_full,
+        case_name_short=case_name_short,
+        citation=cites[0],
+        court_id=court_id,
+        date_filed=date_filed,
+        is_approximate=is_approximate,
+        harvard_characters=harvard_characters,
+        judges=judges,
+        short_data=short_data,
+        long_data=long_data,
+        opinions=parse_opinions(soup),
+    )
+
+
 def parse_harvard_opinions(options: OptionsType) -> None:
     """Parse Harvard Opinions
 
@@ -300,209 +489,239 @@ def parse_harvard_opinions(options: OptionsType) -> None:
     reporter = options["reporter"]
     volumes = options["volumes"]
     page = options["page"]
-    court_id = options["court_id"]
-    make_searchable = options["make_searchable"]
-    is_bankruptcy = options["bankruptcy"]
 
     if not reporter and volumes:
         logger.error("You provided volume(s) but no reporter. Exiting.")
         return
 
     filepaths = filepath_list(reporter, volumes, page)
-    fix_list = get_fix_list()
+    fix_list = set(get_fix_list())
+    court_ids = set(Court.objects.values_list("pk", flat=True))
 
     for file_path in filepaths:
         logger.info(f"Processing opinion at {file_path}")
 
-        ia_download_url = "/".join(
-            ["https://archive.org/download", file_path.split("/", 9)[-1]]
-        )
-
         oc = OpinionCluster.objects.filter(filepath_json_harvard=file_path)
         if len(oc) > 0:
             logger.info(
-                f"Skipping {oc[0].id} - already in system {ia_download_url}"
+                f"Skipping {oc[0].id} - already in system "
+                f"{get_ia_download_url(file_path)}"
             )
             continue
 
-        data = read_json(file_path, ia_download_url)
-        if not data:
-            continue
-
-        identifier = "/".join(file_path.rsplit("/", 2)[1:])
-        if identifier in fix_list:
-            logger.info(f"Fetching fixes and merging data at {file_path}")
-            data = merge_fixes(data, identifier)
-
-        # Cleanup whitespace on citations
-        clean_cite = re.sub(r"\s+", " ", data["citations"][0]["cite"])
-        cites = get_citations(clean_cite, tokenizer=HYPERSCAN_TOKENIZER)
-        cites = [cite for cite in cites if isinstance(cite, FullCaseCitation)]
-        if not cites:
-            logger.warning(f"No citation found for {clean_cite}")
+        case = prepare_harvard_case(
+            file_path,
+            get_fix_identifier(file_path) in fix_list,
+            options["court_id"],
+            options["location"],
+            options["bankruptcy"],
+        )
+        if case is None:
             continue
+        import_harvard_case(case, court_ids, options["make_searchable"])
 
-        case_name = harmonize(data["name_abbreviation"])
-        case_name_short = cnt.make_case_name_short(case_name)
-        case_name_full = harmonize(data["name"])
 
-        citation = cites[0]
+def import_harvard_case(
+    case: HarvardCase, court_ids: set[str], make_searchable: bool
+) -> list[int]:
+    """Add a parsed Harvard case to the DB, or add its citations to the case
+    it was previously imported as.
 
-        # TODO: Generalize this to handle all court types somehow.
-        if not options["court_id"]:
-            # Sometimes the court string doesn't match just one court
-            # This is used to alleviate certain circumstances.
-            found_court = find_court(
-                data["court"]["name"],
-                bankruptcy=is_bankruptcy,
-                location=options["location"],
+    :param case: The parsed case
+    :param court_ids: The IDs of the courts in CL
+    :param make_searchable: Should we add this case to SOLR
+    :return: The IDs of the new opinions
+    """
+    if case.court_id not in court_ids:
+        logger.warning(f"Court not found in Courtlistener: {case.court_id}")
+        return []
+
+    previously_imported_case = find_previously_imported_cases(
+        case.data,
+        case.court_id,
+        case.date_filed,
+        case.harvard_characters,
+        case.case_name_full,
+        case.citation,
+    )
+    if previously_imported_case:
+        # Simply add citations to our matched case for now. Later, we'll
+        # upgrade this to do a full merge.
+
+        with transaction.atomic():
+            add_citations_to_cluster(
+                [c.get("cite") for c in case.data.get("citations", [])],
+                cluster_id=previously_imported_case.id,
             )
-            if len(found_court) != 1:
-                logging.warning(
-                    f"Court not found for {data['court']['name']} at {file_path}"
-                )
-                continue
-            court_id = found_court[0]
-
-        if not Court.objects.filter(id=court_id).exists():
-            logger.warning(f"Court not found in Courtlistener: {court_id}")
-            continue
-
-        # Handle partial dates by adding -01 to YYYY-MM dates
-        date_filed, is_approximate = validate_dt(data["decision_date"])
-        if not date_filed:
-            logger.warning(
-                f"No date found for {data['decision_date']} at {file_path}"
+            logger.info(
+                f"Adding citations for case at https://www.courtlistener.com/opinion/{previously_imported_case.id}/{previously_imported_case.slug}"
             )
-            continue
-        case_body = data["casebody"]["data"]
-        harvard_characters = clean_body_content(case_body, harvard_file=True)
+            # Add the filepath to the harvard file for the associated opinion
+            previously_imported_case.filepath_json_harvard = case.file_path
+            previously_imported_case.save()
+        return []
 
-        if not harvard_characters:
-            # Unfortunately, some harvard cases have no opinions.
-            # See: https://cite.case.law/pdf/1305086/Vinson%20v.%20Cox,%2099%20Fla.%201373%20(1930).pdf
-            logger.warning(f"No opinion in Harvard XML at {file_path}")
-            continue
+    logger.info(f"Adding case {case.case_name_full}")
+    return add_new_case(case, make_searchable)
 
-        previously_imported_case = find_previously_imported_cases(
-            data,
-            court_id,
-            date_filed,
-            harvard_characters,
-            case_name_full,
-            citation,
-        )
-        if previously_imported_case:
-            # Simply add citations to our matched case for now. Later, we'll
-            # upgrade this to do a full merge.
 
-            with transaction.atomic():
-                add_citations_to_cluster(
-                    [c.get("cite") for c in data.get("citations", [])],
-                    cluster_id=previously_imported_case.id,
-                )
-                logger.info(
-                    f"Adding citations for case at https://www.courtlistener.com/opinion/{previously_imported_case.id}/{previously_imported_case.slug}"
-                )
-                # Add the filepath to the harvard file for the associated opinion
-                previously_imported_case.filepath_json_harvard = file_path
-                previously_imported_case.save()
-            continue
-
-        logger.info(f"Adding case {case_name_full}")
-        add_new_case(
-            data,
-            case_body,
-            case_name,
-            case_name_full,
-            case_name_short,
-            date_filed,
-            is_approximate,
-            citation,
-            court_id,
-            file_path,
-            make_searchable,
-        )
+def import_harvard_batch(
+    file_paths: list[str],
+    cases: list[Optional[HarvardCase]],
+    court_ids: set[str],
+    make_searchable: bool,
+) -> int:
+    """Add a batch of parsed Harvard cases to the DB in one transaction, and
+    record their files as done in the ledger.
+
+    The new opinions aren't indexed here. Their IDs are kept in the ledger,
+    to be indexed in bulk at the end of the import.
+
+    :param file_paths: The files of the batch, including those that were
+    skipped
+    :param cases: The cases parsed from the files that weren't skipped, or
+    None for those that couldn't be
+    :param court_ids: The IDs of the courts in CL
+    :param make_searchable: Whether the new opinions will be indexed
+    :return: The number of new opinions
+    """
+    new_op_pks = []
+    with transaction.atomic():
+        for case in cases:
+            if case is not None:
+                new_op_pks.extend(import_harvard_case(case, court_ids, False))
+    record_done_in_ledger(
+        HARVARD_OPINIONS_LEDGER,
+        file_paths,
+        new_op_pks if make_searchable else None,
+    )
+    return len(new_op_pks)
 
 
-def add_new_case(
-    data: dict[str, Any],
-    case_body: str,
-    case_name: str,
-    case_name_full: str,
-    case_name_short: str,
-    date_filed: Optional[date],
-    is_approximate: bool,
-    citation: FullCaseCitation,
-    court_id: Optional[str],
-    file_path: str,
-    make_searchable: bool,
+def parse_harvard_opinions_in_parallel(
+    options: OptionsType, workers: int, batch_size: int, resume: bool
 ) -> None:
-    """Add new case to Courtlistener.com
-
-    :param data: The Harvard data JSON object
-    :param case_body: The Harvard Case body
-    :param case_name: The case name
-    :param case_name_full: The full case name
-    :param case_name_short: The case name abbreviation
-    :param date_filed: The date the case was filed
-    :param is_approximate: Is the case date filed approximate
-    :param citation: The citation we use in logging and first citation parsed
-    :param court_id: The CL Court ID
-    :param file_path: The path to the Harvard JSON
-    :param make_searchable: Should we add this case to SOLR
+    """Parse Harvard Opinions in a pool of processes, and add them to our
+    database in batches.
+
+    The files are read and parsed in the pool, while this process matches
+    and saves the cases of the previous batch, so only one process writes to
+    the DB. Each batch is saved in one transaction, after which its files
+    are recorded in the ledger, so an interrupted import can be resumed.
+    New opinions are indexed at the end, in bulk.
+
+    :param options: The command line options, as for parse_harvard_opinions
+    :param workers: The number of parsing processes
+    :param batch_size: The number of files per batch
+    :param resume: Whether to skip the files done by the last import
     :return: None
     """
-    soup = BeautifulSoup(case_body, "lxml")
+    reporter = options["reporter"]
+    volumes = options["volumes"]
+    make_searchable = options["make_searchable"]
 
-    # Some documents contain images in the HTML
-    # Flag them for a later crawl by using the placeholder '[[Image]]'
-    judge_list = [
-        extract_judge_last_name(x.text)
-        for x in soup.find_all(
-            lambda tag: (tag.name == "judges" and tag.get("data-type") is None)
-            or tag.get("data-type") == "judges"
-        )
-    ]
-    author_list = [
-        extract_judge_last_name(x.text)
-        for x in soup.find_all(
-            lambda tag: (tag.name == "author" and tag.get("data-type") is None)
-            or tag.get("data-type") == "author"
-        )
-    ]
-    # Flatten and dedupe list of judges
-    judges = ", ".join(
-        sorted(set(itertools.chain.from_iterable(judge_list + author_list)))
+    if not reporter and volumes:
+        logger.error("You provided volume(s) but no reporter. Exiting.")
+        return
+
+    filepaths = filepath_list(reporter, volumes, options["page"])
+    fix_list = set(get_fix_list())
+    court_ids = set(Court.objects.values_list("pk", flat=True))
+    if resume:
+        logger.info("Skipping the files done by the last import")
+    else:
+        clear_ledger(HARVARD_OPINIONS_LEDGER)
+    prepare = partial(
+        prepare_harvard_case,
+        court_id=options["court_id"],
+        location=options["location"],
+        is_bankruptcy=options["bankruptcy"],
     )
-    judges = titlecase(judges)
-    docket_string = data["docket_number"].strip()
 
-    short_fields = ["attorneys", "disposition", "otherdate", "seealso"]
+    # Load the tokenizer before forking, so the processes share it, and
+    # don't fork open DB connections.
+    prewarm_hyperscan_tokenizer()
+    connections.close_all()
+    start = time.monotonic()
+    files_done = new_opinions = 0
+    with ProcessPoolExecutor(workers) as executor:
+        pending = None
+        for batch in batched(filepaths, batch_size):
+            file_paths = filter_done_in_ledger(
+                HARVARD_OPINIONS_LEDGER, list(batch)
+            )
+            imported = set(
+                OpinionCluster.objects.filter(
+                    filepath_json_harvard__in=file_paths
+                ).values_list("filepath_json_harvard", flat=True)
+            )
+            to_parse = [path for path in file_paths if path not in imported]
+            # map() submits the whole batch right away.
+            results = executor.map(
+                prepare,
+                to_parse,
+                [get_fix_identifier(path) in fix_list for path in to_parse],
+                chunksize=max(1, len(to_parse) // (workers * 4)),
+            )
+            if pending is not None:
+                new_opinions += import_harvard_batch(
+                    *pending, court_ids, make_searchable
+                )
+            pending = file_paths, list(results)
+            files_done += len(batch)
+            elapsed = time.monotonic() - start
+            logger.info(
+                "Parsed %s of %s files (%.1f/s); added %s opinions.",
+                files_done,
+                len(filepaths),
+                files_done / elapsed,
+                new_opinions,
+            )
+        if pending is not None:
+            new_opinions += import_harvard_batch(
+                *pending, court_ids, make_searchable
+            )
 
-    long_fields = [
-        "syllabus",
-        "summary",
-        "history",
-        "headnotes",
-        "correction",
-    ]
+    if make_searchable:
+        # This includes the opinions added by interrupted imports.
+        new_op_pks = pop_new_ids_from_ledger(HARVARD_OPINIONS_LEDGER)
+        logger.info("Indexing %s opinions", len(new_op_pks))
+        for chunk in batched(new_op_pks, 1000):
+            add_items_to_solr.delay(list(chunk), "search.Opinion")
+    logger.info(
+        "Done. Added %s opinions from %s files in %.0fs.",
+        new_opinions,
+        files_done,
+        time.monotonic() - start,
+    )
 
-    short_data = parse_extra_fields(soup, short_fields, False)
-    long_data = parse_extra_fields(soup, long_fields, True)
+
+def add_new_case(case: HarvardCase, make_searchable: bool) -> list[int]:
+    """Add new case to Courtlistener.com
+
+    :param case: The parsed Harvard case
+    :param make_searchable: Should we add this case to SOLR
+    :return: The IDs of the new opinions
+    """
+    data = case.data
+    citation = case.citation
+    docket_string = data["docket_number"].strip()
+    long_data = dict(case.long_data)
+    short_data = case.short_data
 
     with transaction.atomic():
         logger.info(
-            f"Adding docket for {case_name}: {citation.corrected_citation()}"
+            f"Adding docket for {case.case_name}: "
+            f"{citation.corrected_citation()}"
         )
         docket = update_or_create_docket(
-            case_name,
-            case_name_short,
-            court_id,
+            case.case_name,
+            case.case_name_short,
+            case.court_id,
             docket_string,
             Docket.HARVARD,
             overwrite_existing_data=True,
-            case_name_full=case_name_full,
+            case_name_full=case.case_name_full,
             ia_needs_upload=False,
         )
         try:
@@ -520,14 +739,14 @@ def add_new_case(
                 )
 
         cluster = OpinionCluster(
-            case_name=case_name,
-            case_name_short=case_name_short,
-            case_name_full=case_name_full,
+            case_name=case.case_name,
+            case_name_short=case.case_name_short,
+            case_name_full=case.case_name_full,
             precedential_status="Published",
             docket_id=docket.id,
             source=SOURCES.HARVARD_CASELAW,
-            date_filed=date_filed,
-            date_filed_is_approximate=is_approximate,
+            date_filed=case.date_filed,
+            date_filed_is_approximate=case.is_approximate,
             attorneys=short_data["attorneys"],
             disposition=short_data["disposition"],
             syllabus=long_data["syllabus"],
@@ -537,8 +756,8 @@ def add_new_case(
             cross_reference=short_data["seealso"],
             headnotes=long_data["headnotes"],
             correction=long_data["correction"],
-            judges=judges,
-            filepath_json_harvard=file_path,
+            judges=case.judges,
+            filepath_json_harvard=case.file_path,
         )
         cluster.save(index=False)
         logger.info("Saving cluster for: %s", cluster.id)
@@ -547,7 +766,7 @@ def add_new_case(
         add_citations_to_cluster(
             [c.get("cite") for c in data.get("citations", [])], cluster.id
         )
-        new_op_pks = add_opinions(soup, cluster.id, citation)
+        new_op_pks = add_opinions(case.opinions, cluster.id, citation)
 
     if make_searchable:
         add_items_to_solr.delay(new_op_pks, "search.Opinion")
@@ -556,19 +775,16 @@ def add_new_case(
     logger.info(
         f"Finished adding case at https://www.courtlistener.com/opinion/{cluster.id}/{cluster.slug}"
     )
+    return new_op_pks
 
 
-def add_opinions(
-    soup: BeautifulSoup, cluster_id: int, citation: FullCaseCitation
-) -> list[int]:
-    """Add opinions to Cluster
+def parse_opinions(soup: BeautifulSoup) -> list[HarvardOpinion]:
+    """Parse the opinions of a case
 
     :param soup: The bs4 representation of the case data xml
-    :param cluster_id: The cluster ID
-    :param citation: Citation object
-    :return: Opinion IDs in a list
+    :return: The opinions
     """
-    new_op_pks = []
+    opinions = []
     # We look for opinion tags without data-type or tags with data-type == "opinion"
     for op in soup.find_all(
         lambda tag: (tag.name == "opinion" and tag.get("data-type") is None)
@@ -595,15 +811,38 @@ def add_opinions(
         if per_curiam:
             author_str = "Per Curiam"
 
-        op_type = map_opinion_type(op.get("type"))
-        opinion_xml = str(op)
+        opinions.append(
+            HarvardOpinion(
+                type=map_opinion_type(op.get("type")),
+                author_str=author_str,
+                xml_harvard=str(op),
+                per_curiam=per_curiam,
+            )
+        )
+    return opinions
+
+
+def add_opinions(
+    opinions: list[HarvardOpinion],
+    cluster_id: int,
+    citation: FullCaseCitation,
+) -> list[int]:
+    """Add opinions to Cluster
+
+    :param opinions: The parsed opinions of the case
+    :param cluster_id: The cluster ID
+    :param citation: Citation object
+    :return: Opinion IDs in a list
+    """
+    new_op_pks = []
+    for opinion in opinions:
         logger.info("Adding opinion for: %s", citation.corrected_citation())
         op = Opinion(
             cluster_id=cluster_id,
-            type=op_type,
-            author_str=author_str,
-            xml_harvard=opinion_xml,
-            per_curiam=per_curiam,
+            type=opinion.type,
+            author_str=opinion.author_str,
+            xml_harvard=opinion.xml_harvard,
+            per_curiam=opinion.per_curiam,
             extracted_by_ocr=True,
         )
         # Don't index now; do so later if desired
@@ -633,7 +872,9 @@ def find_previously_imported_cases(
 
     # Match against known citations.
     for cite in data["citations"]:
-        found_cite = get_citations(cite["cite"], tokenizer=HYPERSCAN_TOKENIZER)
+        found_cite = get_citations(
+            cite["cite"], tokenizer=get_hyperscan_tokenizer()
+        )
         if (
             found_cite
             and isinstance(found_cite[0], FullCaseCitation)
@@ -750,8 +991,41 @@ class Command(VerboseCommand):
             action="store_true",
             help="Turn off debug logging",
         )
+        parser.add_argument(
+            "--parallel",
+            action="store_true",
+            help="Parse the files in a pool of processes and save the cases "
+            "in batches. New opinions are indexed at the end. Use this for "
+            "large imports.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="With --parallel, the number of processes parsing files.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="With --parallel, the number of files saved per "
+            "transaction.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="With --parallel, skip the files done by the last import.",
+        )
 
     def handle(self, *args, **options):
         if options["no_debug"]:
             logging.disable(logging.DEBUG)
+        if options["parallel"]:
+            parse_harvard_opinions_in_parallel(
+                options,
+                options["workers"],
+                options["batch_size"],
+                options["resume"],
+            )
+            return
         parse_harvard_opinions(options)
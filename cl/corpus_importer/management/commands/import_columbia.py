@@ -1,11 +1,19 @@
 import fnmatch
 import os
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 from glob import glob
+from itertools import batched
 from random import shuffle
 
+from django.db import connections
+
 from cl.corpus_importer.import_columbia.parse_opinions import parse_file
-from cl.corpus_importer.import_columbia.populate_opinions import make_and_save
+from cl.corpus_importer.import_columbia.populate_opinions import (
+    make_and_save,
+    make_and_save_in_bulk,
+)
+from cl.corpus_importer.utils import StageTimer
 from cl.lib.command_utils import VerboseCommand, logger
 from cl.lib.import_lib import (
     get_courtdates,
@@ -13,6 +21,8 @@ from cl.lib.import_lib import (
     get_min_nocite,
     get_path_list,
 )
+from cl.search.models import SEARCH_TYPES
+from cl.search.tasks import index_parent_and_child_docs
 
 
 class Command(VerboseCommand):
@@ -98,6 +108,20 @@ class Command(VerboseCommand):
             default=False,
             help="Don't change the data.",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=0,
+            help="If set, files are parsed in a pool of processes and saved "
+            "in batches of this size, with a report of the time spent in "
+            "each stage after every batch.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="With --batch-size, the number of processes parsing files.",
+        )
 
     def handle(self, *args, **options):
         super().handle(*args, **options)
@@ -114,6 +138,8 @@ class Command(VerboseCommand):
             options["startfolder"],
             options["startfile"],
             options["debug"],
+            options["batch_size"],
+            options["workers"],
         )
 
 
@@ -130,6 +156,8 @@ def do_many(
     startfolder,
     startfile,
     debug,
+    batch_size=0,
+    workers=1,
 ):
     """Runs through a directory of the form /data/[state]/[sub]/.../[folders]/[.xml documents].
     Parses each .xml document, instantiates the associated model object, and
@@ -149,6 +177,9 @@ def do_many(
     :param courtdates: If true, skip cases with dates before court established.
     :param startfolder: If not None, start on startfolder
     :param startfile: If not None, start on this file (for resuming)
+    :param batch_size: If not 0, parse files in a pool of processes and save
+    them in batches of this size.
+    :param workers: The number of processes parsing files.
     """
     if limit:
         total = limit
@@ -195,6 +226,181 @@ def do_many(
     else:
         skiplist = set()
 
+    paths = path_generator(
+        folders, random_order, limit, startfolder, startfile, skiplist
+    )
+    if batch_size:
+        do_many_in_batches(
+            paths,
+            batch_size,
+            workers,
+            total,
+            skipdupes,
+            min_dates,
+            start_dates,
+            debug,
+        )
+        return
+
+    for path in paths:
+        # try to parse/save the case and show any exceptions with full
+        # tracebacks
+        try:
+            parsed = parse_file(path)
+            make_and_save(parsed, skipdupes, min_dates, start_dates, debug)
+        except Exception as e:
+            log_exception(path, describe_exception(path, e))
+        # status update
+        count += 1
+        if count % status_interval == 0:
+            if total:
+                logger.info(f"Finished {count} out of {total} files.")
+            else:
+                logger.info(f"Finished {count} files.")
+
+
+def do_many_in_batches(
+    paths,
+    batch_size,
+    workers,
+    total,
+    skipdupes,
+    min_dates,
+    start_dates,
+    debug,
+):
+    """Parses files in a pool of processes, and saves them in batches.
+
+    The next batch is parsed while the last one is saved. After every batch,
+    logs the files per second and the time spent in each stage. The new
+    clusters are saved with bulk_create, which skips the signal processor,
+    so they're indexed with their opinions at the end.
+
+    :param paths: The paths of the files.
+    :param batch_size: The number of files per batch.
+    :param workers: The number of processes parsing files.
+    :param total: The total number of files, if known.
+    :param skipdupes: If true, skip duplicates.
+    :param min_dates: If not None, skip cases after these dates, by court.
+    :param start_dates: If not None, skip cases before these dates, by court.
+    :param debug: If true, don't change the data.
+    """
+    timer = StageTimer()
+    count = 0
+    new_cluster_pks = []
+    # Don't fork open DB connections.
+    connections.close_all()
+    with ProcessPoolExecutor(workers) as executor:
+        pending = None
+        for batch in batched(paths, batch_size):
+            # map() submits the whole batch right away.
+            results = executor.map(
+                parse_file_or_describe_exception,
+                batch,
+                chunksize=max(1, len(batch) // (workers * 4)),
+            )
+            if pending is not None:
+                new_cluster_pks += save_batch(
+                    pending, skipdupes, min_dates, start_dates, debug, timer
+                )
+            with timer.stage("parse"):
+                pending = list(zip(batch, results))
+            count += len(batch)
+            logger.info(
+                f"Parsed {count} out of {total or '?'} files. "
+                f"{timer.report(count)}"
+            )
+        if pending is not None:
+            new_cluster_pks += save_batch(
+                pending, skipdupes, min_dates, start_dates, debug, timer
+            )
+
+    logger.info(f"Indexing {len(new_cluster_pks)} clusters")
+    for chunk in batched(new_cluster_pks, 1000):
+        index_parent_and_child_docs.delay(list(chunk), SEARCH_TYPES.OPINION)
+    logger.info(f"Done. {timer.report(count)}")
+
+
+def save_batch(parsed, skipdupes, min_dates, start_dates, debug, timer):
+    """Saves a batch of parsed files, and logs the files that failed.
+
+    :param parsed: A list of (path, (item, exception description)) tuples,
+    from parse_file_or_describe_exception.
+    :param skipdupes: If true, skip duplicates.
+    :param min_dates: If not None, skip cases after these dates, by court.
+    :param start_dates: If not None, skip cases before these dates, by court.
+    :param debug: If true, don't change the data.
+    :param timer: The StageTimer of the import.
+    :return: The IDs of the new clusters that still need to be indexed.
+    """
+    items = []
+    for path, (item, description) in parsed:
+        if description:
+            log_exception(path, description)
+        else:
+            items.append((path, item))
+    new_cluster_pks, failures = make_and_save_in_bulk(
+        items, skipdupes, min_dates, start_dates, debug, timer
+    )
+    for path, e in failures:
+        log_exception(path, describe_exception(path, e))
+    return new_cluster_pks
+
+
+def parse_file_or_describe_exception(path):
+    """Parses a file in a pool process. Exceptions are described there, since
+    their tracebacks can't be sent back.
+
+    :param path: The path of the file.
+    :return: A tuple of the parsed file and None, or of None and a description
+    of the exception.
+    """
+    try:
+        return parse_file(path), None
+    except Exception as e:
+        return None, describe_exception(path, e)
+
+
+def describe_exception(path, e):
+    """Describes an exception, with a simple summary for known problems, and
+    the full traceback otherwise.
+
+    :param path: The path of the file that failed.
+    :param e: The exception.
+    :return: The description.
+    """
+    known = [
+        "mismatched tag",
+        "Failed to get a citation",
+        "Failed to find a court ID",
+        'null value in column "date_filed"',
+        "duplicate(s)",
+    ]
+    if any(k in str(e) for k in known):
+        return f"Known exception in file '{path}':\n{e}"
+    return (
+        f"Unknown exception in file '{path}':\n"
+        f"{''.join(traceback.format_exception(e))}"
+    )
+
+
+def log_exception(path, description):
+    logger.info(path)
+    logger.info(description)
+
+
+def path_generator(
+    folders, random_order, limit, startfolder, startfile, skiplist
+):
+    """Generates the paths of the files to import from some folders.
+
+    :param folders: The folders, one per state.
+    :param random_order: If true, generate the files of each folder randomly.
+    :param limit: If not None, the number of files to generate per folder.
+    :param startfolder: If not None, start on this folder (state name).
+    :param startfile: If not None, start on this file (for resuming).
+    :param skiplist: The paths of files to skip.
+    """
     # start/resume functionality
     if startfolder is not None:
         skipfolder = True
@@ -233,35 +439,7 @@ def do_many(
                 continue
 
             logger.debug(path)
-
-            # try to parse/save the case and show any exceptions with full
-            # tracebacks
-            try:
-                parsed = parse_file(path)
-                make_and_save(parsed, skipdupes, min_dates, start_dates, debug)
-            except Exception as e:
-                logger.info(path)
-                # show simple exception summaries for known problems
-                known = [
-                    "mismatched tag",
-                    "Failed to get a citation",
-                    "Failed to find a court ID",
-                    'null value in column "date_filed"',
-                    "duplicate(s)",
-                ]
-                if any(k in str(e) for k in known):
-                    logger.info(f"Known exception in file '{path}':")
-                    logger.info(str(e))
-                else:
-                    logger.info(f"Unknown exception in file '{path}':")
-                    logger.info(traceback.format_exc())
-        # status update
-        count += 1
-        if count % status_interval == 0:
-            if total:
-                logger.info(f"Finished {count} out of {total} files.")
-            else:
-                logger.info(f"Finished {count} files.")
+            yield path
 
 
 def file_generator(dir_path, random_order=False, limit=None):
@@ -2,7 +2,6 @@ from asgiref.sync import async_to_sync
 from django.conf import settings
 from django.core.management import BaseCommand
 from django.db.models import Q
-from eyecite.tokenizers import HyperscanTokenizer
 from httpx import (
     HTTPStatusError,
     NetworkError,
@@ -18,8 +17,6 @@ from cl.lib.decorators import retry
 from cl.lib.microservice_utils import microservice
 from cl.search.models import SOURCES, Court, OpinionCluster, RECAPDocument
 
-HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
-
 
 @retry(
     ExceptionToCheck=(
@@ -28,6 +28,7 @@ from cl.lib.redis_utils import get_redis_interface
 from cl.lib.storage import S3PrivateUUIDStorage
 from cl.lib.string_utils import trunc
 from cl.lib.timezone_helpers import localize_date_and_time
+from cl.opinion_page.feeds import invalidate_docket_feed
 from cl.recap.mergers import (
     add_bankruptcy_data_to_docket,
     calculate_recap_sequence_numbers,
@@ -41,6 +42,7 @@ from cl.recap_rss.tasks import (
     is_cached,
 )
 from cl.search.models import Court, Docket, DocketEntry, RECAPDocument
+from cl.search.selectors import invalidate_docket_entry_pages
 from cl.search.tasks import add_items_to_solr
 
 FILES_BUFFER_THRESHOLD = 3
@@ -154,6 +156,11 @@ def do_bulk_additions(
         des_bulk_created = DocketEntry.objects.bulk_create(
             docket_entries_to_add_bulk
         )
+        # bulk_create doesn't send signals, so drop the page indexes and
+        # feeds here.
+        for docket_id in {de.docket_id for de in des_bulk_created}:
+            invalidate_docket_entry_pages(docket_id)
+            invalidate_docket_feed(docket_id)
 
         # Create RECAP documents in bulk.
         rds_to_create_bulk = get_rds_to_add(
@@ -21,7 +21,6 @@ from django.db import DatabaseError, IntegrityError, transaction
 from django.db.models import Prefetch
 from django.db.models.query import prefetch_related_objects
 from django.utils.timezone import now
-from eyecite.tokenizers import HyperscanTokenizer
 from httpx import (
     HTTPStatusError,
     NetworkError,
@@ -58,6 +57,7 @@ from urllib3.exceptions import ReadTimeoutError
 from cl.alerts.tasks import enqueue_docket_alert, send_alert_and_webhook
 from cl.audio.models import Audio
 from cl.celery_init import app
+from cl.citations.tokenizers import get_hyperscan_tokenizer
 from cl.citations.utils import filter_out_non_case_law_citations
 from cl.corpus_importer.api_serializers import IADocketSerializer
 from cl.corpus_importer.utils import (
@@ -128,7 +128,6 @@ from cl.search.models import (
 )
 from cl.search.tasks import add_items_to_solr
 
-HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
 
 logger = logging.getLogger(__name__)
 
@@ -2751,7 +2750,7 @@ def ingest_recap_document(
 
     try:
         citations = eyecite.get_citations(
-            r["content"], tokenizer=HYPERSCAN_TOKENIZER
+            r["content"], tokenizer=get_hyperscan_tokenizer()
         )
     except AttributeError:
         # Tokenizer fails with some unicode characters
@@ -17,11 +17,16 @@ from django.core.management import call_command
 from django.db.models.signals import post_save
 from django.test import override_settings
 from django.utils.timezone import make_aware, now
-from eyecite.tokenizers import HyperscanTokenizer
 from factory import RelatedFactory
 from juriscraper.lib.string_utils import harmonize, titlecase
 
-from cl.corpus_importer.court_regexes import match_court_string
+from cl.citations.tokenizers import get_hyperscan_tokenizer
+from cl.corpus_importer.court_regexes import (
+    COURT_PAIRS,
+    get_court_matcher,
+    match_court_string,
+    match_linearly,
+)
 from cl.corpus_importer.factories import (
     CaseBodyFactory,
     CaseLawCourtFactory,
@@ -38,6 +43,8 @@ from cl.corpus_importer.management.commands.clean_up_mis_matched_dockets import
     find_and_fix_mis_matched_dockets,
 )
 from cl.corpus_importer.management.commands.columbia_merge import (
+    merge_columbia_batch,
+    parse_columbia_file,
     process_cluster,
 )
 from cl.corpus_importer.management.commands.harvard_merge import (
@@ -49,8 +56,11 @@ from cl.corpus_importer.management.commands.harvard_merge import (
     update_docket_source,
 )
 from cl.corpus_importer.management.commands.harvard_opinions import (
+    HARVARD_OPINIONS_LEDGER,
     clean_body_content,
+    import_harvard_batch,
     parse_harvard_opinions,
+    prepare_harvard_case,
     validate_dt,
 )
 from cl.corpus_importer.management.commands.normalize_judges_opinions import (
@@ -74,14 +84,18 @@ from cl.corpus_importer.tasks import (
 from cl.corpus_importer.utils import (
     ClusterSourceException,
     DocketSourceException,
+    StageTimer,
+    clear_ledger,
     compare_documents,
     compute_blocked_court_wait,
     compute_next_binary_probe,
+    filter_done_in_ledger,
     get_start_of_quarter,
     merge_case_names,
     merge_docket_numbers,
     merge_judges,
     merge_strings,
+    pop_new_ids_from_ledger,
     winnow_case_name,
 )
 from cl.lib.pacer import process_docket_data
@@ -122,8 +136,6 @@ from cl.settings import MEDIA_ROOT
 from cl.tests.cases import SimpleTestCase, TestCase
 from cl.tests.fakes import FakeCaseQueryReport, FakeFreeOpinionReport
 
-HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
-
 
 class JudgeExtractionTest(SimpleTestCase):
     def test_get_judge_from_string_columbia(self) -> None:
@@ -401,6 +413,31 @@ class CourtMatchingTest(SimpleTestCase):
             got = match_court_string(test["q"], federal_appeals=True)
             self.assertEqual(test["a"], got)
 
+    def test_compiled_matcher_agrees_with_regexes(self) -> None:
+        """Does the compiled court matcher find the same courts as trying
+        the regexes one at a time, in the same order?"""
+        court_strings = (
+            "Eastern District of New York",
+            "U.S. Court of Appeals for the Ninth Circuit",
+            "Supreme Court of Texas",
+            "Court of Appeals of Texas, Fourth District, San Antonio.",
+            "United States Bankruptcy Court, S.D. New York",
+            "Court of King's Bench",
+            "Nothing to see here",
+            "",
+        )
+        matcher = get_court_matcher(*COURT_PAIRS)
+        for court_str in court_strings:
+            with self.subTest(court_str=court_str):
+                expected = match_linearly(matcher.pairs, court_str)
+                self.assertEqual(matcher.match_all(court_str), expected)
+                # Cached matches are the same
+                self.assertEqual(matcher.match_all(court_str), expected)
+                self.assertEqual(
+                    matcher.match(court_str),
+                    expected[0] if expected else None,
+                )
+
 
 @override_settings(
     EGRESS_PROXY_HOSTS=["http://proxy_1:9090", "http://proxy_2:9090"]
@@ -655,7 +692,8 @@ class HarvardTests(TestCase):
         :return: First citation found
         """
         cites = eyecite.get_citations(
-            case_law["citations"][0]["cite"], tokenizer=HYPERSCAN_TOKENIZER
+            case_law["citations"][0]["cite"],
+            tokenizer=get_hyperscan_tokenizer(),
         )
         cite = Citation.objects.get(
             volume=cites[0].groups["volume"],
@@ -758,6 +796,33 @@ Appeals, No. 19667-4-III, October 31, 2002. Denied September 30, 2003."
         docket = cite.cluster.docket
         self.assertEqual(docket.docket_number, case_law["docket_number"])
 
+    def test_import_batch_records_ledger(self):
+        """Does a batch of parsed cases get saved and recorded as done, with
+        its new opinions kept for indexing?"""
+        case_law = CaseLawFactory()
+        self.read_json_func.return_value = case_law
+        clear_ledger(HARVARD_OPINIONS_LEDGER)
+        pop_new_ids_from_ledger(HARVARD_OPINIONS_LEDGER)
+        file_paths = ["/one/fake/filepath.json", "/two/fake/filepath.json"]
+        case = prepare_harvard_case(file_paths[0], False, None, None, False)
+        self.assertIsNotNone(case)
+
+        new_opinions = import_harvard_batch(
+            file_paths, [case, None], {"harvard"}, True
+        )
+
+        cluster = self._get_cite(case_law).cluster
+        self.assertEqual(new_opinions, 1)
+        self.assertEqual(cluster.filepath_json_harvard, file_paths[0])
+        self.assertEqual(
+            filter_done_in_ledger(HARVARD_OPINIONS_LEDGER, file_paths), []
+        )
+        self.assertEqual(
+            pop_new_ids_from_ledger(HARVARD_OPINIONS_LEDGER),
+            [cluster.sub_opinions.get().pk],
+        )
+        clear_ledger(HARVARD_OPINIONS_LEDGER)
+
     def test_existing_docket_lookup(self):
         """Can we update an existing docket instead of creating a new one?"""
 
@@ -3340,6 +3405,56 @@ Lorem ipsum dolor sit amet, consectetur adipiscing elit. Nullam quis elit sed du
                 f"Cluster id: {cluster.id} already merged"
             )
 
+    def test_merge_batch(self):
+        """Can we merge a batch of clusters, skipping the ones that were
+        already merged?"""
+        self.read_xml_to_soup_func.return_value = BeautifulSoup(
+            """<opinion>
+<reporter_caption><center>SMITH v. STATE</center></reporter_caption>
+<opinion_byline> Opinion by ALMA L. LOPEZ, Justice. </opinion_byline>
+<opinion_text>
+Lorem ipsum dolor sit amet, consectetur adipiscing elit.
+</opinion_text>
+</opinion>""",
+            "lxml",
+        )
+        columbia_data = parse_columbia_file("/columbia/fake_filepath.xml")
+        clusters = [
+            OpinionClusterFactoryMultipleOpinions(
+                case_name="Smith v. State",
+                source=SOURCES.HARVARD_CASELAW,
+                docket=DocketFactory(source=Docket.HARVARD),
+                sub_opinions__data=[
+                    {
+                        "type": "010combined",
+                        "xml_harvard": "<p>Lorem ipsum dolor sit amet, "
+                        "consectetur adipiscing elit.</p>",
+                        "html_columbia": "",
+                        "author_str": "Lopez",
+                    },
+                ],
+            )
+            for _ in range(2)
+        ]
+        merged_cluster = clusters[1]
+        merged_cluster.source = SOURCES.COLUMBIA_ARCHIVE_M_HARVARD
+        merged_cluster.save()
+
+        merge_columbia_batch(
+            [(c.pk, "/columbia/fake_filepath.xml") for c in clusters],
+            [columbia_data, columbia_data],
+            False,
+            StageTimer(),
+        )
+
+        opinion = clusters[0].sub_opinions.get()
+        self.assertIn("Lorem ipsum dolor sit amet", opinion.html_columbia)
+        clusters[0].refresh_from_db()
+        self.assertEqual(
+            clusters[0].source, SOURCES.COLUMBIA_ARCHIVE_M_HARVARD
+        )
+        self.assertEqual(merged_cluster.sub_opinions.get().html_columbia, "")
+
 
 @patch("cl.corpus_importer.tasks.get_or_cache_pacer_cookies")
 @override_settings(
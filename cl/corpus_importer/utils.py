@@ -1,8 +1,12 @@
 import itertools
 import random
 import re
+import time
+from collections import Counter
+from contextlib import contextmanager
 from datetime import date
 from difflib import SequenceMatcher
+from functools import lru_cache
 from typing import Any, Iterator, Optional, Set
 
 from asgiref.sync import async_to_sync
@@ -14,12 +18,14 @@ from django.db.utils import IntegrityError
 from django.utils.timezone import now
 from eyecite import get_citations
 from eyecite.models import FullCaseCitation
-from eyecite.tokenizers import HyperscanTokenizer
 from juriscraper.lib.string_utils import harmonize, titlecase
 
+from cl.citations.tokenizers import get_hyperscan_tokenizer
 from cl.citations.utils import map_reporter_db_cite_type
+from cl.corpus_importer.court_regexes import MATCH_CACHE_SIZE
 from cl.lib.command_utils import logger
-from cl.lib.string_diff import get_cosine_similarity
+from cl.lib.redis_utils import get_redis_interface
+from cl.lib.string_diff import SuffixAutomaton, get_cosine_similarity
 from cl.people_db.lookup_utils import (
     find_all_judges,
     lookup_judges_by_last_name_list,
@@ -27,8 +33,6 @@ from cl.people_db.lookup_utils import (
 from cl.people_db.models import Person
 from cl.search.models import Citation, Docket, Opinion, OpinionCluster
 
-HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
-
 
 class OpinionMatchingException(Exception):
     """An exception for wrong matching opinions"""
@@ -125,56 +129,26 @@ def get_start_of_quarter(d: Optional[date] = None) -> date:
     return max([q for q in quarter_dates if q <= d])
 
 
-def make_subset_range(cl_characters: str, max_string: str) -> list[int]:
-    """Find indices for matching max_string in CL opinion
-
-    :param cl_characters: The stripped down CL characters
-    :param max_string: The current largest identified substring
-    :return: Range of indices of match to CL as list
-    """
-    string_index_start = cl_characters.find(max_string)
-    string_index_end = string_index_start + len(max_string)
-    return list(range(string_index_start, string_index_end))
-
-
-def filter_subsets(lists: list[list[int]]) -> Iterator[list[int]]:
+def filter_subsets(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
     """Filter subsets from matches
 
-    Given list of lists, return new list of lists without subsets
+    Given a list of ranges of indices, return the ranges that aren't within
+    another one. Ranges found more than once are within each other, so
+    they're dropped too.
 
-    :param lists: List of matched lists ranges
+    :param ranges: List of matched ranges, as (start, end) tuples
     :return: Reduced list of matches
     """
-
-    for match in lists:
-        if not any(
-            is_subset(match, other_matches)
-            for other_matches in lists
-            if match is not other_matches
-        ):
-            yield match
-
-
-def is_subset(match: list[int], other_match: list[int]) -> bool:
-    """Check if match is a subset of other matches
-
-    Check if needle is ordered subset of haystack in O(n)
-
-    :param match: Matching range of text as the indices
-    :param other_match: Other matching range of text as indices
-    :return: Is match a subset of other match
-    """
-
-    if len(other_match) < len(match):
-        return False
-    index = 0
-    for element in match:
-        try:
-            index = other_match.index(element, index) + 1
-        except ValueError:
-            return False
-    else:
-        return True
+    counts = Counter(ranges)
+    filtered = []
+    max_end = -1
+    # Ranges that start sooner, or as soon but end later, come first, so a
+    # range is within another if one before it ends as late.
+    for start, end in sorted(counts, key=lambda r: (r[0], -r[1])):
+        if end > max_end and counts[(start, end)] == 1:
+            filtered.append((start, end))
+        max_end = max(max_end, end)
+    return filtered
 
 
 def compare_documents(file_characters: str, cl_characters: str) -> int:
@@ -183,34 +157,21 @@ def compare_documents(file_characters: str, cl_characters: str) -> int:
     This code iterates over two opinions logging similar stretches and then
     returns a percentage of the total overlapping characters
 
+    The file text is split into the longest stretches found in the CL text
+    by walking a suffix automaton of the CL text, so this takes time linear
+    in the length of the texts.
+
     :param file_characters: The stripped down opinion text from file/source
     :param cl_characters: The stripped down opinion text on Courtlistener
     :return: Percentage (as integer) overlapping content
     """
-
-    start, stop, count = 0, 0, 0
-    matched_substring = ""
-    found_overlaps = []
-    while stop < len(file_characters):
-        stop += 1
-        source_substring = file_characters[start:stop]
-        if source_substring in cl_characters:
-            matched_substring = source_substring
-        else:
-            if len(matched_substring) > 5:
-                subset = make_subset_range(cl_characters, matched_substring)
-                found_overlaps.append(subset)
-            matched_substring = ""
-            start = stop - 1
-    if len(matched_substring) > 5:
-        subset = make_subset_range(cl_characters, matched_substring)
-        found_overlaps.append(subset)
-
-    # If we checked our subsets as we parsed-we wouldn't need to do this
-    # filtering here. This is a good candidate for refactoring.
-    filtered_subset = list(filter_subsets(found_overlaps))
-    for overlap in filtered_subset:
-        count += len(overlap)
+    automaton = SuffixAutomaton(cl_characters)
+    found_overlaps = [
+        (start, start + length)
+        for start, length in automaton.greedy_matches(file_characters)
+        if length > 5
+    ]
+    count = sum(end - start for start, end in filter_subsets(found_overlaps))
 
     percent_match = int(
         100 * (count / min([len(file_characters), len(cl_characters)]))
@@ -230,6 +191,24 @@ def similarity_scores(
     :param texts_to_compare_2: List of text to compare
     :return: Return similarity scores
     """
+    return similarity_scores_in_bulk(
+        [(texts_to_compare_1, texts_to_compare_2)]
+    )[0]
+
+
+def similarity_scores_in_bulk(
+    pairs: list[tuple[list[str], list[str]]],
+) -> list[list[list[float]]]:
+    """Get the similarity scores of many pairs of lists of texts at once,
+    e.g. the opinions of a file and of each candidate cluster
+
+    One TF-IDF vocabulary is fitted to all the texts, and all of them are
+    weighted in a single pass, instead of fitting a vocabulary per pair.
+
+    :param pairs: A list of (texts_to_compare_1, texts_to_compare_2) tuples
+    :return: The similarity scores of each pair, as similarity_scores
+    returns them
+    """
 
     # We import the library inside the function to avoid loading it if it is
     # not required
@@ -239,13 +218,17 @@ def similarity_scores(
     # Weights the word counts by a measure of how often they appear in the
     # documents, and it returns a sparse matrix
     X = TfidfVectorizer().fit_transform(
-        texts_to_compare_1 + texts_to_compare_2
+        [text for texts_1, texts_2 in pairs for text in texts_1 + texts_2]
     )
 
     # Calculate cosine similarity between weight of words for each text in list
-    scores = cosine_similarity(
-        X[: len(texts_to_compare_1)], X[len(texts_to_compare_1) :]
-    )
+    scores = []
+    offset = 0
+    for texts_1, texts_2 in pairs:
+        middle = offset + len(texts_1)
+        end = middle + len(texts_2)
+        scores.append(cosine_similarity(X[offset:middle], X[middle:end]))
+        offset = end
     return scores
 
 
@@ -293,7 +276,24 @@ def match_opinion_lists(
     """
 
     scores = similarity_scores(file_opinions_list, cl_opinions_list)
+    return confirm_opinion_matches(
+        file_opinions_list, cl_opinions_list, scores
+    )
 
+
+def confirm_opinion_matches(
+    file_opinions_list: list[Any],
+    cl_opinions_list: list[Any],
+    scores: list[list[float]],
+) -> dict[int, int]:
+    """Pick the most similar CL opinion for each file opinion, and keep the
+    matches that are confirmed by cosine similarity or by text overlap
+
+    :param file_opinions_list: Opinions from file
+    :param cl_opinions_list: CL opinions
+    :param scores: Their similarity scores, from similarity_scores
+    :return: Matches if found or empty dict
+    """
     matches = {}
     for i, row in enumerate(scores):
         j = row.argmax()  # type: ignore
@@ -314,6 +314,29 @@ def match_opinion_lists(
     return matches
 
 
+def match_opinion_lists_in_bulk(
+    pairs: list[tuple[list[str], list[str]]],
+) -> list[dict[int, int]]:
+    """Match the opinions of many pairs of lists at once, e.g. the opinions of
+    each file of a batch and of the cluster it's merged into
+
+    The candidate for each file opinion is picked with similarity scores from
+    a single TF-IDF vocabulary fitted to the whole batch, then confirmed the
+    way match_opinion_lists confirms it.
+
+    :param pairs: A list of (file_opinions_list, cl_opinions_list) tuples
+    :return: The matches of each pair, as match_opinion_lists returns them
+    """
+    if not pairs:
+        return []
+    return [
+        confirm_opinion_matches(file_opinions, cl_opinions, scores)
+        for (file_opinions, cl_opinions), scores in zip(
+            pairs, similarity_scores_in_bulk(pairs)
+        )
+    ]
+
+
 def clean_docket_number(docket_number: str) -> str:
     """Strip non-numeric content from docket numbers
 
@@ -612,6 +635,26 @@ def merge_overlapping_data(
     return data_to_update
 
 
+def make_citation_params(citation: FullCaseCitation) -> dict[str, Any]:
+    """Make the fields of a Citation from a citation found by eyecite
+
+    :param citation: A full case citation with a volume
+    :return: A dict with the volume, reporter, page and type of the citation
+    """
+    if not citation.corrected_reporter():
+        reporter_type = Citation.STATE
+    else:
+        cite_type_str = citation.all_editions[0].reporter.cite_type
+        reporter_type = map_reporter_db_cite_type(cite_type_str)
+
+    return {
+        "volume": citation.groups["volume"],
+        "reporter": citation.corrected_reporter(),
+        "page": citation.groups["page"],
+        "type": reporter_type,
+    }
+
+
 def add_citations_to_cluster(
     cites: list[str], cluster_id: int, save_again_if_exists: bool = False
 ) -> None:
@@ -624,7 +667,9 @@ def add_citations_to_cluster(
     """
     for cite in cites:
         clean_cite = re.sub(r"\s+", " ", cite)
-        citation = get_citations(clean_cite, tokenizer=HYPERSCAN_TOKENIZER)
+        citation = get_citations(
+            clean_cite, tokenizer=get_hyperscan_tokenizer()
+        )
         if (
             not citation
             or not isinstance(citation[0], FullCaseCitation)
@@ -633,17 +678,8 @@ def add_citations_to_cluster(
             logger.warning(f"Citation parsing failed for {clean_cite}")
             continue
 
-        if not citation[0].corrected_reporter():
-            reporter_type = Citation.STATE
-        else:
-            cite_type_str = citation[0].all_editions[0].reporter.cite_type
-            reporter_type = map_reporter_db_cite_type(cite_type_str)
-
         citation_params = {
-            "volume": citation[0].groups["volume"],
-            "reporter": citation[0].corrected_reporter(),
-            "page": citation[0].groups["page"],
-            "type": reporter_type,
+            **make_citation_params(citation[0]),
             "cluster_id": cluster_id,
         }
         citation_obj = Citation.objects.filter(**citation_params).first()
@@ -1032,7 +1068,18 @@ def get_court_id(raw_court: str) -> list[str]:
     court_text = re.sub(" +", " ", raw_court)
     # Replace \n and remove dot at end
     court_text = court_text.replace("\n", "").strip(".")
+    return list(find_court_ids(court_text))
+
+
+@lru_cache(maxsize=MATCH_CACHE_SIZE)
+def find_court_ids(court_text: str) -> tuple[str, ...]:
+    """Find the ids of the courts a cleaned up court name partially matches
+    in courts-db. The results are remembered, since importers see the same
+    court names over and over.
 
+    :param court_text: Court name, cleaned up by get_court_id
+    :return: The court ids, empty if none matched
+    """
     for bankruptcy in [False, True]:
         # Remove dot at end, try to get a partial string match, try with and
         # without bankruptcy flag
@@ -1043,9 +1090,9 @@ def get_court_id(raw_court: str) -> list[str]:
             allow_partial_matches=True,
         )
         if found_court:
-            return found_court
+            return tuple(found_court)
 
-    return []
+    return ()
 
 
 def make_iquery_probing_key(court_id: str) -> str:
@@ -1108,3 +1155,119 @@ def compute_blocked_court_wait(court_blocked_attempts: int) -> tuple[int, int]:
         for i in range(court_blocked_attempts)
     )
     return current_wait_time, total_accumulated_time
+
+
+# Ledgers record the items a long running import has finished with, so that
+# it can be resumed where it stopped. They're Redis sets that expire four
+# weeks after the import last finished an item.
+IMPORT_LEDGER_EXPIRATION = 60 * 60 * 24 * 28
+
+
+def make_import_ledger_key(name: str, part: str = "done") -> str:
+    """Make the key of a part of an import's ledger.
+
+    :param name: The name of the import, e.g. "harvard_opinions".
+    :param part: The part of the ledger, e.g. "done".
+    :return: The Redis key.
+    """
+    return f"import_ledger:{name}:{part}"
+
+
+def filter_done_in_ledger(name: str, items: list[str]) -> list[str]:
+    """Leave out the items an import's ledger records as done.
+
+    :param name: The name of the import.
+    :param items: The items, e.g. file paths.
+    :return: The items that aren't done yet, in order.
+    """
+    if not items:
+        return []
+    r = get_redis_interface("CACHE")
+    done = r.smismember(make_import_ledger_key(name), items)
+    return [item for item, is_done in zip(items, done) if not is_done]
+
+
+def record_done_in_ledger(
+    name: str, items: list[str], new_ids: list[int] | None = None
+) -> None:
+    """Record items as done in an import's ledger, along with the IDs of the
+    objects they created that still have to be indexed.
+
+    :param name: The name of the import.
+    :param items: The items that are done.
+    :param new_ids: The IDs of the objects created for them.
+    :return: None
+    """
+    r = get_redis_interface("CACHE")
+    pipe = r.pipeline()
+    for part, values in (("done", items), ("new_ids", new_ids)):
+        if not values:
+            continue
+        key = make_import_ledger_key(name, part)
+        pipe.sadd(key, *values)
+        pipe.expire(key, IMPORT_LEDGER_EXPIRATION)
+    pipe.execute()
+
+
+def pop_new_ids_from_ledger(name: str) -> list[int]:
+    """Get and forget the IDs of the objects an import created.
+
+    :param name: The name of the import.
+    :return: The IDs, sorted.
+    """
+    r = get_redis_interface("CACHE")
+    key = make_import_ledger_key(name, "new_ids")
+    pipe = r.pipeline()
+    pipe.smembers(key)
+    pipe.delete(key)
+    new_ids, _ = pipe.execute()
+    return sorted(int(pk) for pk in new_ids)
+
+
+def clear_ledger(name: str) -> None:
+    """Forget the items an import's ledger recorded as done, to start it
+    over. The IDs of the objects it created are kept until they're indexed.
+
+    :param name: The name of the import.
+    :return: None
+    """
+    r = get_redis_interface("CACHE")
+    r.delete(make_import_ledger_key(name))
+
+
+class StageTimer:
+    """Add up the time an import spends in each of its stages, to report its
+    throughput along with where the time goes."""
+
+    def __init__(self) -> None:
+        self.start = time.monotonic()
+        self.times: Counter = Counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a stage. Stages can be timed many times, and are added up.
+
+        :param name: The name of the stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] += time.perf_counter() - start
+
+    def report(self, done: int, unit: str = "files") -> str:
+        """Describe the throughput so far and the time spent per stage.
+
+        :param done: The number of items done so far.
+        :param unit: What the items are.
+        :return: e.g. "1000 files in 50s (20.0 files/s). parse: 10s (20%)"
+        """
+        elapsed = max(time.monotonic() - self.start, 1e-6)
+        stages = ", ".join(
+            f"{name}: {seconds:.0f}s ({100 * seconds / elapsed:.0f}%)"
+            for name, seconds in self.times.most_common()
+        )
+        return (
+            f"{done} {unit} in {elapsed:.0f}s "
+            f"({done / elapsed:.1f} {unit}/s). {stages}"
+        )
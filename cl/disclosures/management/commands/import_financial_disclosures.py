@@ -1,7 +1,8 @@
 import json
+from itertools import batched
 
 from cl.disclosures.models import FinancialDisclosure
-from cl.disclosures.tasks import import_disclosure
+from cl.disclosures.tasks import import_disclosure, import_disclosures_in_bulk
 from cl.lib.celery_utils import CeleryThrottle
 from cl.lib.command_utils import VerboseCommand, logger
 
@@ -10,22 +11,59 @@ def import_financial_disclosures(
     filepath: str,
     skip_until: int,
     queue_name: str,
+    batch_size: int = 0,
+    extraction_workers: int = 4,
+    thumbnail_queue: str | None = None,
 ) -> None:
     """Import financial documents into courtlistener.
 
     :param filepath: Path to file data to import.
     :param skip_until: ID if any to skip until.
     :param queue_name: The celery queue name.
+    :param batch_size: If not 0, the number of disclosures imported per task.
+    :param extraction_workers: In batches, the number of disclosures each
+    task extracts at a time.
+    :param thumbnail_queue: In batches, the celery queue to generate
+    thumbnails in. Defaults to queue_name.
     :return:None
     """
     throttle = CeleryThrottle(queue_name=queue_name)
     with open(filepath) as f:
         disclosures = json.load(f)
+    disclosures = [data for data in disclosures if data["id"] >= skip_until]
 
-    for data in disclosures:
-        if data["id"] < skip_until:
-            continue
+    if batch_size:
+        for batch in batched(disclosures, batch_size):
+            # Check download_filepath to see if they've been processed
+            # before.
+            extracted = set(
+                FinancialDisclosure.objects.filter(
+                    download_filepath__in=[data["url"] for data in batch],
+                    has_been_extracted=True,
+                ).values_list("download_filepath", flat=True)
+            )
+            batch = [data for data in batch if data["url"] not in extracted]
+            if extracted:
+                logger.info(
+                    f"{len(extracted)} documents already extracted and saved."
+                )
+            if not batch:
+                continue
+
+            throttle.maybe_wait()
 
+            # Add the batch to celery queue
+            import_disclosures_in_bulk.apply_async(
+                args=[batch],
+                kwargs={
+                    "extraction_workers": extraction_workers,
+                    "thumbnail_queue": thumbnail_queue or queue_name,
+                },
+                queue=queue_name,
+            )
+        return
+
+    for data in disclosures:
         # Check download_filepath to see if it has been processed before.
         if FinancialDisclosure.objects.filter(
             download_filepath=data["url"], has_been_extracted=True
@@ -63,10 +101,37 @@ class Command(VerboseCommand):
             help="The celery queue where the tasks should be processed.",
         )
 
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=0,
+            help="If set, each task imports this many disclosures, "
+            "extracting them concurrently and saving their data with one "
+            "bulk insert per table.",
+        )
+
+        parser.add_argument(
+            "--extraction-workers",
+            type=int,
+            default=4,
+            help="With --batch-size, the number of disclosures each task "
+            "extracts at a time.",
+        )
+
+        parser.add_argument(
+            "--thumbnail-queue",
+            default=None,
+            help="With --batch-size, the celery queue where thumbnails are "
+            "generated, with a low priority. Defaults to --queue.",
+        )
+
     def handle(self, *args, **options):
         super().handle(*args, **options)
         import_financial_disclosures(
             filepath=options["filepath"],
             skip_until=options["skip_until"],
             queue_name=options["queue"],
+            batch_size=options["batch_size"],
+            extraction_workers=options["extraction_workers"],
+            thumbnail_queue=options["thumbnail_queue"],
         )
@@ -0,0 +1,56 @@
+# Indexes the event tables the bulk data delta exports look changes up in.
+# They're BRIN indexes, which are tiny and cheap to build, since events are
+# appended in pgh_created_at order. They aren't in the event models, which
+# pghistory generates, so they're only created in the database.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        (
+            "disclosures",
+            "0004_remove_agreement_update_or_delete_snapshot_update_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_financialdisclosureevent_created_brin" ON "disclosures_financialdisclosureevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "disclosures_financialdisclosureevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_investmentevent_created_brin" ON "disclosures_investmentevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "disclosures_investmentevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_positionevent_created_brin" ON "disclosures_positionevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "disclosures_positionevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_agreementevent_created_brin" ON "disclosures_agreementevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "disclosures_agreementevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_noninvestmentincomeevent_created_brin" ON "disclosures_noninvestmentincomeevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "disclosures_noninvestmentincomeevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_spouseincomeevent_created_brin" ON "disclosures_spouseincomeevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "disclosures_spouseincomeevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_reimbursementevent_created_brin" ON "disclosures_reimbursementevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "disclosures_reimbursementevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_giftevent_created_brin" ON "disclosures_giftevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "disclosures_giftevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_debtevent_created_brin" ON "disclosures_debtevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "disclosures_debtevent_created_brin";',
+        ),
+    ]
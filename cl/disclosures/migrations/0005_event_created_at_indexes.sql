@@ -0,0 +1,36 @@
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_financialdisclosureevent_created_brin" ON "disclosures_financialdisclosureevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_investmentevent_created_brin" ON "disclosures_investmentevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_positionevent_created_brin" ON "disclosures_positionevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_agreementevent_created_brin" ON "disclosures_agreementevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_noninvestmentincomeevent_created_brin" ON "disclosures_noninvestmentincomeevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_spouseincomeevent_created_brin" ON "disclosures_spouseincomeevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_reimbursementevent_created_brin" ON "disclosures_reimbursementevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_giftevent_created_brin" ON "disclosures_giftevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "disclosures_debtevent_created_brin" ON "disclosures_debtevent" USING brin ("pgh_created_at");
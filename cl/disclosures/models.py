@@ -285,9 +285,12 @@ class FinancialDisclosure(AbstractDateTimeModel):
             ).count(),
         }
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, make_thumbnail: bool = True, **kwargs):
         super().save(*args, **kwargs)
-        if self.thumbnail_status == THUMBNAIL_STATUSES.NEEDED:
+        if (
+            make_thumbnail
+            and self.thumbnail_status == THUMBNAIL_STATUSES.NEEDED
+        ):
             from cl.disclosures.tasks import (
                 make_financial_disclosure_thumbnail_from_pdf,
             )
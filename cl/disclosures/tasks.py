@@ -1,13 +1,18 @@
 import datetime
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Optional, Union
 
+import httpx
 import requests
 from asgiref.sync import async_to_sync
 from dateutil.parser import ParserError, parse
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
-from django.db import IntegrityError, transaction
+from django.db import DatabaseError, IntegrityError, transaction
+from django.utils.timezone import now
 from redis import ConnectionError as RedisConnectionError
 from redis import Redis
 from requests import Response
@@ -29,8 +34,12 @@ from cl.disclosures.models import (
 from cl.lib.command_utils import logger
 from cl.lib.crypto import sha1
 from cl.lib.microservice_utils import microservice
-from cl.lib.models import THUMBNAIL_STATUSES
-from cl.lib.redis_utils import create_redis_semaphore, get_redis_interface
+from cl.lib.models import THUMBNAIL_STATUSES, AbstractDateTimeModel
+from cl.lib.redis_utils import (
+    create_redis_semaphore,
+    get_redis_interface,
+    refresh_redis_semaphores,
+)
 
 
 def make_disclosure_key(data_id: str) -> str:
@@ -42,6 +51,24 @@ def make_disclosure_key(data_id: str) -> str:
     return f"disclosure.enqueued:fd-{data_id}"
 
 
+# Thumbnails are generated with the lowest priority of the Redis broker, so
+# they never hold up imports sharing their queue.
+THUMBNAIL_PRIORITY = 9
+
+# How long the semaphore of a disclosure lasts. Extracting the longest
+# disclosures takes up to 80 minutes.
+DISCLOSURE_SEMAPHORE_TTL = 60 * 60 * 2
+
+# The fields of a FinancialDisclosure that are set from its extracted data.
+EXTRACTED_FIELDS = [
+    "has_been_extracted",
+    "addendum_content_raw",
+    "addendum_redacted",
+    "is_amended",
+    "report_type",
+]
+
+
 @app.task(bind=True, max_retries=2, ignore_result=True)
 @transaction.atomic
 def make_financial_disclosure_thumbnail_from_pdf(self, pk: int) -> None:
@@ -108,6 +135,19 @@ def extract_content(
     return response.json()
 
 
+def count_pages(pdf_bytes: bytes) -> str:
+    """Count the pages of a PDF.
+
+    :param pdf_bytes: The byte array of the PDF
+    :return: The page count, or an empty string if it couldn't be counted
+    """
+    return async_to_sync(microservice)(
+        service="page-count",
+        file_type="pdf",
+        file=pdf_bytes,
+    ).text
+
+
 def get_report_type(extracted_data: dict) -> int:
     """Get report type if available
 
@@ -159,156 +199,225 @@ def get_date(text: str, year: int) -> Optional[datetime.date]:
         return None
 
 
-@transaction.atomic
-def save_disclosure(extracted_data: dict, disclosure) -> None:
-    """Save financial data to system.
+def update_extracted_fields(extracted_data: dict, disclosure) -> None:
+    """Set the fields of a disclosure that come from its extracted data,
+    without saving it.
 
-    Wrapped in a transaction, we fail if anything fails.
-
-    :param disclosure: Financial disclosure
     :param extracted_data: disclosure
-    :return:None
+    :param disclosure: Financial disclosure
+    :return: None
     """
     addendum = "Additional Information or Explanations"
 
-    # Process and save our data into the system.
     disclosure.has_been_extracted = True
     disclosure.addendum_content_raw = extracted_data[addendum]["text"]
     disclosure.addendum_redacted = extracted_data[addendum]["is_redacted"]
     disclosure.is_amended = extracted_data.get("amended") or False
     disclosure.report_type = get_report_type(extracted_data)
-    disclosure.save()
-
-    Investment.objects.bulk_create(
-        [
-            Investment(
-                financial_disclosure=disclosure,
-                redacted=any(v["is_redacted"] for v in investment.values()),
-                description=investment["A"]["text"],
-                page_number=investment["A"]["page_number"],
-                has_inferred_values=investment["A"]["inferred_value"],
-                income_during_reporting_period_code=investment["B1"]["text"],
-                income_during_reporting_period_type=investment["B2"]["text"],
-                gross_value_code=investment["C1"]["text"],
-                gross_value_method=investment["C2"]["text"],
-                transaction_during_reporting_period=investment["D1"]["text"],
-                transaction_date_raw=investment["D2"]["text"],
-                transaction_date=get_date(
-                    investment["D2"]["text"], disclosure.year
-                ),
-                transaction_value_code=investment["D3"]["text"],
-                transaction_gain_code=investment["D4"]["text"],
-                transaction_partner=investment["D5"]["text"],
-            )
-            for investment in extracted_data["sections"][
-                "Investments and Trusts"
-            ]["rows"]
-        ]
-    )
 
-    Agreement.objects.bulk_create(
-        [
-            Agreement(
-                financial_disclosure=disclosure,
-                redacted=any(v["is_redacted"] for v in agreement.values()),
-                date_raw=agreement["Date"]["text"],
-                parties_and_terms=agreement["Parties and Terms"]["text"],
-            )
-            for agreement in extracted_data["sections"]["Agreements"]["rows"]
-        ]
-    )
 
-    Debt.objects.bulk_create(
-        [
-            Debt(
-                financial_disclosure=disclosure,
-                redacted=any(v["is_redacted"] for v in debt.values()),
-                creditor_name=debt["Creditor"]["text"],
-                description=debt["Description"]["text"],
-                value_code=(
-                    debt["Value Code"]["text"]
-                    if debt["Value Code"]["text"] != "None"
-                    else ""
-                ),
-            )
-            for debt in extracted_data["sections"]["Liabilities"]["rows"]
-        ]
-    )
+@transaction.atomic
+def save_disclosure(
+    extracted_data: dict, disclosure, make_thumbnail: bool = True
+) -> None:
+    """Save financial data to system.
 
-    Position.objects.bulk_create(
-        [
-            Position(
-                financial_disclosure=disclosure,
-                redacted=any(v["is_redacted"] for v in position.values()),
-                position=position["Position"]["text"],
-                organization_name=position["Name of Organization"]["text"],
-            )
-            for position in extracted_data["sections"]["Positions"]["rows"]
-        ]
-    )
+    Wrapped in a transaction, we fail if anything fails.
 
-    Gift.objects.bulk_create(
-        [
-            Gift(
-                financial_disclosure=disclosure,
-                source=gift["Source"]["text"],
-                description=gift["Description"]["text"],
-                value=gift["Value"]["text"],
-                redacted=any(v["is_redacted"] for v in gift.values()),
-            )
-            for gift in extracted_data["sections"]["Gifts"]["rows"]
-        ]
-    )
+    :param disclosure: Financial disclosure
+    :param extracted_data: disclosure
+    :param make_thumbnail: Whether saving the disclosure should queue the
+    generation of its thumbnail, if it needs one
+    :return:None
+    """
+    # Process and save our data into the system.
+    update_extracted_fields(extracted_data, disclosure)
+    disclosure.save(make_thumbnail=make_thumbnail)
 
-    Reimbursement.objects.bulk_create(
-        [
-            Reimbursement(
-                financial_disclosure=disclosure,
-                redacted=any(v["is_redacted"] for v in reimbursement.values()),
-                source=reimbursement["Source"]["text"],
-                date_raw=reimbursement["Dates"]["text"],
-                location=reimbursement["Locations"]["text"],
-                purpose=reimbursement["Purpose"]["text"],
-                items_paid_or_provided=reimbursement["Items Paid or Provided"][
-                    "text"
-                ],
-            )
-            for reimbursement in extracted_data["sections"]["Reimbursements"][
-                "rows"
-            ]
+    for model, rows in make_disclosure_rows(
+        extracted_data, disclosure
+    ).items():
+        model.objects.bulk_create(rows)
+
+
+def make_disclosure_rows(
+    extracted_data: dict, disclosure
+) -> dict[type[AbstractDateTimeModel], list[AbstractDateTimeModel]]:
+    """Make the unsaved rows of the tables of a disclosure's data.
+
+    :param extracted_data: disclosure
+    :param disclosure: Financial disclosure
+    :return: A dict mapping the models of the tables to their rows
+    """
+    rows: dict[type[AbstractDateTimeModel], list] = {}
+    rows[Investment] = [
+        Investment(
+            financial_disclosure=disclosure,
+            redacted=any(v["is_redacted"] for v in investment.values()),
+            description=investment["A"]["text"],
+            page_number=investment["A"]["page_number"],
+            has_inferred_values=investment["A"]["inferred_value"],
+            income_during_reporting_period_code=investment["B1"]["text"],
+            income_during_reporting_period_type=investment["B2"]["text"],
+            gross_value_code=investment["C1"]["text"],
+            gross_value_method=investment["C2"]["text"],
+            transaction_during_reporting_period=investment["D1"]["text"],
+            transaction_date_raw=investment["D2"]["text"],
+            transaction_date=get_date(
+                investment["D2"]["text"], disclosure.year
+            ),
+            transaction_value_code=investment["D3"]["text"],
+            transaction_gain_code=investment["D4"]["text"],
+            transaction_partner=investment["D5"]["text"],
+        )
+        for investment in extracted_data["sections"]["Investments and Trusts"][
+            "rows"
         ]
-    )
+    ]
+
+    rows[Agreement] = [
+        Agreement(
+            financial_disclosure=disclosure,
+            redacted=any(v["is_redacted"] for v in agreement.values()),
+            date_raw=agreement["Date"]["text"],
+            parties_and_terms=agreement["Parties and Terms"]["text"],
+        )
+        for agreement in extracted_data["sections"]["Agreements"]["rows"]
+    ]
+
+    rows[Debt] = [
+        Debt(
+            financial_disclosure=disclosure,
+            redacted=any(v["is_redacted"] for v in debt.values()),
+            creditor_name=debt["Creditor"]["text"],
+            description=debt["Description"]["text"],
+            value_code=(
+                debt["Value Code"]["text"]
+                if debt["Value Code"]["text"] != "None"
+                else ""
+            ),
+        )
+        for debt in extracted_data["sections"]["Liabilities"]["rows"]
+    ]
+
+    rows[Position] = [
+        Position(
+            financial_disclosure=disclosure,
+            redacted=any(v["is_redacted"] for v in position.values()),
+            position=position["Position"]["text"],
+            organization_name=position["Name of Organization"]["text"],
+        )
+        for position in extracted_data["sections"]["Positions"]["rows"]
+    ]
+
+    rows[Gift] = [
+        Gift(
+            financial_disclosure=disclosure,
+            source=gift["Source"]["text"],
+            description=gift["Description"]["text"],
+            value=gift["Value"]["text"],
+            redacted=any(v["is_redacted"] for v in gift.values()),
+        )
+        for gift in extracted_data["sections"]["Gifts"]["rows"]
+    ]
+
+    rows[Reimbursement] = [
+        Reimbursement(
+            financial_disclosure=disclosure,
+            redacted=any(v["is_redacted"] for v in reimbursement.values()),
+            source=reimbursement["Source"]["text"],
+            date_raw=reimbursement["Dates"]["text"],
+            location=reimbursement["Locations"]["text"],
+            purpose=reimbursement["Purpose"]["text"],
+            items_paid_or_provided=reimbursement["Items Paid or Provided"][
+                "text"
+            ],
+        )
+        for reimbursement in extracted_data["sections"]["Reimbursements"][
+            "rows"
+        ]
+    ]
 
-    NonInvestmentIncome.objects.bulk_create(
-        [
-            NonInvestmentIncome(
-                financial_disclosure=disclosure,
-                redacted=any(
-                    v["is_redacted"] for v in non_investment_income.values()
-                ),
-                date_raw=non_investment_income["Date"]["text"],
-                source_type=non_investment_income["Source and Type"]["text"],
-                income_amount=non_investment_income["Income"]["text"],
+    rows[NonInvestmentIncome] = [
+        NonInvestmentIncome(
+            financial_disclosure=disclosure,
+            redacted=any(
+                v["is_redacted"] for v in non_investment_income.values()
+            ),
+            date_raw=non_investment_income["Date"]["text"],
+            source_type=non_investment_income["Source and Type"]["text"],
+            income_amount=non_investment_income["Income"]["text"],
+        )
+        for non_investment_income in extracted_data["sections"][
+            "Non-Investment Income"
+        ]["rows"]
+    ]
+
+    rows[SpouseIncome] = [
+        SpouseIncome(
+            financial_disclosure=disclosure,
+            redacted=any(v["is_redacted"] for v in spouse_income.values()),
+            date_raw=spouse_income["Date"]["text"],
+            source_type=spouse_income["Source and Type"]["text"],
+        )
+        for spouse_income in extracted_data["sections"][
+            "Non Investment Income Spouse"
+        ]["rows"]
+    ]
+    return rows
+
+
+def save_disclosures_in_bulk(
+    extracted: list[tuple[FinancialDisclosure, dict]],
+) -> None:
+    """Save the financial data of many disclosures, with one bulk_create per
+    table for all of them.
+
+    If the batch fails to save, each disclosure is saved on its own, so one
+    bad disclosure doesn't sink the others.
+
+    :param extracted: A list of (disclosure, extracted data) tuples
+    :return: None
+    """
+    built = []
+    rows_by_model = defaultdict(list)
+    for disclosure, extracted_data in extracted:
+        try:
+            rows = make_disclosure_rows(extracted_data, disclosure)
+            update_extracted_fields(extracted_data, disclosure)
+        except (KeyError, TypeError):
+            logger.exception(
+                "Malformed extracted data for disclosure",
+                extra={"disclosure_id": disclosure.pk},
             )
-            for non_investment_income in extracted_data["sections"][
-                "Non-Investment Income"
-            ]["rows"]
-        ]
-    )
+            continue
+        disclosure.date_modified = now()
+        built.append((disclosure, extracted_data))
+        for model, model_rows in rows.items():
+            rows_by_model[model].extend(model_rows)
 
-    SpouseIncome.objects.bulk_create(
-        [
-            SpouseIncome(
-                financial_disclosure=disclosure,
-                redacted=any(v["is_redacted"] for v in spouse_income.values()),
-                date_raw=spouse_income["Date"]["text"],
-                source_type=spouse_income["Source and Type"]["text"],
+    try:
+        with transaction.atomic():
+            FinancialDisclosure.objects.bulk_update(
+                [disclosure for disclosure, _ in built],
+                EXTRACTED_FIELDS + ["date_modified"],
             )
-            for spouse_income in extracted_data["sections"][
-                "Non Investment Income Spouse"
-            ]["rows"]
-        ]
-    )
+            for model, rows in rows_by_model.items():
+                model.objects.bulk_create(rows, batch_size=1000)
+    except (DatabaseError, ValidationError):
+        logger.exception(
+            "Failed to save a batch of disclosures, saving them one at a time"
+        )
+        for disclosure, extracted_data in built:
+            try:
+                save_disclosure(
+                    extracted_data, disclosure, make_thumbnail=False
+                )
+            except (DatabaseError, ValidationError):
+                logger.exception(
+                    "Error saving disclosure",
+                    extra={"disclosure_id": disclosure.pk},
+                )
 
 
 def save_and_upload_disclosure(
@@ -316,6 +425,8 @@ def save_and_upload_disclosure(
     disclosure_key: str,
     response: Response,
     data: dict,
+    page_count: Optional[str] = None,
+    make_thumbnail: bool = True,
 ) -> Optional[FinancialDisclosure]:
     """Save disclosure PDF to S3 and generate a FinancialDisclosure object.
 
@@ -323,6 +434,8 @@ def save_and_upload_disclosure(
     :param disclosure_key: The disclosure key for the redis db
     :param response: The pdf data response object
     :param data: The judge data as a dict
+    :param page_count: The page count of the PDF, if it was already counted
+    :param make_thumbnail: Whether to queue the generation of the thumbnail
     :return: Financial discsosure object or None
     """
     sha1_hash = sha1(response.content)
@@ -330,11 +443,8 @@ def save_and_upload_disclosure(
     if len(disclosure) > 0:
         return disclosure[0]
 
-    page_count = async_to_sync(microservice)(
-        service="page-count",
-        file_type="pdf",
-        file=response.content,
-    ).text
+    if page_count is None:
+        page_count = count_pages(response.content)
     if not page_count:
         logger.error(
             msg="Page count failed",
@@ -357,7 +467,9 @@ def save_and_upload_disclosure(
     disclosure.filepath.save(
         f"{disclosure.person.slug}-disclosure.{data['year']}.pdf",
         ContentFile(response.content),
+        save=False,
     )
+    disclosure.save(make_thumbnail=make_thumbnail)
     logger.info(
         f"Uploaded to https://{settings.AWS_S3_CUSTOM_DOMAIN}/"
         f"{disclosure.filepath}"
@@ -383,7 +495,7 @@ def import_disclosure(self, data: dict[str, Union[str, int, list]]) -> None:
     newly_enqueued = create_redis_semaphore(
         redis_db,
         disclosure_key,
-        ttl=60 * 60 * 2,
+        ttl=DISCLOSURE_SEMAPHORE_TTL,
     )
 
     if not newly_enqueued:
@@ -447,3 +559,204 @@ def import_disclosure(self, data: dict[str, Union[str, int, list]]) -> None:
 
     # Remove disclosure ID in redis for completed disclosure
     redis_db.delete(disclosure_key)
+
+
+@dataclass
+class FetchedDisclosure:
+    """A disclosure PDF downloaded for a batch import, and what the
+    microservices made of it."""
+
+    data: dict
+    response: Optional[Response] = None
+    page_count: Optional[str] = None
+    content: dict = field(default_factory=dict)
+    # Whether the download or a microservice failed in a way worth retrying
+    failed: bool = False
+
+
+def fetch_disclosure(
+    data: dict, disclosure_key: str, needs_page_count: bool
+) -> FetchedDisclosure:
+    """Download a disclosure PDF, and extract its content. Nothing is saved,
+    so this can run in a thread of its own.
+
+    :param data: The disclosure information to process
+    :param disclosure_key: The disclosure key for the redis db
+    :param needs_page_count: Whether to count the pages of the PDF too
+    :return: The fetched disclosure. Its response is None if the download
+    failed, and it's marked as failed if that can be retried.
+    """
+    fetched = FetchedDisclosure(data)
+    try:
+        response = requests.get(data["url"], timeout=60 * 20)
+        if not response.ok:
+            logger.error(
+                f"Failed to download {data['id']} {data['url']}",
+                extra={"disclosure_id": data["id"]},
+            )
+            return fetched
+        fetched.response = response
+        if needs_page_count:
+            fetched.page_count = count_pages(response.content)
+        fetched.content = extract_content(
+            pdf_bytes=response.content,
+            disclosure_key=disclosure_key,
+        )
+    except (RequestException, httpx.HTTPError):
+        logger.exception(
+            f"Failed to fetch {data['id']} {data['url']}",
+            extra={"disclosure_id": data["id"]},
+        )
+        fetched.failed = True
+    return fetched
+
+
+def enqueue_thumbnails(pks: list[int], queue: str) -> None:
+    """Queue the generation of the thumbnails of some disclosures, behind
+    everything else in their queue.
+
+    :param pks: The PKs of the disclosures
+    :param queue: The celery queue to generate them in
+    :return: None
+    """
+    for pk in pks:
+        make_financial_disclosure_thumbnail_from_pdf.apply_async(
+            args=(pk,), queue=queue, priority=THUMBNAIL_PRIORITY
+        )
+
+
+@app.task(
+    bind=True,
+    autoretry_for=(RedisConnectionError,),
+    max_retries=2,
+    interval_start=10,
+    ignore_result=True,
+)
+def import_disclosures_in_bulk(
+    self,
+    batch: list[dict[str, Union[str, int, list]]],
+    extraction_workers: int = 4,
+    thumbnail_queue: str = "celery",
+) -> None:
+    """Import a batch of disclosures into Courtlistener
+
+    The PDFs are downloaded and extracted concurrently, by a bounded pool of
+    threads, since that's all waiting on the network and the microservices.
+    Then the disclosures are saved with one bulk_create per table for the
+    whole batch, and their thumbnails are queued with a low priority.
+
+    Disclosures that fail to download or extract because of a network error
+    are retried in a batch of their own, so the rest of the batch isn't
+    imported again.
+
+    :param batch: The information of the disclosures to process
+    :param extraction_workers: The number of disclosures to download and
+    extract at a time
+    :param thumbnail_queue: The celery queue to generate thumbnails in
+    :return: None
+    """
+    redis_db = get_redis_interface("CACHE")
+    keys = {}
+    for data in batch:
+        disclosure_key = make_disclosure_key(data["id"])
+        if create_redis_semaphore(
+            redis_db, disclosure_key, ttl=DISCLOSURE_SEMAPHORE_TTL
+        ):
+            keys[data["id"]] = disclosure_key
+        else:
+            logger.info(
+                f"Process is already running {data['id']}. {disclosure_key}",
+            )
+    batch = [data for data in batch if data["id"] in keys]
+    if not batch:
+        return
+
+    thumbnails = []
+    failed = []
+    try:
+        # Check if disclosures already exist
+        existing = {}
+        for disclosure in FinancialDisclosure.objects.filter(
+            download_filepath__in=[data["url"] for data in batch]
+        ).order_by("-pk"):
+            existing[disclosure.download_filepath] = disclosure
+        batch = [
+            data
+            for data in batch
+            if not (
+                data["url"] in existing
+                and existing[data["url"]].has_been_extracted
+            )
+        ]
+
+        def fetch(data: dict) -> FetchedDisclosure:
+            item = fetch_disclosure(
+                data, keys[data["id"]], data["url"] not in existing
+            )
+            # The semaphores are held until the whole batch is saved, so
+            # keep them alive as long as extractions keep finishing. If the
+            # worker dies, they expire like those of single imports.
+            refresh_redis_semaphores(
+                redis_db, keys.values(), DISCLOSURE_SEMAPHORE_TTL
+            )
+            return item
+
+        logger.info(f"Fetching {len(batch)} disclosures")
+        with ThreadPoolExecutor(extraction_workers) as executor:
+            fetched = list(executor.map(fetch, batch))
+
+        extracted = []
+        for item in fetched:
+            data = item.data
+            if item.failed:
+                failed.append(data)
+                continue
+            if item.response is None:
+                continue
+            disclosure = existing.get(data["url"])
+            if disclosure is None:
+                disclosure = save_and_upload_disclosure(
+                    redis_db,
+                    keys[data["id"]],
+                    item.response,
+                    data,
+                    page_count=item.page_count,
+                    make_thumbnail=False,
+                )
+            if not disclosure:
+                logger.error(
+                    f"Disclosure failed to save or upload to aws "
+                    f"{data['id']} {data['url']}",
+                    extra={"disclosure_id": data["id"]},
+                )
+                continue
+            if disclosure.thumbnail_status == THUMBNAIL_STATUSES.NEEDED:
+                thumbnails.append(disclosure.pk)
+            if item.content:
+                extracted.append((disclosure, item.content))
+
+        logger.info(f"Saving {len(extracted)} disclosures")
+        save_disclosures_in_bulk(extracted)
+    finally:
+        # Remove disclosure IDs in redis for completed disclosures
+        redis_db.delete(*keys.values())
+
+    enqueue_thumbnails(thumbnails, thumbnail_queue)
+
+    if not failed:
+        return
+    if self.request.retries >= self.max_retries:
+        logger.error(
+            f"Giving up on {len(failed)} disclosures after "
+            f"{self.request.retries} retries",
+            extra={"disclosure_ids": [data["id"] for data in failed]},
+        )
+        return
+    raise self.retry(
+        args=(failed,),
+        kwargs={
+            "extraction_workers": extraction_workers,
+            "thumbnail_queue": thumbnail_queue,
+        },
+        countdown=60,
+    )
@@ -1,8 +1,12 @@
 import json
 import os
+from unittest import mock
 
+import httpx
 from asgiref.sync import sync_to_async
+from celery.exceptions import Retry
 from django.conf import settings
+from django.db import DataError
 from django.urls import reverse
 from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.common.by import By
@@ -24,12 +28,20 @@ from cl.disclosures.models import (
     NonInvestmentIncome,
     Reimbursement,
 )
-from cl.disclosures.tasks import save_disclosure
+from cl.disclosures.tasks import (
+    DISCLOSURE_SEMAPHORE_TTL,
+    import_disclosures_in_bulk,
+    make_disclosure_key,
+    save_disclosure,
+    save_disclosures_in_bulk,
+)
 from cl.lib.microservice_utils import microservice
+from cl.lib.redis_utils import get_redis_interface
 from cl.people_db.factories import PersonWithChildrenFactory
 from cl.people_db.models import Person
 from cl.tests.base import SELENIUM_TIMEOUT, BaseSeleniumTest
 from cl.tests.cases import TestCase
+from cl.tests.utils import MockResponse
 
 
 class DisclosureIngestionTest(TestCase):
@@ -54,7 +66,7 @@ class DisclosureIngestionTest(TestCase):
         cls.test_disclosure = FinancialDisclosureFactory.create(
             person=judge,
         )
-        FinancialDisclosureFactory.create(
+        cls.other_disclosure = FinancialDisclosureFactory.create(
             person=judge,
         )
 
@@ -85,6 +97,117 @@ class DisclosureIngestionTest(TestCase):
             f"Should have 2 ingested non-investments, not {non_investments.count()}",
         )
 
+    def test_financial_disclosure_ingestion_in_bulk(self) -> None:
+        """Can we ingest a batch of disclosures at once?"""
+        with open(self.test_file, "r") as f:
+            extracted_data = json.load(f)
+        Investment.objects.all().delete()
+        Reimbursement.objects.all().delete()
+
+        save_disclosures_in_bulk(
+            [
+                (self.test_disclosure, extracted_data),
+                (self.other_disclosure, extracted_data),
+                # Malformed data is skipped
+                (self.other_disclosure, {}),
+            ]
+        )
+        for disclosure in (self.test_disclosure, self.other_disclosure):
+            disclosure.refresh_from_db()
+            self.assertTrue(disclosure.has_been_extracted)
+            self.assertEqual(disclosure.investments.count(), 19)
+            self.assertEqual(disclosure.reimbursements.count(), 5)
+
+    def test_failed_bulk_save_saves_disclosures_one_at_a_time(self) -> None:
+        """If the batch fails to save because of a DB error, is each
+        disclosure saved on its own?
+        """
+        with open(self.test_file, "r") as f:
+            extracted_data = json.load(f)
+        Investment.objects.all().delete()
+
+        with mock.patch.object(
+            FinancialDisclosure.objects,
+            "bulk_update",
+            side_effect=DataError("value too long"),
+        ):
+            save_disclosures_in_bulk(
+                [
+                    (self.test_disclosure, extracted_data),
+                    (self.other_disclosure, extracted_data),
+                ]
+            )
+        for disclosure in (self.test_disclosure, self.other_disclosure):
+            disclosure.refresh_from_db()
+            self.assertTrue(disclosure.has_been_extracted)
+            self.assertEqual(disclosure.investments.count(), 19)
+
+    def test_import_disclosures_in_bulk_retries_failures(self) -> None:
+        """Is a disclosure that fails to extract retried on its own, while
+        the rest of its batch is imported?
+        """
+        with open(self.test_file, "r") as f:
+            extracted_data = json.load(f)
+        batch = []
+        for i, disclosure in enumerate(
+            (self.test_disclosure, self.other_disclosure)
+        ):
+            url = f"https://example.com/disclosure-{i}.pdf"
+            FinancialDisclosure.objects.filter(pk=disclosure.pk).update(
+                download_filepath=url, has_been_extracted=False
+            )
+            batch.append(
+                {
+                    "id": i,
+                    "url": url,
+                    "person_id": disclosure.person_id,
+                    "year": disclosure.year,
+                }
+            )
+        r = get_redis_interface("CACHE")
+        r.delete(*[make_disclosure_key(data["id"]) for data in batch])
+
+        ttls = []
+
+        def extract_content(pdf_bytes, disclosure_key):
+            ttls.append(r.ttl(disclosure_key))
+            if disclosure_key == make_disclosure_key(1):
+                raise httpx.ConnectError("The microservice is down")
+            return extracted_data
+
+        with (
+            mock.patch(
+                "cl.disclosures.tasks.requests.get",
+                return_value=MockResponse(200, b"%PDF-1.4"),
+            ),
+            mock.patch(
+                "cl.disclosures.tasks.extract_content",
+                side_effect=extract_content,
+            ),
+            mock.patch("cl.disclosures.tasks.enqueue_thumbnails"),
+            mock.patch.object(
+                import_disclosures_in_bulk, "retry", return_value=Retry()
+            ) as retry_mock,
+        ):
+            with self.assertRaises(Retry):
+                import_disclosures_in_bulk(batch)
+
+        # Only the failed disclosure is retried.
+        retry_mock.assert_called_once()
+        self.assertEqual(retry_mock.call_args.kwargs["args"], ([batch[1]],))
+        self.test_disclosure.refresh_from_db()
+        self.assertTrue(self.test_disclosure.has_been_extracted)
+        self.assertEqual(self.test_disclosure.investments.count(), 19)
+        self.other_disclosure.refresh_from_db()
+        self.assertFalse(self.other_disclosure.has_been_extracted)
+        # The semaphores are released, so the retry can take them again.
+        self.assertFalse(r.exists(make_disclosure_key(1)))
+        # They're held as long as a single import holds its own, not for the
+        # time the whole batch could take.
+        self.assertTrue(
+            all(0 < ttl <= DISCLOSURE_SEMAPHORE_TTL for ttl in ttls)
+        )
+
     async def test_extraction_and_ingestion_jef(self) -> None:
         """Can we successfully ingest disclosures from jef documents?"""
         with open(self.jef_pdf, "rb") as f:
@@ -1,6 +1,6 @@
 import time
 import uuid
-from typing import Union
+from typing import Iterable, Union
 
 from django.conf import settings
 from redis import Redis
@@ -75,6 +75,25 @@ def delete_redis_semaphore(r: Union[str, Redis], key: str) -> None:
     r.delete(key)
 
 
+def refresh_redis_semaphores(
+    r: Union[str, Redis], keys: Iterable[str], ttl: int
+) -> None:
+    """Reset the TTL of some redis semaphores, to keep holding them
+
+    :param r: The Redis DB to connect to as a connection interface or str that
+    can be handed off to get_redis_interface.
+    :param keys: The keys of the semaphores
+    :param ttl: How long the keys should live from now, in seconds.
+    :return: None
+    """
+    if isinstance(r, str):
+        r = get_redis_interface(r)
+    pipe = r.pipeline()
+    for key in keys:
+        pipe.expire(key, ttl)
+    pipe.execute()
+
+
 def make_update_pacer_case_id_key(court_id: str) -> str:
     return f"update.pacer_case_id:{court_id}"
 
@@ -124,3 +143,60 @@ def release_redis_lock(r: Redis, key: str, identifier: str) -> int:
     end
     """
     return r.eval(lua_script, 1, key, identifier)
+
+
+def acquire_redis_slot(
+    r: Redis, key: str, limit: int, ttl: int, timeout: int
+) -> str:
+    """Acquires one of the slots of a counting semaphore in Redis.
+
+    At most `limit` slots of a key can be held at once. If they are all in
+    use, this retries until one is released or the timeout passes. Slots held
+    for longer than their TTL are considered abandoned, so a process that
+    crashes while holding a slot doesn't keep it forever.
+
+    :param r: The Redis DB to connect to as a connection interface.
+    :param key: The key for the semaphore in Redis.
+    :param limit: The number of slots of the semaphore.
+    :param ttl: Time-to-live for the slot in milliseconds.
+    :param timeout: How long to wait for a free slot in milliseconds.
+    :return: A unique identifier for the slot.
+    :raises: TimeoutError if no slot was free before the timeout.
+    """
+    # Lua script to drop abandoned slots and take a free one, atomically
+    lua_script = """
+    local key = KEYS[1]
+    local limit = tonumber(ARGV[1])
+    local ttl = tonumber(ARGV[2])
+    local identifier = ARGV[3]
+    local time = redis.call("TIME")
+    local now = time[1] * 1000 + math.floor(time[2] / 1000)
+
+    redis.call("ZREMRANGEBYSCORE", key, "-inf", now - ttl)
+    if redis.call("ZCARD", key) < limit then
+        redis.call("ZADD", key, now, identifier)
+        redis.call("PEXPIRE", key, ttl)
+        return 1
+    else
+        return 0
+    end
+    """
+    identifier = str(uuid.uuid4())
+    deadline = time.monotonic() + timeout / 1000
+    while True:
+        if r.eval(lua_script, 1, key, limit, ttl, identifier):
+            return identifier
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"No free slot in {key} after {timeout} ms.")
+        time.sleep(0.1)
+
+
+def release_redis_slot(r: Redis, key: str, identifier: str) -> int:
+    """Releases a slot of a counting semaphore in Redis.
+
+    :param r: The Redis DB to connect to as a connection interface.
+    :param key: The key for the semaphore in Redis.
+    :param identifier: The unique identifier for the slot.
+    :return: 1 if the slot was released, 0 if it had already expired.
+    """
+    return r.zrem(key, identifier)
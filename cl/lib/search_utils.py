@@ -10,11 +10,11 @@ from django.core.paginator import Page
 from django.http import HttpRequest, QueryDict
 from eyecite import get_citations
 from eyecite.models import FullCaseCitation
-from eyecite.tokenizers import HyperscanTokenizer
 from requests import Session
 from scorched.response import SolrResponse
 
 from cl.citations.match_citations import search_db_for_fullcitation
+from cl.citations.tokenizers import get_hyperscan_tokenizer
 from cl.citations.utils import get_citation_depth_between_clusters
 from cl.lib.bot_detector import is_bot
 from cl.lib.scorched_utils import ExtraSolrInterface
@@ -41,8 +41,6 @@ from cl.search.models import (
     RECAPDocument,
 )
 
-HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
-
 
 def get_solr_interface(
     cd: CleanData, http_connection: Session | None = None
@@ -100,7 +98,7 @@ def get_query_citation(cd: CleanData) -> Optional[List[FullCaseCitation]]:
     """
     if not cd.get("q"):
         return None
-    citations = get_citations(cd["q"], tokenizer=HYPERSCAN_TOKENIZER)
+    citations = get_citations(cd["q"], tokenizer=get_hyperscan_tokenizer())
 
     citations = [c for c in citations if isinstance(c, FullCaseCitation)]
 
@@ -3,6 +3,7 @@ import math
 import re
 import string
 from collections import Counter
+from typing import Iterator
 
 
 def remove_words(phrase):
@@ -126,3 +127,92 @@ def get_cosine_similarity(left_str: str, right_str: str) -> float:
         return 0.0
     else:
         return float(numerator) / denominator
+
+
+class SuffixAutomaton:
+    """The smallest automaton accepting every substring of a text.
+
+    It's built in time linear in the length of the text, after which
+    substrings can be matched against the text a character at a time, in
+    constant time per character, instead of searching the text for each of
+    them.
+
+    States are numbered, with 0 as the initial state, which matches the
+    empty string.
+    """
+
+    def __init__(self, text: str) -> None:
+        # For each state: its transitions, its suffix link, the length of the
+        # longest string it matches, and the end of the first occurrence of
+        # its strings in the text.
+        self.transitions: list[dict[str, int]] = [{}]
+        self.links = [-1]
+        self.lengths = [0]
+        self.first_ends = [-1]
+        last = 0
+        for i, char in enumerate(text):
+            last = self._extend(last, char, i)
+
+    def _add_state(self, length: int, first_end: int) -> int:
+        self.transitions.append({})
+        self.links.append(-1)
+        self.lengths.append(length)
+        self.first_ends.append(first_end)
+        return len(self.lengths) - 1
+
+    def _extend(self, last: int, char: str, index: int) -> int:
+        transitions, links = self.transitions, self.links
+        lengths = self.lengths
+        current = self._add_state(lengths[last] + 1, index)
+        state = last
+        while state != -1 and char not in transitions[state]:
+            transitions[state][char] = current
+            state = links[state]
+        if state == -1:
+            links[current] = 0
+            return current
+
+        next_state = transitions[state][char]
+        if lengths[state] + 1 == lengths[next_state]:
+            links[current] = next_state
+            return current
+
+        clone = self._add_state(
+            lengths[state] + 1, self.first_ends[next_state]
+        )
+        transitions[clone] = dict(transitions[next_state])
+        links[clone] = links[next_state]
+        while state != -1 and transitions[state].get(char) == next_state:
+            transitions[state][char] = clone
+            state = links[state]
+        links[next_state] = links[current] = clone
+        return current
+
+    def greedy_matches(self, text: str) -> Iterator[tuple[int, int]]:
+        """Split a text into the longest substrings of the automaton's text,
+        from left to right, and find where each of them first occurs in it.
+
+        Each substring is extended a character at a time until it no longer
+        occurs in the automaton's text. The next one starts at the character
+        that didn't match.
+
+        :param text: The text to split.
+        :return: An iterator of (start, length) tuples, giving the first
+        occurrence of each substring in the automaton's text. Characters
+        that don't occur in it at all are skipped.
+        """
+        transitions, first_ends = self.transitions, self.first_ends
+        state = length = 0
+        for char in text:
+            next_state = transitions[state].get(char)
+            if next_state is not None:
+                state = next_state
+                length += 1
+                continue
+            if length:
+                # The strings of a state all end at the same places.
+                yield first_ends[state] - length + 1, length
+            state = transitions[0].get(char, 0)
+            length = 1 if state else 0
+        if length:
+            yield first_ends[state] - length + 1, length
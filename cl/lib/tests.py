@@ -1,12 +1,15 @@
 import datetime
 import pickle
+import time
 from typing import Tuple, TypedDict, cast
 from unittest.mock import patch
 
 from asgiref.sync import async_to_sync
 from django.conf import settings
 from django.core.files.base import ContentFile
-from django.test import override_settings
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from requests.cookies import RequestsCookieJar
 
 from cl.lib.date_time import midnight_pt
@@ -37,10 +40,13 @@ from cl.lib.privacy_tools import anonymize
 from cl.lib.ratelimiter import parse_rate
 from cl.lib.redis_utils import (
     acquire_redis_lock,
+    acquire_redis_slot,
     get_redis_interface,
     release_redis_lock,
+    release_redis_slot,
 )
 from cl.lib.search_utils import make_fq
+from cl.lib.string_diff import SuffixAutomaton
 from cl.lib.string_utils import normalize_dashes, trunc
 from cl.lib.utils import (
     check_for_proximity_tokens,
@@ -49,6 +55,13 @@ from cl.lib.utils import (
     sanitize_unbalanced_parenthesis,
     sanitize_unbalanced_quotes,
 )
+from cl.lib.view_utils import (
+    VIEW_COUNT_KEY_PREFIX,
+    flush_view_counts,
+    get_pending_view_counts,
+    increment_view_count,
+    make_view_count_key,
+)
 from cl.people_db.models import Role
 from cl.recap.models import UPLOAD_TYPE, PacerHtmlFiles
 from cl.search.factories import (
@@ -295,6 +308,20 @@ class TestStringUtils(SimpleTestCase):
             self.assertEqual(computed, answer)
 
 
+class TestSuffixAutomaton(SimpleTestCase):
+    def test_greedy_matches(self) -> None:
+        """Is a text split into the longest substrings of another, found at
+        their first occurrences?
+        """
+        automaton = SuffixAutomaton("abcab xyz abcd")
+        self.assertEqual(
+            list(automaton.greedy_matches("abcdq xyab")),
+            # "abcd", then " xy" after skipping "q", then "ab".
+            [(10, 4), (5, 3), (0, 2)],
+        )
+        self.assertEqual(list(automaton.greedy_matches("qqq")), [])
+
+
 class TestMakeFQ(SimpleTestCase):
     def test_make_fq(self) -> None:
         test_pairs = (
@@ -1258,6 +1285,124 @@ class TestRedisUtils(SimpleTestCase):
         result = release_redis_lock(r, lock_key, identifier)
         self.assertEqual(result, 1)
 
+    def test_redis_slots(self) -> None:
+        """Test acquiring and releasing the slots of a Redis semaphore."""
+
+        slots_key = "test_slots"
+        r = get_redis_interface("CACHE")
+        r.delete(slots_key)
+        first = acquire_redis_slot(r, slots_key, 2, 2000, 1000)
+        second = acquire_redis_slot(r, slots_key, 2, 2000, 1000)
+        self.assertNotEqual(first, second)
+        self.assertEqual(r.zcard(slots_key), 2)
+
+        self.assertEqual(release_redis_slot(r, slots_key, first), 1)
+        self.assertEqual(r.zcard(slots_key), 1)
+        release_redis_slot(r, slots_key, second)
+
+    def test_abandoned_redis_slots_expire(self) -> None:
+        """Is a slot that is never released freed after its TTL?"""
+
+        slots_key = "test_slots"
+        r = get_redis_interface("CACHE")
+        r.delete(slots_key)
+        acquire_redis_slot(r, slots_key, 1, 200, 1000)
+        start = time.monotonic()
+        identifier = acquire_redis_slot(r, slots_key, 1, 200, 1000)
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+        self.assertEqual(r.zrange(slots_key, 0, -1), [identifier])
+        release_redis_slot(r, slots_key, identifier)
+
+    def test_redis_slots_timeout(self) -> None:
+        """Does waiting for a slot give up once the timeout passes?"""
+
+        slots_key = "test_slots"
+        r = get_redis_interface("CACHE")
+        r.delete(slots_key)
+        identifier = acquire_redis_slot(r, slots_key, 1, 2000, 1000)
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            acquire_redis_slot(r, slots_key, 1, 2000, 200)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(r.zrange(slots_key, 0, -1), [identifier])
+        release_redis_slot(r, slots_key, identifier)
+
+
+class TestViewCounts(TestCase):
+    """Test the write-behind view counters."""
+
+    def setUp(self) -> None:
+        self.r = get_redis_interface("STATS")
+        for key in self.r.scan_iter(match=f"{VIEW_COUNT_KEY_PREFIX}:*"):
+            self.r.delete(key)
+        self.court = CourtFactory(id="canb", jurisdiction="FB")
+        self.dockets = DocketFactory.create_batch(3, court=self.court)
+        self.date_modified = self.dockets[0].date_modified
+
+    def tearDown(self) -> None:
+        self.r.delete(make_view_count_key(Docket))
+
+    def test_views_are_flushed_in_one_query(self) -> None:
+        """Are views counted in Redis and then written in bulk?"""
+        request = RequestFactory().get("/")
+        view_count = self.dockets[0].view_count
+        for _ in range(3):
+            docket = Docket.objects.get(pk=self.dockets[0].pk)
+            async_to_sync(increment_view_count)(docket, request)
+        # The object shows the live count, but the DB isn't touched.
+        self.assertEqual(docket.view_count, view_count + 3)
+        docket.refresh_from_db()
+        self.assertEqual(docket.view_count, view_count)
+
+        async_to_sync(increment_view_count)(self.dockets[1], request)
+        self.assertEqual(
+            get_pending_view_counts(Docket, [d.pk for d in self.dockets]),
+            {self.dockets[0].pk: 3, self.dockets[1].pk: 1},
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(flush_view_counts(), 2)
+        updates = [q for q in ctx.captured_queries if "UPDATE" in q["sql"]]
+        self.assertEqual(len(updates), 1)
+
+        docket.refresh_from_db()
+        self.assertEqual(docket.view_count, view_count + 3)
+        self.assertEqual(docket.date_modified, self.date_modified)
+        self.assertEqual(
+            get_pending_view_counts(Docket, [d.pk for d in self.dockets]), {}
+        )
+        # Nothing is left in Redis to be added again by the next flush.
+        self.assertEqual(
+            list(self.r.scan_iter(match=f"{VIEW_COUNT_KEY_PREFIX}:*")), []
+        )
+
+    def test_failed_flush_keeps_the_views(self) -> None:
+        """Are the views put back in Redis if the update fails?"""
+        docket = self.dockets[0]
+        view_count = docket.view_count
+        async_to_sync(increment_view_count)(docket, RequestFactory().get("/"))
+        with patch(
+            "cl.lib.view_utils.add_view_counts", side_effect=ValueError
+        ), self.assertRaises(ValueError):
+            flush_view_counts()
+        self.assertEqual(
+            get_pending_view_counts(Docket, [docket.pk]), {docket.pk: 1}
+        )
+
+        self.assertEqual(flush_view_counts(), 1)
+        docket.refresh_from_db()
+        self.assertEqual(docket.view_count, view_count + 1)
+
+    def test_bots_see_pending_views(self) -> None:
+        """Do bots see the live count without incrementing it?"""
+        docket = self.dockets[0]
+        view_count = docket.view_count
+        async_to_sync(increment_view_count)(docket, RequestFactory().get("/"))
+        bot_request = RequestFactory().get("/", HTTP_USER_AGENT="Googlebot")
+        docket.refresh_from_db()
+        async_to_sync(increment_view_count)(docket, bot_request)
+        self.assertEqual(docket.view_count, view_count + 1)
+
 
 class TestLinkifyOrigDocketNumber(SimpleTestCase):
     def test_linkify_orig_docket_number(self):
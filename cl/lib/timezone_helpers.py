@@ -1,11 +1,26 @@
 from datetime import date, datetime, time
+from functools import cache
 
 import pytz
 from django.utils.timezone import is_naive
+from pytz.tzinfo import BaseTzInfo
 
 from cl.recap.constants import COURT_TIMEZONES
 
 
+@cache
+def get_court_timezone(court_id: str) -> BaseTzInfo:
+    """Get the timezone of a court.
+
+    Looking up a pytz timezone isn't free, and we do it for every docket entry
+    we merge, so the result is cached per court.
+
+    :param court_id: The court_id to get the timezone for.
+    :return: The court's timezone, or US/Eastern if it's unknown.
+    """
+    return pytz.timezone(COURT_TIMEZONES.get(court_id, "US/Eastern"))
+
+
 def convert_to_court_timezone(
     court_id: str, datetime_filed: datetime
 ) -> datetime:
@@ -17,7 +32,7 @@ def convert_to_court_timezone(
     timezone conversion.
     :return: A datetime object in the court timezone.
     """
-    court_timezone = pytz.timezone(COURT_TIMEZONES.get(court_id, "US/Eastern"))
+    court_timezone = get_court_timezone(court_id)
     return datetime_filed.astimezone(court_timezone)
 
 
@@ -62,6 +77,6 @@ def localize_naive_datetime_to_court_timezone(
     :return: A datetime object in the court timezone.
     """
 
-    court_timezone = pytz.timezone(COURT_TIMEZONES.get(court_id, "US/Eastern"))
+    court_timezone = get_court_timezone(court_id)
     d = court_timezone.localize(naive_datetime)
     return d
@@ -1,30 +1,154 @@
-from django.db.models import F
+import uuid
+from itertools import batched
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.models import Model
+from redis.exceptions import ResponseError
 
 from cl.lib.bot_detector import is_bot
-from cl.lib.model_helpers import suppress_autotime
+from cl.lib.redis_utils import get_redis_interface
+
+# Views are counted in Redis hashes, one per model, mapping object PKs to the
+# number of views that haven't been written to the DB yet.
+VIEW_COUNT_KEY_PREFIX = "view_counts"
+
+
+def make_view_count_key(model: type[Model]) -> str:
+    """Make the key of the Redis hash holding the pending view counts of a
+    model.
+
+    :param model: The model class, e.g. Docket.
+    :return: The Redis key.
+    """
+    return f"{VIEW_COUNT_KEY_PREFIX}:{model._meta.label_lower}"
 
 
 async def increment_view_count(obj, request):
-    """Increment the view count of an object in the DB
+    """Increment the view count of an object
 
-    Three tricks in this simple function:
+    Views aren't written to the DB right away. Popular objects would become
+    hot rows if every page view updated them, so instead each view increments
+    a counter in Redis, and flush_view_counts writes the accumulated counts to
+    the DB in batches.
+
+    A few tricks in this simple function:
 
       1. If it's a robot viewing the page, don't increment.
-      2. Make sure not to update the "date_modified" fields.
-      3. Do this using an atomic DB query for performance and don't reload from
-         the database after the increment (which would take another query).
+      2. Either way, add the views that haven't been flushed yet to the
+         object, so the page shows the live count.
+      3. Since nothing is saved, the "date_modified" fields aren't updated.
 
     :param obj: A django object containing a view_count parameter
     :param request: A django request so we can detect if it's a bot
     :return: Nothing. The obj is passed by reference
     """
+    r = get_redis_interface("STATS")
+    key = make_view_count_key(type(obj))
     if not is_bot(request):
-        cached_value = obj.view_count
+        pending = r.hincrby(key, obj.pk, 1)
+    else:
+        pending = int(r.hget(key, obj.pk) or 0)
+    obj.view_count += pending
+
+
+def get_pending_view_counts(
+    model: type[Model], pks: list[int]
+) -> dict[int, int]:
+    """Get the views of some objects that haven't been flushed to the DB yet.
+
+    Add these to the view_count values from the DB to get the live counts.
+
+    :param model: The model class of the objects.
+    :param pks: The PKs of the objects.
+    :return: A dict mapping PKs to their pending views. Objects without any
+    pending views are omitted.
+    """
+    if not pks:
+        return {}
+    r = get_redis_interface("STATS")
+    pending = r.hmget(make_view_count_key(model), pks)
+    return {pk: int(count) for pk, count in zip(pks, pending) if count}
+
+
+def flush_view_counts(chunk_size: int = 1000) -> int:
+    """Write the pending view counts in Redis to the DB.
 
-        with suppress_autotime(obj, ["date_modified"]):
-            obj.view_count = F("view_count") + 1
-            await obj.asave(update_fields=["view_count"])
+    The hash of each model is renamed before it's read, so views counted
+    while the flush runs go to a fresh hash and are picked up by the next
+    flush. The counts are then added to the DB with one UPDATE per chunk of
+    objects, and the renamed hash is deleted before the transaction commits,
+    so views that are in the DB are never left in Redis to be added again. If
+    anything fails before the commit, they're put back into Redis so no views
+    are lost.
+
+    Only one flush runs at a time. Renamed hashes left behind by a flush that
+    died are picked up by the next one, since their views never made it to
+    the DB.
+
+    :param chunk_size: The number of objects to update per query.
+    :return: The number of objects whose view counts were updated.
+    """
+    r = get_redis_interface("STATS")
+    lock_key = f"{VIEW_COUNT_KEY_PREFIX}.flush_lock"
+    if not r.set(lock_key, 1, nx=True, ex=10 * 60):
+        return 0
 
-        # To get the new value, you either need to get the item from the DB a
-        # second time, or just manipulate it manually....
-        obj.view_count = cached_value + 1
+    updated = 0
+    try:
+        for key in list(r.scan_iter(match=f"{VIEW_COUNT_KEY_PREFIX}:*")):
+            label = key.split(":")[1]
+            if ":flushing:" in key:
+                flushing_key = key
+            else:
+                flushing_key = f"{key}:flushing:{uuid.uuid4().hex}"
+                try:
+                    r.rename(key, flushing_key)
+                except ResponseError:
+                    # The hash is gone; there are no pending views.
+                    continue
+            counts = r.hgetall(flushing_key)
+            model = apps.get_model(label)
+            try:
+                with transaction.atomic():
+                    for chunk in batched(counts.items(), chunk_size):
+                        add_view_counts(
+                            model,
+                            [(int(pk), int(views)) for pk, views in chunk],
+                        )
+                    r.delete(flushing_key)
+            except Exception:
+                pipe = r.pipeline()
+                for pk, views in counts.items():
+                    pipe.hincrby(make_view_count_key(model), pk, int(views))
+                pipe.delete(flushing_key)
+                pipe.execute()
+                raise
+            updated += len(counts)
+    finally:
+        r.delete(lock_key)
+    return updated
+
+
+def add_view_counts(model: type[Model], counts: list[tuple[int, int]]) -> None:
+    """Add to the view counts of many objects in a single query.
+
+    This is done in SQL so that the "date_modified" fields aren't updated.
+
+    :param model: The model class of the objects.
+    :param counts: A list of (pk, views) tuples.
+    :return: None
+    """
+    quote_name = connection.ops.quote_name
+    table = quote_name(model._meta.db_table)
+    pk_column = quote_name(model._meta.pk.column)
+    values = ", ".join(["(%s, %s)"] * len(counts))
+    params = [value for pk_and_count in counts for value in pk_and_count]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} AS t "
+            f"SET view_count = t.view_count + v.views "
+            f"FROM (VALUES {values}) AS v(id, views) "
+            f"WHERE t.{pk_column} = v.id",
+            params,
+        )
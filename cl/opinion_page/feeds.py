@@ -1,9 +1,13 @@
+import hashlib
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 
 from django.contrib.syndication.views import Feed
+from django.core.cache import cache
 from django.db.models import Prefetch, QuerySet
 from django.http import Http404, HttpRequest
+from django.utils import timezone
 from django.utils.feedgenerator import Atom1Feed
 from django.utils.safestring import SafeText, mark_safe
 
@@ -11,6 +15,80 @@ from cl.lib.date_time import midnight_pt
 from cl.opinion_page.utils import make_docket_title
 from cl.search.models import Docket, DocketEntry, RECAPDocument
 
+# Rendered feeds are invalidated when their docket entries are merged or
+# their documents change, so they can be kept for a while.
+DOCKET_FEED_CACHE_TIMEOUT = 60 * 60
+
+
+def make_docket_feed_version_key(docket_id: int) -> str:
+    return f"docket_feed_version:{docket_id}"
+
+
+async def aget_docket_feed_cache_key(
+    request: HttpRequest, docket_id: int
+) -> str:
+    """Get the key of the rendered feed of a docket.
+
+    The key has the version of the docket's feed, which invalidating it
+    bumps, so a feed rendered from data read before an invalidation is
+    cached under a key that's no longer used. New versions start from the
+    current time, so an evicted version doesn't bring back old renderings.
+    The feed has absolute URLs, so the key has the scheme and host too.
+
+    :param request: The request for the feed.
+    :param docket_id: The ID of the docket.
+    :return: The cache key.
+    """
+    version = await cache.aget_or_set(
+        make_docket_feed_version_key(docket_id),
+        time.time_ns(),
+        DOCKET_FEED_CACHE_TIMEOUT,
+    )
+    return (
+        f"docket_feed:{docket_id}:{version}:"
+        f"{request.scheme}://{request.get_host()}"
+    )
+
+
+def invalidate_docket_feed(docket_id: int | None) -> None:
+    """Drop the rendered feeds of a docket, so the next request renders it
+    again.
+
+    :param docket_id: The ID of the docket.
+    :return: None
+    """
+    if docket_id is None:
+        return
+    try:
+        cache.incr(make_docket_feed_version_key(docket_id))
+    except ValueError:
+        # No version yet, so nothing is cached for this docket.
+        pass
+
+
+def render_docket_feed(
+    request: HttpRequest, docket_id: int, cache_key: str
+) -> dict[str, Any]:
+    """Render the feed of a docket, and cache it along with the validators
+    of conditional requests for it.
+
+    :param request: The request for the feed.
+    :param docket_id: The ID of the docket.
+    :param cache_key: The key to cache the feed under, from
+    aget_docket_feed_cache_key.
+    :return: A dict with the content, content_type, etag and last_modified
+    (a timestamp) of the feed.
+    """
+    response = DocketFeed()(request, docket_id=docket_id)
+    feed = {
+        "content": response.content,
+        "content_type": response["Content-Type"],
+        "etag": f'"{hashlib.md5(response.content).hexdigest()}"',
+        "last_modified": int(timezone.now().timestamp()),
+    }
+    cache.set(cache_key, feed, DOCKET_FEED_CACHE_TIMEOUT)
+    return feed
+
 
 class DocketFeed(Feed):
     """This feed returns the results of a search feed. It lacks a second
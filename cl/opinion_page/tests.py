@@ -11,9 +11,11 @@ from asgiref.sync import async_to_sync, sync_to_async
 from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import Group
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.management import call_command
-from django.test import override_settings
+from django.core.paginator import Paginator
+from django.test import RequestFactory, override_settings
 from django.test.client import AsyncClient
 from django.urls import reverse
 from django.utils.text import slugify
@@ -29,6 +31,11 @@ from cl.lib.test_helpers import (
     SimpleUserDataMixin,
     SitemapTest,
 )
+from cl.lib.view_utils import flush_view_counts
+from cl.opinion_page.feeds import (
+    aget_docket_feed_cache_key,
+    invalidate_docket_feed,
+)
 from cl.opinion_page.forms import (
     MeCourtUploadForm,
     MissCourtUploadForm,
@@ -57,6 +64,7 @@ from cl.recap.mergers import add_docket_entries, merge_attachment_page_data
 from cl.search.factories import (
     CitationWithParentsFactory,
     CourtFactory,
+    DocketEntryFactory,
     DocketFactory,
     OpinionClusterFactoryWithChildrenAndParents,
     OpinionClusterWithParentsFactory,
@@ -68,10 +76,16 @@ from cl.search.models import (
     SEARCH_TYPES,
     Citation,
     Docket,
+    DocketEntry,
     Opinion,
     OpinionCluster,
     RECAPDocument,
 )
+from cl.search.selectors import (
+    get_docket_entries_ordering,
+    get_docket_entries_page,
+    invalidate_docket_entry_pages,
+)
 from cl.tests.cases import ESIndexTestCase, SimpleTestCase, TestCase
 from cl.tests.providers import fake
 from cl.users.factories import UserFactory, UserProfileWithParentsFactory
@@ -782,6 +796,12 @@ class ViewRecapDocketTest(TestCase):
             reverse("view_docket", args=[self.docket.pk, self.docket.slug])
         )
         self.assertEqual(r.status_code, HTTPStatus.OK)
+        self.assertEqual(r.context["docket"].view_count, old_view_count + 1)
+        await self.docket.arefresh_from_db(fields=["view_count"])
+        self.assertEqual(old_view_count, self.docket.view_count)
+
+        # The view is written to the DB when the counts are flushed.
+        await sync_to_async(flush_view_counts)()
         await self.docket.arefresh_from_db(fields=["view_count"])
         self.assertEqual(old_view_count + 1, self.docket.view_count)
 
@@ -804,6 +824,7 @@ class ViewRecapDocketTest(TestCase):
             )
         )
         self.assertEqual(r.status_code, HTTPStatus.OK)
+        await sync_to_async(flush_view_counts)()
         await self.docket_appellate.arefresh_from_db(fields=["view_count"])
         self.assertEqual(old_view_count + 1, self.docket_appellate.view_count)
 
@@ -827,6 +848,228 @@ class ViewRecapDocketTest(TestCase):
         )
 
 
+class DocketEntriesKeysetPaginationTest(TestCase):
+    """Are docket entries paginated by seeking to each page?"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.court = CourtFactory(id="canb", jurisdiction="FB")
+        cls.docket = DocketFactory(court=cls.court, source=Docket.RECAP)
+        # Entries sharing sequence numbers, including unnumbered ones, so
+        # ties have to be broken consistently.
+        entries = [
+            ("2021-01-01.001", 1),
+            ("2021-01-01.002", None),
+            ("2021-01-01.002", None),
+            ("2021-01-01.002", 2),
+            ("2021-01-02.001", 3),
+            ("2021-01-02.001", 3),
+            ("2021-01-02.002", None),
+            ("2021-01-03.001", 4),
+            ("2021-01-03.001", None),
+            ("2021-01-04.001", 5),
+            ("2021-01-05.001", 6),
+        ]
+        for sequence_number, entry_number in entries:
+            DocketEntryFactory(
+                docket=cls.docket,
+                recap_sequence_number=sequence_number,
+                entry_number=entry_number,
+            )
+
+    def setUp(self) -> None:
+        invalidate_docket_entry_pages(self.docket.pk)
+
+    @mock.patch("cl.search.selectors.DOCKET_ENTRIES_ORPHANS", 1)
+    @mock.patch("cl.search.selectors.DOCKET_ENTRIES_PER_PAGE", 3)
+    def test_pages_match_offset_pagination(self) -> None:
+        """Do keyset pages hold the same entries as offset pages?"""
+        for descending in (False, True):
+            entries = DocketEntry.objects.filter(docket=self.docket).order_by(
+                *get_docket_entries_ordering(descending)
+            )
+            paginator = Paginator(entries, 3, orphans=1)
+            for number in paginator.page_range:
+                with self.subTest(descending=descending, number=number):
+                    page = async_to_sync(get_docket_entries_page)(
+                        self.docket.pk, number, descending, entries
+                    )
+                    self.assertEqual(
+                        [de.pk for de in page],
+                        [de.pk for de in paginator.page(number)],
+                    )
+                    self.assertEqual(page.paginator.count, 11)
+                    self.assertEqual(page.paginator.num_pages, 4)
+
+    @mock.patch("cl.search.selectors.DOCKET_ENTRIES_ORPHANS", 1)
+    @mock.patch("cl.search.selectors.DOCKET_ENTRIES_PER_PAGE", 3)
+    def test_page_numbers_are_validated(self) -> None:
+        """Do bad page numbers get the first or last page?"""
+        entries = DocketEntry.objects.filter(docket=self.docket)
+        page = async_to_sync(get_docket_entries_page)(
+            self.docket.pk, "foo", False, entries
+        )
+        self.assertEqual(page.number, 1)
+        page = async_to_sync(get_docket_entries_page)(
+            self.docket.pk, 100, False, entries
+        )
+        self.assertEqual(page.number, 4)
+
+    def test_page_index_is_cached_until_entries_change(self) -> None:
+        """Is the page index reused until the docket's entries change?"""
+        entries = DocketEntry.objects.filter(docket=self.docket)
+        async_to_sync(get_docket_entries_page)(
+            self.docket.pk, 1, False, entries
+        )
+        with self.assertNumQueries(1):
+            page = async_to_sync(get_docket_entries_page)(
+                self.docket.pk, 1, False, entries
+            )
+        self.assertEqual(page.paginator.count, 11)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            DocketEntryFactory(
+                docket=self.docket,
+                recap_sequence_number="2021-01-06.001",
+                entry_number=7,
+            )
+        page = async_to_sync(get_docket_entries_page)(
+            self.docket.pk, 1, False, entries
+        )
+        self.assertEqual(page.paginator.count, 12)
+
+    def test_merge_drops_page_index_once(self) -> None:
+        """Is the page index dropped once per merge, after its entries are
+        saved, rather than once per entry?
+        """
+        docket_entries = [
+            DocketEntryDataFactory(
+                date_filed=date(2021, 2, 1), document_number=i
+            )
+            for i in range(10, 13)
+        ]
+        with mock.patch(
+            "cl.search.selectors.invalidate_docket_entry_pages"
+        ) as mock_invalidate, self.captureOnCommitCallbacks(execute=True):
+            async_to_sync(add_docket_entries)(self.docket, docket_entries)
+            mock_invalidate.assert_not_called()
+        mock_invalidate.assert_called_once_with(self.docket.pk)
+
+
+class DocketFeedCacheTest(TestCase):
+    """Are docket feeds served from their cached rendering?"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.docket = DocketFactory(
+            court=CourtFactory(id="canb", jurisdiction="FB"),
+            source=Docket.RECAP,
+        )
+        DocketEntryFactory(
+            docket=cls.docket,
+            entry_number=1,
+            date_filed=date(2021, 1, 1),
+            description="Lorem ipsum",
+        )
+        cls.path = reverse("docket_feed", kwargs={"docket_id": cls.docket.pk})
+
+    def setUp(self) -> None:
+        invalidate_docket_feed(self.docket.pk)
+
+    async def get_feed(
+        self, headers: dict[str, str] | None = None
+    ) -> tuple[int, bytes, dict]:
+        response = await self.async_client.get(self.path, headers=headers)
+        return response.status_code, response.content, response.headers
+
+    async def test_feed_is_cached_until_entries_change(self) -> None:
+        """Is the rendered feed reused until the docket's entries change?"""
+        status, content, _ = await self.get_feed()
+        self.assertEqual(status, HTTPStatus.OK)
+        self.assertIn(b"Lorem ipsum", content)
+
+        with self.assertNumQueries(0):
+            _, cached_content, _ = await self.get_feed()
+        self.assertEqual(cached_content, content)
+
+        def add_entry() -> None:
+            with self.captureOnCommitCallbacks(execute=True):
+                DocketEntryFactory(
+                    docket=self.docket,
+                    entry_number=2,
+                    date_filed=date(2021, 1, 2),
+                    description="Dolor sit amet",
+                )
+
+        await sync_to_async(add_entry)()
+        _, content, _ = await self.get_feed()
+        self.assertIn(b"Dolor sit amet", content)
+
+    async def test_feed_is_rendered_again_when_docket_changes(self) -> None:
+        """Is the rendered feed dropped when the docket is saved?"""
+        await self.get_feed()
+
+        def rename_docket() -> None:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.docket.case_name = "Lorem v. Ipsum"
+                self.docket.save()
+
+        await sync_to_async(rename_docket)()
+        _, content, _ = await self.get_feed()
+        self.assertIn(b"Lorem v. Ipsum", content)
+
+    async def test_render_from_before_invalidation_is_not_served(
+        self,
+    ) -> None:
+        """Is a feed that was rendered from data read before an invalidation
+        left unused, even if it's cached after the invalidation?
+        """
+        request = RequestFactory().get(self.path)
+        cache_key = await aget_docket_feed_cache_key(request, self.docket.pk)
+        await sync_to_async(invalidate_docket_feed)(self.docket.pk)
+        await cache.aset(
+            cache_key,
+            {
+                "content": b"stale",
+                "content_type": "application/atom+xml",
+                "etag": '"stale"',
+                "last_modified": 0,
+            },
+        )
+        status, content, headers = await self.get_feed()
+        self.assertEqual(status, HTTPStatus.OK)
+        self.assertIn(b"Lorem ipsum", content)
+        self.assertEqual(int(headers["Content-Length"]), len(content))
+
+    @override_settings(ALLOWED_HOSTS=["testserver", "example.com"])
+    async def test_feed_is_cached_per_host_and_scheme(self) -> None:
+        """Since feeds have absolute URLs, are they cached apart for each
+        host and scheme?
+        """
+        requests = [
+            RequestFactory().get(self.path),
+            RequestFactory().get(self.path, secure=True),
+            RequestFactory().get(self.path, HTTP_HOST="example.com"),
+        ]
+        cache_keys = {
+            await aget_docket_feed_cache_key(request, self.docket.pk)
+            for request in requests
+        }
+        self.assertEqual(len(cache_keys), 3)
+
+    async def test_conditional_get(self) -> None:
+        """Do readers with a current copy of the feed get a 304?"""
+        _, _, headers = await self.get_feed()
+        status, _, _ = await self.get_feed({"If-None-Match": headers["ETag"]})
+        self.assertEqual(status, HTTPStatus.NOT_MODIFIED)
+        status, _, _ = await self.get_feed(
+            {"If-Modified-Since": headers["Last-Modified"]}
+        )
+        self.assertEqual(status, HTTPStatus.NOT_MODIFIED)
+        status, _, _ = await self.get_feed({"If-None-Match": '"stale"'})
+        self.assertEqual(status, HTTPStatus.OK)
+
+
 class OgRedirectLookupViewTest(TestCase):
     fixtures = ["recap_docs.json"]
 
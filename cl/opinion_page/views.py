@@ -8,6 +8,7 @@ import eyecite
 import waffle
 from asgiref.sync import async_to_sync, sync_to_async
 from django.contrib import messages
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist, PermissionDenied
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.db.models import IntegerField, Prefetch
@@ -23,10 +24,11 @@ from django.shortcuts import aget_object_or_404  # type: ignore[attr-defined]
 from django.template.defaultfilters import slugify
 from django.template.response import TemplateResponse
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.utils.timezone import now
-from django.views.decorators.cache import cache_page, never_cache
+from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
-from eyecite.tokenizers import HyperscanTokenizer
 from reporters_db import (
     EDITIONS,
     NAMES_TO_EDITIONS,
@@ -36,6 +38,7 @@ from reporters_db import (
 from seal_rookery.search import ImageSizes, seal
 
 from cl.citations.parenthetical_utils import get_or_create_parenthetical_groups
+from cl.citations.tokenizers import get_hyperscan_tokenizer
 from cl.citations.utils import (
     SLUGIFIED_EDITIONS,
     filter_out_non_case_law_citations,
@@ -59,7 +62,10 @@ from cl.lib.string_utils import trunc
 from cl.lib.thumbnails import make_png_thumbnail_for_instance
 from cl.lib.url_utils import get_redirect_or_abort
 from cl.lib.view_utils import increment_view_count
-from cl.opinion_page.feeds import DocketFeed
+from cl.opinion_page.feeds import (
+    aget_docket_feed_cache_key,
+    render_docket_feed,
+)
 from cl.opinion_page.forms import (
     CitationRedirectorForm,
     DocketEntryFilterForm,
@@ -89,11 +95,12 @@ from cl.search.models import (
     Parenthetical,
     RECAPDocument,
 )
-from cl.search.selectors import get_clusters_from_citation_str
+from cl.search.selectors import (
+    get_clusters_from_citation_str,
+    get_docket_entries_page,
+)
 from cl.search.views import do_es_search, do_search
 
-HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
-
 
 async def court_homepage(request: HttpRequest, pk: str) -> HttpResponse:
     """Individual Court Home Pages"""
@@ -349,17 +356,22 @@ async def view_docket(
         Prefetch("recap_documents", queryset=rd_queryset)
     )
     form = DocketEntryFilterForm(request.GET, request=request)
+    is_filtered = False
     if await sync_to_async(form.is_valid)():
         cd = form.cleaned_data
 
         if cd.get("entry_gte"):
             de_list = de_list.filter(entry_number__gte=cd["entry_gte"])
+            is_filtered = True
         if cd.get("entry_lte"):
             de_list = de_list.filter(entry_number__lte=cd["entry_lte"])
+            is_filtered = True
         if cd.get("filed_after"):
             de_list = de_list.filter(date_filed__gte=cd["filed_after"])
+            is_filtered = True
         if cd.get("filed_before"):
             de_list = de_list.filter(date_filed__lte=cd["filed_before"])
+            is_filtered = True
         if cd.get("order_by") == DocketEntryFilterForm.DESCENDING:
             sort_order_asc = False
             de_list = de_list.order_by(
@@ -376,12 +388,22 @@ async def view_docket(
         except EmptyPage:
             return paginator.page(paginator.num_pages)
 
+    if is_filtered:
+        docket_entries = await paginate_docket_entries(de_list, page)
+    else:
+        # Unfiltered pages, which are most of them, seek straight to their
+        # first entry, so the last pages of huge dockets are as fast as the
+        # first ones.
+        docket_entries = await get_docket_entries_page(
+            docket.pk, page, not sort_order_asc, de_list
+        )
+
     context.update(
         {
             "parties": await docket.parties.aexists(),
             # Needed to show/hide parties tab.
             "authorities": await docket.ahas_authorities(),
-            "docket_entries": await paginate_docket_entries(de_list, page),
+            "docket_entries": docket_entries,
             "sort_order_asc": sort_order_asc,
             "form": form,
             "get_string": make_get_string(request),
@@ -390,11 +412,32 @@ async def view_docket(
     return TemplateResponse(request, "docket.html", context)
 
 
-@cache_page(60)
 async def view_docket_feed(
     request: HttpRequest, docket_id: int
 ) -> HttpResponse:
-    return await sync_to_async(DocketFeed())(request, docket_id=docket_id)
+    """Serve the feed of a docket from its cached rendering.
+
+    Feed readers poll these often, so the feed is only rendered again after
+    the docket's entries change, and readers that send back the ETag or
+    Last-Modified of their copy get a 304 while it's still current.
+    """
+    cache_key = await aget_docket_feed_cache_key(request, docket_id)
+    feed = await cache.aget(cache_key)
+    if feed is None:
+        feed = await sync_to_async(render_docket_feed)(
+            request, docket_id, cache_key
+        )
+
+    response = get_conditional_response(
+        request, etag=feed["etag"], last_modified=feed["last_modified"]
+    )
+    if response is None:
+        response = HttpResponse(
+            feed["content"], content_type=feed["content_type"]
+        )
+    response["ETag"] = feed["etag"]
+    response["Last-Modified"] = http_date(feed["last_modified"])
+    return response
 
 
 async def view_parties(
@@ -1276,7 +1319,7 @@ async def citation_homepage(request: HttpRequest) -> HttpResponse:
             # Redirect to the page as a GET instead of a POST
             cd = form.cleaned_data
             citations = eyecite.get_citations(
-                cd["reporter"], tokenizer=HYPERSCAN_TOKENIZER
+                cd["reporter"], tokenizer=get_hyperscan_tokenizer()
             )
             case_law_citations = filter_out_non_case_law_citations(citations)
             if not case_law_citations:
@@ -2,7 +2,11 @@ from django.db.models import Exists, OuterRef, Prefetch
 from rest_framework import viewsets
 
 from cl.api.pagination import TinyAdjustablePagination
-from cl.api.utils import LoggingMixin, RECAPUsersReadOnly
+from cl.api.utils import (
+    ConditionalGetMixin,
+    LoggingMixin,
+    RECAPUsersReadOnly,
+)
 from cl.disclosures.models import FinancialDisclosure
 from cl.people_db.api_serializers import (
     ABARatingSerializer,
@@ -105,7 +109,7 @@ class PersonDisclosureViewSet(viewsets.ModelViewSet):
     ]
 
 
-class PersonViewSet(LoggingMixin, viewsets.ModelViewSet):
+class PersonViewSet(LoggingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = (
         Person.objects.all()
         .prefetch_related(
@@ -118,6 +122,16 @@ class PersonViewSet(LoggingMixin, viewsets.ModelViewSet):
         )
         .order_by("-id")
     )
+    # Nested and linked objects, to version conditional responses
+    conditional_related = (
+        "positions",
+        "educations",
+        "educations__school",
+        "political_affiliations",
+        "sources",
+        "aba_ratings",
+        "race",
+    )
     serializer_class = PersonSerializer
     filterset_class = PersonFilter
     ordering_fields = (
@@ -167,7 +181,9 @@ class PositionViewSet(LoggingMixin, viewsets.ModelViewSet):
     ]
 
 
-class RetentionEventViewSet(LoggingMixin, viewsets.ModelViewSet):
+class RetentionEventViewSet(
+    LoggingMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     queryset = RetentionEvent.objects.all().order_by("-id")
     serializer_class = RetentionEventSerializer
     filterset_class = RetentionEventFilter
@@ -182,8 +198,11 @@ class RetentionEventViewSet(LoggingMixin, viewsets.ModelViewSet):
     ]
 
 
-class EducationViewSet(LoggingMixin, viewsets.ModelViewSet):
+class EducationViewSet(
+    LoggingMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     queryset = Education.objects.all().order_by("-id")
+    conditional_related = ("school",)
     serializer_class = EducationSerializer
     filterset_class = EducationFilter
     ordering_fields = ("id", "date_created", "date_modified")
@@ -197,7 +216,7 @@ class EducationViewSet(LoggingMixin, viewsets.ModelViewSet):
     ]
 
 
-class SchoolViewSet(LoggingMixin, viewsets.ModelViewSet):
+class SchoolViewSet(LoggingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = School.objects.all().order_by("-id")
     serializer_class = SchoolSerializer
     filterset_class = SchoolFilter
@@ -212,7 +231,9 @@ class SchoolViewSet(LoggingMixin, viewsets.ModelViewSet):
     ]
 
 
-class PoliticalAffiliationViewSet(LoggingMixin, viewsets.ModelViewSet):
+class PoliticalAffiliationViewSet(
+    LoggingMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     queryset = PoliticalAffiliation.objects.all().order_by("-id")
     serializer_class = PoliticalAffiliationSerializer
     filterset_class = PoliticalAffiliationFilter
@@ -233,7 +254,7 @@ class PoliticalAffiliationViewSet(LoggingMixin, viewsets.ModelViewSet):
     ]
 
 
-class SourceViewSet(LoggingMixin, viewsets.ModelViewSet):
+class SourceViewSet(LoggingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Source.objects.all().order_by("-id")
     serializer_class = SourceSerializer
     filterset_class = SourceFilter
@@ -248,7 +269,9 @@ class SourceViewSet(LoggingMixin, viewsets.ModelViewSet):
     cursor_ordering_fields = ["id", "date_modified"]
 
 
-class ABARatingViewSet(LoggingMixin, viewsets.ModelViewSet):
+class ABARatingViewSet(
+    LoggingMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     queryset = ABARating.objects.all().order_by("-id")
     serializer_class = ABARatingSerializer
     filterset_class = ABARatingFilter
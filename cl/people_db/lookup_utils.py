@@ -1,18 +1,18 @@
 import html
 import operator
 import re
-from datetime import date, timedelta
+from datetime import date
 from functools import reduce
-from typing import List, Optional, Set, Union
+from typing import Iterable, List, Optional, Set, Union
 
-from dateutil.relativedelta import relativedelta
 from django.db.models import Q, QuerySet
 from django.utils.html import strip_tags
 from nameparser import HumanName
 from unidecode import unidecode
 
 from cl.lib.utils import wrap_text
-from cl.people_db.models import SUFFIX_LOOKUP, Person
+from cl.people_db.models import Person
+from cl.people_db.roster import aget_court_roster, aget_court_rosters
 
 # list of words that aren't judge names
 NOT_JUDGE_WORDS = [
@@ -449,107 +449,32 @@ async def lookup_judge_by_full_name(
     """
     if isinstance(name, str):
         name = HumanName(name)
+    roster = await aget_court_roster(court_id)
+    return roster.lookup(name, event_date, require_living_judge)
 
-    filter_sets = []
 
-    # check based on last name, court, and functioning flesh and blood first
-    first_filter = [
-        Q(name_last__iexact=name.last)
-        | Q(aliases__name_last__iexact=name.last),
-        Q(positions__court_id=court_id),
-    ]
-    if require_living_judge and event_date:
-        first_filter.extend(
-            [
-                # Include timedelta here to account for low-granularity fields.
-                # For example, if they died on 2021/10/15, but we only have the
-                # granularity of a month, and the event is on 2021/10/14, then
-                # date_dob would be 2021/10/01, and we'd miss this. Since
-                # granularity can be off by as much as 365 days, just add some
-                # slop into our query to make sure that when we have low
-                # granularity, we err on the side of over-inclusion. Another
-                # approach would be to factor in the granularity field and
-                # adjust this accordingly, but that's harder.
-                Q(date_dod__gte=event_date - timedelta(days=365))
-                | Q(date_dod__isnull=True),
-                Q(date_dob__lte=event_date + timedelta(days=365))
-                | Q(date_dob__isnull=True),
-            ]
-        )
-    filter_sets.append(first_filter)
-
-    # Then narrow by date
-    if event_date is not None:
-        filter_sets.append(
-            [
-                Q(
-                    positions__date_start__lt=event_date
-                    + relativedelta(years=1)
-                )
-                | Q(positions__date_start=None),
-                Q(
-                    positions__date_termination__gt=event_date
-                    - relativedelta(years=1)
-                )
-                | Q(positions__date_termination=None),
-            ]
-        )
-
-    # Then by first name
-    if name.first:
-        filter_sets.append(
-            [
-                Q(name_first__iexact=name.first)
-                | Q(aliases__name_first__iexact=name.first)
-            ]
+async def lookup_judges_by_full_name_in_bulk(
+    lookups: Iterable[tuple[Union[HumanName, str], str, Optional[date]]],
+    require_living_judge: bool = True,
+) -> List[Optional[Person]]:
+    """Look up many judges at once, as importers do. The rosters of all the
+    courts are loaded up front, in a single query.
+
+    :param lookups: The judges to look up, as (name, court_id, event_date)
+    tuples. See lookup_judge_by_full_name.
+    :param require_living_judge: See lookup_judge_by_full_name.
+    :return: The judge found for each lookup, or None, in the same order.
+    """
+    lookups = list(lookups)
+    rosters = await aget_court_rosters(court_id for _, court_id, _ in lookups)
+    return [
+        rosters[court_id].lookup(
+            HumanName(name) if isinstance(name, str) else name,
+            event_date,
+            require_living_judge,
         )
-
-    # Do middle name or initial next.
-    if name.middle:
-        stripped_middle = name.middle.strip(".,")
-        initial = len(stripped_middle) == 1
-        if initial:
-            filter_sets.append(
-                [
-                    Q(name_middle__istartswith=stripped_middle)
-                    | Q(aliases__name_middle__istartswith=stripped_middle)
-                ]
-            )
-        else:
-            filter_sets.append(
-                [
-                    Q(name_middle__iexact=name.middle)
-                    | Q(aliases__name_middle__iexact=name.middle)
-                ]
-            )
-
-    # And finally, by suffix
-    if name.suffix:
-        suffix = SUFFIX_LOOKUP.get(name.suffix.lower())
-        if suffix:
-            filter_sets.append(
-                [
-                    Q(name_suffix__iexact=suffix)
-                    | Q(aliases__name_suffix__iexact=suffix)
-                ]
-            )
-
-    # Query people DB, slowly adding more filters to the query. If we get zero
-    # results, no luck. If we get one, great. If we get more than one, continue
-    # filtering. If we expend all our filters and still have more than one,
-    # just return None.
-    applied_filters = []
-    for filter_set in filter_sets:
-        applied_filters.extend(filter_set)
-        candidates = Person.objects.filter(*applied_filters)
-        count = await candidates.acount()
-        if count == 0:
-            # No luck finding somebody. Abort.
-            return None
-        elif count == 1:
-            # Got somebody unique!
-            return await candidates.afirst()
-    return None
+        for name, court_id, event_date in lookups
+    ]
 
 
 async def lookup_judge_by_full_name_and_set_attr(
@@ -596,16 +521,10 @@ async def lookup_judges_by_last_name_list(
     require_living_judge: bool = True,
 ) -> List[Person]:
     """Look up a group of judges by list of last names, a date, and a court"""
-    found_people = []
-    for last_name in last_names:
-        hn = HumanName()
-        hn.last = last_name
-        person = await lookup_judge_by_full_name(
-            hn, court_id, event_date, require_living_judge
-        )
-        if person is not None:
-            found_people.append(person)
-    return found_people
+    roster = await aget_court_roster(court_id)
+    return roster.lookup_last_names(
+        last_names, event_date, require_living_judge
+    )
 
 
 async def lookup_judges_by_messy_str(
@@ -0,0 +1,52 @@
+# Indexes the event tables the bulk data delta exports look changes up in.
+# They're BRIN indexes, which are tiny and cheap to build, since events are
+# appended in pgh_created_at order. They aren't in the event models, which
+# pghistory generates, so they're only created in the database.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        (
+            "people_db",
+            "0016_remove_abarating_update_or_delete_snapshot_update_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_personevent_created_brin" ON "people_db_personevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "people_db_personevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_schoolevent_created_brin" ON "people_db_schoolevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "people_db_schoolevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_positionevent_created_brin" ON "people_db_positionevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "people_db_positionevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_retentioneventevent_created_brin" ON "people_db_retentioneventevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "people_db_retentioneventevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_educationevent_created_brin" ON "people_db_educationevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "people_db_educationevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_raceevent_created_brin" ON "people_db_raceevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "people_db_raceevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_personraceevent_created_brin" ON "people_db_personraceevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "people_db_personraceevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_politicalaffiliationevent_created_brin" ON "people_db_politicalaffiliationevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "people_db_politicalaffiliationevent_created_brin";',
+        ),
+    ]
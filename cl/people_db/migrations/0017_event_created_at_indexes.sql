@@ -0,0 +1,32 @@
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_personevent_created_brin" ON "people_db_personevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_schoolevent_created_brin" ON "people_db_schoolevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_positionevent_created_brin" ON "people_db_positionevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_retentioneventevent_created_brin" ON "people_db_retentioneventevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_educationevent_created_brin" ON "people_db_educationevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_raceevent_created_brin" ON "people_db_raceevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_personraceevent_created_brin" ON "people_db_personraceevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "people_db_politicalaffiliationevent_created_brin" ON "people_db_politicalaffiliationevent" USING brin ("pgh_created_at");
@@ -0,0 +1,307 @@
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from functools import partial
+from typing import Callable, Iterable, NamedTuple, Optional
+
+from dateutil.relativedelta import relativedelta
+from django.core.cache import cache
+from django.db.models import Prefetch
+from nameparser import HumanName
+
+from cl.people_db.models import SUFFIX_LOOKUP, Person, Position
+
+# Judges are looked up in rosters of the judges who held positions in each
+# court. A roster is loaded once per process, the first time its court is
+# looked up, and all the rosters of a process are dropped when a Person or
+# Position is saved anywhere, which bumps the version in the cache. Processes
+# check that version at most every ROSTER_VERSION_CHECK_INTERVAL seconds.
+ROSTER_VERSION_KEY = "judge_roster_version"
+ROSTER_VERSION_CHECK_INTERVAL = 60
+
+
+class NameParts(NamedTuple):
+    """The lowercased parts of a person's name."""
+
+    first: str
+    middle: str
+    last: str
+    suffix: str
+
+    @classmethod
+    def from_person(cls, person: Person) -> "NameParts":
+        return cls(
+            person.name_first.lower(),
+            person.name_middle.lower(),
+            person.name_last.lower(),
+            person.name_suffix.lower(),
+        )
+
+
+@dataclass
+class RosterJudge:
+    """A judge in a court roster, with their positions in the court."""
+
+    person: Person
+    name: NameParts
+    aliases: list[NameParts]
+    positions: list[tuple[date | None, date | None]]
+
+    def match_name(self, tests: dict[str, Callable[[str], bool]]) -> bool:
+        """Whether the judge's name passes some tests. Like a query joining
+        the aliases, each part of the name can pass by the judge's own name
+        or by an alias, but it has to be the same alias for every part.
+
+        :param tests: A dict mapping the names of name parts to functions
+        testing them.
+        :return: True if the name passes every test.
+        """
+        for alias in self.aliases or [None]:
+            if all(
+                test(getattr(self.name, part))
+                or (alias is not None and test(getattr(alias, part)))
+                for part, test in tests.items()
+            ):
+                return True
+        return False
+
+    def held_position_around(self, event_date: date) -> bool:
+        """Whether the judge held a position in the court within a year of a
+        date.
+
+        :param event_date: The date.
+        :return: True if they did.
+        """
+        start_before = event_date + relativedelta(years=1)
+        end_after = event_date - relativedelta(years=1)
+        return any(
+            (start is None or start < start_before)
+            and (end is None or end > end_after)
+            for start, end in self.positions
+        )
+
+    def was_alive_around(self, event_date: date) -> bool:
+        """Whether the judge was alive within a year of a date.
+
+        Granularity can be off by as much as 365 days. For example, if they
+        died on 2021/10/15, but we only have the granularity of a month, and
+        the event is on 2021/10/14, the date_dod would be 2021/10/01, so
+        there's slop to err on the side of over-inclusion.
+
+        :param event_date: The date.
+        :return: True if they were, or if their dates aren't known.
+        """
+        dob, dod = self.person.date_dob, self.person.date_dod
+        return (dod is None or dod >= event_date - timedelta(days=365)) and (
+            dob is None or dob <= event_date + timedelta(days=365)
+        )
+
+
+@dataclass
+class CourtRoster:
+    """The judges who held positions in a court, indexed by last name."""
+
+    judges_by_last_name: dict[str, list[RosterJudge]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+
+    def add(self, judge: RosterJudge) -> None:
+        last_names = {judge.name.last, *(a.last for a in judge.aliases)}
+        for last_name in last_names:
+            self.judges_by_last_name[last_name].append(judge)
+
+    def lookup(
+        self,
+        name: HumanName,
+        event_date: Optional[date] = None,
+        require_living_judge: bool = True,
+    ) -> Optional[Person]:
+        """Uniquely identify a judge in the roster.
+
+        This narrows the judges down the way lookup_judge_by_full_name did
+        with queries: by last name, then by the dates of their positions,
+        then by first name, middle name or initial, and suffix, until a
+        single judge is left.
+
+        :param name: The judge's name.
+        :param event_date: The date when the judge did something
+        :param require_living_judge: Whether to ensure that the judge was
+        alive at the event date.
+        :return: The judge that matched, or None.
+        """
+        last = name.last.lower()
+        judges = self.judges_by_last_name.get(last, [])
+        if require_living_judge and event_date:
+            judges = [j for j in judges if j.was_alive_around(event_date)]
+
+        # Each filter narrows the judges left by the previous ones. Name
+        # tests are cumulative, so the same alias passes all of them.
+        filters: list[Callable[[RosterJudge], bool]] = []
+        name_tests: dict[str, Callable[[str], bool]] = {}
+
+        def add_name_test(part: str, test: Callable[[str], bool]) -> None:
+            nonlocal name_tests
+            name_tests = {**name_tests, part: test}
+            filters.append(partial(RosterJudge.match_name, tests=name_tests))
+
+        add_name_test("last", last.__eq__)
+        # Then narrow by date
+        if event_date is not None:
+            filters.append(
+                partial(
+                    RosterJudge.held_position_around, event_date=event_date
+                )
+            )
+        # Then by first name
+        if name.first:
+            add_name_test("first", name.first.lower().__eq__)
+        # Do middle name or initial next.
+        if name.middle:
+            stripped_middle = name.middle.strip(".,").lower()
+            if len(stripped_middle) == 1:
+                add_name_test(
+                    "middle", lambda value: value.startswith(stripped_middle)
+                )
+            else:
+                add_name_test("middle", name.middle.lower().__eq__)
+        # And finally, by suffix
+        if name.suffix:
+            suffix = SUFFIX_LOOKUP.get(name.suffix.lower())
+            if suffix:
+                add_name_test("suffix", suffix.lower().__eq__)
+
+        # If we get zero judges, no luck. If we get one, great. If we get
+        # more than one, continue filtering. If we expend all our filters
+        # and still have more than one, just return None.
+        for keep in filters:
+            judges = [j for j in judges if keep(j)]
+            if not judges:
+                return None
+            elif len(judges) == 1:
+                return judges[0].person
+        return None
+
+    def lookup_last_names(
+        self,
+        last_names: Iterable[str],
+        event_date: Optional[date] = None,
+        require_living_judge: bool = True,
+    ) -> list[Person]:
+        """Identify the judges with some last names in the roster.
+
+        :param last_names: The judges' last names.
+        :param event_date: The date when the judges did something
+        :param require_living_judge: Whether to ensure that the judges were
+        alive at the event date.
+        :return: The judges that matched, leaving out names that didn't.
+        """
+        found_people = []
+        for last_name in last_names:
+            hn = HumanName()
+            hn.last = last_name
+            person = self.lookup(hn, event_date, require_living_judge)
+            if person is not None:
+                found_people.append(person)
+        return found_people
+
+
+_rosters: dict[str, CourtRoster] = {}
+_roster_version: str | None = None
+_roster_version_checked_at = 0.0
+
+
+def invalidate_judge_rosters() -> None:
+    """Drop the judge rosters of every process, so they're reloaded the next
+    time they're used.
+
+    :return: None
+    """
+    global _roster_version
+    _roster_version = uuid.uuid4().hex
+    cache.set(ROSTER_VERSION_KEY, _roster_version, None)
+    _rosters.clear()
+
+
+async def _check_roster_version() -> None:
+    """Drop the rosters of this process if they were invalidated by another
+    process.
+
+    :return: None
+    """
+    global _roster_version, _roster_version_checked_at
+    now = time.monotonic()
+    if now - _roster_version_checked_at < ROSTER_VERSION_CHECK_INTERVAL:
+        return
+    _roster_version_checked_at = now
+    version = await cache.aget(ROSTER_VERSION_KEY)
+    if version != _roster_version:
+        _rosters.clear()
+        _roster_version = version
+
+
+async def aget_court_rosters(
+    court_ids: Iterable[str],
+) -> dict[str, CourtRoster]:
+    """Get the judge rosters of some courts, loading the ones this process
+    hasn't loaded yet in a single query.
+
+    :param court_ids: The IDs of the courts.
+    :return: A dict mapping court IDs to their rosters.
+    """
+    await _check_roster_version()
+    court_ids = set(court_ids)
+    missing = court_ids - _rosters.keys()
+    if missing:
+        rosters = {court_id: CourtRoster() for court_id in missing}
+        people = (
+            Person.objects.filter(positions__court_id__in=missing)
+            .distinct()
+            .prefetch_related(
+                Prefetch(
+                    "positions",
+                    queryset=Position.objects.filter(
+                        court_id__in=missing
+                    ).only(
+                        "person_id",
+                        "court_id",
+                        "date_start",
+                        "date_termination",
+                    ),
+                ),
+                Prefetch(
+                    "aliases",
+                    queryset=Person.objects.only(
+                        "is_alias_of_id",
+                        "name_first",
+                        "name_middle",
+                        "name_last",
+                        "name_suffix",
+                    ),
+                ),
+            )
+        )
+        async for person in people:
+            name = NameParts.from_person(person)
+            aliases = [NameParts.from_person(a) for a in person.aliases.all()]
+            positions = defaultdict(list)
+            for position in person.positions.all():
+                positions[position.court_id].append(
+                    (position.date_start, position.date_termination)
+                )
+            for court_id, court_positions in positions.items():
+                rosters[court_id].add(
+                    RosterJudge(person, name, aliases, court_positions)
+                )
+        _rosters.update(rosters)
+    return {court_id: _rosters[court_id] for court_id in court_ids}
+
+
+async def aget_court_roster(court_id: str) -> CourtRoster:
+    """Get the judge roster of a court.
+
+    :param court_id: The ID of the court.
+    :return: The court's roster.
+    """
+    return (await aget_court_rosters([court_id]))[court_id]
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from cl.people_db.models import Person, Position
+from cl.people_db.roster import invalidate_judge_rosters
+
+
+@receiver(post_save, sender=Person, dispatch_uid="person_roster_handler")
+@receiver(post_delete, sender=Person, dispatch_uid="person_roster_handler")
+@receiver(post_save, sender=Position, dispatch_uid="position_roster_handler")
+@receiver(post_delete, sender=Position, dispatch_uid="position_roster_handler")
+def invalidate_judge_rosters_handler(sender, instance, **kwargs) -> None:
+    """Drop the judge rosters when the people or positions in them change."""
+    invalidate_judge_rosters()
@@ -1,6 +1,21 @@
-from cl.people_db.factories import PersonWithChildrenFactory
+from datetime import date
+
+from asgiref.sync import async_to_sync
+
+from cl.people_db.factories import (
+    PersonFactory,
+    PersonWithChildrenFactory,
+    PositionFactory,
+)
+from cl.people_db.lookup_utils import (
+    lookup_judge_by_full_name,
+    lookup_judge_by_last_name,
+    lookup_judges_by_full_name_in_bulk,
+)
 from cl.people_db.models import Person, Position
-from cl.tests.cases import TransactionTestCase
+from cl.people_db.roster import invalidate_judge_rosters
+from cl.search.factories import CourtFactory
+from cl.tests.cases import TestCase, TransactionTestCase
 
 
 class TestPersonWithChildrenFactory(TransactionTestCase):
@@ -18,3 +33,81 @@ class TestPersonWithChildrenFactory(TransactionTestCase):
         self.assertEqual(
             new_person_with_position.id, positions_in_db[0].person_id
         )
+
+
+class JudgeRosterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.court = CourtFactory(id="ca1")
+        cls.john = PersonFactory(
+            name_first="John",
+            name_middle="Glover",
+            name_last="Roberts",
+            name_suffix="",
+        )
+        PositionFactory(
+            person=cls.john, court=cls.court, date_start=date(2005, 9, 29)
+        )
+        PersonFactory(
+            name_first="Johnny",
+            name_middle="",
+            name_last="Roberts",
+            name_suffix="",
+            is_alias_of=cls.john,
+        )
+        cls.jane = PersonFactory(
+            name_first="Jane", name_last="Roberts", name_suffix=""
+        )
+        PositionFactory(
+            person=cls.jane,
+            court=cls.court,
+            date_start=date(1980, 1, 1),
+            date_termination=date(1990, 1, 1),
+        )
+
+    def setUp(self) -> None:
+        invalidate_judge_rosters()
+
+    def test_lookup_without_queries(self) -> None:
+        """Are judges looked up in the court's roster, which is loaded once,
+        by full name, alias and last name?
+        """
+        event_date = date(2010, 1, 1)
+        lookup = async_to_sync(lookup_judge_by_full_name)
+        self.assertEqual(
+            lookup("John G. Roberts", self.court.pk, event_date), self.john
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                lookup("Johnny Roberts", self.court.pk, event_date),
+                self.john,
+            )
+            # Jane's position ended too long before the event.
+            self.assertEqual(
+                async_to_sync(lookup_judge_by_last_name)(
+                    "Roberts", self.court.pk, event_date
+                ),
+                self.john,
+            )
+            self.assertIsNone(lookup("John Smith", self.court.pk, event_date))
+
+        # Saving a position drops the roster, so it's reloaded.
+        PositionFactory(
+            person=self.jane, court=self.court, date_start=date(2009, 1, 1)
+        )
+        self.assertIsNone(
+            async_to_sync(lookup_judge_by_last_name)(
+                "Roberts", self.court.pk, event_date
+            )
+        )
+
+    def test_lookup_in_bulk(self) -> None:
+        """Can many judges be looked up at once?"""
+        judges = async_to_sync(lookup_judges_by_full_name_in_bulk)(
+            [
+                ("John Roberts", self.court.pk, date(2010, 1, 1)),
+                ("Jane Roberts", self.court.pk, date(1985, 1, 1)),
+                ("Jane Roberts", "ca2", date(1985, 1, 1)),
+            ]
+        )
+        self.assertEqual(judges, [self.john, self.jane, None])
@@ -1,20 +1,28 @@
 # Code for merging PACER content into the DB
+import json
 import logging
 import re
-from copy import deepcopy
-from datetime import date, timedelta
+from collections import defaultdict
+from datetime import date, time, timedelta
+from itertools import batched
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from asgiref.sync import async_to_sync, sync_to_async
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
-from django.db import IntegrityError, OperationalError, transaction
-from django.db.models import Count, Prefetch, Q, QuerySet
+from django.db import (
+    IntegrityError,
+    OperationalError,
+    connection,
+    transaction,
+)
+from django.db.models import Count, Q, QuerySet
 from django.utils.timezone import now
 from juriscraper.lib.string_utils import CaseNameTweaker
 from juriscraper.pacer import AppellateAttachmentPage, AttachmentPage
 
 from cl.corpus_importer.utils import mark_ia_upload_needed
+from cl.lib.crypto import sha256
 from cl.lib.decorators import retry
 from cl.lib.filesizes import convert_size_to_bytes
 from cl.lib.model_helpers import clean_docket_number, make_docket_number_core
@@ -26,6 +34,7 @@ from cl.lib.pacer import (
     normalize_attorney_role,
 )
 from cl.lib.privacy_tools import anonymize
+from cl.lib.redis_utils import get_redis_interface
 from cl.lib.timezone_helpers import localize_date_and_time
 from cl.lib.utils import previous_and_next, remove_duplicate_dicts
 from cl.people_db.lookup_utils import lookup_judge_by_full_name_and_set_attr
@@ -56,6 +65,7 @@ from cl.search.models import (
     RECAPDocument,
     Tag,
 )
+from cl.search.selectors import defer_docket_entry_pages_invalidation
 from cl.search.tasks import add_items_to_solr, index_docket_parties_in_es
 
 logger = logging.getLogger(__name__)
@@ -81,26 +91,18 @@ def confirm_docket_number_core_lookup_match(
     return docket
 
 
-async def find_docket_object(
-    court_id: str,
+def make_docket_lookups(
     pacer_case_id: str | None,
     docket_number: str,
-    using: str = "default",
-) -> Docket:
-    """Attempt to find the docket based on the parsed docket data. If cannot be
-    found, create a new docket. If multiple are found, return the oldest.
+) -> List[Dict[str, str | None]]:
+    """Make the lookups to find a docket with, from most to least specific.
 
-    :param court_id: The CourtListener court_id to lookup
     :param pacer_case_id: The PACER case ID for the docket
     :param docket_number: The docket number to lookup.
-    :param using: The database to use for the lookup queries.
-    :return The docket found or created.
+    :return: A list of dicts of field lookups.
     """
-    # Attempt several lookups of decreasing specificity. Note that
-    # pacer_case_id is required for Docket and Docket History uploads.
-    d = None
     docket_number_core = make_docket_number_core(docket_number)
-    lookups = []
+    lookups: List[Dict[str, str | None]] = []
     if pacer_case_id:
         # Appellate RSS feeds don't contain a pacer_case_id, avoid lookups by
         # blank pacer_case_id values.
@@ -131,29 +133,92 @@ async def find_docket_object(
         lookups.append(
             {"pacer_case_id": None, "docket_number": docket_number},
         )
+    return lookups
+
+
+def pick_docket_from_candidates(
+    candidates: List[Docket],
+    lookups: List[Dict[str, str | None]],
+    docket_number: str,
+) -> Docket | None:
+    """Run the lookups against a list of candidate dockets, in order of
+    decreasing specificity, and return the first one that matches.
 
+    :param candidates: The dockets that might match, oldest first.
+    :param lookups: The lookups made by make_docket_lookups.
+    :param docket_number: The incoming docket_number to lookup.
+    :return: The matched docket or None.
+    """
     for kwargs in lookups:
-        ds = Docket.objects.filter(court_id=court_id, **kwargs).using(using)
-        count = await ds.acount()
-        if count == 0:
+        matches = [
+            c
+            for c in candidates
+            if all(getattr(c, k) == v for k, v in kwargs.items())
+        ]
+        if not matches:
             continue  # Try a looser lookup.
-        if count == 1:
-            d = await ds.afirst()
-            if kwargs.get("pacer_case_id") is None and kwargs.get(
-                "docket_number_core"
-            ):
-                d = confirm_docket_number_core_lookup_match(d, docket_number)
-            if d:
-                break  # Nailed it!
-        elif count > 1:
-            # Choose the oldest one and live with it.
-            d = await ds.aearliest("date_created")
-            if kwargs.get("pacer_case_id") is None and kwargs.get(
-                "docket_number_core"
-            ):
-                d = confirm_docket_number_core_lookup_match(d, docket_number)
-            if d:
-                break
+        # If there's more than one, choose the oldest one and live with it.
+        d = matches[0]
+        if kwargs.get("pacer_case_id") is None and kwargs.get(
+            "docket_number_core"
+        ):
+            d = confirm_docket_number_core_lookup_match(d, docket_number)
+        if d:
+            return d  # Nailed it!
+    return None
+
+
+def make_docket_lookups_query(
+    court_id: str, lookups: List[Dict[str, str | None]]
+) -> Q:
+    """Combine a court's lookups into a single query.
+
+    The looser lookups match everything the stricter ones do, but Postgres
+    simplifies that, and the partial indexes on (court_id, pacer_case_id) and
+    (court_id, docket_number_core) cover every branch.
+
+    :param court_id: The CourtListener court_id to lookup
+    :param lookups: The lookups made by make_docket_lookups.
+    :return: A Q object that matches every candidate docket.
+    """
+    q = Q()
+    for kwargs in lookups:
+        q |= Q(**kwargs)
+    return Q(court_id=court_id) & q
+
+
+async def find_docket_object(
+    court_id: str,
+    pacer_case_id: str | None,
+    docket_number: str,
+    using: str = "default",
+) -> Docket:
+    """Attempt to find the docket based on the parsed docket data. If cannot be
+    found, create a new docket. If multiple are found, return the oldest.
+
+    All the candidate dockets are fetched in one query, then the lookups are
+    done in memory.
+
+    :param court_id: The CourtListener court_id to lookup
+    :param pacer_case_id: The PACER case ID for the docket
+    :param docket_number: The docket number to lookup.
+    :param using: The database to use for the lookup queries.
+    :return The docket found or created.
+    """
+    # Attempt several lookups of decreasing specificity. Note that
+    # pacer_case_id is required for Docket and Docket History uploads.
+    d = None
+    lookups = make_docket_lookups(pacer_case_id, docket_number)
+    if lookups:
+        candidates = [
+            c
+            async for c in Docket.objects.filter(
+                make_docket_lookups_query(court_id, lookups)
+            )
+            .order_by("date_created", "pk")
+            .using(using)
+        ]
+        d = pick_docket_from_candidates(candidates, lookups, docket_number)
     if d is None:
         # Couldn't find a docket. Return a new one.
         return Docket(
@@ -169,6 +234,86 @@ async def find_docket_object(
     return d
 
 
+DocketKey = Tuple[str, str | None, str]
+
+
+def find_docket_pks_in_bulk(
+    keys: List[DocketKey],
+    chunk_size: int = 250,
+) -> Dict[DocketKey, int]:
+    """Find the dockets for many (court_id, pacer_case_id, docket_number)
+    tuples at once.
+
+    This is the batch version of find_docket_object, for things like RSS feeds
+    that have hundreds of items. It does one query per chunk of keys instead
+    of several per key, and only loads the fields needed to do the lookups.
+
+    It returns PKs rather than dockets so that callers load each docket right
+    before they update it, instead of saving a copy that has gone stale while
+    the rest of the batch was processed.
+
+    Keys that don't match an existing docket are left out of the result.
+    Callers should create those dockets one at a time with
+    find_docket_object, so that a docket created for one item is found for
+    the next.
+
+    :param keys: A list of (court_id, pacer_case_id, docket_number) tuples.
+    :param chunk_size: The max number of keys to look up per query.
+    :return: A dict mapping keys to the PKs of the dockets found for them.
+    """
+    key_lookups = {
+        key: make_docket_lookups(key[1], key[2]) for key in set(keys)
+    }
+    key_lookups = {k: lookups for k, lookups in key_lookups.items() if lookups}
+    docket_pks: Dict[DocketKey, int] = {}
+    for key_chunk in batched(key_lookups.keys(), chunk_size):
+        q = Q()
+        for key in key_chunk:
+            q |= make_docket_lookups_query(key[0], key_lookups[key])
+        candidates = (
+            Docket.objects.filter(q)
+            .order_by("date_created", "pk")
+            .only(
+                "pk",
+                "court_id",
+                "pacer_case_id",
+                "docket_number_core",
+                "docket_number",
+                "date_created",
+            )
+        )
+
+        # Index the candidates by each field we look them up by.
+        by_field: Dict[Tuple, List[Docket]] = defaultdict(list)
+        for c in candidates:
+            for field in [
+                "pacer_case_id",
+                "docket_number_core",
+                "docket_number",
+            ]:
+                by_field[(c.court_id, field, getattr(c, field))].append(c)
+
+        for key in key_chunk:
+            court_id, _, docket_number = key
+            lookups = key_lookups[key]
+            matches = {}
+            for kwargs in lookups:
+                for field, value in kwargs.items():
+                    if value is None:
+                        continue
+                    for c in by_field[(court_id, field, value)]:
+                        matches[c.pk] = c
+            matches_by_age = sorted(
+                matches.values(), key=lambda c: (c.date_created, c.pk)
+            )
+            d = pick_docket_from_candidates(
+                matches_by_age, lookups, docket_number
+            )
+            if d is not None:
+                docket_pks[key] = d.pk
+    return docket_pks
+
+
 def add_attorney(atty, p, d):
     """Add/update an attorney.
 
@@ -497,7 +642,9 @@ def make_recap_sequence_number(
     )
 
 
-def calculate_recap_sequence_numbers(docket_entries: list, court_id: str):
+def calculate_recap_sequence_numbers(
+    docket_entries: list, court_id: str
+) -> list[tuple[date, time | None]]:
     """Figure out the RECAP sequence number values for docket entries
     returned by a parser.
 
@@ -521,42 +668,39 @@ def calculate_recap_sequence_numbers(docket_entries: list, court_id: str):
     another parser containing information about docket entries for a docket
     :param court_id: The court id to which docket entries belong, used for
     timezone conversion.
-    :return None, but sets the recap_sequence_number for all items.
+    :return: A list of (date_filed, time_filed) tuples with the localized
+    date and time of each docket entry, in the same order as the entries once
+    they're sorted. Also sets the recap_sequence_number for all items.
     """
     # Determine the sort order of the docket entries and normalize it
     order = get_order_of_docket(docket_entries)
     if order == "desc":
         docket_entries.reverse()
 
+    # Localize every date once, up front, so that each entry can be compared
+    # with its predecessor without converting either of them again.
+    localized_dates = [
+        localize_date_and_time(court_id, de["date_filed"])
+        for de in docket_entries
+    ]
+
     # Assign sequence numbers
-    for prev, de, _ in previous_and_next(docket_entries):
-        current_date_filed, current_time_filed = localize_date_and_time(
-            court_id, de["date_filed"]
-        )
-        prev_date_filed = None
-        if prev is not None:
-            prev_date_filed, prev_time_filed = localize_date_and_time(
-                court_id, prev["date_filed"]
-            )
-        if prev is not None and current_date_filed == prev_date_filed:
+    prev_date_filed = None
+    recap_sequence_index = 0
+    for de, (date_filed, _) in zip(docket_entries, localized_dates):
+        if prev_date_filed is not None and date_filed == prev_date_filed:
             # Previous item has same date. Increment the sequence number.
-            de["recap_sequence_index"] = prev["recap_sequence_index"] + 1
-            de["recap_sequence_number"] = make_recap_sequence_number(
-                current_date_filed, de["recap_sequence_index"]
-            )
-            continue
+            recap_sequence_index += 1
         else:
-            # prev is None --> First item on the list; OR
-            # current is different than previous --> Changed date.
-            # Take same action: Reset the index & assign it.
-            de["recap_sequence_index"] = 1
-            de["recap_sequence_number"] = make_recap_sequence_number(
-                current_date_filed, de["recap_sequence_index"]
-            )
-            continue
+            # First item on the list; OR current is different than
+            # previous --> Changed date. Reset the index.
+            recap_sequence_index = 1
+        de["recap_sequence_number"] = make_recap_sequence_number(
+            date_filed, recap_sequence_index
+        )
+        prev_date_filed = date_filed
 
-    # Cleanup
-    [de.pop("recap_sequence_index", None) for de in docket_entries]
+    return localized_dates
 
 
 def normalize_long_description(docket_entry):
@@ -750,11 +894,151 @@ async def get_or_make_docket_entry(
     return de, de_created
 
 
+# How long we remember the docket entries merged from a docket upload.
+DOCKET_ENTRY_HASHES_TTL = 60 * 60 * 24 * 30
+
+
+def make_docket_entry_hashes_key(docket_pk: int) -> str:
+    """Make the key of the Redis set holding the content hashes of the docket
+    entries merged the last time a docket was uploaded.
+
+    :param docket_pk: The PK of the docket.
+    :return: The Redis key.
+    """
+    return f"docket.entry_hashes:{docket_pk}"
+
+
+def make_docket_upload_digest_key(court_id: str, pacer_case_id: str) -> str:
+    """Make the key of the Redis hash holding the digests of the last docket
+    report merged for a case.
+
+    :param court_id: The CL ID of the court.
+    :param pacer_case_id: The PACER case ID of the case.
+    :return: The Redis key.
+    """
+    return f"recap.docket_upload_digest:{court_id}:{pacer_case_id}"
+
+
+def clear_docket_upload_digest(
+    court_id: str, pacer_case_id: str | None
+) -> None:
+    """Forget the digests of the last docket report merged for a case, so the
+    next upload of the same report is merged again. Call it when something
+    other than a docket upload changes the entries, documents or parties of
+    the case.
+
+    :param court_id: The CL ID of the court.
+    :param pacer_case_id: The PACER case ID of the case.
+    :return: None
+    """
+    if not pacer_case_id:
+        return
+    get_redis_interface("CACHE").delete(
+        make_docket_upload_digest_key(court_id, pacer_case_id)
+    )
+
+
+def hash_docket_entry(docket_entry: dict[str, Any]) -> str:
+    """Hash the contents of a docket entry dict, so we can tell whether it
+    changed between uploads.
+
+    :param docket_entry: A docket entry dict from juriscraper, after
+    calculate_recap_sequence_numbers has set its recap_sequence_number.
+    :return: The SHA256 of the entry's contents.
+    """
+    return sha256(json.dumps(docket_entry, sort_keys=True, default=str))
+
+
+async def get_unchanged_entry_hashes(
+    d: Docket,
+    docket_entries: list[dict[str, Any]],
+    entry_hashes: list[str],
+) -> set[str]:
+    """Find the docket entries that haven't changed since the last time the
+    docket was uploaded.
+
+    An entry is unchanged if the last upload stored its hash and an entry with
+    its RECAP sequence number still exists on the docket, so entries deleted
+    in the meantime are merged again.
+
+    :param d: The docket the entries belong to.
+    :param docket_entries: The docket entry dicts being merged.
+    :param entry_hashes: The content hashes of the docket entries, in the same
+    order.
+    :return: The set of hashes whose entries can be skipped.
+    """
+    if not entry_hashes:
+        return set()
+    r = get_redis_interface("CACHE")
+    known = r.smismember(make_docket_entry_hashes_key(d.pk), entry_hashes)
+    candidates = {
+        h: de["recap_sequence_number"]
+        for de, h, is_known in zip(docket_entries, entry_hashes, known)
+        if is_known
+    }
+    if not candidates:
+        return set()
+    existing_sequence_numbers = {
+        rsn
+        async for rsn in DocketEntry.objects.filter(docket=d).values_list(
+            "recap_sequence_number", flat=True
+        )
+    }
+    return {
+        h for h, rsn in candidates.items() if rsn in existing_sequence_numbers
+    }
+
+
+def store_docket_entry_hashes(docket_pk: int, entry_hashes: list[str]) -> None:
+    """Replace the content hashes remembered for a docket with the ones of
+    the entries that were just merged.
+
+    :param docket_pk: The PK of the docket.
+    :param entry_hashes: The content hashes of the merged docket entries.
+    :return: None
+    """
+    key = make_docket_entry_hashes_key(docket_pk)
+    pipe = get_redis_interface("CACHE").pipeline()
+    pipe.delete(key)
+    if entry_hashes:
+        pipe.sadd(key, *entry_hashes)
+        pipe.expire(key, DOCKET_ENTRY_HASHES_TTL)
+    pipe.execute()
+
+
+async def tag_unchanged_docket_entry(
+    d: Docket, docket_entry: dict[str, Any], tags: list[Tag]
+) -> None:
+    """Apply the tags of a merge to a docket entry it skipped as unchanged,
+    and to its document, as if the entry had been merged.
+
+    :param d: The docket the entry belongs to.
+    :param docket_entry: The docket entry dict that was skipped.
+    :param tags: The tag objects to apply.
+    :return: None
+    """
+    rsn = docket_entry["recap_sequence_number"]
+    async for de in DocketEntry.objects.filter(
+        docket=d, recap_sequence_number=rsn
+    ):
+        for tag in tags:
+            await sync_to_async(tag.tag_object)(de)
+    async for rd in RECAPDocument.objects.filter(
+        docket_entry__docket=d,
+        docket_entry__recap_sequence_number=rsn,
+        attachment_number=docket_entry.get("attachment_number"),
+    ):
+        for tag in tags:
+            await sync_to_async(tag.tag_object)(rd)
+
+
+@defer_docket_entry_pages_invalidation
 async def add_docket_entries(
     d: Docket,
     docket_entries: list[dict[str, Any]],
     tags: list[str] | None = None,
     do_not_update_existing: bool = False,
+    skip_unchanged: bool = False,
 ) -> tuple[
     tuple[list[DocketEntry], list[RECAPDocument]], list[RECAPDocument], bool
 ]:
@@ -766,6 +1050,10 @@ async def add_docket_entries(
     docket entries created or updated in this function.
     :param do_not_update_existing: Whether docket entries should only be created and avoid
     updating an existing one.
+    :param skip_unchanged: Whether to skip the docket entries that haven't
+    changed since the last time this was called with skip_unchanged for the
+    docket. Use it when merging full docket uploads. Skipped entries aren't
+    included in the returned lists, but they still get the tags.
     :return: A three tuple of:
         - A two tuple of list of created or existing DocketEntry objects and
         a list of existing RECAPDocument objects.
@@ -774,14 +1062,43 @@ async def add_docket_entries(
     """
     # Remove items without a date filed value.
     docket_entries = [de for de in docket_entries if de.get("date_filed")]
+    if docket_entries:
+        clear_docket_upload_digest(d.court_id, d.pacer_case_id)
 
     rds_created = []
     des_returned = []
     rds_updated = []
     content_updated = False
-    calculate_recap_sequence_numbers(docket_entries, d.court_id)
+    localized_dates = calculate_recap_sequence_numbers(
+        docket_entries, d.court_id
+    )
+    entry_hashes: list[str | None] = [None] * len(docket_entries)
+    unchanged_hashes: set[str] = set()
+    merged_hashes = []
+    if skip_unchanged:
+        entry_hashes = [hash_docket_entry(de) for de in docket_entries]
+        unchanged_hashes = await get_unchanged_entry_hashes(
+            d, docket_entries, entry_hashes
+        )
+    elif docket_entries:
+        # Entries might change below, so the hashes from the last upload
+        # can't be trusted anymore.
+        store_docket_entry_hashes(d.pk, [])
+
+    appellate_court_ids = Court.federal_courts.appellate_pacer_courts()
+    is_appellate_court = await appellate_court_ids.filter(
+        pk=d.court_id
+    ).aexists()
     known_filing_dates = [d.date_last_filing]
-    for docket_entry in docket_entries:
+    for docket_entry, (date_filed, time_filed), entry_hash in zip(
+        docket_entries, localized_dates, entry_hashes
+    ):
+        if entry_hash in unchanged_hashes:
+            if tags:
+                await tag_unchanged_docket_entry(d, docket_entry, tags)
+            merged_hashes.append(entry_hash)
+            continue
+
         response = await get_or_make_docket_entry(d, docket_entry)
         if response is None:
             continue
@@ -789,9 +1106,6 @@ async def add_docket_entries(
             de, de_created = response[0], response[1]
 
         de.description = docket_entry["description"] or de.description
-        date_filed, time_filed = localize_date_and_time(
-            d.court_id, docket_entry["date_filed"]
-        )
         if not time_filed:
             # If not time data is available, compare if date_filed changed if
             # so restart time_filed to None, otherwise keep the current time.
@@ -831,8 +1145,6 @@ async def add_docket_entries(
         else:
             params["document_type"] = RECAPDocument.PACER_DOCUMENT
 
-        appellate_court_ids = Court.federal_courts.appellate_pacer_courts()
-
         # Unlike district and bankr. dockets, where you always have a main
         # RD and can optionally have attachments to the main RD, Appellate
         # docket entries can either they *only* have a main RD (with no
@@ -844,10 +1156,7 @@ async def add_docket_entries(
         # RDs. The check here ensures that if that happens for a particular
         # entry, we avoid creating the main RD a second+ time when we get the
         # docket sheet a second+ time.
-        appelate_court_id_exists = await appellate_court_ids.filter(
-            pk=d.court_id
-        ).aexists()
-        if de_created is False and appelate_court_id_exists:
+        if de_created is False and is_appellate_court:
             appellate_rd_att_exists = await de.recap_documents.filter(
                 document_type=RECAPDocument.ATTACHMENT
             ).aexists()
@@ -912,12 +1221,16 @@ async def add_docket_entries(
                 attachments,
                 False,
             )
+        if entry_hash is not None:
+            merged_hashes.append(entry_hash)
 
     known_filing_dates = set(filter(None, known_filing_dates))
     if known_filing_dates:
         await Docket.objects.filter(pk=d.pk).aupdate(
             date_last_filing=max(known_filing_dates)
         )
+    if skip_unchanged:
+        store_docket_entry_hashes(d.pk, merged_hashes)
 
     return (des_returned, rds_updated), rds_created, content_updated
 
@@ -944,63 +1257,6 @@ def check_json_for_terminated_entities(parties) -> bool:
     return False
 
 
-def get_terminated_entities(d):
-    """Check the docket to identify if there were any terminated parties or
-    attorneys. If so, return their IDs.
-
-    :param d: A docket object to investigate.
-    :returns (parties, attorneys): A tuple of two sets. One for party IDs, one
-    for attorney IDs.
-    """
-    # This will do five queries at most rather than doing potentially hundreds
-    # on cases with many parties.
-    parties = (
-        d.parties.prefetch_related(
-            Prefetch(
-                "party_types",
-                queryset=PartyType.objects.filter(docket=d)
-                .exclude(date_terminated=None)
-                .distinct()
-                .only("pk"),
-                to_attr="party_types_for_d",
-            ),
-            Prefetch(
-                "attorneys",
-                queryset=Attorney.objects.filter(roles__docket=d)
-                .distinct()
-                .only("pk"),
-                to_attr="attys_in_d",
-            ),
-            Prefetch(
-                "attys_in_d__roles",
-                queryset=Role.objects.filter(
-                    docket=d, role__in=[Role.SELF_TERMINATED, Role.TERMINATED]
-                )
-                .distinct()
-                .only("pk"),
-                to_attr="roles_for_atty",
-            ),
-        )
-        .distinct()
-        .only("pk")
-    )
-    terminated_party_ids = set()
-    terminated_attorney_ids = set()
-    for party in parties:
-        for _ in party.party_types_for_d:
-            # PartyTypes are filtered to terminated objects. Thus, if
-            # any exist, we know it's a terminated party.
-            terminated_party_ids.add(party.pk)
-            break
-        for atty in party.attys_in_d:
-            for _ in atty.roles_for_atty:
-                # Roles are filtered to terminated roles. Thus, if any hits, we
-                # know we have terminated attys.
-                terminated_attorney_ids.add(atty.pk)
-                break
-    return terminated_party_ids, terminated_attorney_ids
-
-
 def normalize_attorney_roles(parties):
     """Clean up the attorney roles for all parties.
 
@@ -1064,6 +1320,10 @@ def disassociate_extraneous_entities(
      - If a party is terminated, do not delete their attorneys even if their
        attorneys are not listed as terminated.
 
+    This is done in a single statement. The terminated entities are found with
+    subqueries instead of being loaded, and the party types, their criminal
+    data, and the roles are deleted together in one set-based DELETE.
+
     :param d: The docket to interrogate and act upon.
     :param parties: The parties dict that was scraped, and which we inspect to
     check if terminated parties were included.
@@ -1072,42 +1332,385 @@ def disassociate_extraneous_entities(
     :param attorneys_to_preserve: A set of attorney IDs that were updated or
     created while updating the docket.
     """
-    new_has_terminated_entities = check_json_for_terminated_entities(parties)
-    if not new_has_terminated_entities:
-        # No terminated data in the JSON. Check if we have any in the DB.
-        terminated_parties, terminated_attorneys = get_terminated_entities(d)
-        if any([terminated_parties, terminated_attorneys]):
-            # The docket currently has terminated entities, but new info
-            # doesn't, indicating that the user didn't request it. Thus, delete
-            # any entities that weren't just created/updated and that aren't in
-            # the list of terminated entities.
-            parties_to_preserve = parties_to_preserve | terminated_parties
-            attorneys_to_preserve = (
-                attorneys_to_preserve | terminated_attorneys
-            )
+    pt_table = PartyType._meta.db_table
+    role_table = Role._meta.db_table
+    if check_json_for_terminated_entities(parties):
+        # The terminated entities are already included in the entities to
+        # preserve, so there's nothing else to keep.
+        terminated_parties_sql = "SELECT NULL::integer AS party_id LIMIT 0"
+        terminated_attorneys_sql = (
+            "SELECT NULL::integer AS attorney_id LIMIT 0"
+        )
     else:
-        # The terminated parties are already included in the entities to
-        # preserve, so just create an empty variable for this.
-        terminated_parties = set()
-
-    # Disassociate extraneous parties from the docket.
-    PartyType.objects.filter(
-        docket=d,
-    ).exclude(
-        party_id__in=parties_to_preserve,
-    ).delete()
-
-    # Disassociate extraneous attorneys from the docket and parties.
-    Role.objects.filter(
-        docket=d,
-    ).exclude(
-        # Don't delete attorney roles for attorneys we're preserving.
-        attorney_id__in=attorneys_to_preserve,
-    ).exclude(
-        # Don't delete attorney roles for parties we're preserving b/c
-        # they were terminated.
-        party_id__in=terminated_parties,
-    ).delete()
+        # No terminated data in the JSON. If the docket currently has
+        # terminated entities, the user didn't request them, so keep them.
+        terminated_parties_sql = f"""
+            SELECT party_id FROM {pt_table}
+            WHERE docket_id = %(docket_id)s AND date_terminated IS NOT NULL
+        """
+        terminated_attorneys_sql = f"""
+            SELECT r.attorney_id FROM {role_table} r
+            INNER JOIN {pt_table} pt
+              ON pt.party_id = r.party_id AND pt.docket_id = r.docket_id
+            WHERE r.docket_id = %(docket_id)s
+              AND r.role = ANY(%(terminated)s)
+        """
+
+    query = f"""
+        WITH terminated_parties AS ({terminated_parties_sql}),
+        terminated_attorneys AS ({terminated_attorneys_sql}),
+        extraneous_party_types AS (
+            SELECT id FROM {pt_table}
+            WHERE docket_id = %(docket_id)s
+              AND NOT party_id = ANY(%(parties)s)
+              AND party_id NOT IN (
+                SELECT party_id FROM terminated_parties
+              )
+        ),
+        deleted_counts AS (
+            DELETE FROM {CriminalCount._meta.db_table}
+            WHERE party_type_id IN (SELECT id FROM extraneous_party_types)
+        ),
+        deleted_complaints AS (
+            DELETE FROM {CriminalComplaint._meta.db_table}
+            WHERE party_type_id IN (SELECT id FROM extraneous_party_types)
+        ),
+        deleted_party_types AS (
+            DELETE FROM {pt_table}
+            WHERE id IN (SELECT id FROM extraneous_party_types)
+        )
+        DELETE FROM {role_table}
+        WHERE docket_id = %(docket_id)s
+          -- Don't delete attorney roles for attorneys we're preserving.
+          AND NOT attorney_id = ANY(%(attorneys)s)
+          AND attorney_id NOT IN (
+            SELECT attorney_id FROM terminated_attorneys
+          )
+          -- Don't delete attorney roles for parties we're preserving b/c
+          -- they were terminated.
+          AND party_id NOT IN (SELECT party_id FROM terminated_parties)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            query,
+            {
+                "docket_id": d.pk,
+                "parties": list(parties_to_preserve),
+                "attorneys": list(attorneys_to_preserve),
+                "terminated": [Role.SELF_TERMINATED, Role.TERMINATED],
+            },
+        )
+
+
+def get_or_create_docket_parties(
+    d: Docket, parties: List[Dict[str, Any]]
+) -> Dict[str, Party]:
+    """Find the parties on a docket by name, creating any that are missing.
+
+    If more than one party on the docket has a name, the earliest one is used.
+
+    :param d: The docket the parties are on.
+    :param parties: The normalized party dicts from Juriscraper.
+    :return: A dict mapping each incoming party name to its Party object.
+    """
+    names = {party["name"] for party in parties}
+    party_lookup: Dict[str, Party] = {}
+    existing_parties = (
+        Party.objects.filter(name__in=names, party_types__docket=d)
+        .distinct()
+        .order_by("date_created")
+        .only("pk", "name", "date_created")
+    )
+    for p in existing_parties:
+        party_lookup.setdefault(p.name, p)
+
+    new_parties = {
+        party["name"]: Party(name=party["name"])
+        for party in parties
+        if party["name"] not in party_lookup
+    }
+    for p in Party.objects.bulk_create(new_parties.values()):
+        party_lookup[p.name] = p
+    return party_lookup
+
+
+def upsert_party_types(
+    d: Docket,
+    parties: List[Dict[str, Any]],
+    party_lookup: Dict[str, Party],
+) -> Dict[Tuple[int, str], PartyType]:
+    """Create or update the party types that link parties to a docket.
+
+    :param d: The docket the parties are on.
+    :param parties: The normalized party dicts from Juriscraper.
+    :param party_lookup: A dict mapping party names to Party objects.
+    :return: A dict mapping (party ID, type name) to PartyType objects.
+    """
+    party_types = {
+        (pt.party_id, pt.name): pt
+        for pt in PartyType.objects.filter(
+            docket=d, party_id__in=[p.pk for p in party_lookup.values()]
+        )
+    }
+    to_create = {}
+    to_update = {}
+    for party in parties:
+        p = party_lookup[party["name"]]
+        key = (p.pk, party["type"])
+        update_dict = {
+            "extra_info": party.get("extra_info", ""),
+            "date_terminated": party.get("date_terminated"),
+        }
+        criminal_data = party.get("criminal_data")
+        if criminal_data:
+            update_dict["highest_offense_level_opening"] = criminal_data[
+                "highest_offense_level_opening"
+            ]
+            update_dict["highest_offense_level_terminated"] = criminal_data[
+                "highest_offense_level_terminated"
+            ]
+
+        pt = party_types.get(key)
+        if pt is None:
+            pt = PartyType(docket=d, party=p, name=party["type"])
+            party_types[key] = pt
+            to_create[key] = pt
+        changed = False
+        for field, value in update_dict.items():
+            if getattr(pt, field) != value:
+                setattr(pt, field, value)
+                changed = True
+        if changed and key not in to_create:
+            to_update[key] = pt
+
+    PartyType.objects.bulk_create(to_create.values())
+    PartyType.objects.bulk_update(
+        to_update.values(),
+        [
+            "extra_info",
+            "date_terminated",
+            "highest_offense_level_opening",
+            "highest_offense_level_terminated",
+        ],
+    )
+    return party_types
+
+
+def replace_criminal_data(
+    parties: List[Dict[str, Any]],
+    party_lookup: Dict[str, Party],
+    party_types: Dict[Tuple[int, str], PartyType],
+) -> None:
+    """Replace the criminal counts and complaints of the parties that have
+    them in the new data.
+
+    :param parties: The normalized party dicts from Juriscraper.
+    :param party_lookup: A dict mapping party names to Party objects.
+    :param party_types: A dict mapping (party ID, type name) to PartyType
+    objects.
+    :return: None
+    """
+    counts = {}
+    complaints = {}
+    for party in parties:
+        criminal_data = party.get("criminal_data")
+        if not criminal_data:
+            continue
+        pt = party_types[(party_lookup[party["name"]].pk, party["type"])]
+        if criminal_data["counts"]:
+            counts[pt.pk] = [
+                CriminalCount(
+                    party_type=pt,
+                    name=criminal_count["name"],
+                    disposition=criminal_count["disposition"],
+                    status=CriminalCount.normalize_status(
+                        criminal_count["status"]
+                    ),
+                )
+                for criminal_count in criminal_data["counts"]
+            ]
+        if criminal_data["complaints"]:
+            complaints[pt.pk] = [
+                CriminalComplaint(
+                    party_type=pt,
+                    name=complaint["name"],
+                    disposition=complaint["disposition"],
+                )
+                for complaint in criminal_data["complaints"]
+            ]
+
+    if counts:
+        CriminalCount.objects.filter(party_type_id__in=counts.keys()).delete()
+        CriminalCount.objects.bulk_create(
+            [c for pt_counts in counts.values() for c in pt_counts]
+        )
+    if complaints:
+        CriminalComplaint.objects.filter(
+            party_type_id__in=complaints.keys()
+        ).delete()
+        CriminalComplaint.objects.bulk_create(
+            [c for pt_complaints in complaints.values() for c in pt_complaints]
+        )
+
+
+def upsert_attorneys(
+    d: Docket,
+    parties: List[Dict[str, Any]],
+    party_lookup: Dict[str, Party],
+) -> set[int]:
+    """Add or update the attorneys of the parties, along with their
+    organizations and roles.
+
+    This does in bulk what add_attorney does for a single attorney. Attorneys
+    are looked up by name among those already on the docket, with the
+    earliest winning ties.
+
+    :param d: The docket the parties are on.
+    :param parties: The normalized party dicts from Juriscraper.
+    :param party_lookup: A dict mapping party names to Party objects.
+    :return: The IDs of the attorneys that were added or updated.
+    """
+    names = {atty["name"] for party in parties for atty in party["attorneys"]}
+    if not names:
+        return set()
+
+    attorneys: Dict[str, Attorney] = {}
+    existing_attorneys = (
+        Attorney.objects.filter(name__in=names, roles__docket=d)
+        .distinct()
+        .order_by("date_created")
+    )
+    for a in existing_attorneys:
+        attorneys.setdefault(a.name, a)
+    new_attorneys = {}
+    for party in parties:
+        for atty in party["attorneys"]:
+            if atty["name"] in attorneys or atty["name"] in new_attorneys:
+                continue
+            new_attorneys[atty["name"]] = Attorney(
+                name=atty["name"], contact_raw=atty["contact"]
+            )
+    for a in Attorney.objects.bulk_create(new_attorneys.values()):
+        attorneys[a.name] = a
+
+    contacts: Dict[Tuple[str, str], Tuple[Dict, Dict]] = {}
+    orgs_to_link: Dict[str, Dict[str, str]] = {}
+    org_links: set[Tuple[int, str]] = set()
+    attorneys_to_update: Dict[int, Attorney] = {}
+    wanted_roles: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+    for party in parties:
+        p = party_lookup[party["name"]]
+        for atty in party["attorneys"]:
+            a = attorneys[atty["name"]]
+            if atty["contact"]:
+                contact_key = (atty["contact"], atty["name"])
+                if contact_key not in contacts:
+                    contacts[contact_key] = normalize_attorney_contact(
+                        atty["contact"], fallback_name=atty["name"]
+                    )
+                atty_org_info, atty_info = contacts[contact_key]
+                if atty_org_info:
+                    lookup_key = atty_org_info["lookup_key"]
+                    orgs_to_link.setdefault(lookup_key, atty_org_info)
+                    org_links.add((a.pk, lookup_key))
+                if atty_info:
+                    new_values = {
+                        "contact_raw": atty["contact"],
+                        "email": atty_info["email"],
+                        "phone": atty_info["phone"],
+                        "fax": atty_info["fax"],
+                    }
+                    for field, value in new_values.items():
+                        if getattr(a, field) != value:
+                            setattr(a, field, value)
+                            attorneys_to_update[a.pk] = a
+
+            roles = atty["roles"]
+            if len(roles) == 0:
+                roles = [{"role": Role.UNKNOWN, "date_action": None}]
+            wanted_roles[(a.pk, p.pk)] = roles
+
+    if attorneys_to_update:
+        for a in attorneys_to_update.values():
+            # bulk_update doesn't touch auto_now fields.
+            a.date_modified = now()
+        Attorney.objects.bulk_update(
+            attorneys_to_update.values(),
+            ["contact_raw", "email", "phone", "fax", "date_modified"],
+        )
+
+    # Associate the attorneys with their orgs.
+    if orgs_to_link:
+        orgs = {
+            org.lookup_key: org
+            for org in AttorneyOrganization.objects.filter(
+                lookup_key__in=orgs_to_link.keys()
+            )
+        }
+        missing_orgs = [
+            AttorneyOrganization(**info)
+            for key, info in orgs_to_link.items()
+            if key not in orgs
+        ]
+        if missing_orgs:
+            # Ignore conflicts in case of a race with another merge, then
+            # reload to get the IDs.
+            AttorneyOrganization.objects.bulk_create(
+                missing_orgs, ignore_conflicts=True
+            )
+            orgs.update(
+                {
+                    org.lookup_key: org
+                    for org in AttorneyOrganization.objects.filter(
+                        lookup_key__in=[o.lookup_key for o in missing_orgs]
+                    )
+                }
+            )
+        AttorneyOrganizationAssociation.objects.bulk_create(
+            [
+                AttorneyOrganizationAssociation(
+                    attorney_id=atty_id,
+                    attorney_organization=orgs[lookup_key],
+                    docket=d,
+                )
+                for atty_id, lookup_key in org_links
+                if lookup_key in orgs
+            ],
+            ignore_conflicts=True,
+        )
+
+    # Replace the roles of each attorney and party pair with the new ones,
+    # leaving the ones that didn't change alone.
+    def role_key(role: Dict[str, Any]) -> Tuple[Any, Any, str]:
+        return role["role"], role["date_action"], role.get("role_raw", "")
+
+    existing_roles = Role.objects.filter(
+        docket=d, attorney_id__in=[a_pk for a_pk, _ in wanted_roles]
+    ).values(
+        "pk", "attorney_id", "party_id", "role", "date_action", "role_raw"
+    )
+    roles_to_keep = set()
+    roles_to_delete = []
+    for role in existing_roles:
+        pair = (role["attorney_id"], role["party_id"])
+        if pair not in wanted_roles:
+            continue
+        wanted = {role_key(r) for r in wanted_roles[pair]}
+        key = role_key(role)
+        if key in wanted and (pair, key) not in roles_to_keep:
+            roles_to_keep.add((pair, key))
+        else:
+            roles_to_delete.append(role["pk"])
+    Role.objects.filter(pk__in=roles_to_delete).delete()
+    Role.objects.bulk_create(
+        [
+            Role(attorney_id=a_pk, party_id=p_pk, docket=d, **atty_role)
+            for (a_pk, p_pk), roles in wanted_roles.items()
+            for atty_role in roles
+            if ((a_pk, p_pk), role_key(atty_role)) not in roles_to_keep
+        ]
+    )
+    return {a.pk for a in attorneys.values()}
 
 
 @transaction.atomic
@@ -1116,6 +1719,11 @@ def disassociate_extraneous_entities(
 def add_parties_and_attorneys(d, parties):
     """Add parties and attorneys from the docket data to the docket.
 
+    Rather than looking up each party and attorney one at a time, this loads
+    what the docket already has in a few queries, works out the differences
+    in memory, and writes them in bulk. Big MDL dockets can have thousands of
+    parties, so this matters.
+
     :param d: The docket to update
     :param parties: The parties to update the docket with, with their
     associated attorney objects. This is typically the
@@ -1135,89 +1743,23 @@ def add_parties_and_attorneys(d, parties):
     # run with the initial value of the parties variable, but will instead be
     # run with the mutated value! That will crash because the mutated variable
     # no longer has the correct shape as it did when it was first passed.
-    # ∴, make a copy of parties as a first step, so that retries work.
-    local_parties = deepcopy(parties)
-
-    normalize_attorney_roles(local_parties)
-
-    updated_parties = set()
-    updated_attorneys = set()
-    for party in local_parties:
-        ps = Party.objects.filter(
-            name=party["name"], party_types__docket=d
-        ).distinct()
-        count = ps.count()
-        if count == 0:
-            try:
-                p = Party.objects.create(name=party["name"])
-            except IntegrityError:
-                # Race condition. Object was created after our get and before
-                # our create. Try to get it again.
-                ps = Party.objects.filter(
-                    name=party["name"], party_types__docket=d
-                ).distinct()
-                count = ps.count()
-        if count == 1:
-            p = ps[0]
-        elif count >= 2:
-            p = ps.earliest("date_created")
-        updated_parties.add(p.pk)
-
-        # If the party type doesn't exist, make a new one.
-        pts = p.party_types.filter(docket=d, name=party["type"])
-        criminal_data = party.get("criminal_data")
-        update_dict = {
-            "extra_info": party.get("extra_info", ""),
-            "date_terminated": party.get("date_terminated"),
+    # ∴, copy the dicts that normalize_attorney_roles mutates as a first
+    # step, so that retries work.
+    local_parties = [
+        {
+            **party,
+            "attorneys": [dict(atty) for atty in party.get("attorneys", [])],
         }
-        if criminal_data:
-            update_dict["highest_offense_level_opening"] = criminal_data[
-                "highest_offense_level_opening"
-            ]
-            update_dict["highest_offense_level_terminated"] = criminal_data[
-                "highest_offense_level_terminated"
-            ]
-        if pts.exists():
-            pts.update(**update_dict)
-            pt = pts[0]
-        else:
-            pt = PartyType.objects.create(
-                docket=d, party=p, name=party["type"], **update_dict
-            )
-
-        # Criminal counts and complaints
-        if criminal_data and criminal_data["counts"]:
-            CriminalCount.objects.filter(party_type=pt).delete()
-            CriminalCount.objects.bulk_create(
-                [
-                    CriminalCount(
-                        party_type=pt,
-                        name=criminal_count["name"],
-                        disposition=criminal_count["disposition"],
-                        status=CriminalCount.normalize_status(
-                            criminal_count["status"]
-                        ),
-                    )
-                    for criminal_count in criminal_data["counts"]
-                ]
-            )
-
-        if criminal_data and criminal_data["complaints"]:
-            CriminalComplaint.objects.filter(party_type=pt).delete()
-            CriminalComplaint.objects.bulk_create(
-                [
-                    CriminalComplaint(
-                        party_type=pt,
-                        name=complaint["name"],
-                        disposition=complaint["disposition"],
-                    )
-                    for complaint in criminal_data["complaints"]
-                ]
-            )
+        for party in parties
+    ]
+    normalize_attorney_roles(local_parties)
+    clear_docket_upload_digest(d.court_id, d.pacer_case_id)
 
-        # Attorneys
-        for atty in party.get("attorneys", []):
-            updated_attorneys.add(add_attorney(atty, p, d))
+    party_lookup = get_or_create_docket_parties(d, local_parties)
+    party_types = upsert_party_types(d, local_parties, party_lookup)
+    replace_criminal_data(local_parties, party_lookup, party_types)
+    updated_attorneys = upsert_attorneys(d, local_parties, party_lookup)
+    updated_parties = {p.pk for p in party_lookup.values()}
 
     disassociate_extraneous_entities(
         d, local_parties, updated_parties, updated_attorneys
@@ -1613,6 +2155,8 @@ async def merge_attachment_page_data(
     if debug:
         return [], de
 
+    clear_docket_upload_digest(court.pk, de.docket.pacer_case_id)
+
     # Save the old HTML to the docket entry.
     # We won't have text if attachments are from docket page.
     if text is not None:
@@ -1,7 +1,9 @@
 import asyncio
 import concurrent.futures
 import hashlib
+import json
 import logging
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
 from http import HTTPStatus
@@ -20,6 +22,7 @@ from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile, File
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db import IntegrityError, transaction
+from django.db.models import Q, QuerySet
 from django.utils.timezone import now
 from juriscraper.lib.exceptions import PacerLoginException, ParsingException
 from juriscraper.lib.string_utils import CaseNameTweaker, harmonize
@@ -66,6 +69,7 @@ from cl.lib.pacer_session import (
     get_pacer_cookie_from_cache,
 )
 from cl.lib.recap_utils import get_document_filename
+from cl.lib.redis_utils import get_redis_interface
 from cl.lib.storage import RecapEmailSESStorage
 from cl.lib.string_diff import find_best_match
 from cl.recap.mergers import (
@@ -77,6 +81,8 @@ from cl.recap.mergers import (
     find_docket_object,
     get_data_from_appellate_att_report,
     get_data_from_att_report,
+    make_docket_entry_hashes_key,
+    make_docket_upload_digest_key,
     merge_attachment_page_data,
     merge_pacer_docket_into_cl_docket,
     process_orphan_documents,
@@ -100,6 +106,7 @@ from cl.search.tasks import (
     add_or_update_recap_docket,
     index_docket_parties_in_es,
 )
+from cl.stats.utils import tally_stat
 
 logger = logging.getLogger(__name__)
 cnt = CaseNameTweaker()
@@ -524,6 +531,106 @@ def parse_docket_text(court_id, text):
     return report.data
 
 
+# How long we remember the digest of the last report merged for a docket.
+DOCKET_UPLOAD_DIGEST_TTL = 60 * 60 * 24 * 30
+
+
+def digest_docket_data(data: dict) -> str:
+    """Compute the digest of the data parsed from a docket report.
+
+    :param data: The data parsed by juriscraper.
+    :return: The SHA256 of the normalized data.
+    """
+    normalized = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+async def get_docket_upload_digest(pq: ProcessingQueue) -> dict[str, str]:
+    """Get the digests of the last docket report merged for the case of an
+    upload.
+
+    Digests are only returned if they can still be trusted: the docket must
+    not have been saved since, and nothing else must have merged docket
+    entries into it, as shown by the entry hashes stored by
+    add_docket_entries still being there. Merges of entries, attachments and
+    parties also delete the digests, with clear_docket_upload_digest.
+
+    :param pq: The ProcessingQueue of the upload.
+    :return: A dict with the "docket_pk" and the "html" and "data" digests, or
+    an empty dict if there are none to compare with.
+    """
+    if pq.debug or not pq.pacer_case_id:
+        return {}
+    r = get_redis_interface("CACHE")
+    digest = r.hgetall(
+        make_docket_upload_digest_key(pq.court_id, pq.pacer_case_id)
+    )
+    if not digest:
+        return {}
+    docket_pk = int(digest["docket_pk"])
+    if not r.exists(make_docket_entry_hashes_key(docket_pk)):
+        return {}
+    date_modified = (
+        await Docket.objects.filter(pk=docket_pk)
+        .values_list("date_modified", flat=True)
+        .afirst()
+    )
+    if date_modified is None:
+        return {}
+    if date_modified.isoformat() != digest.get("date_modified"):
+        return {}
+    return digest
+
+
+def save_docket_upload_digest(
+    pq: ProcessingQueue, d: Docket, html_digest: str, data_digest: str
+) -> None:
+    """Remember the digests of a docket report that was just merged.
+
+    :param pq: The ProcessingQueue of the upload.
+    :param d: The docket the report was merged into, as it was saved by the
+    merge.
+    :param html_digest: The SHA256 of the raw report.
+    :param data_digest: The digest of the parsed report, as returned by
+    digest_docket_data.
+    :return: None
+    """
+    if pq.debug or not pq.pacer_case_id:
+        return
+    key = make_docket_upload_digest_key(pq.court_id, pq.pacer_case_id)
+    pipe = get_redis_interface("CACHE").pipeline()
+    pipe.hset(
+        key,
+        mapping={
+            "docket_pk": d.pk,
+            "date_modified": d.date_modified.isoformat(),
+            "html": html_digest,
+            "data": data_digest,
+        },
+    )
+    pipe.expire(key, DOCKET_UPLOAD_DIGEST_TTL)
+    pipe.execute()
+
+
+async def skip_unchanged_docket_upload(
+    pq: ProcessingQueue, docket_pk: int, matched: str
+) -> dict[str, int | bool]:
+    """Finish processing a docket upload that matches the last report merged
+    for its case, without merging it again.
+
+    :param pq: The ProcessingQueue of the upload.
+    :param docket_pk: The PK of the docket the last report was merged into.
+    :param matched: Which digest matched, "html" or "data". Used to record
+    the skip rates.
+    :return: The same dict process_recap_docket returns.
+    """
+    logger.info(f"Skipping unchanged docket upload ({matched}): {pq}")
+    await tally_stat(f"recap.docket_upload.skipped.{matched}")
+    await associate_related_instances(pq, d_id=docket_pk)
+    await mark_pq_successful(pq)
+    return {"docket_pk": docket_pk, "content_updated": False}
+
+
 async def process_recap_docket(pk):
     """Process an uploaded docket from the RECAP API endpoint.
 
@@ -555,6 +662,15 @@ async def process_recap_docket(pk):
         await mark_pq_status(pq, msg, PROCESSING_STATUS.FAILED)
         return None
 
+    # Extension users upload the same dockets over and over. Skip the ones
+    # that are identical to the last report we merged for the case.
+    upload_digest = await get_docket_upload_digest(pq)
+    html_digest = hashlib.sha256(text.encode()).hexdigest()
+    if upload_digest.get("html") == html_digest:
+        return await skip_unchanged_docket_upload(
+            pq, int(upload_digest["docket_pk"]), "html"
+        )
+
     if process.current_process().daemon:
         data = parse_docket_text(map_cl_to_pacer_id(pq.court_id), text)
     else:
@@ -570,6 +686,12 @@ async def process_recap_docket(pk):
         await mark_pq_status(pq, msg, PROCESSING_STATUS.INVALID_CONTENT)
         return None
 
+    data_digest = digest_docket_data(data)
+    if upload_digest.get("data") == data_digest:
+        return await skip_unchanged_docket_upload(
+            pq, int(upload_digest["docket_pk"]), "data"
+        )
+
     # Merge the contents of the docket into CL.
     d = await find_docket_object(
         pq.court_id, pq.pacer_case_id, data["docket_number"]
@@ -597,7 +719,7 @@ async def process_recap_docket(pk):
     )
 
     items_returned, rds_created, content_updated = await add_docket_entries(
-        d, data["docket_entries"]
+        d, data["docket_entries"], skip_unchanged=True
     )
     await sync_to_async(add_parties_and_attorneys)(d, data["parties"])
     if data["parties"]:
@@ -608,6 +730,8 @@ async def process_recap_docket(pk):
         newly_enqueued = enqueue_docket_alert(d.pk)
         if newly_enqueued:
             await sync_to_async(send_alert_and_webhook.delay)(d.pk, start_time)
+    save_docket_upload_digest(pq, d, html_digest, data_digest)
+    await tally_stat("recap.docket_upload.merged")
     await associate_related_instances(pq, d_id=d.pk)
     await mark_pq_successful(pq)
     return {
@@ -882,7 +1006,7 @@ async def process_recap_docket_history_report(pk):
     )
 
     items_returned, rds_created, content_updated = await add_docket_entries(
-        d, data["docket_entries"]
+        d, data["docket_entries"], skip_unchanged=True
     )
     await process_orphan_documents(rds_created, pq.court_id, d.date_filed)
     if content_updated:
@@ -1050,6 +1174,15 @@ async def process_recap_appellate_docket(pk):
         await mark_pq_status(pq, msg, PROCESSING_STATUS.FAILED)
         return None
 
+    # Extension users upload the same dockets over and over. Skip the ones
+    # that are identical to the last report we merged for the case.
+    upload_digest = await get_docket_upload_digest(pq)
+    html_digest = hashlib.sha256(text.encode()).hexdigest()
+    if upload_digest.get("html") == html_digest:
+        return await skip_unchanged_docket_upload(
+            pq, int(upload_digest["docket_pk"]), "html"
+        )
+
     if process.current_process().daemon:
         data = parse_appellate_text(map_cl_to_pacer_id(pq.court_id), text)
     else:
@@ -1068,6 +1201,12 @@ async def process_recap_appellate_docket(pk):
         await mark_pq_status(pq, msg, PROCESSING_STATUS.INVALID_CONTENT)
         return None
 
+    data_digest = digest_docket_data(data)
+    if upload_digest.get("data") == data_digest:
+        return await skip_unchanged_docket_upload(
+            pq, int(upload_digest["docket_pk"]), "data"
+        )
+
     # Merge the contents of the docket into CL.
     d = await find_docket_object(
         pq.court_id, pq.pacer_case_id, data["docket_number"]
@@ -1099,7 +1238,7 @@ async def process_recap_appellate_docket(pk):
     )
 
     items_returned, rds_created, content_updated = await add_docket_entries(
-        d, data["docket_entries"]
+        d, data["docket_entries"], skip_unchanged=True
     )
     await sync_to_async(add_parties_and_attorneys)(d, data["parties"])
     if data["parties"]:
@@ -1110,6 +1249,8 @@ async def process_recap_appellate_docket(pk):
         newly_enqueued = enqueue_docket_alert(d.pk)
         if newly_enqueued:
             await sync_to_async(send_alert_and_webhook.delay)(d.pk, start_time)
+    save_docket_upload_digest(pq, d, html_digest, data_digest)
+    await tally_stat("recap.docket_upload.merged")
     await associate_related_instances(pq, d_id=d.pk)
     await mark_pq_successful(pq)
     return {
@@ -1197,7 +1338,7 @@ async def process_recap_acms_docket(pk):
     )
 
     des_returned, rds_created, content_updated = await add_docket_entries(
-        d, data["docket_entries"]
+        d, data["docket_entries"], skip_unchanged=True
     )
     await sync_to_async(add_parties_and_attorneys)(d, data["parties"])
     await process_orphan_documents(rds_created, pq.court_id, d.date_filed)
@@ -1511,28 +1652,47 @@ def create_or_merge_from_idb_chunk(idb_chunk):
     """Take a chunk of IDB rows and either merge them into the Docket table or
     create new items for them in the docket table.
 
+    The IDB rows and their candidate dockets are loaded up front in one query
+    each rather than one query per row.
+
     :param idb_chunk: A list of FjcIntegratedDatabase PKs
     :type idb_chunk: list
     :return: None
     :rtype: None
     """
+    idb_rows = FjcIntegratedDatabase.objects.in_bulk(idb_chunk)
+    keys = {(row.district_id, row.docket_number) for row in idb_rows.values()}
+    candidates = defaultdict(list)
+    if keys:
+        q = Q()
+        for court_id, docket_number_core in keys:
+            q |= Q(court_id=court_id, docket_number_core=docket_number_core)
+        for d in make_idb_docket_candidates_query(Docket.objects.filter(q)):
+            candidates[(d.court_id, d.docket_number_core)].append(d)
+
+    # Keys for which a docket was created while processing this chunk. Their
+    # candidates have to be looked up again.
+    created_keys = set()
     for idb_pk in idb_chunk:
-        idb_row = FjcIntegratedDatabase.objects.get(pk=idb_pk)
-        ds = (
-            Docket.objects.filter(
-                docket_number_core=idb_row.docket_number,
-                court=idb_row.district,
+        idb_row = idb_rows[idb_pk]
+        key = (idb_row.district_id, idb_row.docket_number)
+        if key in created_keys:
+            ds = list(
+                make_idb_docket_candidates_query(
+                    Docket.objects.filter(
+                        docket_number_core=idb_row.docket_number,
+                        court=idb_row.district,
+                    )
+                )
             )
-            .exclude(docket_number__icontains="cr")
-            .exclude(case_name__icontains="sealed")
-            .exclude(case_name__icontains="suppressed")
-            .exclude(case_name__icontains="search warrant")
-        )
-        count = ds.count()
+        else:
+            ds = candidates[key]
+        count = len(ds)
         if count == 0:
             msg = "Creating new docket for IDB row: %s"
             logger.info(msg, idb_row)
             create_new_docket_from_idb(idb_row)
+            created_keys.add(key)
             continue
         elif count == 1:
             d = ds[0]
@@ -1549,6 +1709,21 @@ def create_or_merge_from_idb_chunk(idb_chunk):
             merge_docket_with_idb(d, idb_row)
         else:
             create_new_docket_from_idb(idb_row)
+            created_keys.add(key)
+
+
+def make_idb_docket_candidates_query(ds: QuerySet) -> QuerySet:
+    """Exclude the dockets that IDB rows should never be merged into.
+
+    :param ds: A Docket queryset.
+    :return: The filtered queryset.
+    """
+    return (
+        ds.exclude(docket_number__icontains="cr")
+        .exclude(case_name__icontains="sealed")
+        .exclude(case_name__icontains="suppressed")
+        .exclude(case_name__icontains="search warrant")
+    )
 
 
 @app.task
@@ -7,6 +7,7 @@ from pathlib import Path
 from unittest import mock
 from unittest.mock import ANY
 
+import httpx
 import time_machine
 from asgiref.sync import async_to_sync, sync_to_async
 from dateutil.tz import tzutc
@@ -16,7 +17,10 @@ from django.contrib.auth.models import User
 from django.core import mail
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
 from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.timezone import now
 from juriscraper.pacer import PacerRssFeed
@@ -36,7 +40,14 @@ from cl.api.management.commands.cl_retry_webhooks import (
     retry_webhook_events,
 )
 from cl.api.models import Webhook, WebhookEvent, WebhookEventType
-from cl.api.utils import get_next_webhook_retry_date
+from cl.api.utils import (
+    get_next_webhook_retry_date,
+    get_webhook_endpoint_stats,
+)
+from cl.api.webhooks import (
+    get_webhook_endpoint_slots_key,
+    render_webhook_content,
+)
 from cl.lib.pacer import is_pacer_court_accessible, lookup_and_save
 from cl.lib.recap_utils import needs_ocr
 from cl.lib.redis_utils import get_redis_interface
@@ -78,7 +89,9 @@ from cl.recap.mergers import (
     add_docket_entries,
     add_parties_and_attorneys,
     find_docket_object,
+    find_docket_pks_in_bulk,
     get_order_of_docket,
+    make_docket_entry_hashes_key,
     normalize_long_description,
     update_case_names,
     update_docket_metadata,
@@ -90,6 +103,7 @@ from cl.recap.models import (
     EmailProcessingQueue,
     FjcIntegratedDatabase,
     PacerFetchQueue,
+    PacerHtmlFiles,
     ProcessingQueue,
 )
 from cl.recap.tasks import (
@@ -97,6 +111,7 @@ from cl.recap.tasks import (
     do_pacer_fetch,
     fetch_pacer_doc_by_rd,
     get_and_copy_recap_attachment_docs,
+    parse_docket_text,
     process_recap_acms_appellate_attachment,
     process_recap_acms_docket,
     process_recap_appellate_attachment,
@@ -107,7 +122,9 @@ from cl.recap.tasks import (
     process_recap_pdf,
     process_recap_zip,
 )
-from cl.recap_rss.tasks import merge_rss_feed_contents
+from cl.recap_rss.models import RssFeedStatus
+from cl.recap_rss.poller import RssFeedPoller
+from cl.recap_rss.tasks import get_last_build_date, merge_rss_feed_contents
 from cl.scrapers.factories import PACERFreeDocumentRowFactory
 from cl.search.factories import (
     CourtFactory,
@@ -122,7 +139,10 @@ from cl.search.models import (
     DocketEntry,
     OriginatingCourtInformation,
     RECAPDocument,
+    Tag,
 )
+from cl.stats.models import Stat
+from cl.stats.utils import STATS_PENDING_KEY, flush_stats
 from cl.tests import fakes
 from cl.tests.cases import SimpleTestCase, TestCase
 from cl.tests.utils import (
@@ -1954,6 +1974,55 @@ class TerminatedEntitiesTest(TestCase):
         add_parties_and_attorneys(self.d, [])
         self.assertEqual(self.d.parties.count(), count_before)
 
+    def test_extraneous_party_criminal_data_is_removed(self) -> None:
+        """Are the criminal counts of disassociated parties removed with
+        their party types?
+        """
+        pt = PartyType.objects.get(docket=self.d, party=self.extraneous_p)
+        CriminalCount.objects.create(
+            party_type=pt, name="Count 1", status=CriminalCount.PENDING
+        )
+        add_parties_and_attorneys(self.d, self.new_party_data)
+        self.assertFalse(PartyType.objects.filter(pk=pt.pk).exists())
+        self.assertEqual(
+            CriminalCount.objects.filter(party_type_id=pt.pk).count(), 0
+        )
+
+    def test_query_count_does_not_grow_with_parties(self) -> None:
+        """Is the number of queries the same no matter how many parties and
+        attorneys there are?
+        """
+
+        def make_parties(n):
+            return [
+                {
+                    "extra_info": "",
+                    "name": f"Party {i}",
+                    "type": "plaintiff",
+                    "attorneys": [
+                        {
+                            "contact": "",
+                            "name": f"Attorney {i}",
+                            "roles": ["LEAD ATTORNEY"],
+                        }
+                    ],
+                    "date_terminated": None,
+                }
+                for i in range(n)
+            ]
+
+        query_counts = []
+        for n in [3, 30]:
+            d = Docket.objects.create(
+                source=0, court_id="scotus", pacer_case_id=f"parties-{n}"
+            )
+            with CaptureQueriesContext(connection) as ctx:
+                add_parties_and_attorneys(d, make_parties(n))
+            query_counts.append(len(ctx.captured_queries))
+            self.assertEqual(d.parties.count(), n)
+            self.assertEqual(Role.objects.filter(docket=d).count(), n)
+        self.assertEqual(query_counts[0], query_counts[1])
+
 
 class RecapMinuteEntriesTest(TestCase):
     """Can we ingest minute and numberless entries properly?"""
@@ -2002,6 +2071,69 @@ class RecapMinuteEntriesTest(TestCase):
         self.assertEqual(d1.pk, d2.pk)
         self.assertEqual(d2.docket_entries.count(), expected_entry_count)
 
+    def test_unchanged_reuploads_are_skipped(self) -> None:
+        """Are uploads identical to the last merged report skipped?"""
+        get_redis_interface("STATS").delete(STATS_PENDING_KEY)
+        pq = self.make_pq()
+        returned_data = async_to_sync(process_recap_docket)(pq.pk)
+        d = Docket.objects.get(pk=returned_data["docket_pk"])
+        self.assertEqual(PacerHtmlFiles.objects.count(), 1)
+
+        # The same bytes are skipped before parsing.
+        pq = self.make_pq()
+        returned_data = async_to_sync(process_recap_docket)(pq.pk)
+        self.assertEqual(
+            returned_data, {"docket_pk": d.pk, "content_updated": False}
+        )
+        pq.refresh_from_db()
+        self.assertEqual(pq.status, PROCESSING_STATUS.SUCCESSFUL)
+        self.assertEqual(pq.docket_id, d.pk)
+        self.assertEqual(PacerHtmlFiles.objects.count(), 1)
+        flush_stats()
+        self.assertTrue(
+            Stat.objects.filter(
+                name="recap.docket_upload.skipped.html", count=1
+            ).exists()
+        )
+
+        # Markup that doesn't change the parsed data is skipped after
+        # parsing.
+        with open(self.make_path("azd.html"), "rb") as f:
+            content = f.read() + b"<!-- A comment -->"
+        pq = ProcessingQueue.objects.create(
+            court_id="scotus",
+            uploader=self.user,
+            pacer_case_id="asdf",
+            filepath_local=SimpleUploadedFile("azd.html", content),
+            upload_type=UPLOAD_TYPE.DOCKET,
+        )
+        returned_data = async_to_sync(process_recap_docket)(pq.pk)
+        self.assertEqual(returned_data["docket_pk"], d.pk)
+        self.assertEqual(PacerHtmlFiles.objects.count(), 1)
+        flush_stats()
+        self.assertTrue(
+            Stat.objects.filter(
+                name="recap.docket_upload.skipped.data", count=1
+            ).exists()
+        )
+
+        # Once something else saves the docket, the next upload is merged
+        # again.
+        d.save()
+        pq = self.make_pq()
+        async_to_sync(process_recap_docket)(pq.pk)
+        self.assertEqual(PacerHtmlFiles.objects.count(), 2)
+        self.assertEqual(d.docket_entries.count(), 23)
+
+        # And so is the one after something else merges parties into it,
+        # even without saving the docket.
+        with open(self.make_path("azd.html")) as f:
+            data = parse_docket_text("azd", f.read())
+        add_parties_and_attorneys(d, data["parties"])
+        pq = self.make_pq()
+        async_to_sync(process_recap_docket)(pq.pk)
+        self.assertEqual(PacerHtmlFiles.objects.count(), 3)
+
     def test_multiple_numberless_entries_multiple_times(self) -> None:
         """Do we get the right number of entries when we add multiple
         numberless entries multiple times?
@@ -3162,7 +3294,7 @@ class RecapEmailDocketAlerts(TestCase):
         side_effect=lambda z, x, c, v, b, d, e: (None, ""),
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_new_recap_email_case_auto_subscription(
@@ -3237,7 +3369,7 @@ class RecapEmailDocketAlerts(TestCase):
         side_effect=lambda z, x, c, v, b, d, e: (None, ""),
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_new_recap_email_case_auto_subscription_prev_user(
@@ -3330,7 +3462,7 @@ class RecapEmailDocketAlerts(TestCase):
         side_effect=lambda z, x, c, v, b, d, e: (None, ""),
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_new_recap_email_case_no_auto_subscription(
@@ -3393,7 +3525,7 @@ class RecapEmailDocketAlerts(TestCase):
         side_effect=lambda z, x, c, v, b, d, e: (None, ""),
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_new_recap_email_case_no_auto_subscription_prev_user(
@@ -3531,7 +3663,7 @@ class RecapEmailDocketAlerts(TestCase):
         side_effect=lambda z, x, c, v, b, d, e: (None, ""),
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_receive_same_recap_email_notification_different_users(
@@ -3687,7 +3819,7 @@ class RecapEmailDocketAlerts(TestCase):
         side_effect=lambda z, x, c, v, b, d, e: (None, ""),
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_new_recap_email_subscribe_by_email_link(
@@ -3757,7 +3889,7 @@ class RecapEmailDocketAlerts(TestCase):
         side_effect=lambda z, x, c, v, b, d, e: (None, ""),
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_new_recap_email_unsubscribe_by_email_link(
@@ -3851,7 +3983,7 @@ class RecapEmailDocketAlerts(TestCase):
         side_effect=lambda z, x, c, v, b, d, e: (None, ""),
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_new_recap_email_alerts_integration(
@@ -4002,7 +4134,7 @@ class RecapEmailDocketAlerts(TestCase):
         side_effect=lambda z, x, c, v, b, d, e: (None, ""),
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_docket_alert_toggle_confirmation_fails(
@@ -4091,7 +4223,7 @@ class RecapEmailDocketAlerts(TestCase):
         ),
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     @mock.patch(
@@ -4253,7 +4385,7 @@ class RecapEmailDocketAlerts(TestCase):
         ),
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_extract_pdf_for_recap_email(
@@ -4298,7 +4430,7 @@ class RecapEmailDocketAlerts(TestCase):
         side_effect=lambda z, x: "009033568259",
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_new_nda_recap_email(
@@ -4338,7 +4470,7 @@ class RecapEmailDocketAlerts(TestCase):
         self.assertEqual(docket.docket_number, "21-16499")
 
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     @mock.patch(
@@ -4425,7 +4557,7 @@ class RecapEmailDocketAlerts(TestCase):
         side_effect=lambda z, x: "009033568259",
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_new_nda_recap_email_case_no_auto_subscription(
@@ -4498,7 +4630,7 @@ class RecapEmailDocketAlerts(TestCase):
         ),
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_multiple_docket_nef(
@@ -4660,7 +4792,7 @@ class RecapEmailDocketAlerts(TestCase):
         side_effect=lambda z, x, c, v, b, d, e: (None, ""),
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     @mock.patch(
@@ -4753,7 +4885,7 @@ class RecapEmailDocketAlerts(TestCase):
         side_effect=lambda z, x: "",
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_mark_as_sealed_nda_document_not_available_from_magic_link(
@@ -4794,7 +4926,7 @@ class RecapEmailDocketAlerts(TestCase):
         side_effect=lambda z, x, c, v, b, d, e: (None, ""),
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     @mock.patch(
@@ -4842,7 +4974,7 @@ class RecapEmailDocketAlerts(TestCase):
             self.assertEqual(rd["is_sealed"], True)
 
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     @mock.patch(
@@ -4892,7 +5024,7 @@ class RecapEmailDocketAlerts(TestCase):
         self.assertEqual(is_sealed, True)
 
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_recap_email_minute_entry(
@@ -5112,7 +5244,7 @@ class RecapEmailDocketAlerts(TestCase):
         side_effect=lambda z, x, c, v, b, d, e: (None, ""),
     )
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     async def test_recap_email_minute_entry_multi_nef(
@@ -5957,7 +6089,7 @@ class WebhooksRetries(TestCase):
             next_retry_date=fake_now + timedelta(minutes=3),
         )
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -6017,7 +6149,7 @@ class WebhooksRetries(TestCase):
         )
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, raw=self.file_stream
             ),
@@ -6025,7 +6157,7 @@ class WebhooksRetries(TestCase):
             next_retry_date = fake_now + timedelta(minutes=1)
             with time_machine.travel(next_retry_date, tick=False):
                 with mock.patch(
-                    "cl.api.management.commands.cl_retry_webhooks.send_webhook_event"
+                    "cl.api.management.commands.cl_retry_webhooks.send_webhook_events"
                 ):
                     webhooks_to_retry = retry_webhook_events()
                     # No webhooks events should be retried since it's no time.
@@ -6035,7 +6167,7 @@ class WebhooksRetries(TestCase):
             next_retry_date = fake_now + timedelta(minutes=3)
             with time_machine.travel(next_retry_date, tick=False):
                 with mock.patch(
-                    "cl.api.management.commands.cl_retry_webhooks.send_webhook_event"
+                    "cl.api.management.commands.cl_retry_webhooks.send_webhook_events"
                 ):
                     # Only webhook_e1 should be retried.
                     webhooks_to_retry = retry_webhook_events()
@@ -6045,24 +6177,25 @@ class WebhooksRetries(TestCase):
             next_retry_date = fake_now + timedelta(minutes=5)
             with time_machine.travel(next_retry_date, tick=False):
                 with mock.patch(
-                    "cl.api.management.commands.cl_retry_webhooks.send_webhook_event"
+                    "cl.api.management.commands.cl_retry_webhooks.send_webhook_events"
                 ):
-                    # Only webhook_e1 should be retried.
+                    # webhook_e1 is still claimed by the last retry, whose
+                    # send didn't update it.
                     webhooks_to_retry = retry_webhook_events()
-                    self.assertEqual(webhooks_to_retry, 1)
+                    self.assertEqual(webhooks_to_retry, 0)
 
-            # Try to retry 10 hours later.
+            # Try to retry 10 hours later, once the claim has expired.
             next_retry_date = fake_now + timedelta(hours=10)
             with time_machine.travel(next_retry_date, tick=False):
                 with mock.patch(
-                    "cl.api.management.commands.cl_retry_webhooks.send_webhook_event"
+                    "cl.api.management.commands.cl_retry_webhooks.send_webhook_events"
                 ):
                     webhooks_to_retry = retry_webhook_events()
                     self.assertEqual(webhooks_to_retry, 1)
 
             webhook_e1_compare = WebhookEvent.objects.filter(pk=webhook_e1.id)
             # Retry without mocking send_webhook_event
-            next_retry_date = fake_now + timedelta(minutes=10)
+            next_retry_date = fake_now + timedelta(hours=11)
             with time_machine.travel(next_retry_date, tick=False):
                 webhooks_to_retry = retry_webhook_events()
                 self.assertEqual(webhooks_to_retry, 1)
@@ -6072,6 +6205,130 @@ class WebhooksRetries(TestCase):
                 )
                 self.assertEqual(webhook_e1_compare[0].status_code, 200)
 
+    def test_retry_webhook_events_in_batches(
+        self,
+        mock_is_docket_entry_sealed,
+        mock_enqueue_alert,
+        mock_bucket_open,
+        mock_cookies,
+        mock_pacer_court_accessible,
+        mock_get_document_number_from_confirmation_page,
+    ):
+        """Are the events of many endpoints retried together, with each
+        payload serialized once and sent as is?
+        """
+        fake_now = now()
+        webhook_2 = WebhookFactory(
+            user=self.user_profile_2.user,
+            event_type=WebhookEventType.DOCKET_ALERT,
+            url="https://example.org/",
+            enabled=True,
+        )
+        webhook_events = [
+            WebhookEventFactory(
+                webhook=webhook,
+                content={"message": f"ok_{i}"},
+                event_status=WEBHOOK_EVENT_STATUS.ENQUEUED_RETRY,
+                next_retry_date=fake_now + timedelta(minutes=3),
+            )
+            for webhook in [self.webhook, webhook_2]
+            for i in range(3)
+        ]
+        stats_before = get_webhook_endpoint_stats(webhook_2.pk)
+
+        with mock.patch(
+            "cl.api.webhooks.requests.Session.post",
+            side_effect=lambda *args, **kwargs: MockResponse(
+                200, mock_raw=True
+            ),
+        ) as mock_post:
+            next_retry_date = fake_now + timedelta(minutes=3)
+            with time_machine.travel(next_retry_date, tick=False):
+                webhooks_to_retry = retry_webhook_events()
+
+        self.assertEqual(webhooks_to_retry, 6)
+        self.assertEqual(mock_post.call_count, 6)
+        sent = {
+            (call.args[0], call.kwargs["data"])
+            for call in mock_post.call_args_list
+        }
+        expected = {
+            (
+                webhook_event.webhook.url.replace("https://", "http://"),
+                render_webhook_content(webhook_event.content),
+            )
+            for webhook_event in webhook_events
+        }
+        self.assertEqual(sent, expected)
+        for webhook_event in webhook_events:
+            webhook_event.refresh_from_db()
+            self.assertEqual(
+                webhook_event.event_status, WEBHOOK_EVENT_STATUS.SUCCESSFUL
+            )
+            self.assertEqual(webhook_event.status_code, 200)
+
+        stats = get_webhook_endpoint_stats(webhook_2.pk)
+        self.assertEqual(stats["count"] - stats_before["count"], 3)
+        self.assertEqual(stats["failures"], stats_before["failures"])
+        # The endpoint slots taken by the requests were all released.
+        r = get_redis_interface("CACHE")
+        for webhook in [self.webhook, webhook_2]:
+            slots_key = get_webhook_endpoint_slots_key(webhook.url)
+            self.assertEqual(r.zcard(slots_key), 0)
+
+    def test_retry_webhook_events_error_in_one_event(
+        self,
+        mock_is_docket_entry_sealed,
+        mock_enqueue_alert,
+        mock_bucket_open,
+        mock_cookies,
+        mock_pacer_court_accessible,
+        mock_get_document_number_from_confirmation_page,
+    ):
+        """Does an unexpected error sending one event leave the rest of the
+        batch alone?
+        """
+        fake_now = now()
+        webhook_2 = WebhookFactory(
+            user=self.user_profile_2.user,
+            event_type=WebhookEventType.DOCKET_ALERT,
+            url="https://example.org/",
+            enabled=True,
+        )
+        webhook_e1, webhook_e2 = [
+            WebhookEventFactory(
+                webhook=webhook,
+                content={"message": "ok"},
+                event_status=WEBHOOK_EVENT_STATUS.ENQUEUED_RETRY,
+                next_retry_date=fake_now + timedelta(minutes=3),
+            )
+            for webhook in [self.webhook, webhook_2]
+        ]
+
+        def post(url, *args, **kwargs):
+            if url == webhook_2.url.replace("https://", "http://"):
+                raise ValueError("Boom")
+            return MockResponse(200, mock_raw=True)
+
+        with mock.patch(
+            "cl.api.webhooks.requests.Session.post", side_effect=post
+        ):
+            next_retry_date = fake_now + timedelta(minutes=3)
+            with time_machine.travel(next_retry_date, tick=False):
+                webhooks_to_retry = retry_webhook_events()
+
+        self.assertEqual(webhooks_to_retry, 2)
+        webhook_e1.refresh_from_db()
+        self.assertEqual(
+            webhook_e1.event_status, WEBHOOK_EVENT_STATUS.SUCCESSFUL
+        )
+        webhook_e2.refresh_from_db()
+        self.assertEqual(
+            webhook_e2.event_status, WEBHOOK_EVENT_STATUS.ENQUEUED_RETRY
+        )
+        self.assertEqual(webhook_e2.error_message, "ValueError: Boom")
+        self.assertEqual(webhook_e2.retry_counter, 1)
+
     def test_webhook_response_status_codes(
         self,
         mock_is_docket_entry_sealed,
@@ -6102,7 +6359,7 @@ class WebhooksRetries(TestCase):
         webhook_e1_compare = WebhookEvent.objects.filter(pk=webhook_e1.id)
         for status_code, expected_event_status in status_codes_tests:
             with mock.patch(
-                "cl.api.webhooks.requests.post",
+                "cl.api.webhooks.requests.Session.post",
                 side_effect=lambda *args, **kwargs: MockResponse(
                     status_code, raw=self.file_stream
                 ),
@@ -6139,7 +6396,7 @@ class WebhooksRetries(TestCase):
         after receiving an HttpResponse with a failure status code.
         """
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 500,
                 raw=self.file_stream_error,
@@ -6212,7 +6469,7 @@ class WebhooksRetries(TestCase):
         """
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: exec(
                 "raise ConnectionError('Connection Error')"
             ),
@@ -6285,7 +6542,7 @@ class WebhooksRetries(TestCase):
         """
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, raw=self.file_stream
             ),
@@ -6352,7 +6609,7 @@ class WebhooksRetries(TestCase):
         """
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 500, raw=self.file_stream
             ),
@@ -6511,7 +6768,7 @@ class WebhooksRetries(TestCase):
         webhook_e2_compare = WebhookEvent.objects.filter(pk=webhook_e2.id)
         for try_count, notification_out, webhook_enabled in iterations:
             with mock.patch(
-                "cl.api.webhooks.requests.post",
+                "cl.api.webhooks.requests.Session.post",
                 side_effect=lambda *args, **kwargs: MockResponse(
                     500, mock_raw=True
                 ),
@@ -6641,7 +6898,7 @@ class WebhooksRetries(TestCase):
         webhook_compare = Webhook.objects.filter(pk=self.webhook.pk)
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 500, mock_raw=True
             ),
@@ -6671,7 +6928,7 @@ class WebhooksRetries(TestCase):
                 self.assertEqual(webhooks_to_retry, 0)
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -6750,7 +7007,7 @@ class WebhooksRetries(TestCase):
         for try_count, notification_out in iterations:
             # Try to deliver webhook_e1 and webhook_e2 4 times.
             with mock.patch(
-                "cl.api.webhooks.requests.post",
+                "cl.api.webhooks.requests.Session.post",
                 side_effect=lambda *args, **kwargs: MockResponse(
                     500, mock_raw=True
                 ),
@@ -6775,7 +7032,7 @@ class WebhooksRetries(TestCase):
                         )
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -6801,7 +7058,7 @@ class WebhooksRetries(TestCase):
         # 6th try, and disable the webhook endpoint on the 8th try.
         for try_count, notification_out, webhook_enabled in iterations:
             with mock.patch(
-                "cl.api.webhooks.requests.post",
+                "cl.api.webhooks.requests.Session.post",
                 side_effect=lambda *args, **kwargs: MockResponse(
                     500, mock_raw=True
                 ),
@@ -6934,7 +7191,7 @@ class WebhooksRetries(TestCase):
 
         webhook_e1_compare = WebhookEvent.objects.filter(pk=webhook_e1.id)
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 500, mock_raw=True
             ),
@@ -7051,7 +7308,7 @@ class RecapFetchWebhooksTest(TestCase):
         self.assertEqual(dockets.count(), 1)
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -7108,7 +7365,7 @@ class RecapFetchWebhooksTest(TestCase):
         )
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -7169,7 +7426,7 @@ class RecapFetchWebhooksTest(TestCase):
         )
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockResponse(
                 200, mock_raw=True
             ),
@@ -7365,6 +7622,115 @@ class CalculateRecapsSequenceNumbersTest(TestCase):
             prev_de = de
 
 
+class SkipUnchangedDocketEntriesTest(TestCase):
+    """Does merging a re-uploaded docket skip the entries that didn't
+    change?
+    """
+
+    def setUp(self) -> None:
+        self.court = CourtFactory(id="cand", jurisdiction="FB")
+        self.d = DocketFactory(
+            source=Docket.RECAP, court=self.court, pacer_case_id="104490"
+        )
+        self.r = get_redis_interface("CACHE")
+        self.r.delete(make_docket_entry_hashes_key(self.d.pk))
+        self.docket_entries = [
+            DocketEntryDataFactory(
+                date_filed=date(2021, 10, 15), document_number=i
+            )
+            for i in range(1, 4)
+        ]
+
+    def tearDown(self) -> None:
+        self.r.delete(make_docket_entry_hashes_key(self.d.pk))
+
+    def test_skip_unchanged_entries(self) -> None:
+        """Are only new, changed or deleted entries merged again?"""
+        (des, _), rds_created, _ = async_to_sync(add_docket_entries)(
+            self.d, self.docket_entries, skip_unchanged=True
+        )
+        self.assertEqual(len(des), 3)
+        self.assertEqual(len(rds_created), 3)
+
+        # Nothing changed, so nothing is merged.
+        (des, rds_updated), rds_created, content_updated = async_to_sync(
+            add_docket_entries
+        )(self.d, self.docket_entries, skip_unchanged=True)
+        self.assertEqual(des, [])
+        self.assertEqual(rds_updated, [])
+        self.assertFalse(content_updated)
+
+        # A new entry and a changed one are merged.
+        self.docket_entries[0]["description"] = "A new description"
+        self.docket_entries.append(
+            DocketEntryDataFactory(
+                date_filed=date(2021, 10, 16), document_number=4
+            )
+        )
+        (des, _), rds_created, content_updated = async_to_sync(
+            add_docket_entries
+        )(self.d, self.docket_entries, skip_unchanged=True)
+        self.assertEqual(sorted(de.entry_number for de in des), [1, 4])
+        self.assertEqual(len(rds_created), 1)
+        self.assertTrue(content_updated)
+        self.assertEqual(
+            DocketEntry.objects.get(docket=self.d, entry_number=1).description,
+            "A new description",
+        )
+
+        # A deleted entry is merged again.
+        DocketEntry.objects.filter(docket=self.d, entry_number=2).delete()
+        (des, _), _, _ = async_to_sync(add_docket_entries)(
+            self.d, self.docket_entries, skip_unchanged=True
+        )
+        self.assertEqual([de.entry_number for de in des], [2])
+        self.assertEqual(DocketEntry.objects.filter(docket=self.d).count(), 4)
+
+    def test_skipped_entries_are_tagged(self) -> None:
+        """Do unchanged entries get the tags of the merge that skips them?"""
+        async_to_sync(add_docket_entries)(
+            self.d, self.docket_entries, skip_unchanged=True
+        )
+        tag = Tag.objects.create(name="test-skip-unchanged")
+        (des, _), _, _ = async_to_sync(add_docket_entries)(
+            self.d, self.docket_entries, tags=[tag], skip_unchanged=True
+        )
+        self.assertEqual(des, [])
+        self.assertEqual(
+            DocketEntry.objects.filter(docket=self.d, tags=tag).count(), 3
+        )
+        self.assertEqual(
+            RECAPDocument.objects.filter(
+                docket_entry__docket=self.d, tags=tag
+            ).count(),
+            3,
+        )
+
+    def test_merges_without_entries_keep_hashes(self) -> None:
+        """Are the stored hashes kept by merges with no entries?"""
+        async_to_sync(add_docket_entries)(
+            self.d, self.docket_entries, skip_unchanged=True
+        )
+        async_to_sync(add_docket_entries)(self.d, [])
+        self.assertTrue(self.r.exists(make_docket_entry_hashes_key(self.d.pk)))
+
+    def test_merges_without_skipping_forget_hashes(self) -> None:
+        """Do merges that don't skip entries invalidate the stored hashes?"""
+        async_to_sync(add_docket_entries)(
+            self.d, self.docket_entries, skip_unchanged=True
+        )
+        self.assertTrue(self.r.exists(make_docket_entry_hashes_key(self.d.pk)))
+
+        async_to_sync(add_docket_entries)(self.d, self.docket_entries[:1])
+        self.assertFalse(
+            self.r.exists(make_docket_entry_hashes_key(self.d.pk))
+        )
+        (des, _), _, _ = async_to_sync(add_docket_entries)(
+            self.d, self.docket_entries, skip_unchanged=True
+        )
+        self.assertEqual(len(des), 3)
+
+
 class LookupDocketsTest(TestCase):
     """Test find_docket_object lookups work properly, avoid overwriting
     dockets with identical docket_number_core if they are different cases.
@@ -7577,6 +7943,30 @@ class LookupDocketsTest(TestCase):
         # The existing docket is matched instead of creating a new one.
         self.assertEqual(new_d.pk, d.pk)
 
+    def test_bulk_lookup_matches_single_lookups(self):
+        """Does the bulk lookup find the same dockets as find_docket_object,
+        in a single query?
+        """
+        keys = [
+            (self.court.pk, "12345", self.docket_data["docket_number"]),
+            (self.court.pk, "54321", self.docket_data["docket_number"]),
+            (self.court.pk, "12346", self.docket_data["docket_number"]),
+            (self.court.pk, None, self.docket_core_data["docket_number"]),
+            (self.court.pk, None, self.docket_no_core_data["docket_number"]),
+        ]
+        with self.assertNumQueries(1):
+            docket_pks = find_docket_pks_in_bulk(keys)
+
+        self.assertEqual(docket_pks[keys[0]], self.docket_case_id.pk)
+        self.assertEqual(docket_pks[keys[1]], self.docket_case_id_2.pk)
+        # No match, so it's left for the caller to create.
+        self.assertNotIn(keys[2], docket_pks)
+        self.assertEqual(docket_pks[keys[3]], self.docket_1.pk)
+        self.assertEqual(docket_pks[keys[4]], self.docket_2.pk)
+        for key in keys:
+            d = async_to_sync(find_docket_object)(*key)
+            self.assertEqual(docket_pks.get(key), d.pk)
+
 
 class CleanUpDuplicateAppellateEntries(TestCase):
     """Test clean_up_duplicate_appellate_entries method that finds and clean
@@ -7740,7 +8130,7 @@ class RemoveDuplicatedMinuteEntries(TestCase):
         )
 
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     def test_avoid_deleting_non_duplicated_minute_entries(
@@ -7811,7 +8201,7 @@ class RemoveDuplicatedMinuteEntries(TestCase):
             )
 
     @mock.patch(
-        "cl.api.webhooks.requests.post",
+        "cl.api.webhooks.requests.Session.post",
         side_effect=lambda *args, **kwargs: MockResponse(200, mock_raw=True),
     )
     def test_remove_duplicated_minute_entries(
@@ -7882,3 +8272,230 @@ class RemoveDuplicatedMinuteEntries(TestCase):
                 entry_db.recap_documents.all()[0].description,
                 entry["short_description"],
             )
+
+
+class RssFeedPollerTest(TestCase):
+    """Does the concurrent RSS poller avoid downloading unchanged feeds?"""
+
+    url = "https://ecf.mdb.uscourts.gov/cgi-bin/rss_outside.pl"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.court = CourtFactory(id="mdb", jurisdiction="FB")
+        path = os.path.join(
+            settings.INSTALL_ROOT,
+            "cl",
+            "recap",
+            "test_assets",
+            "rss_sample_unnumbered_mdb.xml",
+        )
+        with open(path, "rb") as f:
+            cls.content = f.read()
+
+    def fetch(self, handler, last_build_date):
+        """Run the poller's fetch against a mocked transport."""
+        poller = RssFeedPoller([self.court.pk])
+        last_status = RssFeedStatus(date_last_build=last_build_date)
+        new_status = RssFeedStatus.objects.create(
+            court=self.court,
+            status=RssFeedStatus.PROCESSING_IN_PROGRESS,
+        )
+
+        async def run():
+            transport = httpx.MockTransport(handler)
+            async with httpx.AsyncClient(transport=transport) as client:
+                return await poller.fetch_feed(
+                    client, self.url, {}, last_status, new_status
+                )
+
+        fetched = async_to_sync(run)()
+        new_status.refresh_from_db()
+        return fetched, new_status
+
+    def test_unchanged_feed_is_skipped(self) -> None:
+        """Is an unchanged feed skipped as soon as we see its build date?"""
+        build_date = get_last_build_date(self.content)
+        fetched, status = self.fetch(
+            lambda request: httpx.Response(200, content=self.content),
+            build_date,
+        )
+        self.assertIsNone(fetched)
+        self.assertEqual(status.status, RssFeedStatus.UNCHANGED)
+
+    def test_not_modified_feed_is_skipped(self) -> None:
+        """Does a 304 response mark the feed as unchanged?"""
+        fetched, status = self.fetch(
+            lambda request: httpx.Response(304), now()
+        )
+        self.assertIsNone(fetched)
+        self.assertEqual(status.status, RssFeedStatus.UNCHANGED)
+
+    def test_changed_feed_is_downloaded(self) -> None:
+        """Is a changed feed downloaded in full, with its validators?"""
+        fetched, status = self.fetch(
+            lambda request: httpx.Response(
+                200, content=self.content, headers={"ETag": '"abc"'}
+            ),
+            now() - timedelta(days=1),
+        )
+        self.assertEqual(fetched.content, self.content)
+        self.assertEqual(fetched.validators["etag"], '"abc"')
+        self.assertEqual(status.status, RssFeedStatus.PROCESSING_IN_PROGRESS)
+        self.assertEqual(
+            status.date_last_build, get_last_build_date(self.content)
+        )
+
+    def test_stale_feeds_are_backed_off(self) -> None:
+        """Are stale feeds visited less often than fresh ones?"""
+        poller = RssFeedPoller(["mdb", "nyeb"])
+        poller.schedule_next_visit("mdb", 60)
+        poller.schedule_next_visit("nyeb", 60 * 60 * 24)
+        self.assertLess(poller.next_visits["mdb"], poller.next_visits["nyeb"])
+        self.assertLessEqual(
+            poller.seconds_until_next_visit(),
+            poller.RSS_MAX_VISIT_FREQUENCY,
+        )
+        self.assertEqual(poller.get_due_courts(), [])
+
+    def test_failed_court_does_not_stop_the_others(self) -> None:
+        """Does an error polling one court leave the other courts alone?"""
+        poller = RssFeedPoller(["mdb", "nyeb"])
+        polled = []
+
+        async def poll_court(client, court_id):
+            if court_id == "mdb":
+                raise ValueError("Boom")
+            polled.append(court_id)
+
+        async def run():
+            async with httpx.AsyncClient() as client:
+                await poller.poll_courts(client, ["mdb", "nyeb"])
+
+        with mock.patch.object(poller, "poll_court", side_effect=poll_court):
+            async_to_sync(run)()
+        self.assertEqual(polled, ["nyeb"])
+        # The failed court is visited again later, not right away.
+        self.assertIn("mdb", poller.next_visits)
+        self.assertEqual(poller.get_due_courts(), ["nyeb"])
+
+    def poll(self, handler, last_build_date=None):
+        """Poll the court once against a mocked transport, with the staleness
+        alerts mocked.
+        """
+        if last_build_date:
+            RssFeedStatus.objects.create(
+                court=self.court,
+                status=RssFeedStatus.UNCHANGED,
+                date_last_build=last_build_date,
+            )
+        poller = RssFeedPoller([self.court.pk], check_recency=False)
+
+        async def run():
+            transport = httpx.MockTransport(handler)
+            async with httpx.AsyncClient(transport=transport) as client:
+                await poller.poll_court(client, self.court.pk)
+
+        with mock.patch(
+            "cl.recap_rss.poller.alert_on_staleness"
+        ) as alert_on_staleness:
+            async_to_sync(run)()
+        return poller, alert_on_staleness
+
+    def test_unchanged_feeds_are_checked_for_staleness(self) -> None:
+        """Are unchanged and not modified feeds checked for staleness,
+        without being queued for merging?
+        """
+        build_date = get_last_build_date(self.content)
+        for handler in [
+            lambda request: httpx.Response(200, content=self.content),
+            lambda request: httpx.Response(304),
+        ]:
+            RssFeedStatus.objects.all().delete()
+            poller, alert_on_staleness = self.poll(handler, build_date)
+            alert_on_staleness.assert_called_once_with(
+                build_date, self.court.pk, self.url
+            )
+            self.assertTrue(poller.queue.empty())
+            self.assertIn(self.court.pk, poller.next_visits)
+
+    def test_changed_feed_is_queued(self) -> None:
+        """Is a changed feed checked for staleness and queued for merging?"""
+        poller, alert_on_staleness = self.poll(
+            lambda request: httpx.Response(200, content=self.content)
+        )
+        build_date = get_last_build_date(self.content)
+        alert_on_staleness.assert_called_once_with(
+            build_date, self.court.pk, self.url
+        )
+        fetched = poller.queue.get_nowait()
+        self.assertEqual(fetched.content, self.content)
+        self.assertEqual(fetched.feed_status.date_last_build, build_date)
+
+    def test_failed_feed_is_not_checked_for_staleness(self) -> None:
+        """Are feeds that are down left out of the staleness checks?"""
+        poller, alert_on_staleness = self.poll(
+            lambda request: httpx.Response(500)
+        )
+        alert_on_staleness.assert_not_called()
+        self.assertTrue(poller.queue.empty())
+        status = RssFeedStatus.objects.get(court=self.court)
+        self.assertEqual(status.status, RssFeedStatus.PROCESSING_FAILED)
+
+
+@mock.patch("cl.recap_rss.management.commands.scrape_rss.RssFeedPoller")
+class ScrapeRssCommandTest(TestCase):
+    """Does the scrape_rss command run the poller on the right courts, one
+    instance at a time?
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.mdb = CourtFactory(
+            id="mdb", jurisdiction="FB", pacer_has_rss_feed=True
+        )
+        cls.nyeb = CourtFactory(
+            id="nyeb", jurisdiction="FB", pacer_has_rss_feed=True
+        )
+        CourtFactory(id="nyb", jurisdiction="FB", pacer_has_rss_feed=False)
+
+    def setUp(self) -> None:
+        self.r = get_redis_interface("CACHE")
+        self.lock_key = "rss-scraper:mdb"
+        self.r.delete(self.lock_key)
+
+    def tearDown(self) -> None:
+        self.r.delete(self.lock_key)
+
+    def test_runs_the_poller(self, poller_class) -> None:
+        """Is the poller run on the requested PACER courts, and is the lock
+        released when it's done?
+        """
+        poller_class.return_value.run = mock.AsyncMock()
+        call_command("scrape_rss", courts=["mdb"], iterations=1)
+
+        args, kwargs = poller_class.call_args
+        self.assertEqual(args[0], ["mdb"])
+        self.assertFalse(kwargs["sweep"])
+        self.assertFalse(kwargs["check_recency"])
+        poller_class.return_value.run.assert_awaited_once_with(1)
+        self.assertFalse(self.r.exists(self.lock_key))
+
+    def test_all_courts(self, poller_class) -> None:
+        """Are all the PACER courts with RSS feeds polled by default?"""
+        poller_class.return_value.run = mock.AsyncMock()
+        call_command("scrape_rss", iterations=1)
+
+        args, kwargs = poller_class.call_args
+        self.assertEqual(sorted(args[0]), ["mdb", "nyeb"])
+        self.assertTrue(kwargs["check_recency"])
+
+    def test_only_one_instance_at_a_time(self, poller_class) -> None:
+        """Does the command refuse to run while another instance holds the
+        lock for the same courts?
+        """
+        self.r.set(self.lock_key, 1)
+        with self.assertRaises(SystemExit):
+            call_command("scrape_rss", courts=["mdb"], iterations=1)
+        poller_class.assert_not_called()
+        # The other instance's lock is left alone.
+        self.assertTrue(self.r.exists(self.lock_key))
@@ -0,0 +1,474 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+from asgiref.sync import sync_to_async
+from celery.canvas import chain
+from django.utils.timezone import make_aware, now
+from juriscraper.pacer import PacerRssFeed
+
+from cl.alerts.tasks import send_alerts_and_webhooks
+from cl.lib.pacer import map_cl_to_pacer_id
+from cl.recap_rss.models import RssFeedStatus
+from cl.recap_rss.tasks import (
+    alert_on_staleness,
+    get_last_build_date,
+    mark_status_successful,
+    merge_rss_feed_contents,
+    store_rss_feed_data,
+    trim_rss_data,
+    update_entry_types,
+)
+from cl.recap_rss.utils import get_feed_validators, log_feed_freshness
+from cl.search.tasks import add_items_to_solr
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FetchedFeed:
+    """A feed that was downloaded and needs to be parsed and merged."""
+
+    court_id: str
+    feed_status: RssFeedStatus
+    content: bytes
+    validators: Dict[str, str] = field(default_factory=dict)
+
+
+def merge_fetched_feed(fetched: FetchedFeed) -> None:
+    """Parse a downloaded feed, store it, and send it off to be merged.
+
+    This is the synchronous part of the pipeline. It runs in the merge workers
+    of the poller, outside the event loop.
+
+    :param fetched: The feed that was downloaded.
+    :return: None
+    """
+    court_id = fetched.court_id
+    rss_feed = PacerRssFeed(map_cl_to_pacer_id(court_id))
+    rss_feed._parse_text(fetched.content.decode())
+    logger.info(f"{court_id}: Got {len(rss_feed.data)} results to merge.")
+
+    # Update RSS entry types in Court table
+    update_entry_types(court_id, rss_feed.feed.feed.description)
+    store_rss_feed_data(court_id, fetched.content)
+
+    chain(
+        merge_rss_feed_contents.s(rss_feed.data, court_id),
+        send_alerts_and_webhooks.s(),
+        # Update recap *documents*, not *dockets*. Updating dockets requires
+        # much more work, and we don't expect to get much docket information
+        # from the RSS feeds. RSS feeds also have information about hundreds
+        # or thousands of dockets. Updating them all would be very bad.
+        add_items_to_solr.s("search.RECAPDocument"),
+        mark_status_successful.si(fetched.feed_status.pk, fetched.validators),
+    ).apply_async()
+
+
+class RssFeedPoller:
+    """Poll PACER RSS feeds concurrently.
+
+    Feeds are fetched concurrently on the event loop, with a cap on the number
+    of simultaneous requests to any one host. Each request is conditional when
+    we have validators from the last visit, and the download is abandoned as
+    soon as the lastBuildDate shows that the feed hasn't changed, so most
+    polls never download a full feed.
+
+    Changed feeds go into a bounded queue that is drained by merge workers.
+    The queue being bounded means that fetching slows down if merging can't
+    keep up.
+
+    Instead of sleeping a fixed amount between iterations, each court gets its
+    own next-visit time. Feeds that are being built regularly are visited
+    every RSS_MAX_VISIT_FREQUENCY seconds. Feeds that have gone stale are
+    backed off, up to RSS_MAX_BACKOFF seconds.
+    """
+
+    RSS_MAX_VISIT_FREQUENCY = 5 * 60
+    RSS_MAX_BACKOFF = 10 * 60
+    RSS_MAX_PROCESSING_DURATION = 10 * 60
+    DELAY_BETWEEN_CACHE_TRIMS = 60 * 60
+
+    # How much of a feed to read while looking for its lastBuildDate. The tag
+    # is always near the top, so if we haven't found it by here, we won't.
+    BUILD_DATE_SEARCH_BYTES = 8 * 1024
+
+    def __init__(
+        self,
+        court_ids: List[str],
+        sweep: bool = False,
+        check_recency: bool = True,
+        per_host_limit: int = 2,
+        max_connections: int = 20,
+        queue_size: int = 10,
+        merge_workers: int = 2,
+        timeout: float = 60,
+    ) -> None:
+        """
+        :param court_ids: The CL IDs of the courts to poll.
+        :param sweep: Whether to ignore caching and download every feed.
+        :param check_recency: Whether to skip courts that were visited
+        recently according to their RssFeedStatus objects.
+        :param per_host_limit: The max number of simultaneous requests to a
+        single host.
+        :param max_connections: The max number of simultaneous requests.
+        :param queue_size: The max number of downloaded feeds that can wait
+        to be merged.
+        :param merge_workers: The number of workers merging feeds.
+        :param timeout: The timeout for each request, in seconds.
+        """
+        self.court_ids = court_ids
+        self.sweep = sweep
+        self.check_recency = check_recency
+        self.per_host_limit = per_host_limit
+        self.max_connections = max_connections
+        self.merge_workers = merge_workers
+        self.timeout = timeout
+        self.queue: asyncio.Queue[FetchedFeed] = asyncio.Queue(
+            maxsize=queue_size
+        )
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.next_visits: Dict[str, datetime] = {}
+        self.last_trim_date: Optional[datetime] = None
+        # Merges run in their own threads, so that they run in parallel and
+        # don't wait behind the short DB calls of the pollers, which share
+        # the thread of sync_to_async's thread sensitive mode.
+        self.merge_executor: Optional[ThreadPoolExecutor] = None
+
+    def get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        if host not in self.host_semaphores:
+            self.host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self.host_semaphores[host]
+
+    def schedule_next_visit(
+        self, court_id: str, freshness_lag: Optional[float]
+    ) -> None:
+        """Pick when to visit a court next according to its freshness lag.
+
+        :param court_id: The CL ID of the court
+        :param freshness_lag: How many seconds behind the court's feed was on
+        the last visit.
+        :return: None
+        """
+        delay = self.RSS_MAX_VISIT_FREQUENCY
+        if freshness_lag is not None and not self.sweep:
+            # A feed that hasn't been built for hours isn't likely to change
+            # in the next five minutes. Back off, a little.
+            delay = min(
+                max(delay, freshness_lag / 4),
+                self.RSS_MAX_BACKOFF,
+            )
+        self.next_visits[court_id] = now() + timedelta(seconds=delay)
+
+    def get_due_courts(self) -> List[str]:
+        _now = now()
+        return [
+            court_id
+            for court_id in self.court_ids
+            if self.next_visits.get(court_id, _now) <= _now
+        ]
+
+    def seconds_until_next_visit(self) -> float:
+        if not self.next_visits:
+            return 0
+        next_visit = min(self.next_visits.values())
+        return max((next_visit - now()).total_seconds(), 0)
+
+    async def get_last_feed_status(self, court_id: str) -> RssFeedStatus:
+        """Get the last time we successfully got the feed."""
+        try:
+            return await RssFeedStatus.objects.filter(
+                court_id=court_id,
+                is_sweep=self.sweep,
+                status__in=[
+                    RssFeedStatus.PROCESSING_SUCCESSFUL,
+                    RssFeedStatus.UNCHANGED,
+                    RssFeedStatus.PROCESSING_IN_PROGRESS,
+                ],
+            ).alatest("date_created")
+        except RssFeedStatus.DoesNotExist:
+            # First time running it or status items have been nuked by an
+            # admin. Make a dummy object, but no need to actually save it to
+            # the DB. Make it old.
+            lincolns_birthday = make_aware(datetime(1809, 2, 12))
+            return RssFeedStatus(
+                date_created=lincolns_birthday,
+                date_last_build=lincolns_birthday,
+                is_sweep=self.sweep,
+            )
+
+    def is_ripe(self, feed_status: RssFeedStatus) -> bool:
+        """Check whether a court is ready to be crawled again."""
+        if self.sweep:
+            return True
+        if self.check_recency:
+            max_visit_ago = now() - timedelta(
+                seconds=self.RSS_MAX_VISIT_FREQUENCY
+            )
+            if feed_status.date_created > max_visit_ago:
+                # Processed too recently.
+                return False
+
+        # Don't crawl a court if it says it's been in progress just a little
+        # while. It's probably queued and on the way.
+        processing_cutoff = now() - timedelta(
+            seconds=self.RSS_MAX_PROCESSING_DURATION
+        )
+        if (
+            feed_status.status == RssFeedStatus.PROCESSING_IN_PROGRESS
+            and feed_status.date_created > processing_cutoff
+        ):
+            return False
+        return True
+
+    async def poll_court(self, client: httpx.AsyncClient, court_id: str):
+        """Fetch a court's feed and queue it for merging if it changed.
+
+        :param client: The HTTP client to use.
+        :param court_id: The CL ID of the court
+        :return: None
+        """
+        last_status = await self.get_last_feed_status(court_id)
+        if not self.is_ripe(last_status):
+            self.schedule_next_visit(court_id, None)
+            return
+
+        new_status = await RssFeedStatus.objects.acreate(
+            court_id=court_id,
+            status=RssFeedStatus.PROCESSING_IN_PROGRESS,
+            is_sweep=self.sweep,
+        )
+        url = PacerRssFeed(map_cl_to_pacer_id(court_id)).url
+        headers = {}
+        validators = {}
+        if not self.sweep:
+            validators = await sync_to_async(get_feed_validators)(court_id)
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        try:
+            async with self.get_host_semaphore(url):
+                fetched = await self.fetch_feed(
+                    client, url, headers, last_status, new_status
+                )
+        except httpx.HTTPError:
+            logger.warning(f"Network error trying to get RSS feed at {url}")
+            new_status.status = RssFeedStatus.PROCESSING_FAILED
+            await new_status.asave()
+            self.schedule_next_visit(court_id, None)
+            return
+
+        lag = await sync_to_async(log_feed_freshness)(
+            court_id, new_status.date_last_build
+        )
+        self.schedule_next_visit(court_id, lag)
+        # Unchanged feeds are the ones that go stale, so check them too.
+        if new_status.date_last_build:
+            await sync_to_async(alert_on_staleness)(
+                new_status.date_last_build, court_id, url
+            )
+        if fetched is None:
+            return
+
+        logger.info(
+            f"{court_id}: Feed changed or doing a sweep. Moving on to the "
+            f"merge."
+        )
+        await self.queue.put(fetched)
+
+    async def fetch_feed(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: Dict[str, str],
+        last_status: RssFeedStatus,
+        new_status: RssFeedStatus,
+    ) -> Optional[FetchedFeed]:
+        """Download a feed, stopping early if it hasn't changed.
+
+        The status object is updated with the outcome, except for changed
+        feeds, which are left in progress until they are merged.
+
+        :param client: The HTTP client to use.
+        :param url: The URL of the feed.
+        :param headers: Headers for a conditional request, if any.
+        :param last_status: The status object from the last visit.
+        :param new_status: The status object for this visit.
+        :return: The downloaded feed if it changed, else None
+        """
+        court_id = new_status.court_id
+        async with client.stream("GET", url, headers=headers) as response:
+            if response.status_code == HTTPStatus.NOT_MODIFIED:
+                logger.info(f"{court_id}: Feed not modified. Aborting.")
+                new_status.date_last_build = last_status.date_last_build
+                new_status.status = RssFeedStatus.UNCHANGED
+                await new_status.asave()
+                return None
+
+            if response.is_error:
+                logger.warning(
+                    f"RSS feed down at '{court_id}' "
+                    f"({response.status_code})."
+                )
+                new_status.status = RssFeedStatus.PROCESSING_FAILED
+                await new_status.asave()
+                return None
+
+            chunks = []
+            head = b""
+            current_build_date = None
+            async for chunk in response.aiter_bytes():
+                chunks.append(chunk)
+                if current_build_date is not None or head is None:
+                    continue
+                head += chunk
+                current_build_date = get_last_build_date(head)
+                if current_build_date is None:
+                    if len(head) > self.BUILD_DATE_SEARCH_BYTES:
+                        # Give up looking.
+                        head = None
+                    continue
+
+                # Only check for early abortion during partial crawls.
+                if (
+                    current_build_date == last_status.date_last_build
+                    and not self.sweep
+                ):
+                    logger.info(
+                        "%s: Feed has not changed since %s. Aborting.",
+                        court_id,
+                        last_status.date_last_build,
+                    )
+                    new_status.date_last_build = current_build_date
+                    new_status.status = RssFeedStatus.UNCHANGED
+                    await new_status.asave()
+                    return None
+
+            validators = {
+                "etag": response.headers.get("ETag", ""),
+                "last_modified": response.headers.get("Last-Modified", ""),
+            }
+
+        content = b"".join(chunks)
+        if not content:
+            logger.warning(f"Empty RSS document returned by PACER: {court_id}")
+            new_status.status = RssFeedStatus.PROCESSING_FAILED
+            await new_status.asave()
+            return None
+
+        if current_build_date is None:
+            logger.warning(
+                f"No last build date in RSS document returned by PACER: "
+                f"{court_id}"
+            )
+            new_status.status = RssFeedStatus.PROCESSING_FAILED
+            await new_status.asave()
+            return None
+
+        new_status.date_last_build = current_build_date
+        await new_status.asave()
+        return FetchedFeed(
+            court_id=court_id,
+            feed_status=new_status,
+            content=content,
+            validators=validators,
+        )
+
+    async def merge_worker(self) -> None:
+        """Drain the queue of downloaded feeds, merging each one."""
+        while True:
+            fetched = await self.queue.get()
+            try:
+                await sync_to_async(
+                    merge_fetched_feed,
+                    thread_sensitive=False,
+                    executor=self.merge_executor,
+                )(fetched)
+            except Exception:
+                logger.exception(
+                    f"{fetched.court_id}: Unable to merge RSS feed."
+                )
+                fetched.feed_status.status = RssFeedStatus.PROCESSING_FAILED
+                await fetched.feed_status.asave()
+            finally:
+                self.queue.task_done()
+
+    def maybe_trim(self) -> None:
+        """Trim the RSS tracking tables if not too recently trimmed."""
+        trim_cutoff_date = now() - timedelta(
+            seconds=self.DELAY_BETWEEN_CACHE_TRIMS
+        )
+        if (
+            self.last_trim_date is None
+            or trim_cutoff_date > self.last_trim_date
+        ):
+            trim_rss_data.delay()
+            self.last_trim_date = now()
+
+    async def poll_courts(
+        self, client: httpx.AsyncClient, court_ids: List[str]
+    ) -> None:
+        """Poll some courts at once. A failure to poll a court is logged and
+        doesn't stop the others.
+
+        :param client: The HTTP client to use.
+        :param court_ids: The CL IDs of the courts to poll.
+        :return: None
+        """
+        results = await asyncio.gather(
+            *[self.poll_court(client, court_id) for court_id in court_ids],
+            return_exceptions=True,
+        )
+        for court_id, result in zip(court_ids, results):
+            if isinstance(result, BaseException):
+                logger.error(
+                    f"{court_id}: Unable to poll RSS feed.", exc_info=result
+                )
+                self.schedule_next_visit(court_id, None)
+
+    async def run(self, iterations: int = 0) -> None:
+        """Poll the feeds until the iterations are done.
+
+        :param iterations: The number of iterations to do. 0 means forever.
+        :return: None
+        """
+        self.merge_executor = ThreadPoolExecutor(
+            self.merge_workers, thread_name_prefix="rss-merge"
+        )
+        workers = [
+            asyncio.create_task(self.merge_worker())
+            for _ in range(self.merge_workers)
+        ]
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+        )
+        iterations_completed = 0
+        try:
+            async with httpx.AsyncClient(
+                limits=limits,
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={"User-Agent": "CourtListener"},
+            ) as client:
+                while iterations == 0 or iterations_completed < iterations:
+                    await self.poll_courts(client, self.get_due_courts())
+                    self.maybe_trim()
+                    iterations_completed += 1
+                    if iterations == 0 or iterations_completed < iterations:
+                        await asyncio.sleep(self.seconds_until_next_visit())
+            # Let the merge workers finish what's in the queue.
+            await self.queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            self.merge_executor.shutdown(wait=True)
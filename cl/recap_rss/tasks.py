@@ -1,5 +1,4 @@
 import bz2
-import errno
 import json
 import logging
 import re
@@ -7,33 +6,29 @@ from calendar import SATURDAY, SUNDAY
 from datetime import datetime, timedelta
 from typing import Optional
 
-import requests
 from asgiref.sync import async_to_sync
-from celery import Task
 from dateparser import parse
 from django.core.files.base import ContentFile
 from django.core.mail import send_mail
 from django.db import IntegrityError, transaction
 from django.utils.timezone import now
-from juriscraper.pacer import PacerRssFeed
 from pytz import timezone
-from requests import HTTPError
 
 from cl.alerts.tasks import enqueue_docket_alert
 from cl.celery_init import app
 from cl.lib.crypto import sha256
-from cl.lib.pacer import map_cl_to_pacer_id
 from cl.lib.types import EmailType
 from cl.recap.constants import COURT_TIMEZONES
 from cl.recap.mergers import (
     add_bankruptcy_data_to_docket,
     add_docket_entries,
     find_docket_object,
+    find_docket_pks_in_bulk,
     update_docket_metadata,
 )
 from cl.recap_rss.models import RssFeedData, RssFeedStatus, RssItemCache
-from cl.recap_rss.utils import emails
-from cl.search.models import Court
+from cl.recap_rss.utils import emails, save_feed_validators
+from cl.search.models import Court, Docket
 
 logger = logging.getLogger(__name__)
 
@@ -149,136 +144,16 @@ def mark_status(status_obj, status_value):
     status_obj.save()
 
 
-def abort_task(task: Task, feed_status: RssFeedStatus):
-    """Abort RSS tasks without retry.
-
-    We don't want to retry RSS tasks because they'll get retried by the
-    daemon anyway, and because they have log timeouts. Better just to let
-    them die.
-    """
-    mark_status(feed_status, RssFeedStatus.PROCESSING_FAILED)
-    task.request.chain = None
-    return
-
-
-@app.task(bind=True, max_retries=0)
-def check_if_feed_changed(self, court_pk, feed_status_pk, date_last_built):
-    """Check if the feed changed
-
-    For now, we do this in a very simple way, by using the lastBuildDate field
-    and checking if it differs from the last time we checked. One thing that
-    makes this approach suboptimal is that we know the `lastBuildDate` field
-    varies around the time that the feeds are actually...um, built. For
-    example, we've seen the same feed with two different values for this field
-    around the time that it is built. When this happens, the two values tend to
-    be off by about a minute or so.
-
-    If we were being very careful and really optimizing when we crawled these
-    feeds, this would cause us trouble because we'd detect a change in this
-    field when the actual data hadn't changed. But because we only crawl the
-    feeds at most once every five minutes, and because the gaps we've observed
-    in this field tend to only be about one minute, we can get away with this.
-
-    Other solutions/thoughts we can consider later:
-
-     - If the difference between two lastBuildDate values is less than two
-       minutes assume it's the same feed.
-     - Use hashing of the feed to determine if it has changed.
-
-    One other oddity here is that we use regex parsing to grab the
-    lastBuildDate value. This is because parsing the feed properly can take
-    several seconds for a big feed.
+def store_rss_feed_data(court_pk: str, content: bytes) -> RssFeedData:
+    """Save a compressed copy of an RSS feed for future analysis.
 
     :param court_pk: The CL ID for the court object.
-    :param feed_status_pk: The CL ID for the status object.
-    :param date_last_built: The last time the court was scraped.
+    :param content: The raw content of the feed.
+    :return: The RssFeedData object that was created.
     """
-    feed_status = RssFeedStatus.objects.get(pk=feed_status_pk)
-    rss_feed = PacerRssFeed(map_cl_to_pacer_id(court_pk))
-    try:
-        rss_feed.query()
-    except requests.RequestException:
-        logger.warning(
-            f"Network error trying to get RSS feed at {rss_feed.url}"
-        )
-        abort_task(self, feed_status)
-        return
-
-    content = rss_feed.response.content
-    if not content:
-        try:
-            raise Exception(
-                f"Empty RSS document returned by PACER: {feed_status.court_id}"
-            )
-        except Exception as exc:
-            logger.warning(str(exc))
-            abort_task(self, feed_status)
-            return
-
-    try:
-        rss_feed.response.raise_for_status()
-    except HTTPError as exc:
-        logger.warning(
-            f"RSS feed down at '{court_pk}' "
-            f"({rss_feed.response.status_code}). {exc}"
-        )
-        abort_task(self, feed_status)
-        return
-
-    current_build_date = get_last_build_date(content)
-    if current_build_date:
-        alert_on_staleness(
-            current_build_date, feed_status.court_id, rss_feed.url
-        )
-        feed_status.date_last_build = current_build_date
-        feed_status.save()
-    else:
-        try:
-            raise Exception(
-                "No last build date in RSS document returned by "
-                "PACER: %s" % feed_status.court_id
-            )
-        except Exception as exc:
-            logger.warning(str(exc))
-            abort_task(self, feed_status)
-            return
-
-    # Only check for early abortion during partial crawls.
-    if date_last_built == current_build_date and not feed_status.is_sweep:
-        logger.info(
-            "%s: Feed has not changed since %s. Aborting.",
-            feed_status.court_id,
-            date_last_built,
-        )
-        # Abort. Nothing has changed here.
-        self.request.chain = None
-        mark_status(feed_status, RssFeedStatus.UNCHANGED)
-        return
-
-    logger.info(
-        f"{feed_status.court_id}: Feed changed or doing a sweep. Moving on to the merge."
-    )
-    rss_feed.parse()
-    logger.info(
-        f"{feed_status.court_id}: Got {len(rss_feed.data)} results to merge."
-    )
-
-    # Update RSS entry types in Court table
-    update_entry_types(court_pk, rss_feed.feed.feed.description)
-
-    # Save the feed to the DB
     feed_data = RssFeedData(court_id=court_pk)
-    try:
-        feed_data.filepath.save(
-            "rss.xml.bz2", ContentFile(bz2.compress(content))
-        )
-    except OSError as exc:
-        if exc.errno == errno.EIO:
-            abort_task(self, feed_status)
-        else:
-            raise exc
-
-    return rss_feed.data
+    feed_data.filepath.save("rss.xml.bz2", ContentFile(bz2.compress(content)))
+    return feed_data
 
 
 def hash_item(item):
@@ -328,20 +203,39 @@ def merge_rss_feed_contents(self, feed_data, court_pk, metadata_only=False):
     # RSS feeds are a list of normal Juriscraper docket objects.
     all_rds_created = []
     d_pks_to_alert = []
-    for docket in feed_data:
-        item_hash = hash_item(docket)
-        if async_to_sync(is_cached)(item_hash):
-            continue
-
+    items = [(docket, hash_item(docket)) for docket in feed_data]
+    cached_hashes = set(
+        RssItemCache.objects.filter(
+            hash__in=[item_hash for _, item_hash in items]
+        ).values_list("hash", flat=True)
+    )
+    items = [item for item in items if item[1] not in cached_hashes]
+
+    # Look up the dockets for all the new items at once.
+    docket_pks = find_docket_pks_in_bulk(
+        [
+            (court_pk, docket["pacer_case_id"], docket["docket_number"])
+            for docket, _ in items
+        ]
+    )
+    for docket, item_hash in items:
         with transaction.atomic():
             cached_ok = async_to_sync(cache_hash)(item_hash)
             if not cached_ok:
                 # The item is already in the cache, ergo it's getting processed
                 # in another thread/process and we had a race condition.
                 continue
-            d = async_to_sync(find_docket_object)(
-                court_pk, docket["pacer_case_id"], docket["docket_number"]
+            docket_pk = docket_pks.get(
+                (court_pk, docket["pacer_case_id"], docket["docket_number"])
             )
+            if docket_pk:
+                d = Docket.objects.get(pk=docket_pk)
+            else:
+                # Not found in bulk. Look again, in case an earlier item in
+                # the feed created it.
+                d = async_to_sync(find_docket_object)(
+                    court_pk, docket["pacer_case_id"], docket["docket_number"]
+                )
 
             d.add_recap_source()
             async_to_sync(update_docket_metadata)(d, docket)
@@ -379,10 +273,20 @@ def merge_rss_feed_contents(self, feed_data, court_pk, metadata_only=False):
 
 
 @app.task
-def mark_status_successful(feed_status_pk):
+def mark_status_successful(feed_status_pk, validators=None):
+    """Mark a feed as successfully processed.
+
+    :param feed_status_pk: The CL ID for the status object.
+    :param validators: Optional dict of HTTP cache validators (ETag and
+    Last-Modified) for the feed. They're only saved once the feed has been
+    merged so that a failed merge doesn't make the next conditional request
+    skip the changes.
+    """
     feed_status = RssFeedStatus.objects.get(pk=feed_status_pk)
     logger.info(f"Marking {feed_status.court_id} as a success.")
     mark_status(feed_status, RssFeedStatus.PROCESSING_SUCCESSFUL)
+    if validators:
+        save_feed_validators(feed_status.court_id, validators)
 
 
 @app.task
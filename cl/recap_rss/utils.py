@@ -1,7 +1,10 @@
-from typing import Dict
+from datetime import datetime
+from typing import Dict, Optional
 
 from django.conf import settings
+from django.utils.timezone import now
 
+from cl.lib.redis_utils import get_redis_interface
 from cl.lib.types import EmailType
 
 emails: Dict[str, EmailType] = {
@@ -26,3 +29,81 @@ emails: Dict[str, EmailType] = {
         "to": [a[1] for a in settings.MANAGERS],
     },
 }
+
+
+def make_feed_validators_key(court_id: str) -> str:
+    return f"rss.validators:{court_id}"
+
+
+RSS_FRESHNESS_LAG_KEY = "rss.freshness_lag"
+RSS_LAST_POLL_KEY = "rss.last_poll"
+
+
+def get_feed_validators(court_id: str) -> Dict[str, str]:
+    """Get the HTTP cache validators we last saw for a court's feed.
+
+    :param court_id: The CL ID of the court
+    :return: A dict that may contain "etag" and "last_modified" keys.
+    """
+    r = get_redis_interface("CACHE")
+    return r.hgetall(make_feed_validators_key(court_id))  # type: ignore
+
+
+def save_feed_validators(court_id: str, validators: Dict[str, str]) -> None:
+    """Save the HTTP cache validators for a court's feed so that the next
+    request can be made conditionally.
+
+    :param court_id: The CL ID of the court
+    :param validators: A dict with "etag" and/or "last_modified" keys.
+    :return: None
+    """
+    validators = {k: v for k, v in validators.items() if v}
+    if not validators:
+        return
+    r = get_redis_interface("CACHE")
+    key = make_feed_validators_key(court_id)
+    pipe = r.pipeline()
+    pipe.delete(key)
+    pipe.hset(key, mapping=validators)
+    # Feeds change many times a day. If we stop polling, there's no need to
+    # keep these around.
+    pipe.expire(key, 60 * 60 * 24 * 2)
+    pipe.execute()
+
+
+def log_feed_freshness(
+    court_id: str,
+    last_build_date: Optional[datetime],
+) -> Optional[float]:
+    """Record how far behind a court's feed is and when we last polled it.
+
+    The lag is the number of seconds between the lastBuildDate of the feed
+    and now, so it captures both the court being slow to build its feed and
+    us being slow to poll it.
+
+    :param court_id: The CL ID of the court
+    :param last_build_date: The lastBuildDate value of the feed, if known.
+    :return: The freshness lag in seconds, or None if no build date is known.
+    """
+    _now = now()
+    r = get_redis_interface("STATS")
+    pipe = r.pipeline()
+    pipe.hset(RSS_LAST_POLL_KEY, court_id, _now.timestamp())
+    lag = None
+    if last_build_date is not None:
+        lag = round((_now - last_build_date).total_seconds(), 2)
+        pipe.hset(RSS_FRESHNESS_LAG_KEY, court_id, lag)
+    pipe.execute()
+    return lag
+
+
+def get_feed_freshness() -> Dict[str, float]:
+    """Get the freshness lag, in seconds, for every court we poll.
+
+    :return: A dict mapping court IDs to their lag in seconds.
+    """
+    r = get_redis_interface("STATS")
+    return {
+        court_id: float(lag)
+        for court_id, lag in r.hgetall(RSS_FRESHNESS_LAG_KEY).items()
+    }
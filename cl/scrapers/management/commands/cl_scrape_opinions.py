@@ -10,12 +10,12 @@ from django.core.management.base import CommandError
 from django.db import transaction
 from django.utils.encoding import force_bytes
 from eyecite.find import get_citations
-from eyecite.tokenizers import HyperscanTokenizer
 from juriscraper.lib.importer import build_module_list
 from juriscraper.lib.string_utils import CaseNameTweaker
 from sentry_sdk import capture_exception
 
 from cl.alerts.models import RealTimeQueue
+from cl.citations.tokenizers import get_hyperscan_tokenizer
 from cl.citations.utils import map_reporter_db_cite_type
 from cl.lib.command_utils import VerboseCommand, logger
 from cl.lib.crypto import sha1
@@ -40,7 +40,6 @@ from cl.search.models import (
     OpinionCluster,
 )
 
-HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
 
 # for use in catching the SIGINT (Ctrl+4)
 die_now = False
@@ -51,7 +50,9 @@ def make_citation(
     cite_str: str, cluster: OpinionCluster, court_id: str
 ) -> Optional[Citation]:
     """Create and return a citation object for the input values."""
-    citation_objs = get_citations(cite_str, tokenizer=HYPERSCAN_TOKENIZER)
+    citation_objs = get_citations(
+        cite_str, tokenizer=get_hyperscan_tokenizer()
+    )
     if not citation_objs:
         logger.error(
             "Could not parse citation from court '%s'",
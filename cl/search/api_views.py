@@ -6,7 +6,13 @@ from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 
 from cl.api.pagination import ESCursorPagination
-from cl.api.utils import CacheListMixin, LoggingMixin, RECAPUsersReadOnly
+from cl.api.utils import (
+    CacheListMixin,
+    ConditionalGetMixin,
+    FastListMixin,
+    LoggingMixin,
+    RECAPUsersReadOnly,
+)
 from cl.lib.elasticsearch_utils import do_es_api_query
 from cl.search import api_utils
 from cl.search.api_serializers import (
@@ -62,7 +68,9 @@ from cl.search.models import (
 )
 
 
-class OriginatingCourtInformationViewSet(viewsets.ModelViewSet):
+class OriginatingCourtInformationViewSet(
+    ConditionalGetMixin, viewsets.ModelViewSet
+):
     serializer_class = OriginalCourtInformationSerializer
     # Default cursor ordering key
     ordering = "-id"
@@ -75,7 +83,9 @@ class OriginatingCourtInformationViewSet(viewsets.ModelViewSet):
     queryset = OriginatingCourtInformation.objects.all().order_by("-id")
 
 
-class DocketViewSet(LoggingMixin, viewsets.ModelViewSet):
+class DocketViewSet(
+    LoggingMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet
+):
     serializer_class = DocketSerializer
     filterset_class = DocketFilter
     ordering_fields = (
@@ -95,6 +105,15 @@ class DocketViewSet(LoggingMixin, viewsets.ModelViewSet):
         "date_created",
         "date_modified",
     ]
+    # Nested and linked objects, to version conditional responses
+    conditional_related = (
+        "originating_court_information",
+        "idb_data",
+        "panel",
+        "clusters",
+        "audio_files",
+        "tags",
+    )
     queryset = (
         Docket.objects.select_related(
             "court",
@@ -108,7 +127,9 @@ class DocketViewSet(LoggingMixin, viewsets.ModelViewSet):
     )
 
 
-class DocketEntryViewSet(LoggingMixin, viewsets.ModelViewSet):
+class DocketEntryViewSet(
+    LoggingMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet
+):
     permission_classes = (RECAPUsersReadOnly,)
     serializer_class = DocketEntrySerializer
     filterset_class = DocketEntryFilter
@@ -121,6 +142,7 @@ class DocketEntryViewSet(LoggingMixin, viewsets.ModelViewSet):
         "date_created",
         "date_modified",
     ]
+    conditional_related = ("recap_documents", "recap_documents__tags", "tags")
     queryset = (
         DocketEntry.objects.select_related(
             "docket",  # For links back to dockets
@@ -135,7 +157,11 @@ class DocketEntryViewSet(LoggingMixin, viewsets.ModelViewSet):
 
 
 class RECAPDocumentViewSet(
-    LoggingMixin, CacheListMixin, viewsets.ModelViewSet
+    LoggingMixin,
+    ConditionalGetMixin,
+    CacheListMixin,
+    FastListMixin,
+    viewsets.ModelViewSet,
 ):
     permission_classes = (RECAPUsersReadOnly,)
     serializer_class = RECAPDocumentSerializer
@@ -149,6 +175,12 @@ class RECAPDocumentViewSet(
         "date_created",
         "date_modified",
     ]
+    # Lists of a single docket are only invalidated by writes to it.
+    list_cache_scope_params = (
+        "docket_entry__docket",
+        "docket_entry__docket__id",
+    )
+    conditional_related = ("tags",)
     queryset = (
         RECAPDocument.objects.select_related(
             "docket_entry", "docket_entry__docket"
@@ -158,7 +190,7 @@ class RECAPDocumentViewSet(
     )
 
 
-class CourtViewSet(LoggingMixin, viewsets.ModelViewSet):
+class CourtViewSet(LoggingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = CourtSerializer
     filterset_class = CourtFilter
     ordering_fields = (
@@ -168,6 +200,7 @@ class CourtViewSet(LoggingMixin, viewsets.ModelViewSet):
         "start_date",
         "end_date",
     )
+    conditional_related = ("appeals_to",)
     queryset = Court.objects.exclude(
         jurisdiction=Court.TESTING_COURT
     ).order_by("position")
@@ -177,7 +210,9 @@ class CourtViewSet(LoggingMixin, viewsets.ModelViewSet):
     pagination_class = PageNumberPagination
 
 
-class OpinionClusterViewSet(LoggingMixin, viewsets.ModelViewSet):
+class OpinionClusterViewSet(
+    LoggingMixin, FastListMixin, viewsets.ModelViewSet
+):
     serializer_class = OpinionClusterSerializer
     filterset_class = OpinionClusterFilter
     ordering_fields = (
@@ -201,7 +236,7 @@ class OpinionClusterViewSet(LoggingMixin, viewsets.ModelViewSet):
     ).order_by("-id")
 
 
-class OpinionViewSet(LoggingMixin, viewsets.ModelViewSet):
+class OpinionViewSet(LoggingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = OpinionSerializer
     filterset_class = OpinionFilter
     ordering_fields = (
@@ -217,6 +252,7 @@ class OpinionViewSet(LoggingMixin, viewsets.ModelViewSet):
         "date_created",
         "date_modified",
     ]
+    conditional_related = ("opinions_cited", "joined_by")
     queryset = (
         Opinion.objects.select_related("cluster", "author")
         .prefetch_related("opinions_cited", "joined_by")
@@ -224,7 +260,9 @@ class OpinionViewSet(LoggingMixin, viewsets.ModelViewSet):
     )
 
 
-class OpinionsCitedViewSet(LoggingMixin, viewsets.ModelViewSet):
+class OpinionsCitedViewSet(
+    LoggingMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     serializer_class = OpinionsCitedSerializer
     filterset_class = OpinionsCitedFilter
     # Default cursor ordering key
@@ -234,7 +272,7 @@ class OpinionsCitedViewSet(LoggingMixin, viewsets.ModelViewSet):
     queryset = OpinionsCited.objects.all().order_by("-id")
 
 
-class TagViewSet(LoggingMixin, viewsets.ModelViewSet):
+class TagViewSet(LoggingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     permission_classes = (RECAPUsersReadOnly,)
     serializer_class = TagSerializer
     # Default cursor ordering key
@@ -41,40 +41,57 @@ def get_item(item):
         return item
 
 
+# The feed descriptions are truncated to 500 words, so there's no need to strip
+# the tags out of whole opinions to get them.
+FEED_TEXT_MAX_LENGTH = 50_000
+
+
+def clean_feed_text(text: str) -> str:
+    """Strip the tags and control characters out of the start of a text, for
+    a feed description.
+
+    :param text: The text of a document, possibly HTML.
+    :return: Up to FEED_TEXT_MAX_LENGTH characters of the text, cleaned up.
+    """
+    text = text[:FEED_TEXT_MAX_LENGTH]
+    if len(text) == FEED_TEXT_MAX_LENGTH and text.rfind("<") > text.rfind(">"):
+        # Don't leave half a tag at the end.
+        text = text[: text.rfind("<")]
+    return strip_tags(text.translate(null_map))
+
+
 def cleanup_control_chars(
     items: Response, document_text_key: str, jurisdiction: bool = False
-) -> None:
+) -> list:
     """Clean up control characters from document texts for a proper XML
     rendering.
 
+    The whole page of results is cleaned up and normalized with get_item in
+    a single pass, so the feed's item methods don't repeat the work.
+
     :param items: The ES Response containing the search results.
     :param document_text_key: Key in the item dict to clean.
     :param jurisdiction: A bool to indicate if the item is from a jurisdiction
     feed.
-    :return: None. The function modify items in place.
+    :return: The items, normalized with get_item. They're also modified in
+    place.
     """
-
+    cleaned = []
     for item in items:
-        if document_text_key == "text":
-            # Opinions case.
-            if jurisdiction:
-                # Jurisdiction Feed display Opinions
-                item[document_text_key] = strip_tags(
-                    item[document_text_key][0].translate(null_map)
+        if document_text_key == "text" and not jurisdiction:
+            # Opinions Search Feed display Clusters with child summary.
+            for doc in item.child_docs:
+                doc["_source"][document_text_key] = clean_feed_text(
+                    doc["_source"][document_text_key][0]
                 )
-            else:
-                # Opinions Search Feed display Clusters with child summary.
-                for doc in item.child_docs:
-                    doc["_source"][document_text_key] = strip_tags(
-                        doc["_source"][document_text_key][0].translate(
-                            null_map
-                        )
-                    )
         else:
-            # RECAP Search Feed. Display RECAPDocuments instead of Dockets.
-            item[document_text_key] = strip_tags(
-                item[document_text_key][0].translate(null_map)
+            # Jurisdiction Feeds display Opinions, and the RECAP Search Feed
+            # displays RECAPDocuments instead of Dockets.
+            item[document_text_key] = clean_feed_text(
+                item[document_text_key][0]
             )
+        cleaned.append(get_item(item))
+    return cleaned
 
 
 class SearchFeed(Feed):
@@ -145,7 +162,7 @@ class SearchFeed(Feed):
                         rows=20,
                         exclude_docs_for_empty_field=exclude_docs_for_empty_field,
                     )
-                    cleanup_control_chars(items, document_text_key)
+                    items = cleanup_control_chars(items, document_text_key)
 
                 else:
                     # Do a Solr query.
@@ -225,7 +242,7 @@ class JurisdictionFeed(Feed):
             items = do_es_feed_query(
                 es_search_query, cd, rows=20, jurisdiction=True
             )
-            cleanup_control_chars(items, "text", jurisdiction=True)
+            items = cleanup_control_chars(items, "text", jurisdiction=True)
         else:
             with Session() as session:
                 solr = ExtraSolrInterface(
@@ -294,7 +311,7 @@ class AllJurisdictionsFeed(JurisdictionFeed):
             items = do_es_feed_query(
                 es_search_query, cd, rows=20, jurisdiction=True
             )
-            cleanup_control_chars(items, "text", jurisdiction=True)
+            items = cleanup_control_chars(items, "text", jurisdiction=True)
         else:
             with Session() as session:
                 solr = ExtraSolrInterface(
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.8 on 2024-08-20 17:42
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("search", "0033_order_opinions"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="docket",
+            index=models.Index(
+                condition=models.Q(("pacer_case_id__isnull", False)),
+                fields=["court_id", "pacer_case_id"],
+                name="docket_court_pacer_case_id_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,4 @@
+--
+-- Concurrently create index docket_court_pacer_case_id_idx on field(s) court_id, pacer_case_id of model docket
+--
+CREATE INDEX CONCURRENTLY "docket_court_pacer_case_id_idx" ON "search_docket" ("court_id", "pacer_case_id") WHERE "pacer_case_id" IS NOT NULL;
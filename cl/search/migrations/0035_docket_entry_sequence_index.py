@@ -0,0 +1,22 @@
+# Generated by Django 5.0.8 on 2024-08-27 15:10
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("search", "0034_docket_lookup_indexes"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="docketentry",
+            index=models.Index(
+                fields=["docket_id", "recap_sequence_number", "entry_number"],
+                name="entry_docket_sequence_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,4 @@
+--
+-- Concurrently create index entry_docket_sequence_idx on field(s) docket_id, recap_sequence_number, entry_number of model docketentry
+--
+CREATE INDEX CONCURRENTLY "entry_docket_sequence_idx" ON "search_docketentry" ("docket_id", "recap_sequence_number", "entry_number");
@@ -0,0 +1,61 @@
+# Indexes the event tables the bulk data delta exports look changes up in.
+# They're BRIN indexes, which are tiny and cheap to build, since events are
+# appended in pgh_created_at order. They aren't in the event models, which
+# pghistory generates, so they're only created in the database.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("search", "0035_docket_entry_sequence_index"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_originatingcourtinformationevent_created_brin" ON "search_originatingcourtinformationevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "search_originatingcourtinformationevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_docketevent_created_brin" ON "search_docketevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "search_docketevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_courtevent_created_brin" ON "search_courtevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "search_courtevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_courtappealstoevent_created_brin" ON "search_courtappealstoevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "search_courtappealstoevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_courthouseevent_created_brin" ON "search_courthouseevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "search_courthouseevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_opinionclusterevent_created_brin" ON "search_opinionclusterevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "search_opinionclusterevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_opinionclusterpanelevent_created_brin" ON "search_opinionclusterpanelevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "search_opinionclusterpanelevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_opinionclusternonparticipatingjudgesevent_created_brin" ON "search_opinionclusternonparticipatingjudgesevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "search_opinionclusternonparticipatingjudgesevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_citationevent_created_brin" ON "search_citationevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "search_citationevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_opinionevent_created_brin" ON "search_opinionevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "search_opinionevent_created_brin";',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_opinionjoinedbyevent_created_brin" ON "search_opinionjoinedbyevent" USING brin ("pgh_created_at");',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "search_opinionjoinedbyevent_created_brin";',
+        ),
+    ]
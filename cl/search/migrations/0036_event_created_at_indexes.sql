@@ -0,0 +1,44 @@
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_originatingcourtinformationevent_created_brin" ON "search_originatingcourtinformationevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_docketevent_created_brin" ON "search_docketevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_courtevent_created_brin" ON "search_courtevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_courtappealstoevent_created_brin" ON "search_courtappealstoevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_courthouseevent_created_brin" ON "search_courthouseevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_opinionclusterevent_created_brin" ON "search_opinionclusterevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_opinionclusterpanelevent_created_brin" ON "search_opinionclusterpanelevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_opinionclusternonparticipatingjudgesevent_created_brin" ON "search_opinionclusternonparticipatingjudgesevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_citationevent_created_brin" ON "search_citationevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_opinionevent_created_brin" ON "search_opinionevent" USING brin ("pgh_created_at");
+--
+-- Raw SQL operation
+--
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "search_opinionjoinedbyevent_created_brin" ON "search_opinionjoinedbyevent" USING brin ("pgh_created_at");
@@ -18,11 +18,11 @@ from django.utils import timezone
 from django.utils.encoding import force_str
 from django.utils.text import slugify
 from eyecite import get_citations
-from eyecite.tokenizers import HyperscanTokenizer
 from localflavor.us.models import USPostalCodeField, USZipCodeField
 from localflavor.us.us_states import OBSOLETE_STATES, USPS_CHOICES
 from model_utils import FieldTracker
 
+from cl.citations.tokenizers import get_hyperscan_tokenizer
 from cl.citations.utils import get_citation_depth_between_clusters
 from cl.custom_filters.templatetags.text_filters import best_case_name
 from cl.lib import fields
@@ -45,8 +45,6 @@ from cl.lib.string_utils import trunc
 from cl.lib.utils import deepgetattr
 from cl.search.docket_sources import DocketSources
 
-HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
-
 
 class PRECEDENTIAL_STATUS:
     PUBLISHED = "Published"
@@ -773,6 +771,11 @@ class Docket(AbstractDateTimeModel, DocketSources):
                 name="district_court_docket_lookup_idx",
             ),
             HashIndex("docket_number", name="hash_docket_number_lookup_idx"),
+            models.Index(
+                fields=["court_id", "pacer_case_id"],
+                condition=Q(pacer_case_id__isnull=False),
+                name="docket_court_pacer_case_id_idx",
+            ),
         ]
 
     def __str__(self) -> str:
@@ -1237,6 +1240,10 @@ class DocketEntry(AbstractDateTimeModel):
                 condition=Q(entry_number=1),
             ),
             models.Index(fields=["recap_sequence_number", "entry_number"]),
+            models.Index(
+                fields=["docket_id", "recap_sequence_number", "entry_number"],
+                name="entry_docket_sequence_idx",
+            ),
         ]
         ordering = ("recap_sequence_number", "entry_number")
         permissions = (("has_recap_api_access", "Can work with RECAP API"),)
@@ -2366,7 +2373,7 @@ class ClusterCitationQuerySet(models.query.QuerySet):
                 c = get_citations(
                     citation_str,
                     remove_ambiguous=False,
-                    tokenizer=HYPERSCAN_TOKENIZER,
+                    tokenizer=get_hyperscan_tokenizer(),
                 )[0]
             except IndexError:
                 raise ValueError(f"Unable to parse citation '{citation_str}'")
@@ -1,7 +1,28 @@
+from contextvars import ContextVar
+from functools import partial, wraps
+from typing import Any, Awaitable, Callable, TypeVar
+
 import natsort
-from django.db.models import F, Prefetch, QuerySet
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import transaction
+from django.db.models import F, Prefetch, Q, QuerySet, Window
+from django.db.models.functions import RowNumber
+
+from cl.search.models import DocketEntry, OpinionCluster
+
+DOCKET_ENTRIES_PER_PAGE = 200
+DOCKET_ENTRIES_ORPHANS = 10
+# The page index is dropped whenever entries of the docket are saved or
+# deleted, so this is just a safety net for writes that skip signals.
+DOCKET_ENTRY_PAGES_TTL = 60 * 60 * 24
 
-from cl.search.models import OpinionCluster
+# The dockets whose page indexes are dropped at the end of a merge, if one is
+# running. See defer_docket_entry_pages_invalidation.
+_deferred_page_invalidations: ContextVar[set[int] | None] = ContextVar(
+    "deferred_page_invalidations", default=None
+)
 
 
 async def get_clusters_from_citation_str(
@@ -88,3 +109,249 @@ async def get_clusters_from_citation_str(
             cluster_count = 1 if await clusters.aexists() else 0
 
     return clusters, cluster_count
+
+
+def make_docket_entry_pages_key(docket_id: int, descending: bool) -> str:
+    """Make the cache key of the page index of a docket's entries.
+
+    Args:
+        docket_id (int): The ID of the docket.
+        descending (bool): Whether the index is for entries in descending
+        order.
+
+    Returns:
+        The cache key.
+    """
+    order = "desc" if descending else "asc"
+    return f"docket.entry_pages:{docket_id}:{order}"
+
+
+def invalidate_docket_entry_pages(docket_id: int) -> None:
+    """Drop the cached page indexes of a docket's entries, so they're rebuilt
+    the next time they're needed.
+
+    Args:
+        docket_id (int): The ID of the docket whose entries changed.
+    """
+    cache.delete_many(
+        [
+            make_docket_entry_pages_key(docket_id, descending)
+            for descending in (False, True)
+        ]
+    )
+
+
+def schedule_docket_entry_pages_invalidation(docket_id: int) -> None:
+    """Drop the cached page indexes of a docket's entries once the current
+    transaction commits, or at the end of the merge that's running, if any.
+
+    Args:
+        docket_id (int): The ID of the docket whose entries changed.
+    """
+    deferred = _deferred_page_invalidations.get()
+    if deferred is not None:
+        deferred.add(docket_id)
+        return
+    transaction.on_commit(partial(invalidate_docket_entry_pages, docket_id))
+
+
+T = TypeVar("T")
+
+
+def defer_docket_entry_pages_invalidation(
+    func: Callable[..., Awaitable[T]],
+) -> Callable[..., Awaitable[T]]:
+    """Decorate a merge so the page indexes of the dockets whose entries it
+    changes are dropped once, when it returns, instead of once per entry
+    saved.
+
+    Merges save many entries of a docket one after the other. Dropping the
+    index on each save makes the readers in between rebuild it over and
+    over, with counts that are already stale.
+
+    Args:
+        func: The coroutine function doing the merge.
+
+    Returns:
+        The decorated coroutine function.
+    """
+
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        deferred: set[int] = set()
+        token = _deferred_page_invalidations.set(deferred)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _deferred_page_invalidations.reset(token)
+            for docket_id in deferred:
+                # Schedule it from the thread that saved the entries, so it
+                # runs when that thread's transaction commits.
+                await sync_to_async(schedule_docket_entry_pages_invalidation)(
+                    docket_id
+                )
+
+    return wrapper
+
+
+def get_docket_entries_ordering(descending: bool) -> list[str]:
+    """Get the ordering of the docket entries on a docket page.
+
+    The PK breaks ties so every entry has a unique position that pages can
+    seek to.
+
+    Args:
+        descending (bool): Whether to sort in descending order.
+
+    Returns:
+        The fields to order by.
+    """
+    fields = ["recap_sequence_number", "entry_number", "pk"]
+    if descending:
+        return [f"-{field}" for field in fields]
+    return fields
+
+
+async def get_docket_entry_pages(
+    docket_id: int, descending: bool
+) -> dict[str, int | list[tuple[str, int | None, int]]]:
+    """Get the page index of a docket's entries, building it if it's not
+    cached.
+
+    The index holds the number of entries in the docket and the sort key of
+    the first entry of each page. With it, any page can be fetched by seeking
+    to its first entry, without counting the entries or scanning the ones on
+    previous pages.
+
+    Args:
+        docket_id (int): The ID of the docket.
+        descending (bool): Whether the entries are in descending order.
+
+    Returns:
+        A dict with the "count" of entries and the "boundaries" of the pages,
+        as (recap_sequence_number, entry_number, pk) tuples.
+    """
+    key = make_docket_entry_pages_key(docket_id, descending)
+    pages = await cache.aget(key)
+    if pages is not None:
+        return pages
+
+    entries = DocketEntry.objects.filter(docket_id=docket_id)
+    count = await entries.acount()
+    paginator = Paginator(
+        range(count), DOCKET_ENTRIES_PER_PAGE, orphans=DOCKET_ENTRIES_ORPHANS
+    )
+    first_rows = [
+        paginator.per_page * i + 1 for i in range(paginator.num_pages)
+    ]
+    boundaries = [
+        row
+        async for row in entries.annotate(
+            row_number=Window(
+                RowNumber(), order_by=get_docket_entries_ordering(descending)
+            )
+        )
+        .filter(row_number__in=first_rows)
+        .order_by("row_number")
+        .values_list("recap_sequence_number", "entry_number", "pk")
+    ]
+    pages = {"count": count, "boundaries": boundaries}
+    await cache.aset(key, pages, DOCKET_ENTRY_PAGES_TTL)
+    return pages
+
+
+def make_docket_entry_seek_filter(
+    boundary: tuple[str, int | None, int], descending: bool
+) -> Q:
+    """Make a filter for the docket entries at or after a page boundary, in
+    the order of the page.
+
+    entry_number can be null, and nulls sort last in ascending order and first
+    in descending order, so the filter spells out the comparison instead of
+    comparing rows.
+
+    Args:
+        boundary (tuple): The (recap_sequence_number, entry_number, pk) of the
+        first entry of the page.
+        descending (bool): Whether the entries are in descending order.
+
+    Returns:
+        The filter.
+    """
+    sequence_number, entry_number, pk = boundary
+    op = "lt" if descending else "gt"
+    op_or_equal = f"{op[0]}te"
+    if entry_number is None:
+        same_entry_number = Q(entry_number__isnull=True) & Q(
+            **{f"pk__{op_or_equal}": pk}
+        )
+        if descending:
+            # Entries with numbers come after the ones without.
+            same_entry_number |= Q(entry_number__isnull=False)
+    else:
+        same_entry_number = Q(**{f"entry_number__{op}": entry_number}) | Q(
+            entry_number=entry_number, **{f"pk__{op_or_equal}": pk}
+        )
+        if not descending:
+            # Entries without numbers come after the ones with.
+            same_entry_number |= Q(entry_number__isnull=True)
+    # The first condition is implied by the others, but it lets the DB start
+    # the index scan at the boundary instead of at the first entry.
+    return Q(**{f"recap_sequence_number__{op_or_equal}": sequence_number}) & (
+        Q(**{f"recap_sequence_number__{op}": sequence_number})
+        | (Q(recap_sequence_number=sequence_number) & same_entry_number)
+    )
+
+
+async def get_docket_entries_page(
+    docket_id: int,
+    page_number: int | str,
+    descending: bool,
+    queryset: QuerySet[DocketEntry],
+) -> Page:
+    """Get a page of a docket's entries using keyset pagination.
+
+    Pages are numbered and sized like Django's Paginator would do it, but
+    rendering any of them only reads the entries on that page.
+
+    Args:
+        docket_id (int): The ID of the docket.
+        page_number (int | str): The page requested. Invalid numbers get the
+        first page and numbers that are too large get the last one.
+        descending (bool): Whether the entries are in descending order.
+        queryset (QuerySet): The docket entries queryset to get the page
+        from, with any prefetches the page needs.
+
+    Returns:
+        The requested page.
+    """
+    pages = await get_docket_entry_pages(docket_id, descending)
+    paginator = Paginator(
+        range(pages["count"]),
+        DOCKET_ENTRIES_PER_PAGE,
+        orphans=DOCKET_ENTRIES_ORPHANS,
+    )
+    try:
+        number = paginator.validate_number(page_number)
+    except PageNotAnInteger:
+        number = 1
+    except EmptyPage:
+        number = paginator.num_pages
+
+    boundaries = pages["boundaries"]
+    if number > len(boundaries):
+        # No entries at all.
+        return Page([], number, paginator)
+
+    if number == paginator.num_pages:
+        # The last page has the orphans, if any.
+        size = pages["count"] - paginator.per_page * (number - 1)
+    else:
+        size = paginator.per_page
+    entries = [
+        de
+        async for de in queryset.filter(
+            make_docket_entry_seek_filter(boundaries[number - 1], descending)
+        ).order_by(*get_docket_entries_ordering(descending))[:size]
+    ]
+    return Page(entries, number, paginator)
@@ -1,12 +1,18 @@
+from functools import partial
+
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from cl.api.utils import invalidate_list_cache
 from cl.audio.models import Audio
+from cl.citations.citation_index import forget_citation
 from cl.citations.tasks import (
     find_citations_and_parantheticals_for_recap_documents,
 )
 from cl.lib.es_signal_processor import ESSignalProcessor
+from cl.opinion_page.feeds import invalidate_docket_feed
 from cl.people_db.models import (
     ABARating,
     Education,
@@ -39,6 +45,7 @@ from cl.search.models import (
     ParentheticalGroup,
     RECAPDocument,
 )
+from cl.search.selectors import schedule_docket_entry_pages_invalidation
 
 # This field mapping is used to define which fields should be updated in the
 # Elasticsearch index document when they change in the DB. The outer keys
@@ -567,3 +574,73 @@ def handle_recap_doc_change(
             find_citations_and_parantheticals_for_recap_documents.apply_async(
                 args=([instance.pk],)
             )
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=DocketEntry,
+    dispatch_uid="handle_docket_entry_change_uid",
+)
+def handle_docket_entry_change(sender, instance: DocketEntry, **kwargs):
+    """Drop the page index and feed of the docket once one of its entries is
+    added, changed or deleted and committed, so the docket pages are
+    paginated by fresh data and the feed is rendered again. During merges,
+    the page index is only dropped once, at the end.
+    """
+    schedule_docket_entry_pages_invalidation(instance.docket_id)
+    transaction.on_commit(partial(invalidate_docket_feed, instance.docket_id))
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=RECAPDocument,
+    dispatch_uid="invalidate_recap_document_lists_uid",
+)
+def invalidate_recap_document_lists(sender, instance: RECAPDocument, **kwargs):
+    """Invalidate the cached RECAPDocument API lists and feed of the docket
+    of a document once it's saved or deleted and committed.
+    """
+    if RECAPDocument.docket_entry.is_cached(instance):
+        docket_id = instance.docket_entry.docket_id
+    else:
+        # Only get the docket ID instead of loading the whole entry. It's
+        # None if the entry was deleted along with the document.
+        docket_id = (
+            DocketEntry.objects.filter(pk=instance.docket_entry_id)
+            .values_list("docket_id", flat=True)
+            .first()
+        )
+    if docket_id is None:
+        return
+    transaction.on_commit(
+        partial(invalidate_list_cache, RECAPDocument, scope=docket_id)
+    )
+    transaction.on_commit(partial(invalidate_docket_feed, docket_id))
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=Docket,
+    dispatch_uid="invalidate_docket_feed_uid",
+)
+def handle_docket_change(sender, instance: Docket, **kwargs):
+    """Drop the feed of a docket whenever it's saved or deleted, since the
+    feed shows the docket's title and case name.
+    """
+    transaction.on_commit(partial(invalidate_docket_feed, instance.pk))
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=Citation,
+    dispatch_uid="forget_indexed_citation_uid",
+)
+def forget_indexed_citation(sender, instance: Citation, **kwargs):
+    """Drop a citation from the citation index when it's saved or deleted,
+    so that it's resolved by search until the index is rebuilt.
+    """
+    transaction.on_commit(
+        partial(
+            forget_citation, instance.reporter, instance.volume, instance.page
+        )
+    )
@@ -1351,13 +1351,14 @@ def check_bulk_indexing_exception(
 def index_related_cites_fields(
     self: Task,
     model_name: str,
-    child_id: int,
+    child_id: int | None,
     cluster_ids_to_update: list[int] | None = None,
 ) -> None:
     """Index 'cites' and 'citeCount' fields in ES documents in a one request.
     :param self: The Celery task instance.
     :param model_name: The model name that originated the request.
-    :param child_id: The child document ID to update with the cites.
+    :param child_id: The child document ID to update with the cites, or None
+    to only update the 'citeCount' of the clusters.
     :param cluster_ids_to_update: Optional; the cluster IDs where 'citeCount'
     should be updated.
     :return: None.
@@ -1425,11 +1426,12 @@ def index_related_cites_fields(
                     documents_to_update.append(doc_to_update)
 
             # Finally build the Opinion dict for updating the cites.
-            child_doc_model = Opinion
-            es_child_doc_class = OpinionDocument
-            cites_doc_to_update = build_bulk_cites_doc(
-                es_child_doc_class, child_id, child_doc_model
-            )
+            if child_id is not None:
+                child_doc_model = Opinion
+                es_child_doc_class = OpinionDocument
+                cites_doc_to_update = build_bulk_cites_doc(
+                    es_child_doc_class, child_id, child_doc_model
+                )
 
         case OpinionsCitedByRECAPDocument.__name__:
             # Build the RECAPDocument dict for updating the cites.
@@ -1477,6 +1479,71 @@ def index_related_cites_fields(
         DocketDocument._index.refresh()
 
 
+@app.task(
+    bind=True,
+    autoretry_for=(ConnectionError, ConflictError, ConnectionTimeout),
+    max_retries=6,
+    retry_backoff=2 * 60,
+    retry_backoff_max=20 * 60,
+    retry_jitter=True,
+    queue=settings.CELERY_ETL_TASK_QUEUE,
+    ignore_result=True,
+)
+def index_recap_documents_cites(self: Task, rd_ids: list[int]) -> None:
+    """Index the 'cites' field of many RECAPDocuments in one bulk request.
+
+    This is the batched version of index_related_cites_fields, for backfills.
+    Documents that aren't indexed yet are skipped instead of retried; they
+    get their cites when they're indexed.
+
+    :param self: The Celery task instance.
+    :param rd_ids: The IDs of the RECAPDocuments to update.
+    :return: None.
+    """
+    cites: dict[int, list[int]] = {rd_id: [] for rd_id in rd_ids}
+    for rd_id, opinion_id in OpinionsCitedByRECAPDocument.objects.filter(
+        citing_document_id__in=rd_ids
+    ).values_list("citing_document_id", "cited_opinion_id"):
+        cites[rd_id].append(opinion_id)
+    docket_ids = dict(
+        RECAPDocument.objects.filter(pk__in=rd_ids).values_list(
+            "pk", "docket_entry__docket_id"
+        )
+    )
+    documents_to_update = [
+        {
+            "_op_type": "update",
+            "_index": DocketDocument._index._name,
+            "_id": ES_CHILD_ID(rd_id).RECAP,
+            "_routing": docket_ids[rd_id],
+            "doc": {"cites": opinion_ids},
+        }
+        for rd_id, opinion_ids in cites.items()
+        if rd_id in docket_ids
+    ]
+    if not documents_to_update:
+        return
+
+    client = connections.get_connection(alias="no_retry_connection")
+    _, errors = bulk(client, documents_to_update, raise_on_error=False)
+    errors = [
+        error
+        for error in errors
+        if error.get("update", {}).get("error", {}).get("type")
+        != "document_missing_exception"
+    ]
+    if check_bulk_indexing_exception(
+        errors, "version_conflict_engine_exception"
+    ):
+        raise ConflictError("ConflictError indexing cites.", "", {})
+    if errors:
+        raise BulkIndexError(f"{len(errors)} document(s) failed.", errors)
+
+    if settings.ELASTICSEARCH_DSL_AUTO_REFRESH:
+        # Set auto-refresh, used for testing.
+        DocketDocument._index.refresh()
+
+
 @app.task(
     bind=True,
     max_retries=5,
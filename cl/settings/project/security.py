@@ -16,6 +16,13 @@ ALLOWED_HOSTS: list[str] = env(
 EGRESS_PROXY_HOSTS: list[str] = env.list(
     "EGRESS_PROXY_HOSTS", default=["http://cl-webhook-sentry:9090"]
 )
+# Webhook delivery. Connections to each egress proxy are pooled and kept
+# alive, and each endpoint gets at most this many requests at a time.
+WEBHOOK_POOL_MAXSIZE = env.int("WEBHOOK_POOL_MAXSIZE", default=50)
+WEBHOOK_MAX_WORKERS = env.int("WEBHOOK_MAX_WORKERS", default=20)
+WEBHOOK_ENDPOINT_CONCURRENCY = env.int(
+    "WEBHOOK_ENDPOINT_CONCURRENCY", default=4
+)
 
 SECURE_HSTS_SECONDS = 63_072_000
 SECURE_HSTS_INCLUDE_SUBDOMAINS = True
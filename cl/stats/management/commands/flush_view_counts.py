@@ -0,0 +1,41 @@
+import time
+
+from cl.lib.command_utils import VerboseCommand, logger
+from cl.lib.view_utils import flush_view_counts
+
+
+class Command(VerboseCommand):
+    help = (
+        "Write the view counts accumulated in Redis to the DB. Runs "
+        "continuously unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=60,
+            help="The number of seconds to wait between flushes.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="The number of objects to update per query.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            default=False,
+            help="Flush once and exit, instead of running continuously.",
+        )
+
+    def handle(self, *args, **options):
+        super().handle(*args, **options)
+
+        while True:
+            updated = flush_view_counts(options["chunk_size"])
+            logger.info("Flushed the view counts of %s objects.", updated)
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
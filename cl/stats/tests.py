@@ -1,8 +1,17 @@
+from unittest import mock
+
 import pytest
 from asgiref.sync import async_to_sync
 
+from cl.lib.redis_utils import get_redis_interface
 from cl.stats.models import Stat
-from cl.stats.utils import get_milestone_range, tally_stat
+from cl.stats.utils import (
+    STATS_PENDING_KEY,
+    STATS_TOTALS_KEY,
+    flush_stats,
+    get_milestone_range,
+    tally_stat,
+)
 from cl.tests.cases import TestCase
 
 
@@ -17,9 +26,12 @@ class MilestoneTests(TestCase):
 class StatTests(TestCase):
     def setUp(self) -> None:
         Stat.objects.all().delete()
+        self.r = get_redis_interface("STATS")
+        self.r.delete(STATS_PENDING_KEY, STATS_TOTALS_KEY)
 
     def tearDown(self) -> None:
         Stat.objects.all().delete()
+        self.r.delete(STATS_PENDING_KEY, STATS_TOTALS_KEY)
 
     def test_tally_a_stat(self) -> None:
         count = async_to_sync(tally_stat)("test")
@@ -36,3 +48,45 @@ class StatTests(TestCase):
         self.assertEqual(count, 2)
         count = async_to_sync(tally_stat)("test3", inc=2)
         self.assertEqual(count, 4)
+
+    def test_flush_stats(self) -> None:
+        """Are stat increments written to the DB in one query per chunk?"""
+        async_to_sync(tally_stat)("test4")
+        async_to_sync(tally_stat)("test4", inc=2)
+        async_to_sync(tally_stat)("test5")
+        self.assertFalse(Stat.objects.exists())
+
+        with self.assertNumQueries(3):
+            # A savepoint, the upsert, and the savepoint's release.
+            self.assertEqual(flush_stats(), 2)
+        self.assertEqual(Stat.objects.get(name="test4").count, 3)
+        self.assertEqual(Stat.objects.get(name="test5").count, 1)
+
+        # Counts keep adding up after a flush.
+        count = async_to_sync(tally_stat)("test4")
+        self.assertEqual(count, 4)
+        flush_stats()
+        self.assertEqual(Stat.objects.get(name="test4").count, 4)
+
+        # Nothing is left in Redis to be written again.
+        self.assertEqual(list(self.r.scan_iter(f"{STATS_PENDING_KEY}*")), [])
+
+    def test_failed_flush_keeps_the_increments(self) -> None:
+        """Are the increments put back in Redis if the upsert fails?"""
+        async_to_sync(tally_stat)("test6", inc=2)
+        with mock.patch(
+            "cl.stats.utils.upsert_stats", side_effect=ValueError
+        ), self.assertRaises(ValueError):
+            flush_stats()
+        self.assertFalse(Stat.objects.exists())
+        self.assertEqual(
+            list(self.r.scan_iter(f"{STATS_PENDING_KEY}*")),
+            [STATS_PENDING_KEY],
+        )
+
+        self.assertEqual(flush_stats(), 1)
+        self.assertEqual(Stat.objects.get(name="test6").count, 2)
+
+    def test_flush_stats_with_nothing_pending(self) -> None:
+        """Does flushing work when there's nothing to flush?"""
+        self.assertEqual(flush_stats(), 0)
@@ -1,10 +1,13 @@
+import uuid
 from collections import OrderedDict
+from datetime import date, datetime
+from itertools import batched
+from typing import Iterable
 
 import redis
 import requests
 from django.conf import settings
-from django.db import OperationalError, connections
-from django.db.models import F
+from django.db import OperationalError, connection, connections, transaction
 from django.utils.timezone import now
 
 from cl.lib.db_tools import fetchall_as_dict
@@ -47,27 +50,128 @@ def get_milestone_range(start, end):
     return out
 
 
+# Stat increments are accumulated in a Redis hash mapping "date:name" to the
+# increments that haven't been written to the DB yet, and written to the DB by
+# flush_stats.
+STATS_PENDING_KEY = "stats.pending"
+# The counts in the DB as of the last flush, so that tally_stat can return
+# running totals without querying the DB.
+STATS_TOTALS_KEY = "stats.totals"
+STATS_TOTALS_TTL = 60 * 60 * 24 * 2
+
+
+def make_stat_field(name: str, date_logged: date | datetime | None) -> str:
+    """Make the field used for a stat in the Redis hashes.
+
+    :param name: The name of the stat.
+    :param date_logged: The date or datetime the event happened, converted to
+    a date the same way the date_logged field of Stat does it. Defaults to
+    now.
+    :return: The field, in the form "date:name".
+    """
+    if date_logged is None:
+        date_logged = now()
+    date_logged = Stat._meta.get_field("date_logged").to_python(date_logged)
+    return f"{date_logged.isoformat()}:{name}"
+
+
 async def tally_stat(name, inc=1, date_logged=None):
-    """Tally an event's occurrence to the database.
+    """Tally an event's occurrence.
 
     Will assume the following overridable values:
        - the event happened today.
        - the event happened once.
+
+    The increment goes to Redis, and is written to the database the next
+    time flush_stats runs. This way, busy stats don't turn into hot rows that
+    every worker waits on. Since Redis holds the count right away, nothing is
+    lost if the worker shuts down before the flush.
+
+    :return: The count of the stat so far, including the increments that
+    haven't been flushed yet.
     """
-    if date_logged is None:
-        date_logged = now()
-    stat, created = await Stat.objects.aget_or_create(
-        name=name, date_logged=date_logged, defaults={"count": inc}
-    )
-    if created:
-        return stat.count
-    else:
-        count_cache = stat.count
-        stat.count = F("count") + inc
-        await stat.asave()
-        # stat doesn't have the new value when it's updated with a F object, so
-        # we fake the return value instead of looking it up again for the user.
-        return count_cache + inc
+    field = make_stat_field(name, date_logged)
+    pipe = get_redis_interface("STATS").pipeline()
+    pipe.hincrby(STATS_PENDING_KEY, field, inc)
+    pipe.hget(STATS_TOTALS_KEY, field)
+    pending, total = pipe.execute()
+    return int(total or 0) + pending
+
+
+def flush_stats(chunk_size: int = 1000) -> int:
+    """Write the stat increments accumulated in Redis to the database.
+
+    The pending hash is renamed before it's read, so increments tallied while
+    the flush runs go to a fresh hash and are picked up by the next flush.
+    Each chunk of stats is then upserted with a single query, and the renamed
+    hash is deleted before the transaction commits, so increments that are
+    in the database are never left in Redis to be written again. If anything
+    fails before the commit, the increments are put back into Redis so no
+    counts are lost.
+
+    Call this at the end of management commands that tally stats, and in
+    tests, to see the counts in the database right away.
+
+    :param chunk_size: The number of stats to upsert per query.
+    :return: The number of stats that were updated.
+    """
+    r = get_redis_interface("STATS")
+    flushing_key = f"{STATS_PENDING_KEY}:flushing:{uuid.uuid4().hex}"
+    try:
+        r.rename(STATS_PENDING_KEY, flushing_key)
+    except redis.exceptions.ResponseError:
+        # Nothing is pending.
+        return 0
+
+    increments = r.hgetall(flushing_key)
+    totals = {}
+    try:
+        with transaction.atomic():
+            for chunk in batched(increments.items(), chunk_size):
+                totals.update(upsert_stats(chunk))
+            r.delete(flushing_key)
+    except Exception:
+        pipe = r.pipeline()
+        for field, inc in increments.items():
+            pipe.hincrby(STATS_PENDING_KEY, field, int(inc))
+        pipe.delete(flushing_key)
+        pipe.execute()
+        raise
+
+    pipe = r.pipeline()
+    pipe.hset(STATS_TOTALS_KEY, mapping=totals)
+    pipe.expire(STATS_TOTALS_KEY, STATS_TOTALS_TTL)
+    pipe.execute()
+    return len(increments)
+
+
+def upsert_stats(increments: Iterable[tuple[str, str]]) -> dict[str, int]:
+    """Add increments to many stats in one query, creating the ones that
+    don't exist yet.
+
+    :param increments: (field, increment) tuples, with fields as made by
+    make_stat_field.
+    :return: A dict mapping the fields to their new counts.
+    """
+    values = []
+    params: list[str | int] = []
+    for field, inc in increments:
+        date_logged, name = field.split(":", 1)
+        values.append("(%s, %s::date, %s)")
+        params.extend([name, date_logged, int(inc)])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {Stat._meta.db_table} (name, date_logged, count) "
+            f"VALUES {', '.join(values)} "
+            f"ON CONFLICT (date_logged, name) DO UPDATE "
+            f"SET count = {Stat._meta.db_table}.count + EXCLUDED.count "
+            f"RETURNING name, date_logged, count",
+            params,
+        )
+        return {
+            f"{date_logged.isoformat()}:{name}": count
+            for name, date_logged, count in cursor.fetchall()
+        }
 
 
 def check_redis() -> bool:
@@ -3309,7 +3309,7 @@ class WebhooksHTMXTests(APITestCase):
             kwargs={"pk": webhooks_first.pk, "format": "json"},
         )
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockPostResponse(
                 200, mock_raw=True
             ),
@@ -3327,7 +3327,7 @@ class WebhooksHTMXTests(APITestCase):
         )
 
         with mock.patch(
-            "cl.api.webhooks.requests.post",
+            "cl.api.webhooks.requests.Session.post",
             side_effect=lambda *args, **kwargs: MockPostResponse(
                 500, mock_raw=True
             ),
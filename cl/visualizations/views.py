@@ -22,7 +22,7 @@ from django.views.decorators.csrf import ensure_csrf_cookie
 
 from cl.lib.bot_detector import is_bot
 from cl.lib.http import is_ajax
-from cl.lib.view_utils import increment_view_count
+from cl.lib.view_utils import get_pending_view_counts, increment_view_count
 from cl.stats.utils import tally_stat
 from cl.visualizations.forms import VizEditForm, VizForm
 from cl.visualizations.models import Referer, SCOTUSMap
@@ -303,6 +303,13 @@ async def gallery(request: HttpRequest) -> HttpResponse:
         paged_vizes = await sync_to_async(paginator.page)(1)
     except EmptyPage:
         paged_vizes = await sync_to_async(paginator.page)(paginator.num_pages)
+    # Show the live view counts, including views not flushed to the DB yet.
+    paged_vizes.object_list = [viz async for viz in paged_vizes.object_list]
+    pending_views = get_pending_view_counts(
+        SCOTUSMap, [viz.pk for viz in paged_vizes.object_list]
+    )
+    for viz in paged_vizes.object_list:
+        viz.view_count += pending_views.get(viz.pk, 0)
     return TemplateResponse(
         request,
         "gallery.html",
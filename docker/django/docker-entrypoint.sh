@@ -23,8 +23,10 @@ case "$1" in
     # 1. Set high number of --workers. Docs recommend 2-4× core count
     # 2. Set --limit-request-line to high value to allow long Solr queries
     # 3. Set --max-requests to reset each worker once in a while
+    # 4. --preload loads the app before forking, so workers share its memory
     exec gunicorn cl.asgi:application \
         --chdir /opt/courtlistener/ \
+        --preload \
         --user www-data \
         --group www-data \
         --workers ${NUM_WORKERS:-48} \